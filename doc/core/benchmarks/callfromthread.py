@@ -0,0 +1,107 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Measure how quickly the reactor runs calls queued by many threads with
+C{callFromThread}, and how many times those threads wake it up.
+
+For each number of producer threads, every thread queues the same number of
+calls as fast as it can, and the time until the reactor has run all of them is
+measured.
+"""
+
+import sys
+import threading
+import time
+
+from twisted.internet import reactor
+from twisted.internet.defer import Deferred, inlineCallbacks
+
+
+class Counter(object):
+    """
+    Counts the queued calls which have been run, and fires C{done} once all
+    of them have.
+    """
+
+    def __init__(self, expected):
+        self.expected = expected
+        self.calls = 0
+        self.done = Deferred()
+
+
+    def call(self):
+        self.calls += 1
+        if self.calls == self.expected:
+            self.done.callback(None)
+
+
+
+def produce(counter, calls):
+    callFromThread = reactor.callFromThread
+    call = counter.call
+    for i in xrange(calls):
+        callFromThread(call)
+
+
+
+class WakeUpCounter(object):
+    """
+    Counts the calls to the reactor's C{wakeUp}.
+    """
+
+    def __init__(self):
+        self.wakeUps = 0
+        self._wakeUp = reactor.wakeUp
+        reactor.wakeUp = self.wakeUp
+
+
+    def wakeUp(self):
+        self.wakeUps += 1
+        self._wakeUp()
+
+
+
+@inlineCallbacks
+def benchmark(wakeUps, producers, calls):
+    counter = Counter(producers * calls)
+    threads = [
+        threading.Thread(target=produce, args=(counter, calls))
+        for i in range(producers)]
+    wakeUps.wakeUps = 0
+    before = time.time()
+    for thread in threads:
+        thread.start()
+    yield counter.done
+    elapsed = time.time() - before
+    for thread in threads:
+        thread.join()
+    total = producers * calls
+    print "%9d %9d %9.3f %12.0f %12.4f" % (
+        producers, calls, elapsed, total / elapsed,
+        wakeUps.wakeUps / float(total))
+
+
+
+@inlineCallbacks
+def run(calls):
+    wakeUps = WakeUpCounter()
+    print "%9s %9s %9s %12s %12s" % (
+        "threads", "calls", "seconds", "calls/sec", "wakeups/call")
+    try:
+        for producers in [1, 4, 16, 64]:
+            yield benchmark(wakeUps, producers, calls // producers)
+    finally:
+        reactor.stop()
+
+
+
+def main(args):
+    calls = 1000000
+    if args:
+        calls = int(args[0])
+    reactor.callWhenRunning(run, calls)
+    reactor.run()
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -9,6 +9,7 @@ This is mainly useful to compare cdefer.Deferred to defer.Deferred
 
 
 from twisted.internet import defer
+from twisted.python.failure import Failure
 from timer import timeit
 
 benchmarkFuncs = []
@@ -66,6 +67,11 @@ instantiateShootErrback = benchmarkFunc(200)(instantiateShootErrback)
 
 ns = [10, 1000, 10000]
 
+try:
+    1/0
+except:
+    failure = Failure()
+
 def instantiateAddCallbacksNoResult(n):
     """
     Creates a deferred and adds a trivial callback/errback/both to it the given
@@ -133,6 +139,95 @@ def pauseUnpause(n):
     d.unpause()
 pauseUnpause = benchmarkNFunc(20, ns)(pauseUnpause)
 
+def succeedResult():
+    """
+    Create a deferred which already has a result with L{defer.succeed}.
+    """
+    defer.succeed(1)
+succeedResult = benchmarkFunc(100000)(succeedResult)
+
+def callbackChain(n):
+    """
+    Adds the given number of callbacks to a deferred, and then shoots a result
+    through them.
+    """
+    d = defer.Deferred()
+    def f(result):
+        return result
+    for i in xrange(n):
+        d.addCallback(f)
+    d.callback(1)
+callbackChain = benchmarkNFunc(20000, [1, 5, 20])(callbackChain)
+
+def errbackChain(n):
+    """
+    Adds the given number of callbacks and then an errback to a deferred, and
+    then shoots a failure past the callbacks to the errback.
+    """
+    d = defer.Deferred()
+    def f(result):
+        return result
+    for i in xrange(n):
+        d.addCallback(f)
+    d.addErrback(lambda reason: None)
+    d.errback(failure)
+errbackChain = benchmarkNFunc(20000, [1, 5, 20])(errbackChain)
+
+def deferredList(n):
+    """
+    Creates the given number of deferreds, waits for all of them with a
+    L{defer.DeferredList}, and then gives each of them a result.
+    """
+    ds = [defer.Deferred() for i in xrange(n)]
+    defer.DeferredList(ds)
+    for d in ds:
+        d.callback(None)
+deferredList = benchmarkNFunc(10, [10000])(deferredList)
+
+def gatherResults(n):
+    """
+    Creates the given number of deferreds, waits for all of them with
+    L{defer.gatherResults}, and then gives each of them a result.
+    """
+    ds = [defer.Deferred() for i in xrange(n)]
+    defer.gatherResults(ds)
+    for d in ds:
+        d.callback(None)
+gatherResults = benchmarkNFunc(10, [10000])(gatherResults)
+
+def inlineCallbacksRecursion(n):
+    """
+    Calls a function decorated with L{defer.inlineCallbacks} which calls
+    itself recursively to the given depth, each level yielding the deferred
+    of the next.  The deepest level returns a result immediately.
+    """
+    @defer.inlineCallbacks
+    def recurse(depth):
+        if depth:
+            yield recurse(depth - 1)
+        defer.returnValue(depth)
+    recurse(n)
+inlineCallbacksRecursion = benchmarkNFunc(1000, [10, 100])(
+    inlineCallbacksRecursion)
+
+def inlineCallbacksRecursionWaiting(n):
+    """
+    Like L{inlineCallbacksRecursion}, but the deepest level waits for a
+    deferred which is given a result once all of the levels are waiting.
+    """
+    waiting = defer.Deferred()
+    @defer.inlineCallbacks
+    def recurse(depth):
+        if depth:
+            yield recurse(depth - 1)
+        else:
+            yield waiting
+        defer.returnValue(depth)
+    recurse(n)
+    waiting.callback(None)
+inlineCallbacksRecursionWaiting = benchmarkNFunc(1000, [10, 100])(
+    inlineCallbacksRecursionWaiting)
+
 def benchmark():
     """
     Run all of the benchmarks registered in the benchmarkFuncs list
@@ -3,6 +3,7 @@
 
 import random
 from twisted.python import failure
+from twisted.internet import defer
 
 random.seed(10050)
 O = [0, 20, 40, 60, 80, 10, 30, 50, 70, 90]
@@ -52,15 +53,28 @@ def fail_easy(n):
         except:
             pass
 
+def trap(f):
+    f.trap(PythonException)
+    return f
+
+def fail_errbacks(n):
+    for i in R:
+        d = defer.fail(PythonException())
+        for j in range(n):
+            d.addErrback(trap)
+        d.addErrback(lambda f: None)
+
 from timer import timeit
 # for i in O:
 #     timeit(fail, 1, i)
 
-# for i in O:
-#     print 'easy failing', i, timeit(fail_easy, 1, i)
+print 'easy failing', timeit(fail_easy, 1, 0)
+
+for i in (1, 5, 20):
+    print 'errbacks', i, timeit(fail_errbacks, 1, i)
 
 for i in O:
     print 'failing', i, timeit(fail, 1, i)
 
-# for i in O:
-#     print 'string failing', i, timeit(fail_str, 1, i)
+for i in O:
+    print 'string failing', i, timeit(fail_str, 1, i)
@@ -0,0 +1,106 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Measure how much memory a server uses for each idle TCP connection.
+
+A child process opens many connections to a server running a line-based
+protocol with an idle timeout, and sends one line on each of them.  Once the
+server has received every line, the growth of its resident set size is divided
+by the number of connections.
+
+It measures the tree it is run from, so to compare two versions of Twisted,
+run it once with each on C{PYTHONPATH}.
+"""
+
+import gc
+import resource
+import subprocess
+import sys
+
+from twisted.internet import reactor
+from twisted.internet.protocol import ServerFactory
+from twisted.protocols.basic import LineReceiver
+from twisted.protocols.policies import TimeoutMixin
+
+
+CLIENT = """
+import socket, sys
+port, count = int(sys.argv[1]), int(sys.argv[2])
+connections = []
+for i in range(count):
+    s = socket.socket()
+    s.connect(("127.0.0.1", port))
+    s.send(b"hello\\r\\n")
+    connections.append(s)
+sys.stdin.read()
+"""
+
+
+class IdleProtocol(LineReceiver, TimeoutMixin):
+    """
+    Counts the lines received, and then waits for more until its timeout.
+    """
+
+    def connectionMade(self):
+        self.setTimeout(3600)
+
+
+    def lineReceived(self, line):
+        self.resetTimeout()
+        self.factory.received()
+
+
+
+class IdleFactory(ServerFactory):
+    protocol = IdleProtocol
+
+    def __init__(self, expected, done):
+        self.expected = expected
+        self.lines = 0
+        self.done = done
+
+
+    def received(self):
+        self.lines += 1
+        if self.lines == self.expected:
+            self.done()
+
+
+
+def residentSize():
+    """
+    Return the largest resident set size of this process so far, in bytes.
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return usage
+    return usage * 1024
+
+
+
+def main(args):
+    count = 5000
+    if args:
+        count = int(args[0])
+
+    def done():
+        gc.collect()
+        used = residentSize() - before
+        print "%9s %12s %12s" % ("conns", "bytes", "bytes/conn")
+        print "%9d %12d %12.0f" % (count, used, used / float(count))
+        client.stdin.close()
+        reactor.stop()
+
+    factory = IdleFactory(count, done)
+    port = reactor.listenTCP(0, factory, backlog=1024, interface="127.0.0.1")
+    gc.collect()
+    before = residentSize()
+    client = subprocess.Popen(
+        [sys.executable, "-c", CLIENT, str(port.getHost().port), str(count)],
+        stdin=subprocess.PIPE)
+    reactor.run()
+    client.wait()
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,89 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Compare the timer queues in L{twisted.internet.timers}.
+
+Each queue is filled with a number of timers spread over ten minutes, then
+a hundred of the timers are reset a little sooner, a quarter of them are
+cancelled and finally the clock is advanced one second at a time until all of
+them have run.  (Resetting a timer to a later time, as an idle timeout which
+is refreshed by activity is, costs the same for every queue.)
+"""
+
+import random
+
+from timer import timeit
+
+from twisted.internet.base import DelayedCall
+from twisted.internet.timers import HeapTimerQueue, TimingWheel
+
+
+class FakeClock(object):
+    now = 0.0
+
+    def seconds(self):
+        return self.now
+
+
+
+def schedule(queue, clock, times):
+    calls = []
+    for when in times:
+        call = DelayedCall(when, lambda: None, (), {},
+                           queue.cancel, queue.moveSooner, clock.seconds)
+        queue.add(call)
+        calls.append(call)
+    return calls
+
+
+
+def reset(calls):
+    for call in calls[:100]:
+        call.reset(call.time - call.seconds() - 1)
+
+
+
+def cancel(calls):
+    for call in calls[::4]:
+        call.cancel()
+
+
+
+def drain(queue, clock):
+    while len(queue):
+        clock.now += 1
+        while True:
+            call = queue.popDue(clock.now)
+            if call is None:
+                break
+            call.called = 1
+        queue.nextTime()
+
+
+
+def benchmark(factory, n):
+    clock = FakeClock()
+    queue = factory()
+    times = [random.uniform(1, 600) for i in xrange(n)]
+    result = []
+    calls = []
+    result.append(
+        timeit(lambda: calls.extend(schedule(queue, clock, times)), 1))
+    result.append(timeit(reset, 1, calls))
+    result.append(timeit(cancel, 1, calls))
+    result.append(timeit(drain, 1, queue, clock))
+    return result
+
+
+
+def main():
+    print "%-15s %9s %9s %9s %9s %9s" % (
+        "queue", "timers", "schedule", "reset", "cancel", "drain")
+    for n in [10000, 100000, 1000000]:
+        for factory in [HeapTimerQueue, TimingWheel]:
+            print "%-15s %9d %9.3f %9.3f %9.3f %9.3f" % (
+                (factory.__name__, n) + tuple(benchmark(factory, n)))
+
+if __name__ == '__main__':
+    main()
@@ -33,12 +33,14 @@ modules = [
     "twisted.internet.gireactor",
     "twisted.internet._glibbase",
     "twisted.internet.gtk3reactor",
+    "twisted.internet.instrumentation",
     "twisted.internet.main",
     "twisted.internet._newtls",
     "twisted.internet.posixbase",
     "twisted.internet.protocol",
     "twisted.internet.pollreactor",
     "twisted.internet.reactor",
+    "twisted.internet.reactorgroup",
     "twisted.internet.selectreactor",
     "twisted.internet._signals",
     "twisted.internet.ssl",
@@ -50,6 +52,7 @@ modules = [
     "twisted.internet.test._posixifaces",
     "twisted.internet.test.reactormixins",
     "twisted.internet.threads",
+    "twisted.internet.timers",
     "twisted.internet.udp",
     "twisted.internet.util",
     "twisted.names",
@@ -77,10 +80,12 @@ modules = [
     "twisted.python.filepath",
     "twisted.python.lockfile",
     "twisted.python.log",
+    "twisted.python._mmsg",
     "twisted.python.monkey",
     "twisted.python.randbytes",
     "twisted.python._reflectpy3",
     "twisted.python.runtime",
+    "twisted.python._sendfile",
     "twisted.python.test",
     "twisted.python.test.deprecatedattributes",
     "twisted.python.test.modules_helpers",
@@ -88,6 +93,7 @@ modules = [
     "twisted.python.threadpool",
     "twisted.python.util",
     "twisted.python.versions",
+    "twisted.python._writev",
     "twisted.test",
     "twisted.test.proto_helpers",
     "twisted.test.ssl_helpers",
@@ -130,15 +136,18 @@ testModules = [
     "twisted.internet.test.test_fdset",
     "twisted.internet.test.test_filedescriptor",
     "twisted.internet.test.test_inlinecb",
+    "twisted.internet.test.test_instrumentation",
     "twisted.internet.test.test_gireactor",
     "twisted.internet.test.test_glibbase",
     "twisted.internet.test.test_main",
     "twisted.internet.test.test_newtls",
     "twisted.internet.test.test_posixbase",
     "twisted.internet.test.test_protocol",
+    "twisted.internet.test.test_reactorgroup",
     "twisted.internet.test.test_sigchld",
     "twisted.internet.test.test_tcp",
     "twisted.internet.test.test_threads",
+    "twisted.internet.test.test_timers",
     "twisted.internet.test.test_tls",
     "twisted.internet.test.test_udp",
     "twisted.internet.test.test_udp_internals",
@@ -152,10 +161,13 @@ testModules = [
     "twisted.python.test.test_components",
     "twisted.python.test.test_constants",
     "twisted.python.test.test_deprecate",
+    "twisted.python.test.test_mmsg",
     "twisted.python.test.test_reflectpy3",
     "twisted.python.test.test_runtime",
+    "twisted.python.test.test_sendfile",
     "twisted.python.test.test_util",
     "twisted.python.test.test_versions",
+    "twisted.python.test.test_writev",
     "twisted.test.test_abstract",
     "twisted.test.test_compat",
     "twisted.test.test_context",
@@ -0,0 +1,26 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Benchmarks of the reactors and of the protocols built on them.
+
+Run them with::
+
+    python -m twisted.benchmarks --output results.json
+
+Each benchmark is run once with each of the reactors given with
+C{--reactors}, in a new process for each reactor, and the results are written
+as JSON.  Passing the results of an earlier run with C{--compare} reports how
+the rate of each benchmark has changed since then.
+
+A benchmark is a function which takes a reactor and a C{scale}, a multiplier
+for the amount of work it does, and returns a L{Deferred
+<twisted.internet.defer.Deferred>} which fires with a C{dict} describing the
+work done, with at least these items:
+
+  - C{"unit"}: the name of the operations counted, such as C{"bytes"}.
+  - C{"operations"}: the number of operations done.
+  - C{"elapsed"}: the time, in seconds, that they took.
+
+@see: L{twisted.benchmarks.runner}
+"""
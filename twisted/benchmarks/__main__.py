@@ -0,0 +1,14 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Run the benchmarks in L{twisted.benchmarks}.
+"""
+
+from __future__ import absolute_import
+
+import sys
+
+from twisted.benchmarks.runner import main
+
+main(sys.argv[1:])
@@ -0,0 +1,124 @@
+# -*- test-case-name: twisted.benchmarks.test.test_benchmarks -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Helpers for benchmarks which connect to a server of their own over the
+loopback interface.
+"""
+
+from __future__ import division, absolute_import
+
+from twisted.internet import protocol
+from twisted.internet.defer import Deferred, succeed, inlineCallbacks
+
+
+class TrackingFactory(protocol.ServerFactory):
+    """
+    A server factory which builds protocols with another factory, and keeps
+    count of the connections which are still open, so that a benchmark can
+    wait for the server side of all of them to be closed.
+
+    @ivar wrapped: The factory which builds the protocols.
+
+    @ivar open: The number of connections which are open.
+
+    @ivar _waiting: L{Deferred}s to fire when no connections are open.
+    """
+
+    def __init__(self, wrapped):
+        self.wrapped = wrapped
+        self.open = 0
+        self._waiting = []
+
+
+    def doStart(self):
+        self.wrapped.doStart()
+
+
+    def doStop(self):
+        self.wrapped.doStop()
+
+
+    def buildProtocol(self, addr):
+        """
+        Build a protocol with the wrapped factory, and arrange to be told when
+        its connection is lost.
+        """
+        p = self.wrapped.buildProtocol(addr)
+        if p is None:
+            return None
+        self.open += 1
+        connectionLost = p.connectionLost
+        def lost(reason):
+            del p.connectionLost
+            connectionLost(reason)
+            self.open -= 1
+            if not self.open:
+                waiting, self._waiting = self._waiting, []
+                for d in waiting:
+                    d.callback(None)
+        p.connectionLost = lost
+        return p
+
+
+    def whenClosed(self):
+        """
+        @return: A L{Deferred} which fires when no connections are open.
+        """
+        if not self.open:
+            return succeed(None)
+        d = Deferred()
+        self._waiting.append(d)
+        return d
+
+
+
+class ClosingProtocol(protocol.Protocol):
+    """
+    A protocol with a L{Deferred} which fires when its connection is lost.
+
+    @ivar closed: A L{Deferred} which fires with C{None} when the connection is
+        lost.
+    """
+
+    def __init__(self):
+        self.closed = Deferred()
+
+
+    def connectionLost(self, reason):
+        self.closed.callback(None)
+
+
+
+def listen(reactor, factory):
+    """
+    Listen for TCP connections on the loopback interface.
+
+    @param reactor: The reactor to listen with.
+
+    @param factory: The factory to build protocols with.
+
+    @return: A C{(port, tracker)} tuple of the L{IListeningPort} and the
+        L{TrackingFactory} which wraps C{factory}.
+    """
+    tracker = TrackingFactory(factory)
+    port = reactor.listenTCP(0, tracker, backlog=128, interface="127.0.0.1")
+    return port, tracker
+
+
+
+@inlineCallbacks
+def shutdown(port, tracker):
+    """
+    Stop listening, and wait for the server side of every connection to be
+    closed.
+
+    @param port: The L{IListeningPort} to stop.
+
+    @param tracker: The L{TrackingFactory} returned with C{port} by L{listen}.
+
+    @return: A L{Deferred} which fires when everything is closed.
+    """
+    yield port.stopListening()
+    yield tracker.whenClosed()
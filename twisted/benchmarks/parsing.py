@@ -0,0 +1,85 @@
+# -*- test-case-name: twisted.benchmarks.test.test_benchmarks -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Benchmarks of the parsing done by protocols in L{twisted.protocols.basic}.
+
+These do not use the reactor: the bytes are given to the protocol directly,
+in the size of chunk a transport would read at once.
+"""
+
+from __future__ import division, absolute_import
+
+import struct
+import time
+
+from twisted.internet.defer import succeed
+from twisted.protocols import basic
+from twisted.test.proto_helpers import StringTransport
+
+
+_CHUNK = 2 ** 16
+
+
+class CountingLineReceiver(basic.LineReceiver):
+    """
+    Count the lines received.
+    """
+    lines = 0
+
+    def lineReceived(self, line):
+        self.lines += 1
+
+
+
+class CountingInt32StringReceiver(basic.Int32StringReceiver):
+    """
+    Count the strings received.
+    """
+    strings = 0
+
+    def stringReceived(self, string):
+        self.strings += 1
+
+
+
+def _deliver(receiver, data):
+    """
+    Give bytes to a protocol in chunks, and return how long it took.
+    """
+    receiver.makeConnection(StringTransport())
+    chunks = [data[i:i + _CHUNK] for i in range(0, len(data), _CHUNK)]
+    started = time.time()
+    for chunk in chunks:
+        receiver.dataReceived(chunk)
+    return time.time() - started
+
+
+
+def lineReceiver(reactor, scale):
+    """
+    Measure how quickly L{basic.LineReceiver} splits bytes into lines.
+    """
+    count = max(1, int(200000 * scale))
+    data = b"".join(b"line number %d\r\n" % (i,) for i in range(count))
+    receiver = CountingLineReceiver()
+    elapsed = _deliver(receiver, data)
+    assert receiver.lines == count
+    return succeed({"unit": "lines", "operations": count, "elapsed": elapsed})
+
+
+
+def int32StringReceiver(reactor, scale):
+    """
+    Measure how quickly L{basic.Int32StringReceiver} splits bytes into
+    strings.
+    """
+    count = max(1, int(200000 * scale))
+    strings = [b"string number %d" % (i,) for i in range(count)]
+    data = b"".join(struct.pack("!I", len(s)) + s for s in strings)
+    receiver = CountingInt32StringReceiver()
+    elapsed = _deliver(receiver, data)
+    assert receiver.strings == count
+    return succeed({"unit": "strings", "operations": count,
+                    "elapsed": elapsed})
@@ -0,0 +1,106 @@
+# -*- test-case-name: twisted.benchmarks.test.test_benchmarks -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Benchmarks of starting child processes with C{spawnProcess}.
+
+Starting a process costs more the more memory and file descriptors the parent
+has, so these hold extra descriptors open while they run, as a server with
+many connections would.
+"""
+
+from __future__ import division, absolute_import
+
+import os
+import time
+
+from twisted.internet.defer import Deferred, gatherResults
+from twisted.internet.defer import inlineCallbacks, returnValue
+from twisted.internet.protocol import ProcessProtocol
+
+# How many processes to start at once.
+_CONCURRENCY = 8
+
+
+class EndedProtocol(ProcessProtocol):
+    """
+    A process protocol with a L{Deferred} which fires when the process ends.
+
+    @ivar ended: A L{Deferred} which fires with C{None} when the process has
+        ended.
+    """
+
+    def __init__(self):
+        self.ended = Deferred()
+
+
+    def processEnded(self, reason):
+        self.ended.callback(None)
+
+
+
+def _openDescriptors(count):
+    """
+    Open up to C{count} file descriptors, leaving at least half of the
+    process's limit free.
+    """
+    try:
+        import resource
+    except ImportError:
+        pass
+    else:
+        limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+        count = max(0, min(count, limit // 2 - 64))
+    return [os.open(os.devnull, os.O_RDONLY) for i in range(count)]
+
+
+
+@inlineCallbacks
+def _startProcesses(reactor, scale):
+    """
+    Start processes which exit at once, a few at a time, and wait for them to
+    end.
+    """
+    count = max(1, int(500 * scale))
+    environment = {"PATH": os.environ.get("PATH", os.defpath)}
+    descriptors = _openDescriptors(4000)
+    try:
+        started = time.time()
+        for first in range(0, count, _CONCURRENCY):
+            protocols = [EndedProtocol()
+                         for i in range(min(_CONCURRENCY, count - first))]
+            for protocol in protocols:
+                reactor.spawnProcess(
+                    protocol, "true", ["true"], environment)
+            yield gatherResults([protocol.ended for protocol in protocols])
+        elapsed = time.time() - started
+    finally:
+        for fd in descriptors:
+            os.close(fd)
+    returnValue({"unit": "processes", "operations": count,
+                 "elapsed": elapsed, "descriptors": len(descriptors)})
+
+
+
+def spawnProcesses(reactor, scale):
+    """
+    Measure how quickly processes can be started and reaped.
+    """
+    return _startProcesses(reactor, scale)
+
+
+
+def forkProcesses(reactor, scale):
+    """
+    Measure how quickly processes can be started and reaped by forking, the
+    way they are when posix_spawn cannot be used.
+    """
+    from twisted.internet import process
+    posixspawn = process._posixspawn
+    process._posixspawn = None
+    d = _startProcesses(reactor, scale)
+    def restore(result):
+        process._posixspawn = posixspawn
+        return result
+    return d.addBoth(restore)
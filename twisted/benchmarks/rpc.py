@@ -0,0 +1,131 @@
+# -*- test-case-name: twisted.benchmarks.test.test_benchmarks -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Benchmarks of remote calls with L{twisted.protocols.amp} and
+L{twisted.spread.pb}.
+"""
+
+from __future__ import division, absolute_import
+
+import time
+
+from twisted.internet import protocol
+from twisted.internet.defer import Deferred, inlineCallbacks, returnValue
+from twisted.internet.endpoints import TCP4ClientEndpoint, connectProtocol
+from twisted.protocols import amp
+from twisted.spread import pb
+
+from twisted.benchmarks._support import listen, shutdown
+
+
+class Echo(amp.Command):
+    """
+    Return the arguments given.
+    """
+    arguments = [(b"value", amp.String()), (b"number", amp.Integer())]
+    response = [(b"value", amp.String()), (b"number", amp.Integer())]
+
+
+
+class EchoServer(amp.AMP):
+    """
+    Respond to L{Echo}.
+    """
+
+    @Echo.responder
+    def echo(self, value, number):
+        return {"value": value, "number": number}
+
+
+
+class EchoClient(amp.AMP):
+    """
+    An L{amp.AMP} with a L{Deferred} which fires when its connection is lost.
+
+    @ivar closed: A L{Deferred} which fires with C{None} when the connection is
+        lost.
+    """
+
+    def __init__(self):
+        amp.AMP.__init__(self)
+        self.closed = Deferred()
+
+
+    def connectionLost(self, reason):
+        amp.AMP.connectionLost(self, reason)
+        self.closed.callback(None)
+
+
+
+class EchoRoot(pb.Root):
+    """
+    Return the arguments given to C{echo}.
+    """
+
+    def remote_echo(self, value, number):
+        return value, number
+
+
+
+class ClosingPBClientFactory(pb.PBClientFactory):
+    """
+    A L{pb.PBClientFactory} with a L{Deferred} which fires when its connection
+    is lost.
+
+    @ivar closed: A L{Deferred} which fires with C{None} when the connection is
+        lost.
+    """
+
+    def __init__(self):
+        pb.PBClientFactory.__init__(self)
+        self.closed = Deferred()
+
+
+    def clientConnectionLost(self, connector, reason, reconnecting=0):
+        pb.PBClientFactory.clientConnectionLost(
+            self, connector, reason, reconnecting)
+        self.closed.callback(None)
+
+
+
+@inlineCallbacks
+def ampRoundTrips(reactor, scale):
+    """
+    Measure how quickly AMP commands can be called, one after another.
+    """
+    count = max(1, int(10000 * scale))
+    port, tracker = listen(
+        reactor, protocol.Factory.forProtocol(EchoServer))
+    endpoint = TCP4ClientEndpoint(reactor, "127.0.0.1", port.getHost().port)
+    client = yield connectProtocol(endpoint, EchoClient())
+    started = time.time()
+    for i in range(count):
+        yield client.callRemote(Echo, value=b"hello", number=i)
+    elapsed = time.time() - started
+    client.transport.loseConnection()
+    yield client.closed
+    yield shutdown(port, tracker)
+    returnValue({"unit": "calls", "operations": count, "elapsed": elapsed})
+
+
+
+@inlineCallbacks
+def pbCalls(reactor, scale):
+    """
+    Measure how quickly PB remote methods can be called, one after another.
+    """
+    count = max(1, int(10000 * scale))
+    port, tracker = listen(reactor, pb.PBServerFactory(EchoRoot()))
+    factory = ClosingPBClientFactory()
+    reactor.connectTCP("127.0.0.1", port.getHost().port, factory)
+    root = yield factory.getRootObject()
+    started = time.time()
+    for i in range(count):
+        yield root.callRemote("echo", "hello", i)
+    elapsed = time.time() - started
+    factory.disconnect()
+    yield factory.closed
+    yield shutdown(port, tracker)
+    returnValue({"unit": "calls", "operations": count, "elapsed": elapsed})
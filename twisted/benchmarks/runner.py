@@ -0,0 +1,327 @@
+# -*- test-case-name: twisted.benchmarks.test.test_runner -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Run the benchmarks in L{twisted.benchmarks} with each of several reactors,
+and record the results as JSON.
+
+A reactor can only be installed once in a process, so the benchmarks are run
+in a new process for each reactor, which writes its results to a file for
+this one to collect.
+"""
+
+from __future__ import division, absolute_import
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from twisted import __version__
+from twisted.python import usage
+from twisted.python.reflect import namedAny
+from twisted.internet.defer import inlineCallbacks, returnValue
+
+
+# The names of the benchmarks, relative to twisted.benchmarks.  Their modules
+# are only imported once the reactor has been installed, since some of the
+# modules they import install the default reactor.
+BENCHMARKS = [
+    "tcp.echoThroughput",
+    "tcp.echoLatency",
+    "tcp.connectionSetup",
+    "timers.callLaterChurn",
+    "parsing.lineReceiver",
+    "parsing.int32StringReceiver",
+    "web.siteRequests",
+    "web.channelRequests",
+    "rpc.ampRoundTrips",
+    "rpc.pbCalls",
+    "processes.spawnProcesses",
+    "processes.forkProcesses",
+    ]
+
+DEFAULT_REACTORS = "select,poll,epoll"
+
+
+class Options(usage.Options):
+    """
+    Command line options for running benchmarks.
+    """
+    synopsis = "Usage: python -m twisted.benchmarks [options] [benchmark ...]"
+
+    longdesc = ("Run the named benchmarks, or all of them, with each reactor. "
+                "A name may also be a prefix, such as 'tcp'.")
+
+    optFlags = [
+        ["list", "l", "List the benchmarks and exit."],
+        ["worker", None,
+         "Run the benchmarks with a single reactor in this process."],
+        ]
+
+    optParameters = [
+        ["reactors", "r", DEFAULT_REACTORS,
+         "A comma-separated list of the reactors to use."],
+        ["repeat", "n", 3,
+         "The number of times to run each benchmark.", int],
+        ["scale", "s", 1.0,
+         "A multiplier for the amount of work each benchmark does.", float],
+        ["output", "o", None,
+         "The file to write the results to, as JSON."],
+        ["compare", "c", None,
+         "A file of earlier results to compare these results with."],
+        ]
+
+    def __init__(self):
+        usage.Options.__init__(self)
+        self["benchmarks"] = []
+
+
+    def parseArgs(self, *names):
+        self["benchmarks"] = selectBenchmarks(names)
+
+
+    def postOptions(self):
+        if self["repeat"] < 1:
+            raise usage.UsageError("--repeat must be at least 1")
+        if self["scale"] <= 0:
+            raise usage.UsageError("--scale must be greater than 0")
+        self["reactors"] = [
+            name.strip() for name in self["reactors"].split(",")
+            if name.strip()]
+        if self["worker"] and len(self["reactors"]) != 1:
+            raise usage.UsageError("--worker needs exactly one reactor")
+
+
+
+def selectBenchmarks(names):
+    """
+    Find the benchmarks with the given names, or names which start with them.
+
+    @param names: A sequence of names, or prefixes of names.  If it is empty,
+        every benchmark is selected.
+
+    @raise usage.UsageError: If a name matches no benchmark.
+
+    @return: A C{list} of names, in the order of L{BENCHMARKS}.
+    """
+    if not names:
+        return list(BENCHMARKS)
+    selected = set()
+    for name in names:
+        matches = [
+            benchmark for benchmark in BENCHMARKS
+            if benchmark == name or benchmark.startswith(name + ".")]
+        if not matches:
+            raise usage.UsageError("No benchmark named %r" % (name,))
+        selected.update(matches)
+    return [benchmark for benchmark in BENCHMARKS if benchmark in selected]
+
+
+
+def loadBenchmarks(names):
+    """
+    Import benchmarks.
+
+    @param names: A sequence of names from L{BENCHMARKS}.
+
+    @return: A C{list} of C{(name, benchmark)} tuples.
+    """
+    return [(name, namedAny("twisted.benchmarks." + name)) for name in names]
+
+
+
+@inlineCallbacks
+def measure(reactor, benchmarks, scale, repeat):
+    """
+    Run benchmarks, one after another.
+
+    @param reactor: The reactor to run them with.
+
+    @param benchmarks: A C{list} of C{(name, benchmark)} tuples.
+
+    @param scale: The multiplier for the amount of work each one does.
+
+    @param repeat: The number of times to run each one.
+
+    @return: A L{Deferred} which fires with a C{dict} mapping the name of each
+        benchmark to a C{dict} of its results.  This has the C{"unit"} and
+        C{"operations"} of the benchmark, the C{"elapsed"} time of each run,
+        and the C{"rate"} of operations per second of the fastest run, along
+        with anything else the fastest run reported.
+    """
+    results = {}
+    for name, benchmark in benchmarks:
+        runs = []
+        for i in range(repeat):
+            result = yield benchmark(reactor, scale)
+            runs.append(result)
+        best = min(runs, key=lambda result: result["elapsed"])
+        summary = dict(best)
+        summary["elapsed"] = [result["elapsed"] for result in runs]
+        summary["rate"] = best["operations"] / max(best["elapsed"], 1e-9)
+        results[name] = summary
+    returnValue(results)
+
+
+
+def compare(baseline, results):
+    """
+    Compare the rates of benchmarks in two sets of results.
+
+    @param baseline: Earlier results, as written by L{main}.
+
+    @param results: Later results.
+
+    @return: A C{list} of C{(reactor, benchmark, before, after, change)}
+        tuples, for each benchmark run with the same reactor in both, where
+        C{change} is the relative change of the rate, so that C{0.1} means
+        it is ten percent higher.
+    """
+    changes = []
+    for reactorName, after in sorted(results["reactors"].items()):
+        before = baseline.get("reactors", {}).get(reactorName, {})
+        for name in BENCHMARKS:
+            if name in before and name in after:
+                old = before[name]["rate"]
+                new = after[name]["rate"]
+                changes.append(
+                    (reactorName, name, old, new, (new - old) / old))
+    return changes
+
+
+
+def runWorker(reactorName, benchmarks, scale, repeat):
+    """
+    Run benchmarks with a reactor in a new process.
+
+    @param reactorName: The short name of the reactor, as accepted by
+        L{twisted.application.reactors.installReactor}.
+
+    @param benchmarks: A C{list} of the names of the benchmarks.
+
+    @param scale: The multiplier for the amount of work each one does.
+
+    @param repeat: The number of times to run each one.
+
+    @return: A C{(results, error)} tuple.  C{results} is the C{dict} of
+        results from L{measure}, or C{None} if the process failed, in which
+        case C{error} is the last line it wrote to standard error.
+    """
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        args = [sys.executable, "-m", "twisted.benchmarks", "--worker",
+                "--reactors", reactorName, "--scale", repr(scale),
+                "--repeat", str(repeat), "--output", path]
+        args.extend(benchmarks)
+        process = subprocess.Popen(args, stderr=subprocess.PIPE)
+        out, err = process.communicate()
+        if process.returncode:
+            lines = err.decode("utf-8", "replace").strip().splitlines()
+            return None, lines[-1] if lines else "exited with status %d" % (
+                process.returncode,)
+        with open(path) as f:
+            return json.load(f), None
+    finally:
+        os.remove(path)
+
+
+
+def _work(options):
+    """
+    Run the benchmarks with the reactor given in C{options}, in this process,
+    and write the results to the output file.
+    """
+    from twisted.application.reactors import installReactor
+    from twisted.internet.task import react
+
+    installReactor(options["reactors"][0])
+    benchmarks = loadBenchmarks(options["benchmarks"])
+
+    def write(results):
+        with open(options["output"], "w") as f:
+            json.dump(results, f)
+
+    react(lambda reactor: measure(
+            reactor, benchmarks, options["scale"],
+            options["repeat"]).addCallback(write))
+
+
+
+def _report(results, write):
+    """
+    Write a table of the rate of each benchmark.
+    """
+    for reactorName, benchmarks in sorted(results["reactors"].items()):
+        for name in BENCHMARKS:
+            if name in benchmarks:
+                result = benchmarks[name]
+                write("%-8s %-28s %14.1f %s/s\n" % (
+                        reactorName, name, result["rate"], result["unit"]))
+    for reactorName, reason in sorted(results["skipped"].items()):
+        write("%-8s skipped: %s\n" % (reactorName, reason))
+
+
+
+def main(args):
+    """
+    Run benchmarks as directed by the command line.
+
+    @param args: The command line arguments, excluding the program name.
+    """
+    options = Options()
+    try:
+        options.parseOptions(args)
+    except usage.UsageError as e:
+        sys.stderr.write("%s\n%s\n" % (options, e))
+        sys.exit(2)
+
+    if options["list"]:
+        for name in options["benchmarks"]:
+            sys.stdout.write("%s\n" % (name,))
+        return
+
+    if options["worker"]:
+        _work(options)
+        return
+
+    results = {
+        "twisted": __version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "started": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "scale": options["scale"],
+        "repeat": options["repeat"],
+        "reactors": {},
+        "skipped": {},
+        }
+    for reactorName in options["reactors"]:
+        measured, error = runWorker(
+            reactorName, options["benchmarks"], options["scale"],
+            options["repeat"])
+        if measured is None:
+            results["skipped"][reactorName] = error
+        else:
+            results["reactors"][reactorName] = measured
+
+    _report(results, sys.stdout.write)
+
+    if options["output"] is not None:
+        with open(options["output"], "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if options["compare"] is not None:
+        with open(options["compare"]) as f:
+            baseline = json.load(f)
+        sys.stdout.write("\n")
+        for reactorName, name, before, after, change in compare(
+                baseline, results):
+            sys.stdout.write("%-8s %-28s %14.1f %14.1f %+7.1f%%\n" % (
+                    reactorName, name, before, after, change * 100))
+
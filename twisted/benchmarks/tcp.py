@@ -0,0 +1,196 @@
+# -*- test-case-name: twisted.benchmarks.test.test_benchmarks -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Benchmarks of TCP connections over the loopback interface.
+"""
+
+from __future__ import division, absolute_import
+
+import time
+
+from twisted.internet import protocol
+from twisted.internet.defer import Deferred, inlineCallbacks, returnValue
+from twisted.internet.endpoints import TCP4ClientEndpoint, connectProtocol
+
+from twisted.benchmarks._support import ClosingProtocol, listen, shutdown
+
+
+class Echo(protocol.Protocol):
+    """
+    Write everything received back to the peer.
+    """
+
+    def dataReceived(self, data):
+        self.transport.write(data)
+
+
+
+class ThroughputClient(ClosingProtocol):
+    """
+    Send chunks of data to an echo server, keeping a few of them in flight,
+    until a total amount has come back.
+
+    @ivar chunk: The bytes to send each time.
+
+    @ivar total: The number of bytes to send in all.
+
+    @ivar window: The number of chunks to keep in flight.
+
+    @ivar sent: The number of bytes sent so far.
+
+    @ivar received: The number of bytes received so far.
+
+    @ivar done: A L{Deferred} which fires when all of the bytes have come
+        back.
+    """
+
+    def __init__(self, chunk, total, window):
+        ClosingProtocol.__init__(self)
+        self.chunk = chunk
+        self.total = total
+        self.window = window
+        self.sent = self.received = 0
+        self.done = Deferred()
+
+
+    def connectionMade(self):
+        for i in range(self.window):
+            self._send()
+
+
+    def _send(self):
+        if self.sent < self.total:
+            self.transport.write(self.chunk)
+            self.sent += len(self.chunk)
+
+
+    def dataReceived(self, data):
+        before = self.received // len(self.chunk)
+        self.received += len(data)
+        for i in range(self.received // len(self.chunk) - before):
+            self._send()
+        if self.received >= self.total:
+            self.transport.loseConnection()
+            self.done.callback(None)
+
+
+
+class PingClient(ClosingProtocol):
+    """
+    Send a short message to an echo server, and send it again each time it
+    comes back, recording how long each round trip took.
+
+    @ivar count: The number of round trips to make.
+
+    @ivar times: The duration of each round trip so far.
+
+    @ivar done: A L{Deferred} which fires when all of the round trips have
+        been made.
+    """
+    message = b"ping\r\n"
+
+    def __init__(self, count):
+        ClosingProtocol.__init__(self)
+        self.count = count
+        self.times = []
+        self.done = Deferred()
+        self._buffer = b""
+
+
+    def connectionMade(self):
+        self._ping()
+
+
+    def _ping(self):
+        self._started = time.time()
+        self.transport.write(self.message)
+
+
+    def dataReceived(self, data):
+        self._buffer += data
+        if len(self._buffer) < len(self.message):
+            return
+        self._buffer = b""
+        self.times.append(time.time() - self._started)
+        if len(self.times) < self.count:
+            self._ping()
+        else:
+            self.transport.loseConnection()
+            self.done.callback(None)
+
+
+
+def _percentile(ordered, fraction):
+    """
+    Return an element of a sorted list at a fraction of its length.
+    """
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+
+@inlineCallbacks
+def echoThroughput(reactor, scale):
+    """
+    Measure how quickly data can be sent to an echo server and back.
+    """
+    chunk = b"x" * 2 ** 16
+    total = max(1, int(512 * scale)) * len(chunk)
+    port, tracker = listen(reactor, protocol.Factory.forProtocol(Echo))
+    endpoint = TCP4ClientEndpoint(reactor, "127.0.0.1", port.getHost().port)
+    started = time.time()
+    client = yield connectProtocol(
+        endpoint, ThroughputClient(chunk, total, 4))
+    yield client.done
+    elapsed = time.time() - started
+    yield client.closed
+    yield shutdown(port, tracker)
+    returnValue({"unit": "bytes", "operations": total, "elapsed": elapsed})
+
+
+
+@inlineCallbacks
+def echoLatency(reactor, scale):
+    """
+    Measure the round trip time of short messages to an echo server, one at a
+    time.
+    """
+    count = max(1, int(10000 * scale))
+    port, tracker = listen(reactor, protocol.Factory.forProtocol(Echo))
+    endpoint = TCP4ClientEndpoint(reactor, "127.0.0.1", port.getHost().port)
+    client = yield connectProtocol(endpoint, PingClient(count))
+    yield client.done
+    yield client.closed
+    yield shutdown(port, tracker)
+    times = sorted(client.times)
+    returnValue({
+            "unit": "round trips", "operations": count,
+            "elapsed": sum(times),
+            "latency": {
+                "median": _percentile(times, 0.5),
+                "99th percentile": _percentile(times, 0.99),
+                "maximum": times[-1],
+                }})
+
+
+
+@inlineCallbacks
+def connectionSetup(reactor, scale):
+    """
+    Measure how quickly connections can be made to a server and closed again,
+    one after another.
+    """
+    count = max(1, int(1000 * scale))
+    port, tracker = listen(reactor, protocol.Factory.forProtocol(
+            protocol.Protocol))
+    endpoint = TCP4ClientEndpoint(reactor, "127.0.0.1", port.getHost().port)
+    started = time.time()
+    for i in range(count):
+        client = yield connectProtocol(endpoint, ClosingProtocol())
+        client.transport.loseConnection()
+        yield client.closed
+    elapsed = time.time() - started
+    yield shutdown(port, tracker)
+    returnValue({"unit": "connections", "operations": count,
+                 "elapsed": elapsed})
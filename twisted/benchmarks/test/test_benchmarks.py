@@ -0,0 +1,128 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for the benchmarks in L{twisted.benchmarks}, which run each of them on
+a very small scale.
+"""
+
+from __future__ import division, absolute_import
+
+from twisted.internet import interfaces, reactor
+from twisted.trial.unittest import TestCase
+
+from twisted.benchmarks.runner import loadBenchmarks
+
+
+class BenchmarkTests(TestCase):
+    """
+    Each benchmark does the work it reports, and cleans up after itself.
+    """
+
+    def assertBenchmark(self, name):
+        """
+        Run a benchmark, and check that the result describes some work.
+        """
+        [(name, benchmark)] = loadBenchmarks([name])
+        d = benchmark(reactor, 0.001)
+        def check(result):
+            self.assertIsInstance(result["unit"], str)
+            self.assertTrue(result["operations"] > 0)
+            self.assertTrue(result["elapsed"] >= 0)
+            return result
+        return d.addCallback(check)
+
+
+    def test_echoThroughput(self):
+        """
+        L{twisted.benchmarks.tcp.echoThroughput} reports the work it did.
+        """
+        return self.assertBenchmark("tcp.echoThroughput")
+
+
+    def test_echoLatency(self):
+        """
+        L{twisted.benchmarks.tcp.echoLatency} reports the work it did, and the
+        round trip times.
+        """
+        d = self.assertBenchmark("tcp.echoLatency")
+        def check(result):
+            latency = result["latency"]
+            self.assertTrue(
+                latency["median"] <= latency["99th percentile"] <=
+                latency["maximum"])
+        return d.addCallback(check)
+
+
+    def test_connectionSetup(self):
+        """
+        L{twisted.benchmarks.tcp.connectionSetup} reports the work it did.
+        """
+        return self.assertBenchmark("tcp.connectionSetup")
+
+
+    def test_callLaterChurn(self):
+        """
+        L{twisted.benchmarks.timers.callLaterChurn} reports the work it did.
+        """
+        return self.assertBenchmark("timers.callLaterChurn")
+
+
+    def test_lineReceiver(self):
+        """
+        L{twisted.benchmarks.parsing.lineReceiver} reports the work it did.
+        """
+        return self.assertBenchmark("parsing.lineReceiver")
+
+
+    def test_int32StringReceiver(self):
+        """
+        L{twisted.benchmarks.parsing.int32StringReceiver} reports the work it did.
+        """
+        return self.assertBenchmark("parsing.int32StringReceiver")
+
+
+    def test_siteRequests(self):
+        """
+        L{twisted.benchmarks.web.siteRequests} reports the work it did.
+        """
+        return self.assertBenchmark("web.siteRequests")
+
+
+    def test_channelRequests(self):
+        """
+        L{twisted.benchmarks.web.channelRequests} reports the work it did.
+        """
+        return self.assertBenchmark("web.channelRequests")
+
+
+    def test_ampRoundTrips(self):
+        """
+        L{twisted.benchmarks.rpc.ampRoundTrips} reports the work it did.
+        """
+        return self.assertBenchmark("rpc.ampRoundTrips")
+
+
+    def test_pbCalls(self):
+        """
+        L{twisted.benchmarks.rpc.pbCalls} reports the work it did.
+        """
+        return self.assertBenchmark("rpc.pbCalls")
+
+
+    def test_spawnProcesses(self):
+        """
+        L{twisted.benchmarks.processes.spawnProcesses} reports the work it did.
+        """
+        return self.assertBenchmark("processes.spawnProcesses")
+
+
+    def test_forkProcesses(self):
+        """
+        L{twisted.benchmarks.processes.forkProcesses} reports the work it did.
+        """
+        return self.assertBenchmark("processes.forkProcesses")
+
+    if not interfaces.IReactorProcess.providedBy(reactor):
+        test_spawnProcesses.skip = test_forkProcesses.skip = (
+            "This reactor does not support processes.")
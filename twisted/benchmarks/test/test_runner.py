@@ -0,0 +1,140 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.benchmarks.runner}.
+"""
+
+from __future__ import division, absolute_import
+
+from twisted.python import usage
+from twisted.internet.defer import succeed
+from twisted.trial.unittest import TestCase
+
+from twisted.benchmarks import runner
+
+
+class SelectBenchmarksTests(TestCase):
+    """
+    Tests for L{runner.selectBenchmarks}.
+    """
+
+    def test_all(self):
+        """
+        Every benchmark is selected if no names are given.
+        """
+        self.assertEqual(runner.selectBenchmarks([]), runner.BENCHMARKS)
+
+
+    def test_prefix(self):
+        """
+        A name selects the benchmarks whose names start with it, in the order
+        of L{runner.BENCHMARKS}.
+        """
+        self.assertEqual(
+            runner.selectBenchmarks(["rpc", "tcp.echoLatency"]),
+            ["tcp.echoLatency", "rpc.ampRoundTrips", "rpc.pbCalls"])
+
+
+    def test_partialName(self):
+        """
+        A name must match a whole part of a benchmark's name.
+        """
+        self.assertRaises(usage.UsageError, runner.selectBenchmarks, ["tc"])
+
+
+
+class OptionsTests(TestCase):
+    """
+    Tests for L{runner.Options}.
+    """
+
+    def test_defaults(self):
+        """
+        By default, every benchmark is run three times with the select, poll
+        and epoll reactors.
+        """
+        options = runner.Options()
+        options.parseOptions([])
+        self.assertEqual(options["reactors"], ["select", "poll", "epoll"])
+        self.assertEqual(options["benchmarks"], runner.BENCHMARKS)
+        self.assertEqual(options["repeat"], 3)
+        self.assertEqual(options["scale"], 1.0)
+
+
+    def test_options(self):
+        """
+        The reactors, number of runs, scale and benchmarks may be given.
+        """
+        options = runner.Options()
+        options.parseOptions(
+            ["--reactors", "poll, epoll", "-n", "5", "-s", "0.5", "timers"])
+        self.assertEqual(options["reactors"], ["poll", "epoll"])
+        self.assertEqual(options["benchmarks"], ["timers.callLaterChurn"])
+        self.assertEqual(options["repeat"], 5)
+        self.assertEqual(options["scale"], 0.5)
+
+
+    def test_invalid(self):
+        """
+        L{runner.Options} rejects a number of runs less than one, a scale
+        which is not positive, and more than one reactor for a worker.
+        """
+        for args in (["-n", "0"], ["-s", "0"], ["--worker"]):
+            self.assertRaises(
+                usage.UsageError, runner.Options().parseOptions, args)
+
+
+
+class MeasureTests(TestCase):
+    """
+    Tests for L{runner.measure}.
+    """
+
+    def test_fastestRun(self):
+        """
+        L{runner.measure} runs each benchmark as many times as it is asked
+        to, and reports the time of each run and the rate of the fastest
+        one, along with the rest of its results.
+        """
+        times = [2.0, 0.5, 1.0]
+        calls = []
+        def benchmark(reactor, scale):
+            calls.append((reactor, scale))
+            return succeed({"unit": "things", "operations": 10,
+                            "elapsed": times[len(calls) - 1],
+                            "run": len(calls)})
+        d = runner.measure("reactor", [("fake", benchmark)], 0.25, 3)
+        self.assertEqual(self.successResultOf(d), {
+                "fake": {"unit": "things", "operations": 10,
+                         "elapsed": times, "rate": 20.0, "run": 2}})
+        self.assertEqual(calls, [("reactor", 0.25)] * 3)
+
+
+
+class CompareTests(TestCase):
+    """
+    Tests for L{runner.compare}.
+    """
+
+    def test_compare(self):
+        """
+        L{runner.compare} reports the change in the rate of each benchmark
+        run with the same reactor in both sets of results.
+        """
+        baseline = {"reactors": {
+                "select": {"tcp.echoLatency": {"rate": 100.0},
+                           "rpc.pbCalls": {"rate": 10.0}},
+                "poll": {"rpc.pbCalls": {"rate": 10.0}}}}
+        results = {"reactors": {
+                "select": {"tcp.echoLatency": {"rate": 110.0},
+                           "rpc.pbCalls": {"rate": 5.0},
+                           "rpc.ampRoundTrips": {"rate": 5.0}},
+                "epoll": {"rpc.pbCalls": {"rate": 10.0}}}}
+        changes = runner.compare(baseline, results)
+        self.assertEqual(
+            [change[:4] for change in changes],
+            [("select", "tcp.echoLatency", 100.0, 110.0),
+             ("select", "rpc.pbCalls", 10.0, 5.0)])
+        self.assertAlmostEqual(changes[0][4], 0.1)
+        self.assertAlmostEqual(changes[1][4], -0.5)
@@ -0,0 +1,46 @@
+# -*- test-case-name: twisted.benchmarks.test.test_benchmarks -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Benchmarks of timed calls.
+"""
+
+from __future__ import division, absolute_import
+
+import random
+import time
+
+from twisted.internet.defer import Deferred
+
+
+def callLaterChurn(reactor, scale):
+    """
+    Measure how quickly timed calls can be scheduled, rescheduled, cancelled
+    and run.
+
+    Calls are scheduled for up to a millisecond ahead.  Of each four, one is
+    cancelled and one is delayed again, and the rest are left to run.  The
+    choices are made with a fixed seed, so that they are the same each time.
+    """
+    count = max(4, int(100000 * scale))
+    choices = random.Random(4)
+    finished = Deferred()
+    remaining = [0]
+    def ran():
+        remaining[0] -= 1
+        if not remaining[0]:
+            finished.callback({
+                    "unit": "calls", "operations": count,
+                    "elapsed": time.time() - started})
+
+    started = time.time()
+    calls = [reactor.callLater(choices.random() / 1000, ran)
+             for i in range(count)]
+    for i, call in enumerate(calls):
+        if i % 4 == 0:
+            call.cancel()
+        elif i % 4 == 1:
+            call.delay(choices.random() / 1000)
+    remaining[0] = count - len(calls[::4])
+    return finished
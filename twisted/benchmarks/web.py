@@ -0,0 +1,141 @@
+# -*- test-case-name: twisted.benchmarks.test.test_benchmarks -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Benchmarks of L{twisted.web}.
+"""
+
+from __future__ import division, absolute_import
+
+import time
+
+from twisted.internet.address import IPv4Address
+from twisted.internet.defer import Deferred, gatherResults, succeed
+from twisted.internet.defer import inlineCallbacks, returnValue
+from twisted.internet.endpoints import TCP4ClientEndpoint, connectProtocol
+from twisted.internet.error import ConnectionDone
+from twisted.python.failure import Failure
+from twisted.test.proto_helpers import StringTransport
+from twisted.web.resource import Resource
+from twisted.web.server import Site
+
+from twisted.benchmarks._support import ClosingProtocol, listen, shutdown
+
+
+class Hello(Resource):
+    """
+    A resource with a short body.
+    """
+    isLeaf = True
+
+    def render_GET(self, request):
+        request.setHeader(b"content-type", b"text/plain")
+        return b"Hello, world!\n"
+
+
+
+class KeepAliveClient(ClosingProtocol):
+    """
+    Make HTTP/1.1 requests one after another over a persistent connection.
+
+    @ivar count: The number of requests to make.
+
+    @ivar responses: The number of complete responses received so far.
+
+    @ivar done: A L{Deferred} which fires when all of the responses have been
+        received.
+    """
+    request = (b"GET / HTTP/1.1\r\n"
+               b"Host: 127.0.0.1\r\n"
+               b"User-Agent: twisted.benchmarks\r\n"
+               b"\r\n")
+
+    def __init__(self, count):
+        ClosingProtocol.__init__(self)
+        self.count = count
+        self.responses = 0
+        self.done = Deferred()
+        self._buffer = b""
+        self._remaining = None
+
+
+    def connectionMade(self):
+        self.transport.write(self.request)
+
+
+    def dataReceived(self, data):
+        self._buffer += data
+        while True:
+            if self._remaining is None:
+                end = self._buffer.find(b"\r\n\r\n")
+                if end == -1:
+                    return
+                head = self._buffer[:end].lower()
+                start = head.find(b"\r\ncontent-length:")
+                if start == -1:
+                    raise ValueError("response has no Content-Length")
+                start += len(b"\r\ncontent-length:")
+                stop = head.find(b"\r\n", start)
+                if stop == -1:
+                    stop = len(head)
+                self._remaining = int(head[start:stop])
+                self._buffer = self._buffer[end + 4:]
+            if len(self._buffer) < self._remaining:
+                return
+            self._buffer = self._buffer[self._remaining:]
+            self._remaining = None
+            self.responses += 1
+            if self.responses == self.count:
+                self.transport.loseConnection()
+                self.done.callback(None)
+                return
+            self.transport.write(self.request)
+
+
+
+@inlineCallbacks
+def siteRequests(reactor, scale):
+    """
+    Measure how many HTTP/1.1 requests per second a L{Site} serves to a few
+    clients making requests one after another over persistent connections.
+    """
+    connections = 4
+    perConnection = max(1, int(2500 * scale))
+    port, tracker = listen(reactor, Site(Hello()))
+    endpoint = TCP4ClientEndpoint(reactor, "127.0.0.1", port.getHost().port)
+    started = time.time()
+    clients = yield gatherResults([
+            connectProtocol(endpoint, KeepAliveClient(perConnection))
+            for i in range(connections)])
+    yield gatherResults([client.done for client in clients])
+    elapsed = time.time() - started
+    yield gatherResults([client.closed for client in clients])
+    yield shutdown(port, tracker)
+    returnValue({"unit": "requests", "operations": connections * perConnection,
+                 "elapsed": elapsed})
+
+
+
+def channelRequests(reactor, scale):
+    """
+    Measure how many HTTP/1.1 requests per second a L{Site} serves when the
+    requests are given to its channel directly, without the reactor, so that
+    only the parsing of requests and the writing of responses is measured.
+    """
+    count = max(1, int(20000 * scale))
+    site = Site(Hello())
+    site.doStart()
+    channel = site.buildProtocol(IPv4Address("TCP", "127.0.0.1", 0))
+    transport = StringTransport()
+    channel.makeConnection(transport)
+    request = KeepAliveClient.request
+    started = time.time()
+    for i in range(count):
+        channel.dataReceived(request)
+        transport.clear()
+    elapsed = time.time() - started
+    channel.connectionLost(Failure(ConnectionDone()))
+    site.doStop()
+    return succeed({"unit": "requests", "operations": count,
+                    "elapsed": elapsed})
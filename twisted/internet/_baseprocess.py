@@ -12,6 +12,7 @@ from twisted.python.deprecate import getWarningMethod
 from twisted.python.failure import Failure
 from twisted.python.log import err
 from twisted.persisted.styles import Ephemeral
+from twisted.internet.address import _ProcessAddress
 
 _missingProcessExited = ("Since Twisted 8.2, IProcessProtocol.processExited "
                          "is required.  %s must implement it.")
@@ -26,6 +27,20 @@ class BaseProcess(Ephemeral):
         self.proto = protocol
 
 
+    def getHost(self):
+        """
+        Processes have no address, so return a L{_ProcessAddress}.
+        """
+        return _ProcessAddress()
+
+
+    def getPeer(self):
+        """
+        Processes have no address, so return a L{_ProcessAddress}.
+        """
+        return _ProcessAddress()
+
+
     def _callProcessExited(self, reason):
         default = object()
         processExited = getattr(self.proto, 'processExited', default)
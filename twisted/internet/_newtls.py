@@ -142,6 +142,7 @@ def startTLS(transport, contextFactory, normal, bypass):
 
     transport.getHandle = tlsProtocol.getHandle
     transport.getPeerCertificate = tlsProtocol.getPeerCertificate
+    transport.getNegotiatedProtocol = tlsProtocol.getNegotiatedProtocol
 
     # Mark the transport as secure.
     directlyProvides(transport, ISSLTransport)
@@ -47,6 +47,10 @@ warnings.warn(
 
 class _TLSMixin:
     _socketShutdownMethod = 'sock_shutdown'
+    # Everything has to go through the SSL connection's send.
+    _writeSomeVectors = None
+    # The SSL connection buffers data which the reactor cannot see.
+    _edgeTriggerable = False
 
     writeBlockedOnRead = 0
     readBlockedOnWrite = 0
@@ -11,9 +11,13 @@ Future Plans::
 Maintainer: James Y Knight
 """
 
+import errno
+import io
+
 from zope.interface import implements
 
 from twisted.internet import process, error, interfaces
+from twisted.internet.main import CONNECTION_LOST, CONNECTION_DONE
 from twisted.python import log, failure
 
 
@@ -21,6 +25,40 @@ class PipeAddress(object):
     implements(interfaces.IAddress)
 
 
+
+class _StandardInputReader(process.ProcessReader):
+    """
+    L{process.ProcessReader} for standard input which reads directly into
+    the buffer of a protocol providing L{interfaces.IBufferedProtocol}.
+
+    @ivar _input: An unbuffered, non-closing file object for the descriptor,
+        created when first needed.
+    """
+    _input = None
+
+    def doRead(self):
+        protocol = self.proc.protocol
+        if not interfaces.IBufferedProtocol.providedBy(protocol):
+            return process.ProcessReader.doRead(self)
+
+        if self._input is None:
+            self._input = io.FileIO(self.fd, 'r', closefd=False)
+        try:
+            count = self._input.readinto(protocol.getBuffer(8192))
+        except (OSError, IOError) as ioe:
+            if ioe.args[0] in (errno.EAGAIN, errno.EINTR):
+                return
+            else:
+                return CONNECTION_LOST
+        if count is None:
+            # Nothing to read after all.
+            return
+        if not count:
+            return CONNECTION_DONE
+        protocol.bufferUpdated(count)
+
+
+
 class StandardIO(object):
     implements(interfaces.ITransport, interfaces.IProducer,
                interfaces.IConsumer, interfaces.IHalfCloseableDescriptor)
@@ -36,7 +74,7 @@ class StandardIO(object):
         self.protocol = proto
 
         self._writer = process.ProcessWriter(reactor, self, 'write', stdout)
-        self._reader = process.ProcessReader(reactor, self, 'read', stdin)
+        self._reader = _StandardInputReader(reactor, self, 'read', stdin)
         self._reader.startReading()
         self.protocol.makeConnection(self)
 
@@ -0,0 +1,29 @@
+# -*- test-case-name: twisted.internet.test.test_processpool -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+The main program of the worker processes of
+L{twisted.internet.processpool.ProcessPool}.
+"""
+
+import os
+import sys
+
+
+def _setupPath(environ):
+    """
+    Override C{sys.path} with what the pool passed in
+    B{TWISTED_PROCESSPOOL_PYTHONPATH}, so that the worker can import what the
+    pool can.
+    """
+    if 'TWISTED_PROCESSPOOL_PYTHONPATH' in environ:
+        sys.path[:] = environ['TWISTED_PROCESSPOOL_PYTHONPATH'].split(
+            os.pathsep)
+
+
+
+if __name__ == '__main__':
+    _setupPath(os.environ)
+    from twisted.internet.processpool import _main
+    _main()
@@ -650,7 +650,8 @@ class OpenSSLCertificateOptions(object):
                  enableSessions=True,
                  fixBrokenPeers=False,
                  enableSessionTickets=False,
-                 extraCertChain=None):
+                 extraCertChain=None,
+                 acceptableProtocols=None):
         """
         Create an OpenSSL context SSL connection context factory.
 
@@ -707,6 +708,15 @@ class OpenSSLCertificateOptions(object):
             C{certificate} to it.
 
         @type extraCertChain: C{list} of L{OpenSSL.crypto.X509}
+
+        @param acceptableProtocols: The application protocols, such as
+            C{b"h2"} and C{b"http/1.1"}, to offer or accept using ALPN or NPN,
+            in order of preference.  The protocol agreed on is available from
+            C{getNegotiatedProtocol} on the transport once the handshake is
+            done.  Where the installed pyOpenSSL and OpenSSL support neither
+            extension, no protocol is negotiated.
+
+        @type acceptableProtocols: C{list} of C{bytes}
         """
 
         if (privateKey is None) != (certificate is None):
@@ -748,6 +758,7 @@ class OpenSSLCertificateOptions(object):
         self.enableSessions = enableSessions
         self.fixBrokenPeers = fixBrokenPeers
         self.enableSessionTickets = enableSessionTickets
+        self.acceptableProtocols = acceptableProtocols
 
 
     def __getstate__(self):
@@ -820,4 +831,39 @@ class OpenSSLCertificateOptions(object):
         if not self.enableSessionTickets:
             ctx.set_options(self._OP_NO_TICKET)
 
+        if self.acceptableProtocols:
+            _setAcceptableProtocols(ctx, self.acceptableProtocols)
+
         return ctx
+
+
+
+def _setAcceptableProtocols(context, acceptableProtocols):
+    """
+    Set up a context to offer or accept some application protocols, using ALPN
+    where pyOpenSSL and OpenSSL support it and NPN where they support that.
+
+    @param context: The context to set up.
+    @type context: L{OpenSSL.SSL.Context}
+
+    @param acceptableProtocols: The protocols, in order of preference.
+    @type acceptableProtocols: C{list} of C{bytes}
+    """
+    def choose(connection, offered):
+        for protocol in acceptableProtocols:
+            if protocol in offered:
+                return protocol
+        return b""
+
+    try:
+        context.set_alpn_select_callback(choose)
+        context.set_alpn_protos(acceptableProtocols)
+    except (AttributeError, NotImplementedError):
+        pass
+
+    try:
+        context.set_npn_advertise_callback(
+            lambda connection: acceptableProtocols)
+        context.set_npn_select_callback(choose)
+    except (AttributeError, NotImplementedError):
+        pass
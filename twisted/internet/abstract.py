@@ -16,6 +16,7 @@ from zope.interface import implementer
 from twisted.python.compat import _PY3, unicode, lazyByteSlice
 from twisted.python import _reflectpy3 as reflect, failure
 from twisted.internet import interfaces, main
+from twisted.internet.defer import Deferred, fail
 
 if _PY3:
     def _concatenate(bObj, offset, bArray):
@@ -24,12 +25,21 @@ if _PY3:
         # be joined and FileDescriptor can use writev().  Or perhaps bytearrays
         # would help.
         return bObj[offset:] + b"".join(bArray)
+
+    def _segmentFrom(segment, offset):
+        # A view of the rest of a segment, without copying it.
+        return memoryview(segment)[offset:]
 else:
     def _concatenate(bObj, offset, bArray):
         # Avoid one extra string copy by using a buffer to limit what we include
         # in the result.
         return buffer(bObj, offset) + b"".join(bArray)
 
+    def _segmentFrom(segment, offset):
+        # A buffer, rather than a memoryview, so that twisted.python._writev
+        # can find its memory without copying it.
+        return buffer(segment, offset)
+
 
 class _ConsumerMixin(object):
     """
@@ -153,6 +163,37 @@ class _LogOwner(object):
 
 
 
+class _FileWrite(object):
+    """
+    A part of a file waiting to be written by L{FileDescriptor.writeFile}.
+
+    @ivar fileObject: The file to write from.
+
+    @ivar offset: The offset within the file of the next byte to write.
+    @type offset: C{int}
+
+    @ivar remaining: The number of bytes still to be written.
+    @type remaining: C{int}
+
+    @ivar deferred: The L{Deferred} returned by L{FileDescriptor.writeFile}.
+
+    @ivar after: A C{list} of the data written to the transport while this
+        file was pending, to be written once it has been.
+
+    @ivar afterLen: The total length of the data in C{after}.
+    @type afterLen: C{int}
+    """
+
+    def __init__(self, fileObject, offset, count):
+        self.fileObject = fileObject
+        self.offset = offset
+        self.remaining = count
+        self.deferred = Deferred()
+        self.after = []
+        self.afterLen = 0
+
+
+
 @implementer(
     interfaces.IPushProducer, interfaces.IReadWriteDescriptor,
     interfaces.IConsumer, interfaces.ITransport,
@@ -164,6 +205,53 @@ class FileDescriptor(_ConsumerMixin, _LogOwner):
     This is an abstract superclass of all objects which may be notified when
     they are readable or writable; e.g. they have a file-descriptor that is
     valid to be passed to select(2).
+
+    Data to be written is normally joined into C{dataBuffer} before being
+    passed to L{writeSomeData}.  If a subclass provides C{_writeSomeVectors},
+    the chunks passed to L{write} and L{writeSequence} are instead kept as
+    separate segments in C{_tempDataBuffer}, with C{offset} giving the number
+    of bytes of the first segment which were already written, and are written
+    by passing a list of them to C{_writeSomeVectors}.
+
+    @ivar _writeSomeVectors: C{None}, or a method which writes as much as
+        possible of a C{list} of bytes-like objects, as if they were joined,
+        and returns the number of bytes written or an exception, like
+        L{writeSomeData}.
+
+    @ivar _maxVectors: The largest number of segments passed to
+        C{_writeSomeVectors} at once.
+
+    @ivar _writeSomeFile: C{None}, or a method which writes as much as
+        possible of part of a file, given the file descriptor of the file, the
+        offset of the first byte to write and the number of bytes to write.
+        It returns the number of bytes written (C{0} meaning that the end of
+        the file was reached), C{None} if nothing could be written now, or an
+        exception if the connection was lost.  Subclasses which provide it
+        support L{writeFile}.
+
+    @ivar _tempDataBuffer: A C{list} of the chunks written and not yet
+        joined into C{dataBuffer} or written.  Like C{_files}, it is an empty
+        C{tuple} shared by every descriptor until something is written, and
+        again once everything has been written, so that idle connections do
+        not each keep an empty C{list}.
+
+    @ivar _tempDataLen: The total length of the chunks in C{_tempDataBuffer}.
+
+    @ivar _files: A C{list} of the L{_FileWrite}s waiting to be written, in
+        order.  Data written to the transport after a file is kept with the
+        last pending file, until it has been written.
+
+    @ivar _edgeTriggerable: Whether L{doRead} and L{doWrite} set
+        C{_readBlocked} and C{_writeBlocked} when reading or writing would
+        block, so that an edge-triggered reactor can tell when this descriptor
+        is no longer ready.  Subclasses which buffer data where the reactor
+        cannot see it (such as in a TLS library) must leave this C{False}.
+
+    @ivar _readBlocked: Set to C{True} by L{doRead} when there was nothing to
+        read, if C{_edgeTriggerable} is C{True}.  The reactor resets it.
+
+    @ivar _writeBlocked: Set to C{True} by L{doWrite} when nothing more could
+        be written, if C{_edgeTriggerable} is C{True}.  The reactor resets it.
     """
     connected = 0
     disconnected = 0
@@ -175,6 +263,16 @@ class FileDescriptor(_ConsumerMixin, _LogOwner):
 
     SEND_LIMIT = 128*1024
 
+    _writeSomeVectors = None
+    _maxVectors = 1024
+    _writeSomeFile = None
+    _files = ()
+    _tempDataBuffer = ()
+    _tempDataLen = 0
+    _edgeTriggerable = False
+    _readBlocked = False
+    _writeBlocked = False
+
     def __init__(self, reactor=None):
         """
         @param reactor: An L{IReactorFDSet} provider which this descriptor will
@@ -184,8 +282,6 @@ class FileDescriptor(_ConsumerMixin, _LogOwner):
         if not reactor:
             from twisted.internet import reactor
         self.reactor = reactor
-        self._tempDataBuffer = [] # will be added to dataBuffer in doWrite
-        self._tempDataLen = 0
 
 
     def connectionLost(self, reason):
@@ -200,6 +296,9 @@ class FileDescriptor(_ConsumerMixin, _LogOwner):
         """
         self.disconnected = 1
         self.connected = 0
+        files, self._files = self._files, ()
+        for pending in files:
+            pending.deferred.errback(reason)
         if self.producer is not None:
             self.producer.stopProducing()
             self.producer = None
@@ -240,54 +339,157 @@ class FileDescriptor(_ConsumerMixin, _LogOwner):
 
         @see: L{twisted.internet.interfaces.IWriteDescriptor.doWrite}.
         """
-        if len(self.dataBuffer) - self.offset < self.SEND_LIMIT:
-            # If there is currently less than SEND_LIMIT bytes left to send
-            # in the string, extend it with the array data.
-            self.dataBuffer = _concatenate(
-                self.dataBuffer, self.offset, self._tempDataBuffer)
-            self.offset = 0
-            self._tempDataBuffer = []
-            self._tempDataLen = 0
+        if self._files and (
+                self.offset == len(self.dataBuffer) and not self._tempDataLen):
+            return self._writeFiles()
 
-        # Send as much data as you can.
-        if self.offset:
-            l = self.writeSomeData(lazyByteSlice(self.dataBuffer, self.offset))
+        if self._writeSomeVectors is not None:
+            l = self._writeSegments()
+            if isinstance(l, Exception) or l < 0:
+                return l
         else:
-            l = self.writeSomeData(self.dataBuffer)
-
-        # There is no writeSomeData implementation in Twisted which returns
-        # < 0, but the documentation for writeSomeData used to claim negative
-        # integers meant connection lost.  Keep supporting this here,
-        # although it may be worth deprecating and removing at some point.
-        if isinstance(l, Exception) or l < 0:
-            return l
-        self.offset += l
+            if len(self.dataBuffer) - self.offset < self.SEND_LIMIT:
+                # If there is currently less than SEND_LIMIT bytes left to
+                # send in the string, extend it with the array data.
+                self.dataBuffer = _concatenate(
+                    self.dataBuffer, self.offset, self._tempDataBuffer)
+                self.offset = 0
+                self._tempDataBuffer = ()
+                self._tempDataLen = 0
+
+            # Send as much data as you can.
+            if self.offset:
+                l = self.writeSomeData(
+                    lazyByteSlice(self.dataBuffer, self.offset))
+            else:
+                l = self.writeSomeData(self.dataBuffer)
+
+            # There is no writeSomeData implementation in Twisted which
+            # returns < 0, but the documentation for writeSomeData used to
+            # claim negative integers meant connection lost.  Keep supporting
+            # this here, although it may be worth deprecating and removing at
+            # some point.
+            if isinstance(l, Exception) or l < 0:
+                return l
+            self.offset += l
         # If there is nothing left to send,
         if self.offset == len(self.dataBuffer) and not self._tempDataLen:
             self.dataBuffer = b""
+            self._tempDataBuffer = ()
             self.offset = 0
-            # stop writing.
-            self.stopWriting()
-            # If I've got a producer who is supposed to supply me with data,
-            if self.producer is not None and ((not self.streamingProducer)
-                                              or self.producerPaused):
-                # tell them to supply some more.
-                self.producerPaused = 0
-                self.producer.resumeProducing()
-            elif self.disconnecting:
-                # But if I was previously asked to let the connection die, do
-                # so.
-                return self._postLoseConnection()
-            elif self._writeDisconnecting:
-                # I was previously asked to half-close the connection.  We
-                # set _writeDisconnected before calling handler, in case the
-                # handler calls loseConnection(), which will want to check for
-                # this attribute.
-                self._writeDisconnected = True
-                result = self._closeWriteConnection()
-                return result
+            if self._files:
+                # A file is next, and is written by the next call.
+                return None
+            return self._allWritten()
         return None
 
+
+    def _allWritten(self):
+        """
+        Called by L{doWrite} when all of the data written to this descriptor
+        has been written.
+
+        Whatever this returns is then returned by doWrite.
+        """
+        # stop writing.
+        self.stopWriting()
+        # If I've got a producer who is supposed to supply me with data,
+        if self.producer is not None and ((not self.streamingProducer)
+                                          or self.producerPaused):
+            # tell them to supply some more.
+            self.producerPaused = 0
+            self.producer.resumeProducing()
+        elif self.disconnecting:
+            # But if I was previously asked to let the connection die, do
+            # so.
+            return self._postLoseConnection()
+        elif self._writeDisconnecting:
+            # I was previously asked to half-close the connection.  We
+            # set _writeDisconnected before calling handler, in case the
+            # handler calls loseConnection(), which will want to check for
+            # this attribute.
+            self._writeDisconnected = True
+            result = self._closeWriteConnection()
+            return result
+        return None
+
+
+    def _writeFiles(self):
+        """
+        Write as much as possible of the first pending file with
+        C{_writeSomeFile}.  Once it has all been written, queue the data
+        written after it and fire the L{Deferred} returned by L{writeFile}.
+
+        Whatever this returns is then returned by doWrite.
+        """
+        current = self._files[0]
+        l = self._writeSomeFile(
+            current.fileObject.fileno(), current.offset, current.remaining)
+        if l is None:
+            return None
+        if isinstance(l, Exception) or l < 0:
+            return l
+        current.offset += l
+        current.remaining -= l
+        if l and current.remaining:
+            return None
+
+        # The file has been written (or it ended early).
+        del self._files[0]
+        if self._tempDataBuffer:
+            self._tempDataBuffer.extend(current.after)
+        else:
+            self._tempDataBuffer = current.after
+        self._tempDataLen += current.afterLen
+        current.deferred.callback(None)
+        if (not self._files and not self._tempDataLen
+                and self.offset == len(self.dataBuffer)):
+            return self._allWritten()
+        return None
+
+
+    def _writeSegments(self):
+        """
+        Write as much as possible of the segments in C{_tempDataBuffer} with
+        one call to C{_writeSomeVectors}, without joining them, and discard
+        the segments which were completely written.
+
+        At most C{_maxVectors} segments and about C{SEND_LIMIT} bytes are
+        passed to C{_writeSomeVectors}.
+
+        @return: The result of C{_writeSomeVectors}.
+        """
+        segments = self._tempDataBuffer
+        offset = self.offset
+        vectors = []
+        size = 0
+        for segment in segments[:self._maxVectors]:
+            if offset:
+                segment = _segmentFrom(segment, offset)
+                offset = 0
+            vectors.append(segment)
+            size += len(segment)
+            if size >= self.SEND_LIMIT:
+                break
+
+        l = self._writeSomeVectors(vectors)
+        if isinstance(l, Exception) or l < 0:
+            return l
+
+        # Drop the segments which were written, and remember how much of the
+        # next one was.
+        self._tempDataLen -= l
+        written = self.offset + l
+        index = 0
+        while index < len(segments) and written >= len(segments[index]):
+            written -= len(segments[index])
+            index += 1
+        if index:
+            del segments[:index]
+        self.offset = written
+        return l
+
+
     def _postLoseConnection(self):
         """Called after a loseConnection(), when all data has been written.
 
@@ -320,7 +522,10 @@ class FileDescriptor(_ConsumerMixin, _LogOwner):
 
         @return: C{True} if it is full, C{False} otherwise.
         """
-        return len(self.dataBuffer) + self._tempDataLen > self.bufferSize
+        pending = len(self.dataBuffer) + self._tempDataLen
+        for queued in self._files:
+            pending += queued.remaining + queued.afterLen
+        return pending > self.bufferSize
 
 
     def _maybePauseProducer(self):
@@ -349,8 +554,15 @@ class FileDescriptor(_ConsumerMixin, _LogOwner):
         if not self.connected or self._writeDisconnected:
             return
         if data:
-            self._tempDataBuffer.append(data)
-            self._tempDataLen += len(data)
+            if self._files:
+                self._files[-1].after.append(data)
+                self._files[-1].afterLen += len(data)
+            else:
+                if self._tempDataBuffer:
+                    self._tempDataBuffer.append(data)
+                else:
+                    self._tempDataBuffer = [data]
+                self._tempDataLen += len(data)
             self._maybePauseProducer()
             self.startWriting()
 
@@ -376,11 +588,49 @@ class FileDescriptor(_ConsumerMixin, _LogOwner):
                 raise TypeError("Data must not be unicode")
         if not self.connected or not iovec or self._writeDisconnected:
             return
-        self._tempDataBuffer.extend(iovec)
-        for i in iovec:
-            self._tempDataLen += len(i)
+        if self._files:
+            pending = self._files[-1]
+            pending.after.extend(iovec)
+            for i in iovec:
+                pending.afterLen += len(i)
+        else:
+            if self._tempDataBuffer:
+                self._tempDataBuffer.extend(iovec)
+            else:
+                self._tempDataBuffer = list(iovec)
+            for i in iovec:
+                self._tempDataLen += len(i)
+        self._maybePauseProducer()
+        self.startWriting()
+
+
+    def canWriteFile(self):
+        """
+        Determine whether L{writeFile} can be used.
+
+        @see: L{twisted.internet.interfaces.IFileTransport.canWriteFile}
+        """
+        return self._writeSomeFile is not None
+
+
+    def writeFile(self, fileObject, offset, count):
+        """
+        Write part of a file, after any data already written and before any
+        data written later, without reading it into memory.
+
+        @see: L{twisted.internet.interfaces.IFileTransport.writeFile}
+        """
+        if not self.canWriteFile():
+            raise RuntimeError("%r cannot write files" % (self,))
+        if not self.connected or self._writeDisconnected:
+            return fail(main.CONNECTION_LOST)
+        pending = _FileWrite(fileObject, offset, count)
+        if not self._files:
+            self._files = []
+        self._files.append(pending)
         self._maybePauseProducer()
         self.startWriting()
+        return pending.deferred
 
 
     def loseConnection(self, _connDone=failure.Failure(main.CONNECTION_DONE)):
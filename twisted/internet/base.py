@@ -13,7 +13,7 @@ from zope.interface import implementer, classImplements
 
 import sys
 import warnings
-from heapq import heappush, heappop, heapify
+from collections import deque
 
 import traceback
 
@@ -21,6 +21,7 @@ from twisted.internet.interfaces import IReactorCore, IReactorTime, IReactorThre
 from twisted.internet.interfaces import IResolverSimple, IReactorPluggableResolver
 from twisted.internet.interfaces import IConnector, IDelayedCall
 from twisted.internet import fdesc, main, error, abstract, defer, threads
+from twisted.internet.timers import ITimerQueue, HeapTimerQueue
 from twisted.python import log, failure, _reflectpy3 as reflect
 from twisted.python.runtime import seconds as runtimeSeconds, platform
 from twisted.internet.defer import Deferred, DeferredList
@@ -37,6 +38,8 @@ class DelayedCall:
     # an exception occurs while the function is being run
     debug = False
     _str = None
+    cancelled = called = 0
+    delayed_time = 0
 
     def __init__(self, time, func, args, kw, cancel, reset,
                  seconds=runtimeSeconds):
@@ -60,8 +63,6 @@ class DelayedCall:
         self.resetter = reset
         self.canceller = cancel
         self.seconds = seconds
-        self.cancelled = self.called = 0
-        self.delayed_time = 0
         if self.debug:
             self.creator = traceback.format_stack()[:-2]
 
@@ -460,9 +461,34 @@ class ReactorBase(object):
     @ivar _registerAsIOThread: A flag controlling whether the reactor will
         register the thread it is running in as the I/O thread when it starts.
         If C{True}, registration will be done, otherwise it will not be.
+
+    @ivar _timers: The L{ITimerQueue} holding the pending timed calls.
+
+    @ivar _newTimedCalls: A C{list} of the timed calls which have been
+        scheduled since the last time C{_timers} was updated.
+
+    @ivar _delayedCallCanceller: C{_cancelCallLater}, bound once and given
+        to every L{DelayedCall}, so that each does not keep a bound method of
+        its own.
+
+    @ivar _delayedCallResetter: C{_moveCallLaterSooner}, bound once like
+        C{_delayedCallCanceller}.
+
+    @ivar _instrumentation: The installed
+        L{twisted.internet.instrumentation.ReactorInstrumentation}, or C{None}.
+
+    @ivar threadCallQueue: A C{deque} of the C{(f, args, kwargs)} tuples
+        given to L{callFromThread} which have not been called yet.
+
+    @ivar _wakeUpPending: A flag which is true from the time L{callFromThread}
+        wakes the reactor up until the reactor next runs the calls in
+        C{threadCallQueue}, so that other calls added in the meantime do not
+        wake it up again.
     """
 
     _registerAsIOThread = True
+    _instrumentation = None
+    _wakeUpPending = False
 
     _stopped = True
     installed = False
@@ -472,11 +498,12 @@ class ReactorBase(object):
     __name__ = "twisted.internet.reactor"
 
     def __init__(self):
-        self.threadCallQueue = []
+        self.threadCallQueue = deque()
         self._eventTriggers = {}
-        self._pendingTimedCalls = []
+        self._timers = HeapTimerQueue()
         self._newTimedCalls = []
-        self._cancellations = 0
+        self._delayedCallCanceller = self._cancelCallLater
+        self._delayedCallResetter = self._moveCallLaterSooner
         self.running = False
         self._started = False
         self._justStopped = False
@@ -511,6 +538,52 @@ class ReactorBase(object):
         self.resolver = resolver
         return oldResolver
 
+
+    def installTimerQueue(self, timers):
+        """
+        Use a different data structure to keep track of timed calls.
+
+        Any calls pending in the old timer queue are moved to the new one.
+
+        @param timers: The timer queue to use from now on.
+        @type timers: L{ITimerQueue} provider
+
+        @return: The previously installed timer queue.
+        """
+        assert ITimerQueue.providedBy(timers)
+        oldTimers = self._timers
+        for call in oldTimers.getDelayedCalls():
+            timers.add(call)
+        self._timers = timers
+        return oldTimers
+
+
+    def installInstrumentation(self, instrumentation):
+        """
+        Start or stop measuring where this reactor spends its time.
+
+        @param instrumentation: The instrumentation to use from now on, or
+            C{None} to stop measuring.
+        @type instrumentation:
+            L{twisted.internet.instrumentation.ReactorInstrumentation}
+
+        @return: The previously installed instrumentation, or C{None}.
+        """
+        oldInstrumentation = self._instrumentation
+        # Instrumented versions of these methods are set on the instance, so
+        # that the class versions run without any overhead otherwise.
+        for name in ('doIteration', '_doReadOrWrite'):
+            self.__dict__.pop(name, None)
+        self._instrumentation = instrumentation
+        if instrumentation is not None:
+            self.doIteration = instrumentation.wrapIteration(self.doIteration)
+            doReadOrWrite = getattr(self, '_doReadOrWrite', None)
+            if doReadOrWrite is not None:
+                self._doReadOrWrite = instrumentation.wrapDoReadOrWrite(
+                    doReadOrWrite)
+        return oldInstrumentation
+
+
     def wakeUp(self):
         """
         Wake up the event loop.
@@ -706,34 +779,17 @@ class ReactorBase(object):
         assert _seconds >= 0, \
                "%s is not greater than or equal to 0 seconds" % (_seconds,)
         tple = DelayedCall(self.seconds() + _seconds, _f, args, kw,
-                           self._cancelCallLater,
-                           self._moveCallLaterSooner,
+                           self._delayedCallCanceller,
+                           self._delayedCallResetter,
                            seconds=self.seconds)
         self._newTimedCalls.append(tple)
         return tple
 
     def _moveCallLaterSooner(self, tple):
-        # Linear time find: slow.
-        heap = self._pendingTimedCalls
-        try:
-            pos = heap.index(tple)
-
-            # Move elt up the heap until it rests at the right place.
-            elt = heap[pos]
-            while pos != 0:
-                parent = (pos-1) // 2
-                if heap[parent] <= elt:
-                    break
-                # move parent down
-                heap[pos] = heap[parent]
-                pos = parent
-            heap[pos] = elt
-        except ValueError:
-            # element was not found in heap - oh well...
-            pass
+        self._timers.moveSooner(tple)
 
     def _cancelCallLater(self, tple):
-        self._cancellations+=1
+        self._timers.cancel(tple)
 
 
     def getDelayedCalls(self):
@@ -741,15 +797,14 @@ class ReactorBase(object):
         They are returned in no particular order.
         This method is not efficient -- it is really only meant for
         test cases."""
-        return [x for x in (self._pendingTimedCalls + self._newTimedCalls) if not x.cancelled]
+        return self._timers.getDelayedCalls() + [
+            x for x in self._newTimedCalls if not x.cancelled]
 
     def _insertNewDelayedCalls(self):
         for call in self._newTimedCalls:
-            if call.cancelled:
-                self._cancellations-=1
-            else:
+            if not call.cancelled:
                 call.activate_delay()
-                heappush(self._pendingTimedCalls, call)
+                self._timers.add(call)
         self._newTimedCalls = []
 
 
@@ -765,10 +820,11 @@ class ReactorBase(object):
         # insert new delayed calls to make sure to include them in timeout value
         self._insertNewDelayedCalls()
 
-        if not self._pendingTimedCalls:
+        nextTime = self._timers.nextTime()
+        if nextTime is None:
             return None
 
-        delay = self._pendingTimedCalls[0].time - self.seconds()
+        delay = nextTime - self.seconds()
 
         # Pick a somewhat arbitrary maximum possible value for the timeout.
         # This value is 2 ** 31 / 1000, which is the number of seconds which can
@@ -786,42 +842,62 @@ class ReactorBase(object):
     def runUntilCurrent(self):
         """Run all pending timed calls.
         """
-        if self.threadCallQueue:
-            # Keep track of how many calls we actually make, as we're
-            # making them, in case another call is added to the queue
-            # while we're in this loop.
-            count = 0
-            total = len(self.threadCallQueue)
-            for (f, a, kw) in self.threadCallQueue:
+        instrumentation = self._instrumentation
+        # Calls added from now on wake the reactor up again.  This must happen
+        # on every iteration, before the queue is looked at, so that no call
+        # is left in it without a wake up pending: a thread which saw the flag
+        # unset just before it was last cleared may have set it again since.
+        self._wakeUpPending = False
+        queue = self.threadCallQueue
+        if queue:
+            if instrumentation is not None:
+                start = instrumentation.clock()
+            # Only make the calls which are already queued, in case another
+            # call is added to the queue while we're in this loop.
+            popleft = queue.popleft
+            total = len(queue)
+            while total:
+                total -= 1
+                f, a, kw = popleft()
                 try:
-                    f(*a, **kw)
+                    if instrumentation is None:
+                        f(*a, **kw)
+                    else:
+                        instrumentation.callThreadCall(f, a, kw)
                 except:
                     log.err()
-                count += 1
-                if count == total:
-                    break
-            del self.threadCallQueue[:count]
-            if self.threadCallQueue:
+            if queue and not self._wakeUpPending:
+                # Calls added without waking the reactor up, such as by a
+                # signal handler, must not wait for some other event.
+                self._wakeUpPending = True
                 self.wakeUp()
+            if instrumentation is not None:
+                instrumentation.record(
+                    "threadCalls", instrumentation.clock() - start)
 
         # insert new delayed calls now
         self._insertNewDelayedCalls()
 
         now = self.seconds()
-        while self._pendingTimedCalls and (self._pendingTimedCalls[0].time <= now):
-            call = heappop(self._pendingTimedCalls)
-            if call.cancelled:
-                self._cancellations-=1
-                continue
+        if instrumentation is not None:
+            start = instrumentation.clock()
+        timers = self._timers
+        while True:
+            call = timers.popDue(now)
+            if call is None:
+                break
 
             if call.delayed_time > 0:
                 call.activate_delay()
-                heappush(self._pendingTimedCalls, call)
+                timers.add(call)
                 continue
 
             try:
                 call.called = 1
-                call.func(*call.args, **call.kw)
+                if instrumentation is None:
+                    call.func(*call.args, **call.kw)
+                else:
+                    instrumentation.callTimedCall(call)
             except:
                 log.deferr()
                 if hasattr(call, "creator"):
@@ -833,13 +909,9 @@ class ReactorBase(object):
                     e += "\n"
                     log.msg(e)
 
-
-        if (self._cancellations > 50 and
-             self._cancellations > len(self._pendingTimedCalls) >> 1):
-            self._cancellations = 0
-            self._pendingTimedCalls = [x for x in self._pendingTimedCalls
-                                       if not x.cancelled]
-            heapify(self._pendingTimedCalls)
+        if instrumentation is not None:
+            instrumentation.record(
+                "timedCalls", instrumentation.clock() - start)
 
         if self._justStopped:
             self._justStopped = False
@@ -941,11 +1013,16 @@ class ReactorBase(object):
             See L{twisted.internet.interfaces.IReactorThreads.callFromThread}.
             """
             assert callable(f), "%s is not callable" % (f,)
-            # lists are thread-safe in CPython, but not in Jython
+            # deques are thread-safe in CPython, but not in Jython
             # this is probably a bug in Jython, but until fixed this code
             # won't work in Jython.
             self.threadCallQueue.append((f, args, kw))
-            self.wakeUp()
+            # Only the first call since the reactor last emptied the queue
+            # needs to wake it up.  Two threads may both see the flag unset
+            # here, which only costs an extra wake up.
+            if not self._wakeUpPending:
+                self._wakeUpPending = True
+                self.wakeUp()
 
         def _initThreadPool(self):
             """
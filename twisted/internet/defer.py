@@ -159,6 +159,12 @@ def passthru(arg):
 
 
 
+# The half of an entry in Deferred.callbacks which passes the result through
+# unchanged, shared by every entry added by addCallback or addErrback.
+_PASSTHRU = (passthru, None, None)
+
+
+
 def setDebugging(on):
     """
     Enable or disable L{Deferred} debugging.
@@ -302,8 +308,11 @@ class Deferred:
 
         See L{addCallbacks}.
         """
-        return self.addCallbacks(callback, callbackArgs=args,
-                                 callbackKeywords=kw)
+        assert callable(callback)
+        self.callbacks.append(((callback, args, kw), _PASSTHRU))
+        if self.called:
+            self._runCallbacks()
+        return self
 
 
     def addErrback(self, errback, *args, **kw):
@@ -312,9 +321,11 @@ class Deferred:
 
         See L{addCallbacks}.
         """
-        return self.addCallbacks(passthru, errback,
-                                 errbackArgs=args,
-                                 errbackKeywords=kw)
+        assert callable(errback)
+        self.callbacks.append((_PASSTHRU, (errback, args, kw)))
+        if self.called:
+            self._runCallbacks()
+        return self
 
 
     def addBoth(self, callback, *args, **kw):
@@ -324,9 +335,12 @@ class Deferred:
 
         See L{addCallbacks}.
         """
-        return self.addCallbacks(callback, callback,
-                                 callbackArgs=args, errbackArgs=args,
-                                 callbackKeywords=kw, errbackKeywords=kw)
+        assert callable(callback)
+        both = (callback, args, kw)
+        self.callbacks.append((both, both))
+        if self.called:
+            self._runCallbacks()
+        return self
 
 
     def chainDeferred(self, d):
@@ -487,7 +501,11 @@ class Deferred:
             self._debugInfo.invoker = traceback.format_stack()[:-2]
         self.called = True
         self.result = result
-        self._runCallbacks()
+        # With no callbacks yet, a successful result needs no further work,
+        # unless there is a chain to clear.
+        if (self.callbacks or self._chainedTo is not None or
+                isinstance(result, failure.Failure)):
+            self._runCallbacks()
 
 
     def _continuation(self):
@@ -547,34 +565,50 @@ class Deferred:
 
             finished = True
             current._chainedTo = None
-            while current.callbacks:
-                item = current.callbacks.pop(0)
-                callback, args, kw = item[
-                    isinstance(current.result, failure.Failure)]
-                args = args or ()
-                kw = kw or {}
-
-                # Avoid recursion if we can.
-                if callback is _CONTINUE:
-                    # Give the waiting Deferred our current result and then
-                    # forget about that result ourselves.
-                    chainee = args[0]
-                    chainee.result = current.result
-                    current.result = None
-                    # Making sure to update _debugInfo
-                    if current._debugInfo is not None:
-                        current._debugInfo.failResult = None
-                    chainee.paused -= 1
-                    chain.append(chainee)
-                    # Delay cleaning this Deferred and popping it from the chain
-                    # until after we've dealt with chainee.
-                    finished = False
-                    break
+            # Rather than popping each callback off the front of the list,
+            # which takes time proportional to the length of the list, walk
+            # along it and remove the callbacks which were run in one go when
+            # stopping.  Callbacks added while this runs are appended, so are
+            # run by this loop too.
+            callbacks = current.callbacks
+            index = 0
+            current._runningCallbacks = True
+            try:
+                while index < len(callbacks):
+                    item = callbacks[index]
+                    index += 1
+                    callback, args, kw = item[
+                        isinstance(current.result, failure.Failure)]
+
+                    # Avoid recursion if we can.
+                    if callback is _CONTINUE:
+                        # Give the waiting Deferred our current result and
+                        # then forget about that result ourselves.
+                        chainee = args[0]
+                        chainee.result = current.result
+                        current.result = None
+                        # Making sure to update _debugInfo
+                        if current._debugInfo is not None:
+                            current._debugInfo.failResult = None
+                        chainee.paused -= 1
+                        chain.append(chainee)
+                        # Delay cleaning this Deferred and popping it from the
+                        # chain until after we've dealt with chainee.
+                        finished = False
+                        break
+
+                    if callback is passthru and not args and not kw:
+                        # Calling it would leave the result as it is.
+                        continue
 
-                try:
-                    current._runningCallbacks = True
                     try:
-                        current.result = callback(current.result, *args, **kw)
+                        if kw:
+                            current.result = callback(
+                                current.result, *(args or ()), **kw)
+                        elif args:
+                            current.result = callback(current.result, *args)
+                        else:
+                            current.result = callback(current.result)
                         if current.result is current:
                             warnAboutFunction(
                                 callback,
@@ -582,34 +616,43 @@ class Deferred:
                                 "it was attached to; this breaks the "
                                 "callback chain and will raise an "
                                 "exception in the future.")
-                    finally:
-                        current._runningCallbacks = False
-                except:
-                    # Including full frame information in the Failure is quite
-                    # expensive, so we avoid it unless self.debug is set.
-                    current.result = failure.Failure(captureVars=self.debug)
-                else:
-                    if isinstance(current.result, Deferred):
-                        # The result is another Deferred.  If it has a result,
-                        # we can take it and keep going.
-                        resultResult = getattr(current.result, 'result', _NO_RESULT)
-                        if resultResult is _NO_RESULT or isinstance(resultResult, Deferred) or current.result.paused:
-                            # Nope, it didn't.  Pause and chain.
-                            current.pause()
-                            current._chainedTo = current.result
-                            # Note: current.result has no result, so it's not
-                            # running its callbacks right now.  Therefore we can
-                            # append to the callbacks list directly instead of
-                            # using addCallbacks.
-                            current.result.callbacks.append(current._continuation())
-                            break
-                        else:
-                            # Yep, it did.  Steal it.
-                            current.result.result = None
-                            # Make sure _debugInfo's failure state is updated.
-                            if current.result._debugInfo is not None:
-                                current.result._debugInfo.failResult = None
-                            current.result = resultResult
+                    except:
+                        # Including full frame information in the Failure is
+                        # quite expensive, so we avoid it unless self.debug is
+                        # set.
+                        current.result = failure.Failure(
+                            captureVars=self.debug)
+                    else:
+                        if isinstance(current.result, Deferred):
+                            # The result is another Deferred.  If it has a
+                            # result, we can take it and keep going.
+                            resultResult = getattr(
+                                current.result, 'result', _NO_RESULT)
+                            if (resultResult is _NO_RESULT or
+                                    isinstance(resultResult, Deferred) or
+                                    current.result.paused):
+                                # Nope, it didn't.  Pause and chain.
+                                current.pause()
+                                current._chainedTo = current.result
+                                # Note: current.result has no result, so it's
+                                # not running its callbacks right now.
+                                # Therefore we can append to the callbacks
+                                # list directly instead of using
+                                # addCallbacks.
+                                current.result.callbacks.append(
+                                    current._continuation())
+                                break
+                            else:
+                                # Yep, it did.  Steal it.
+                                current.result.result = None
+                                # Make sure _debugInfo's failure state is
+                                # updated.
+                                if current.result._debugInfo is not None:
+                                    current.result._debugInfo.failResult = None
+                                current.result = resultResult
+            finally:
+                current._runningCallbacks = False
+                del callbacks[:index]
 
             if finished:
                 # As much of the callback chain - perhaps all of it - as can be
@@ -1147,6 +1190,17 @@ def _inlineCallbacks(result, g, deferred):
 
         if isinstance(result, Deferred):
             # a deferred was yielded, get the result.
+            if (result.called and not result.paused and
+                    not result.callbacks and not result._runningCallbacks):
+                # It already has its final result, so take it as the
+                # callback below would, without adding a callback.
+                r = result.result
+                result.result = None
+                if result._debugInfo is not None:
+                    result._debugInfo.failResult = None
+                result = r
+                continue
+
             def gotResult(r):
                 if waiting[0]:
                     waiting[0] = False
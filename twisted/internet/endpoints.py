@@ -432,7 +432,7 @@ class _TCPServerEndpoint(object):
     A TCP server endpoint interface
     """
 
-    def __init__(self, reactor, port, backlog, interface):
+    def __init__(self, reactor, port, backlog, interface, reusePort=False):
         """
         @param reactor: An L{IReactorTCP} provider.
 
@@ -444,11 +444,18 @@ class _TCPServerEndpoint(object):
 
         @param interface: The hostname to bind to
         @type interface: str
+
+        @param reusePort: Whether to let other sockets listen on the same
+            port at the same time, with C{SO_REUSEPORT}.  This requires the
+            reactor's C{listenTCP} to accept a C{reusePort} argument, as
+            L{twisted.internet.posixbase.PosixReactorBase.listenTCP} does.
+        @type reusePort: bool
         """
         self._reactor = reactor
         self._port = port
         self._backlog = backlog
         self._interface = interface
+        self._reusePort = reusePort
 
 
     def listen(self, protocolFactory):
@@ -456,11 +463,17 @@ class _TCPServerEndpoint(object):
         Implement L{IStreamServerEndpoint.listen} to listen on a TCP
         socket
         """
+        kwargs = {}
+        if self._reusePort:
+            # Only passed when requested, since other IReactorTCP providers
+            # do not accept it.
+            kwargs['reusePort'] = True
         return defer.execute(self._reactor.listenTCP,
                              self._port,
                              protocolFactory,
                              backlog=self._backlog,
-                             interface=self._interface)
+                             interface=self._interface,
+                             **kwargs)
 
 
 
@@ -468,7 +481,8 @@ class TCP4ServerEndpoint(_TCPServerEndpoint):
     """
     Implements TCP server endpoint with an IPv4 configuration
     """
-    def __init__(self, reactor, port, backlog=50, interface=''):
+    def __init__(self, reactor, port, backlog=50, interface='',
+                 reusePort=False):
         """
         @param reactor: An L{IReactorTCP} provider.
 
@@ -480,8 +494,13 @@ class TCP4ServerEndpoint(_TCPServerEndpoint):
 
         @param interface: The hostname to bind to, defaults to '' (all)
         @type interface: str
+
+        @param reusePort: Whether to set C{SO_REUSEPORT} on the listening
+            socket.
+        @type reusePort: bool
         """
-        _TCPServerEndpoint.__init__(self, reactor, port, backlog, interface)
+        _TCPServerEndpoint.__init__(
+            self, reactor, port, backlog, interface, reusePort)
 
 
 
@@ -489,7 +508,8 @@ class TCP6ServerEndpoint(_TCPServerEndpoint):
     """
     Implements TCP server endpoint with an IPv6 configuration
     """
-    def __init__(self, reactor, port, backlog=50, interface='::'):
+    def __init__(self, reactor, port, backlog=50, interface='::',
+                 reusePort=False):
         """
         @param reactor: An L{IReactorTCP} provider.
 
@@ -501,8 +521,13 @@ class TCP6ServerEndpoint(_TCPServerEndpoint):
 
         @param interface: The hostname to bind to, defaults to '' (all)
         @type interface: str
+
+        @param reusePort: Whether to set C{SO_REUSEPORT} on the listening
+            socket.
+        @type reusePort: bool
         """
-        _TCPServerEndpoint.__init__(self, reactor, port, backlog, interface)
+        _TCPServerEndpoint.__init__(
+            self, reactor, port, backlog, interface, reusePort)
 
 
 
@@ -998,7 +1023,7 @@ class AdoptedStreamServerEndpoint(object):
 
 
 
-def _parseTCP(factory, port, interface="", backlog=50):
+def _parseTCP(factory, port, interface="", backlog=50, reuseport=False):
     """
     Internal parser function for L{_parseServer} to convert the string
     arguments for a TCP(IPv4) stream endpoint into the structured arguments.
@@ -1016,12 +1041,19 @@ def _parseTCP(factory, port, interface="", backlog=50):
     @param backlog: the length of the listen queue
     @type backlog: C{str}
 
+    @param reuseport: A string '0' or '1', mapping to C{False} and C{True}
+        respectively, giving whether to set C{SO_REUSEPORT} on the listening
+        socket.
+    @type reuseport: C{str}
+
     @return: a 2-tuple of (args, kwargs), describing  the parameters to
         L{IReactorTCP.listenTCP} (or, modulo argument 2, the factory, arguments
         to L{TCP4ServerEndpoint}.
     """
-    return (int(port), factory), {'interface': interface,
-                                  'backlog': int(backlog)}
+    kw = {'interface': interface, 'backlog': int(backlog)}
+    if bool(int(reuseport)):
+        kw['reusePort'] = True
+    return (int(port), factory), kw
 
 
 
@@ -1219,7 +1251,8 @@ class _TCP6ServerParser(object):
     """
     prefix = "tcp6"     # Used in _parseServer to identify the plugin with the endpoint type
 
-    def _parseServer(self, reactor, port, backlog=50, interface='::'):
+    def _parseServer(self, reactor, port, backlog=50, interface='::',
+                     reuseport=False):
         """
         Internal parser function for L{_parseServer} to convert the string
         arguments into structured arguments for the L{TCP6ServerEndpoint}
@@ -1234,10 +1267,15 @@ class _TCP6ServerParser(object):
 
         @param interface: The hostname to bind to
         @type interface: str
+
+        @param reuseport: A string '0' or '1', giving whether to set
+            C{SO_REUSEPORT} on the listening socket.
+        @type reuseport: str
         """
         port = int(port)
         backlog = int(backlog)
-        return TCP6ServerEndpoint(reactor, port, backlog, interface)
+        reusePort = bool(int(reuseport))
+        return TCP6ServerEndpoint(reactor, port, backlog, interface, reusePort)
 
 
     def parseStreamServer(self, reactor, *args, **kwargs):
@@ -1421,6 +1459,12 @@ def serverFromString(reactor, description):
 
         serverFromString(reactor, "tcp:80:interface=127.0.0.1")
 
+    Several processes may listen on the same TCP port at once, sharing the
+    incoming connections, if each of them sets C{SO_REUSEPORT} with the
+    C{reuseport} argument::
+
+        serverFromString(reactor, "tcp:80:reuseport=1")
+
     SSL server endpoints may be specified with the 'ssl' prefix, and the
     private key and certificate files may be specified by the C{privateKey} and
     C{certKey} arguments::
@@ -9,11 +9,16 @@ listeners or connectors are added)::
 
     from twisted.internet import epollreactor
     epollreactor.install()
+
+To have TCP connections and ports use edge-triggered notifications instead,
+install it with::
+
+    epollreactor.install(edgeTriggered=True)
 """
 
 from __future__ import division, absolute_import
 
-from select import epoll, EPOLLHUP, EPOLLERR, EPOLLIN, EPOLLOUT
+from select import epoll, EPOLLHUP, EPOLLERR, EPOLLIN, EPOLLOUT, EPOLLET
 import errno
 
 from zope.interface import implementer
@@ -212,6 +217,27 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
     @ivar _continuousPolling: A L{_ContinuousPolling} instance, used to handle
         file descriptors (e.g. filesytem files) that are not supported by
         C{epoll(7)}.
+
+    @ivar _edgeTriggered: Whether descriptors which set
+        C{_edgeTriggerable} are registered for edge-triggered notifications.
+        Each of them is then registered for both read and write readiness
+        once, and only unregistered once it is disconnected, so adding and
+        removing it as a reader or writer only changes C{_reads} and
+        C{_writes}.
+
+    @ivar _edgeFDs: A set containing the integer file descriptors registered
+        with C{_poller} for edge-triggered notifications.  They are in
+        C{_selectables} even when they are in neither C{_reads} nor
+        C{_writes}.
+
+    @ivar _ready: A dictionary mapping the integer file descriptors in
+        C{_edgeFDs} which have events to handle to those events.  Only
+        readers and writers which have not reported that reading or writing
+        would block are in it, so that descriptors which are, for example,
+        writable but not writing are not visited on every iteration.  Their
+        readiness is kept by resetting C{_readBlocked} and C{_writeBlocked}
+        instead, so that they are handled as soon as they are added as a
+        reader or writer, without waiting for another notification.
     """
 
     # Attributes for _PollLikeMixin
@@ -219,10 +245,14 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
     _POLL_IN = EPOLLIN
     _POLL_OUT = EPOLLOUT
 
-    def __init__(self):
+    def __init__(self, edgeTriggered=False):
         """
         Initialize epoll object, file descriptor tracking dictionaries, and the
         base class.
+
+        @param edgeTriggered: Whether to use edge-triggered notifications for
+            the descriptors which support them.
+        @type edgeTriggered: C{bool}
         """
         # Create the poller we're going to use.  The 1024 here is just a hint
         # to the kernel, it is not a hard maximum.  After Linux 2.6.8, the size
@@ -232,9 +262,114 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
         self._writes = set()
         self._selectables = {}
         self._continuousPolling = _ContinuousPolling(self)
+        self._edgeTriggered = edgeTriggered
+        self._edgeFDs = set()
+        self._ready = {}
         posixbase.PosixReactorBase.__init__(self)
 
 
+    def _usesEdgeTriggering(self, xer):
+        """
+        Determine whether a descriptor is, or is to be, registered for
+        edge-triggered notifications.
+
+        A descriptor which is registered for them but no longer sets
+        C{_edgeTriggerable} (for example because TLS was started on it) is
+        registered for level-triggered notifications instead.
+        """
+        fd = xer.fileno()
+        if not (self._edgeTriggered and
+                getattr(xer, "_edgeTriggerable", False)):
+            if fd in self._edgeFDs:
+                if self._selectables.get(fd) is xer:
+                    self._levelTrigger(fd)
+                else:
+                    self._unregisterEdgeTriggered(fd)
+            return False
+        # A descriptor registered for level-triggered notifications keeps
+        # them until it is removed.
+        return fd in self._edgeFDs or not (
+            fd in self._reads or fd in self._writes)
+
+
+    def _addEdgeTriggered(self, xer, primary):
+        """
+        Private method for adding a descriptor which is registered for
+        edge-triggered notifications.
+
+        It is only registered if it was not already, so that becoming a reader
+        or writer again is only a matter of updating C{primary}.
+        """
+        fd = xer.fileno()
+        if self._selectables.get(fd) is not xer or fd not in self._edgeFDs:
+            if fd in self._edgeFDs:
+                # The descriptor this number belonged to was closed without
+                # being disconnected; forget about it.
+                self._unregisterEdgeTriggered(fd)
+            self._poller.register(fd, EPOLLIN | EPOLLOUT | EPOLLET)
+            self._edgeFDs.add(fd)
+            self._selectables[fd] = xer
+        primary.add(fd)
+        self._updateReady(fd, xer, 0)
+
+
+    def _levelTrigger(self, fd):
+        """
+        Register a file descriptor registered for edge-triggered notifications
+        for level-triggered notifications of the events it is interested in.
+        """
+        flags = 0
+        if fd in self._reads:
+            flags |= EPOLLIN
+        if fd in self._writes:
+            flags |= EPOLLOUT
+        if flags:
+            self._poller.modify(fd, flags)
+            self._edgeFDs.discard(fd)
+            self._ready.pop(fd, None)
+        else:
+            self._unregisterEdgeTriggered(fd)
+
+
+    def _unregisterEdgeTriggered(self, fd):
+        """
+        Unregister a file descriptor registered for edge-triggered
+        notifications, and forget its pending events.
+        """
+        try:
+            self._poller.unregister(fd)
+        except IOError as e:
+            # It is already gone if it was closed.
+            if e.errno not in (errno.ENOENT, errno.EBADF):
+                raise
+        self._edgeFDs.discard(fd)
+        self._ready.pop(fd, None)
+        del self._selectables[fd]
+
+
+    def _removeEdgeTriggered(self, xer, primary, other):
+        """
+        Private method for removing a descriptor which is registered for
+        edge-triggered notifications.
+
+        It stays registered until it is disconnected, so that it can be added
+        again without a system call.
+        """
+        fd = xer.fileno()
+        if fd == -1:
+            for fd, fdes in self._selectables.items():
+                if xer is fdes:
+                    break
+            else:
+                return
+        primary.discard(fd)
+        if self._selectables.get(fd) is xer:
+            if xer.disconnected and fd not in other:
+                self._unregisterEdgeTriggered(fd)
+            else:
+                self._updateReady(fd, xer, 0)
+
+
     def _add(self, xer, primary, other, selectables, event, antievent):
         """
         Private method for adding a descriptor from the event loop.
@@ -267,8 +402,11 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
         Add a FileDescriptor for notification of data available to read.
         """
         try:
-            self._add(reader, self._reads, self._writes, self._selectables,
-                      EPOLLIN, EPOLLOUT)
+            if self._usesEdgeTriggering(reader):
+                self._addEdgeTriggered(reader, self._reads)
+            else:
+                self._add(reader, self._reads, self._writes,
+                          self._selectables, EPOLLIN, EPOLLOUT)
         except IOError as e:
             if e.errno == errno.EPERM:
                 # epoll(7) doesn't support certain file descriptors,
@@ -284,8 +422,11 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
         Add a FileDescriptor for notification of data available to write.
         """
         try:
-            self._add(writer, self._writes, self._reads, self._selectables,
-                      EPOLLOUT, EPOLLIN)
+            if self._usesEdgeTriggering(writer):
+                self._addEdgeTriggered(writer, self._writes)
+            else:
+                self._add(writer, self._writes, self._reads,
+                          self._selectables, EPOLLOUT, EPOLLIN)
         except IOError as e:
             if e.errno == errno.EPERM:
                 # epoll(7) doesn't support certain file descriptors,
@@ -329,6 +470,9 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
         if self._continuousPolling.isReading(reader):
             self._continuousPolling.removeReader(reader)
             return
+        if self._edgeFDs and self._usesEdgeTriggering(reader):
+            self._removeEdgeTriggered(reader, self._reads, self._writes)
+            return
         self._remove(reader, self._reads, self._writes, self._selectables,
                      EPOLLIN, EPOLLOUT)
 
@@ -340,6 +484,9 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
         if self._continuousPolling.isWriting(writer):
             self._continuousPolling.removeWriter(writer)
             return
+        if self._edgeFDs and self._usesEdgeTriggering(writer):
+            self._removeEdgeTriggered(writer, self._writes, self._reads)
+            return
         self._remove(writer, self._writes, self._reads, self._selectables,
                      EPOLLOUT, EPOLLIN)
 
@@ -370,6 +517,10 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
         """
         if timeout is None:
             timeout = -1  # Wait indefinitely.
+        if self._ready:
+            # Don't wait for notifications while there are descriptors known
+            # to be ready.
+            timeout = 0
 
         try:
             # Limit the number of events to the number of io objects we're
@@ -387,7 +538,12 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
             raise
 
         _drdw = self._doReadOrWrite
+        edgeFDs = self._edgeFDs
+        ready = self._ready
         for fd, event in l:
+            if fd in edgeFDs:
+                self._notifiedEdgeTriggered(fd, event)
+                continue
             try:
                 selectable = self._selectables[fd]
             except KeyError:
@@ -395,14 +551,84 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
             else:
                 log.callWithLogger(selectable, _drdw, selectable, fd, event)
 
+        if ready:
+            for fd in list(ready):
+                event = ready.get(fd)
+                if event is None:
+                    # It was removed or disconnected while handling an
+                    # earlier event.
+                    continue
+                selectable = self._selectables[fd]
+                log.callWithLogger(
+                    selectable, self._doEdgeTriggered, selectable, fd, event)
+
     doIteration = doPoll
 
 
-def install():
+    def _notifiedEdgeTriggered(self, fd, event):
+        """
+        Record the events reported for a descriptor registered for
+        edge-triggered notifications.
+
+        Readiness for reading or writing resets C{_readBlocked} or
+        C{_writeBlocked}, whether or not the descriptor is a reader or
+        writer; disconnection resets both, so that whichever is tried next
+        finds out about it.
+        """
+        selectable = self._selectables[fd]
+        if event & self._POLL_DISCONNECTED:
+            selectable._readBlocked = selectable._writeBlocked = False
+        else:
+            if event & EPOLLIN:
+                selectable._readBlocked = False
+            if event & EPOLLOUT:
+                selectable._writeBlocked = False
+        self._updateReady(fd, selectable, event)
+
+
+    def _updateReady(self, fd, selectable, event):
+        """
+        Keep a descriptor registered for edge-triggered notifications in
+        C{_ready} if it is a reader or writer which has not reported that
+        reading or writing would block, and remove it otherwise.
+
+        @param event: Events to handle in addition to those already in
+            C{_ready} for it.  Disconnection events are only handled for
+            readers and writers, as they would not be reported for descriptors
+            which were neither if they were registered for level-triggered
+            notifications.
+        """
+        wanted = 0
+        if fd in self._reads and not selectable._readBlocked:
+            wanted |= EPOLLIN
+        if fd in self._writes and not selectable._writeBlocked:
+            wanted |= EPOLLOUT
+        if wanted:
+            event |= self._ready.get(fd, 0) | wanted
+            self._ready[fd] = event & (wanted | self._POLL_DISCONNECTED)
+        else:
+            self._ready.pop(fd, None)
+
+
+    def _doEdgeTriggered(self, selectable, fd, event):
+        """
+        Handle events for a descriptor registered for edge-triggered
+        notifications, and forget the ones which it reports it is no longer
+        ready for.
+        """
+        self._doReadOrWrite(selectable, fd, event)
+        if self._selectables.get(fd) is selectable:
+            self._updateReady(fd, selectable, 0)
+
+
+def install(edgeTriggered=False):
     """
     Install the epoll() reactor.
+
+    @param edgeTriggered: Whether to use edge-triggered notifications for the
+        descriptors which support them.  See L{EPollReactor}.
     """
-    p = EPollReactor()
+    p = EPollReactor(edgeTriggered)
     from twisted.internet.main import installReactor
     installReactor(p)
 
@@ -0,0 +1,221 @@
+# -*- test-case-name: twisted.internet.test.test_instrumentation -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Measurement of where a reactor spends its time.
+
+A L{ReactorInstrumentation} can be installed in a reactor based on
+L{twisted.internet.base.ReactorBase} with
+L{ReactorBase.installInstrumentation
+<twisted.internet.base.ReactorBase.installInstrumentation>}::
+
+    from twisted.internet import reactor
+    from twisted.internet.instrumentation import ReactorInstrumentation
+    instrumentation = ReactorInstrumentation(slowThreshold=0.05)
+    reactor.installInstrumentation(instrumentation)
+
+It then keeps a L{Histogram} of the time taken by each of these parts of the
+reactor loop, keyed by name in its C{histograms} attribute:
+
+  - C{"iteration"}: each call to C{doIteration}, that is, waiting for I/O
+    events and dispatching them.
+  - C{"io"}: each call to the C{doRead} or C{doWrite} method of a
+    selectable.
+  - C{"threadCalls"}: running all the calls queued by C{callFromThread} in one
+    pass of C{runUntilCurrent}.
+  - C{"threadCall"}: each of those calls.
+  - C{"timedCalls"}: running all the due L{DelayedCall}s in one pass of
+    C{runUntilCurrent}.
+  - C{"timedCall"}: each of those calls.
+
+Any single callback which takes longer than C{slowThreshold} seconds is
+reported with a log event whose C{slowCallback} key gives a description of the
+callable.
+
+Reactors without instrumentation installed do not pay for any of this.
+"""
+
+from __future__ import division, absolute_import
+
+from twisted.python import log
+from twisted.python import _reflectpy3 as reflect
+from twisted.python.runtime import seconds as runtimeSeconds
+
+
+
+class Histogram(object):
+    """
+    A histogram of durations.
+
+    Durations are counted in buckets whose bounds are successive powers of two
+    microseconds: bucket C{0} counts durations of less than one microsecond and
+    bucket C{n} counts durations of at least C{2 ** (n - 1)} and less than
+    C{2 ** n} microseconds.
+
+    @ivar count: The number of durations added.
+    @type count: C{int}
+
+    @ivar total: The sum of the durations added, in seconds.
+    @type total: C{float}
+
+    @ivar maximum: The longest duration added, in seconds.
+    @type maximum: C{float}
+
+    @ivar buckets: A C{dict} mapping bucket numbers to the number of durations
+        which fell in that bucket.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.buckets = {}
+
+
+    def __repr__(self):
+        return "<Histogram count=%d total=%f maximum=%f>" % (
+            self.count, self.total, self.maximum)
+
+
+    def add(self, duration):
+        """
+        Count one duration.
+
+        @param duration: A duration, in seconds.
+        @type duration: C{float}
+        """
+        self.count += 1
+        self.total += duration
+        if duration > self.maximum:
+            self.maximum = duration
+        bucket = max(0, int(duration * 1000000)).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+
+    def percentile(self, fraction):
+        """
+        Estimate a percentile of the durations added.
+
+        @param fraction: The fraction of durations which should be no longer
+            than the result, between C{0} and C{1}.
+        @type fraction: C{float}
+
+        @return: The upper bound, in seconds, of the bucket containing the
+            requested percentile (but no more than C{maximum}), or C{None} if
+            no durations have been added.
+        @rtype: C{float} or C{NoneType}
+        """
+        if not self.count:
+            return None
+        wanted = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= wanted:
+                break
+        return min(self.maximum, (2 ** bucket) / 1000000.0)
+
+
+
+class ReactorInstrumentation(object):
+    """
+    Timing of the parts of a reactor's loop.
+
+    @ivar histograms: A C{dict} mapping the names of the parts of the reactor
+        loop to a L{Histogram} of the time spent in them.
+
+    @ivar slowThreshold: The number of seconds which a single callback may take
+        before being reported, or C{None} to never report callbacks.
+    @type slowThreshold: C{float} or C{NoneType}
+
+    @ivar clock: A no-argument callable returning the current time, in
+        seconds.
+    """
+
+    names = ("iteration", "io", "threadCalls", "threadCall",
+             "timedCalls", "timedCall")
+
+    def __init__(self, slowThreshold=None, clock=runtimeSeconds):
+        self.slowThreshold = slowThreshold
+        self.clock = clock
+        self.reset()
+
+
+    def reset(self):
+        """
+        Discard all of the measurements made so far.
+        """
+        self.histograms = dict([(name, Histogram()) for name in self.names])
+
+
+    def record(self, name, duration, description=None):
+        """
+        Record the time taken by one part of the reactor loop.
+
+        @param name: One of L{names}.
+        @type name: C{str}
+
+        @param duration: The time taken, in seconds.
+        @type duration: C{float}
+
+        @param description: If not C{None}, the callback which took this long.
+            It is reported if C{duration} exceeds C{slowThreshold}.
+        """
+        self.histograms[name].add(duration)
+        if (description is not None and self.slowThreshold is not None
+                and duration > self.slowThreshold):
+            log.msg(
+                format="Reactor spent %(duration)f seconds in %(category)s "
+                       "%(slowCallback)s",
+                slowCallback=reflect.safe_str(description),
+                category=name, duration=duration)
+
+
+    def callThreadCall(self, f, args, kw):
+        """
+        Call and time a function queued with C{callFromThread}.
+        """
+        start = self.clock()
+        try:
+            f(*args, **kw)
+        finally:
+            self.record("threadCall", self.clock() - start, f)
+
+
+    def callTimedCall(self, call):
+        """
+        Call and time the function of a L{DelayedCall}.
+        """
+        start = self.clock()
+        try:
+            call.func(*call.args, **call.kw)
+        finally:
+            self.record("timedCall", self.clock() - start, call)
+
+
+    def wrapIteration(self, doIteration):
+        """
+        Wrap a reactor's C{doIteration} so that it is timed.
+        """
+        def timedIteration(delay):
+            start = self.clock()
+            try:
+                doIteration(delay)
+            finally:
+                self.record("iteration", self.clock() - start)
+        return timedIteration
+
+
+    def wrapDoReadOrWrite(self, doReadOrWrite):
+        """
+        Wrap a reactor's C{_doReadOrWrite} so that the handling of each I/O
+        event is timed.
+        """
+        def timedDoReadOrWrite(selectable, *args):
+            start = self.clock()
+            try:
+                doReadOrWrite(selectable, *args)
+            finally:
+                self.record("io", self.clock() - start, selectable)
+        return timedDoReadOrWrite
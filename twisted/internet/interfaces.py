@@ -1942,6 +1942,73 @@ class IFileDescriptorReceiver(Interface):
 
 
 
+class IBufferedProtocol(Interface):
+    """
+    Protocols may implement L{IBufferedProtocol} to have received data read
+    directly into a buffer they own, rather than into a new string which is
+    then passed to L{IProtocol.dataReceived}.  This saves an allocation (and
+    usually a copy) for each read.
+
+    Only some transports (the POSIX TCP, UNIX and standard I/O transports)
+    use this interface; the others, and those same transports once TLS has
+    been started on them, keep calling L{IProtocol.dataReceived}.  Providers
+    must therefore implement L{IProtocol} as well, and must accept data
+    through either interface at any time.
+    """
+
+    def getBuffer(sizeHint):
+        """
+        Get the buffer into which the transport should read the next bytes.
+
+        @param sizeHint: The number of bytes the transport would like to read.
+            The buffer may be smaller or larger than this.
+        @type sizeHint: C{int}
+
+        @return: A writable object supporting the buffer protocol, such as a
+            C{bytearray} or a C{memoryview} of one, at least one byte long.
+            The transport writes the data it reads at the start of it.
+        """
+
+
+    def bufferUpdated(nbytes):
+        """
+        Called when data has been read into the buffer last returned by
+        L{getBuffer}.
+
+        @param nbytes: The number of bytes written at the start of that
+            buffer.  This is always at least one; the end of the connection is
+            reported to L{IProtocol.connectionLost} as usual.
+        @type nbytes: C{int}
+
+        @return: C{None}
+        """
+
+
+
+class IBatchDatagramProtocol(Interface):
+    """
+    Datagram protocols may implement L{IBatchDatagramProtocol} to be given
+    all of the datagrams a transport reads at once in a single call, rather
+    than one call to C{datagramReceived} for each of them.
+
+    Only L{twisted.internet.udp.Port} uses this interface; other datagram
+    transports keep calling C{datagramReceived}, which providers should
+    therefore implement as well.
+    """
+
+    def datagramsReceived(datagrams):
+        """
+        Called when datagrams have been received.
+
+        @param datagrams: The datagrams, in the order they were received.
+        @type datagrams: C{list} of C{(data, addr)} tuples, with the same
+            meanings as the arguments of C{datagramReceived}.
+
+        @return: C{None}
+        """
+
+
+
 class IProtocolFactory(Interface):
     """
     Interface for protocol factories.
@@ -2128,6 +2195,51 @@ class IUNIXTransport(ITransport):
 
 
 
+class IFileTransport(ITransport):
+    """
+    A transport which can send the contents of a file without reading them
+    into memory, for example with the C{sendfile} system call.
+    """
+
+    def canWriteFile():
+        """
+        Determine whether L{writeFile} can currently be used.  It cannot, for
+        example, once TLS has been started on the transport, since the file
+        would then have to be encrypted.
+
+        @return: C{True} if L{writeFile} may be called, C{False} otherwise.
+        @rtype: C{bool}
+        """
+
+
+    def writeFile(fileObject, offset, count):
+        """
+        Write part of a file to the transport.
+
+        The bytes are sent after any data already written to the transport and
+        before any data written afterwards.  Until they have all been sent,
+        they count towards the transport's buffer, so a registered streaming
+        producer may be paused as if they had been passed to C{write}.
+
+        @param fileObject: A file object whose C{fileno} method gives the
+            descriptor of a regular file.  It must not be closed until the
+            result has fired.
+
+        @param offset: The offset within the file of the first byte to write.
+        @type offset: C{int}
+
+        @param count: The number of bytes to write.  Fewer are written if the
+            end of the file is reached first.
+        @type count: C{int}
+
+        @return: A L{Deferred} which fires with C{None} once the bytes have
+            been written, or fails if the connection is lost first.
+
+        @raise RuntimeError: If L{canWriteFile} returns C{False}.
+        """
+
+
+
 class ITLSTransport(ITCPTransport):
     """
     A TCP transport that supports switching to TLS midstream.
@@ -2298,6 +2410,26 @@ class IUDPTransport(Interface):
 
 
 
+class IBatchUDPTransport(IUDPTransport):
+    """
+    A UDP transport which can send several datagrams at once.
+    """
+
+    def writeBatch(datagrams):
+        """
+        Write several datagrams, with as few system calls as possible.
+
+        This behaves as calling C{write} for each datagram in turn: if one of
+        them cannot be written, the same exception is raised, and the
+        datagrams after it are not written.
+
+        @param datagrams: The datagrams to write.
+        @type datagrams: An iterable of C{(packet, addr)} tuples, with the
+            same meanings as the arguments of C{write}.
+        """
+
+
+
 class IUNIXDatagramTransport(Interface):
     """
     Transport for UDP PacketProtocols.
@@ -490,8 +490,18 @@ class PosixReactorBase(_SignalReactorMixin, _DisconnectSelectableMixin,
 
     # IReactorTCP
 
-    def listenTCP(self, port, factory, backlog=50, interface=''):
-        p = tcp.Port(port, factory, backlog, interface, self)
+    def listenTCP(self, port, factory, backlog=50, interface='',
+                  reusePort=False):
+        """
+        @see: L{twisted.internet.interfaces.IReactorTCP.listenTCP}
+
+        @param reusePort: If C{True}, set C{SO_REUSEPORT} on the listening
+            socket, so that several processes may listen on C{port} at once
+            and share the incoming connections.
+            L{twisted.internet.error.CannotListenError} is raised where the
+            platform does not support this.
+        """
+        p = tcp.Port(port, factory, backlog, interface, self, reusePort)
         p.startListening()
         return p
 
@@ -23,6 +23,16 @@ try:
 except ImportError:
     fcntl = None
 
+try:
+    from twisted.python import _posixspawn
+except ImportError:
+    _posixspawn = None
+
+try:
+    from twisted.python import _waitid
+except ImportError:
+    _waitid = None
+
 from zope.interface import implements
 
 from twisted.python import log, failure
@@ -41,7 +51,34 @@ reapProcessHandlers = {}
 def reapAllProcesses():
     """
     Reap all registered processes.
+
+    Where waitid(2) can say which child has exited without reaping it, only
+    the processes which have exited are asked to reap themselves, so that a
+    C{SIGCHLD} costs the same however many processes are registered.  If a
+    child which is not registered has exited, it is left for whoever started
+    it, and every registered process is asked instead, as it is where waitid
+    cannot be used.
+
+    waitid keeps reporting such a child until it is reaped, so a child which
+    Twisted did not start and which is left unreaped (for example, one whose
+    parent code never waits for it) makes every C{SIGCHLD} cost as much as it
+    would without waitid, for as long as it is left.
     """
+    if _waitid is not None:
+        while True:
+            try:
+                pid = _waitid.exitedChild()
+            except OSError:
+                break
+            if pid is None:
+                return
+            process = reapProcessHandlers.get(pid)
+            if process is None:
+                break
+            process.reapProcess()
+            if reapProcessHandlers.get(pid) is process:
+                # It could not be reaped, and would be found again.
+                break
     for process in reapProcessHandlers.values():
         process.reapProcess()
 
@@ -583,6 +620,27 @@ def _listOpenFDs():
     return detector._listOpenFDs()
 
 
+
+def _closeOtherFDs(keep):
+    """
+    Close every file descriptor except those in C{keep}, in a child process
+    before it calls C{exec}.
+
+    Where the kernel supports close_range(2) this takes a system call for each
+    gap between the descriptors kept, rather than one for each descriptor
+    L{_listOpenFDs} finds, which matters in a process with many sockets open.
+    """
+    if _posixspawn is not None and _posixspawn.closeOtherFDs(keep):
+        return
+    for fd in _listOpenFDs():
+        if fd in keep:
+            continue
+        try:
+            os.close(fd)
+        except:
+            pass
+
+
 class Process(_BaseProcess):
     """
     An operating-system Process.
@@ -674,7 +732,10 @@ class Process(_BaseProcess):
             if debug: print "helpers", helpers
             # the child only cares about fdmap.values()
 
-            self._fork(path, uid, gid, executable, args, environment, fdmap=fdmap)
+            if not self._spawn(path, uid, gid, executable, args, environment,
+                               fdmap):
+                self._fork(path, uid, gid, executable, args, environment,
+                           fdmap=fdmap)
         except:
             map(os.close, _openedPipes)
             raise
@@ -710,6 +771,42 @@ class Process(_BaseProcess):
         registerReapProcessHandler(self.pid, self)
 
 
+    def _spawn(self, path, uid, gid, executable, args, environment, fdmap):
+        """
+        Start the child with posix_spawn(3) rather than C{fork} and C{exec},
+        if it can be.
+
+        Forking copies the page tables of this process, however big it is, and
+        the child then has to find and close the descriptors it should not
+        inherit.  posix_spawn does neither, but runs no Python code in the
+        child, so it is only used where L{_setupChild} and L{_execChild} would
+        do nothing it cannot: there is no user to switch to and the child's
+        descriptors are numbered from 0 with no gaps, as they usually are.  If
+        it fails, the caller falls back to C{fork}, which reports errors the
+        way it always has.
+
+        @return: C{True} if the child was started.
+        """
+        if (_posixspawn is None or uid is not None or gid is not None or
+            self.debug_child or sorted(fdmap) != range(len(fdmap))):
+            return False
+        if environment is None:
+            environment = os.environ
+        found = _posixspawn.findExecutable(executable, environment)
+        if found is None:
+            return False
+        ignored = [
+            signalnum for signalnum in range(1, signal.NSIG)
+            if signal.getsignal(signalnum) == signal.SIG_IGN]
+        try:
+            self.pid = _posixspawn.spawn(
+                found, args, environment, fdmap, path, ignored)
+        except OSError:
+            return False
+        self.status = -1
+        return True
+
+
     def _setupChild(self, fdmap):
         """
         fdmap[childFD] = parentFD
@@ -723,7 +820,8 @@ class Process(_BaseProcess):
 
             1. close all file descriptors that aren't values of fdmap.  This
                means 0 .. maxfds (or just the open fds within that range, if
-               the platform supports '/proc/<pid>/fd').
+               the platform supports '/proc/<pid>/fd', or a few calls to
+               close_range(2), if the kernel supports that).
 
             2. for each childFD::
 
@@ -747,15 +845,10 @@ class Process(_BaseProcess):
             errfd.write("starting _setupChild\n")
 
         destList = fdmap.values()
-        for fd in _listOpenFDs():
-            if fd in destList:
-                continue
-            if debug and fd == errfd.fileno():
-                continue
-            try:
-                os.close(fd)
-            except:
-                pass
+        if debug:
+            _closeOtherFDs(destList + [errfd.fileno()])
+        else:
+            _closeOtherFDs(destList)
 
         # at this point, the only fds still open are the ones that need to
         # be moved to their appropriate positions in the child (the targets
@@ -987,8 +1080,8 @@ class PTYProcess(abstract.FileDescriptor, _BaseProcess):
 
             - duplicating C{slavefd} to standard input, output, and error
 
-            - closing all other open file descriptors (according to
-              L{_listOpenFDs})
+            - closing all other open file descriptors (with
+              L{_closeOtherFDs})
 
             - re-setting all signal handlers to C{SIG_DFL}
 
@@ -1011,12 +1104,7 @@ class PTYProcess(abstract.FileDescriptor, _BaseProcess):
         os.dup2(slavefd, 1) # stdout
         os.dup2(slavefd, 2) # stderr
 
-        for fd in _listOpenFDs():
-            if fd > 2:
-                try:
-                    os.close(fd)
-                except:
-                    pass
+        _closeOtherFDs([0, 1, 2])
 
         self._resetSignalDisposition()
 
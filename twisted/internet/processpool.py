@@ -0,0 +1,585 @@
+# -*- test-case-name: twisted.internet.test.test_processpool -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+A pool of worker processes to run CPU-bound functions in.
+
+Running a function in a thread with L{twisted.internet.threads.deferToThread}
+keeps the reactor responsive only while the function releases the global
+interpreter lock, which pure Python code does not.  A L{ProcessPool} runs
+functions in long-lived worker processes instead, and talks to them with
+L{twisted.protocols.amp}::
+
+    from twisted.internet.processpool import ProcessPool
+
+    pool = ProcessPool(maxWorkers=4, timeout=30)
+    pool.setServiceParent(application)
+    ...
+    d = pool.deferToProcess(crunch, numbers)
+
+The function, its arguments and its result are pickled, so the function must
+be importable by name (a module-level function, not a lambda or a method of a
+local class) and the arguments and result must be picklable.
+
+@since: 14.0
+"""
+
+from __future__ import division, absolute_import
+
+import errno
+import os
+import sys
+from collections import deque
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from twisted.application import service
+from twisted.internet import error
+from twisted.internet.defer import Deferred, fail
+from twisted.internet.endpoints import ProcessEndpoint, connectProtocol
+from twisted.internet.protocol import FileWrapper
+from twisted.protocols import amp
+from twisted.python import log
+from twisted.python.failure import Failure
+from twisted.python.modules import theSystemPath
+from twisted.python.reflect import qual
+
+
+# The environment variable which carries the parent's sys.path to workers.
+_PYTHONPATH = "TWISTED_PROCESSPOOL_PYTHONPATH"
+
+
+
+class WorkerTimeout(Exception):
+    """
+    A call took longer than its timeout, so the worker running it was killed.
+    """
+
+
+
+class RemoteCallError(Exception):
+    """
+    A worker could not unpickle a call, or could not pickle its result or the
+    exception it raised.
+    """
+
+
+
+class _Bytes(amp.Argument):
+    """
+    Encode a byte string of any length, split into as many AMP values as it
+    takes to fit within L{amp.MAX_VALUE_LENGTH}.
+    """
+
+    def toBox(self, name, strings, objects, proto):
+        value = objects.pop(name)
+        size = amp.MAX_VALUE_LENGTH
+        chunks = [value[i:i + size] for i in range(0, len(value), size)]
+        strings[name] = str(len(chunks)).encode("ascii")
+        for i, chunk in enumerate(chunks):
+            strings[name + b"." + str(i).encode("ascii")] = chunk
+
+
+    def fromBox(self, name, strings, objects, proto):
+        count = int(strings.pop(name))
+        objects[name] = b"".join([
+                strings.pop(name + b"." + str(i).encode("ascii"))
+                for i in range(count)])
+
+
+
+class _Call(amp.Command):
+    """
+    Call a function in a worker.
+
+    C{call} is a pickled C{(function, args, kwargs)} tuple.  C{value} is the
+    pickled result, or the pickled exception if C{failed} is true.
+    """
+    arguments = [(b"call", _Bytes())]
+    response = [(b"failed", amp.Boolean()), (b"value", _Bytes())]
+
+
+
+class _WorkerLocator(amp.CommandLocator):
+    """
+    Respond to L{_Call} in a worker process, by calling the function there and
+    then.
+    """
+
+    @_Call.responder
+    def call(self, call):
+        try:
+            function, args, kwargs = pickle.loads(call)
+            result = function(*args, **kwargs)
+            failed = False
+        except:
+            result = sys.exc_info()[1]
+            failed = True
+        try:
+            value = pickle.dumps(result, 2)
+        except:
+            value = pickle.dumps(RemoteCallError(
+                    "Could not pickle %s %r" % (
+                        "exception" if failed else "result", result)), 2)
+            failed = True
+        return {"failed": failed, "value": value}
+
+
+
+class _Task(object):
+    """
+    A call waiting for a worker, or running in one.
+
+    @ivar call: The pickled C{(function, args, kwargs)} tuple.
+
+    @ivar deferred: The L{Deferred} which fires with the outcome of the call.
+
+    @ivar timeout: The number of seconds the call may run for, or C{None}.
+
+    @ivar worker: The L{_WorkerProtocol} running the call, or C{None} while it
+        waits.
+
+    @ivar timer: The L{IDelayedCall} which kills the worker when the timeout
+        expires, or C{None}.
+
+    @ivar killed: The exception to fail the call with once the worker which
+        was running it has been killed, or C{None}.
+    """
+    worker = None
+    timer = None
+    killed = None
+
+    def __init__(self, call, deferred, timeout):
+        self.call = call
+        self.deferred = deferred
+        self.timeout = timeout
+
+
+
+class _WorkerProtocol(amp.AMP):
+    """
+    The connection to a worker process, in the process which owns the pool.
+
+    @ivar tasks: The number of calls the worker has been given.
+
+    @ivar task: The L{_Task} the worker is running, or C{None} if it is idle.
+
+    @ivar ended: Whether the worker process has exited.
+
+    @ivar idleTimer: The L{IDelayedCall} which retires the worker if it stays
+        idle for too long, or C{None}.
+    """
+    task = None
+    ended = False
+    idleTimer = None
+
+    def __init__(self, pool):
+        amp.AMP.__init__(self)
+        self.pool = pool
+        self.tasks = 0
+
+
+    def connectionLost(self, reason):
+        # The pool forgets this worker first, so that no call made by the
+        # callbacks of the calls which fail below is given to it.
+        self.ended = True
+        self.pool._workerEnded(self)
+        amp.AMP.connectionLost(self, reason)
+
+
+    def kill(self):
+        """
+        Kill the worker process.
+        """
+        try:
+            self.transport.signalProcess("KILL")
+        except error.ProcessExitedAlready:
+            pass
+
+
+
+class ProcessPool(service.Service):
+    """
+    A pool of worker processes to run functions in.
+
+    Workers are started as they are needed, up to C{maxWorkers}, and each
+    runs one call at a time.  A call goes to the idle worker which has run the
+    fewest calls, so that the work and the recycling of workers are spread
+    evenly; it waits in a queue if every worker is busy.
+
+    The pool is a service: workers are started, and calls made before then
+    are run, once the service starts.  Stopping the service lets the calls
+    already made finish, then ends the workers, and returns a L{Deferred}
+    which fires once they have exited.
+
+    @ivar minWorkers: The number of workers to keep running even when there
+        is no work.
+
+    @ivar maxWorkers: The largest number of workers to run at once.
+
+    @ivar maxTasksPerWorker: The number of calls after which a worker is
+        replaced by a new one, or C{None} to keep workers for as long as they
+        last.  This bounds the damage done by functions which leak memory.
+
+    @ivar timeout: The default number of seconds a call may run for before
+        the worker running it is killed, or C{None} for no limit.
+
+    @ivar idleTimeout: The number of seconds a worker beyond C{minWorkers}
+        may stay idle before it is ended, or C{None} to keep it.
+
+    @ivar executable: The Python executable to run workers with.
+
+    @ivar workers: The L{_WorkerProtocol}s of the running workers.
+
+    @ivar _retiring: The L{_WorkerProtocol}s of the workers which have been
+        taken out of the pool and told to exit, but have not exited yet.
+    """
+
+    def __init__(self, minWorkers=1, maxWorkers=None, maxTasksPerWorker=None,
+                 timeout=None, idleTimeout=None, reactor=None,
+                 executable=sys.executable):
+        """
+        Create a process pool.
+
+        @param maxWorkers: The largest number of workers, or C{None} for one
+            per CPU.
+
+        @param reactor: The reactor to start workers and time calls with, or
+            C{None} for the global reactor.
+
+        @raise ValueError: If C{minWorkers} is more than C{maxWorkers}, or
+            C{maxWorkers} or C{maxTasksPerWorker} is less than one.
+        """
+        if maxWorkers is None:
+            maxWorkers = max(_cpuCount(), minWorkers)
+        if maxWorkers < 1:
+            raise ValueError("maxWorkers must be at least 1")
+        if minWorkers < 0 or minWorkers > maxWorkers:
+            raise ValueError(
+                "minWorkers must be between 0 and maxWorkers")
+        if maxTasksPerWorker is not None and maxTasksPerWorker < 1:
+            raise ValueError("maxTasksPerWorker must be at least 1")
+        if reactor is None:
+            from twisted.internet import reactor
+        self.minWorkers = minWorkers
+        self.maxWorkers = maxWorkers
+        self.maxTasksPerWorker = maxTasksPerWorker
+        self.timeout = timeout
+        self.idleTimeout = idleTimeout
+        self.executable = executable
+        self.workers = []
+        self._retiring = []
+        self._reactor = reactor
+        self._queue = deque()
+        self._starting = 0
+        self._stopping = False
+        self._stopped = []
+        self._adjusting = False
+        self._readjust = False
+
+
+    def startService(self):
+        service.Service.startService(self)
+        self._stopping = False
+        self._adjust()
+
+
+    def stopService(self):
+        """
+        Let the calls already made finish, then end the workers.
+
+        @return: A L{Deferred} which fires once every worker has exited.
+        """
+        service.Service.stopService(self)
+        self._stopping = True
+        d = Deferred()
+        self._stopped.append(d)
+        self._adjust()
+        return d
+
+
+    def deferToProcess(self, f, *args, **kwargs):
+        """
+        Call a function in a worker, with the pool's default timeout.
+
+        @param f: The function to call.  It must be importable by name.
+        @param *args: positional arguments to pass to f.
+        @param **kwargs: keyword arguments to pass to f.
+
+        @return: A L{Deferred} which fires with the result of f, or fails with
+            the exception it raised, or with L{WorkerTimeout} if it ran for too
+            long, or with L{error.ProcessTerminated} if the worker died while
+            running it.  Cancelling the L{Deferred} takes the call out of the
+            queue, or kills the worker which is running it.
+        """
+        return self.callWithTimeout(self.timeout, f, *args, **kwargs)
+
+
+    def callWithTimeout(self, timeout, f, *args, **kwargs):
+        """
+        Call a function in a worker, like L{deferToProcess}, with a timeout
+        for this call alone.
+
+        @param timeout: The number of seconds the call may run for once a
+            worker has started it, or C{None} for no limit.
+        """
+        try:
+            call = pickle.dumps((f, args, kwargs), 2)
+        except:
+            return fail()
+        task = _Task(call, None, timeout)
+        task.deferred = Deferred(lambda d: self._cancel(task))
+        self._queue.append(task)
+        self._adjust()
+        return task.deferred
+
+
+    def _cancel(self, task):
+        """
+        Take a cancelled call out of the queue, or kill the worker running it.
+        """
+        if task.worker is None:
+            self._queue.remove(task)
+        else:
+            task.killed = Failure(error.ConnectionAborted())
+            task.worker.kill()
+
+
+    def _adjust(self):
+        """
+        Give queued calls to idle workers, and start or end workers to match
+        the work there is to do.
+
+        Starting a worker, or failing a call, can lead back here; rather than
+        recurse, this runs again once it is done.
+        """
+        if self._adjusting:
+            self._readjust = True
+            return
+        self._adjusting = True
+        try:
+            self._readjust = True
+            while self._readjust:
+                self._readjust = False
+                self._adjustOnce()
+        finally:
+            self._adjusting = False
+
+
+    def _adjustOnce(self):
+        if not (self.running or self._stopping):
+            return
+        idle = [worker for worker in self.workers if worker.task is None]
+        idle.sort(key=lambda worker: worker.tasks)
+        while self._queue and idle:
+            self._run(idle.pop(0), self._queue.popleft())
+
+        if not self._stopping:
+            wanted = max(self.minWorkers, len(self.workers) + len(self._queue))
+            for worker in idle:
+                self._idle(worker)
+        elif self._queue:
+            wanted = len(self.workers) + len(self._queue)
+        else:
+            for worker in idle:
+                self._retire(worker)
+            if not (self.workers or self._retiring or self._starting):
+                stopped, self._stopped = self._stopped, []
+                for d in stopped:
+                    d.callback(None)
+            return
+        wanted = min(wanted, self.maxWorkers)
+        for i in range(wanted - len(self.workers) - self._starting):
+            self._spawn()
+
+
+    def _spawn(self):
+        """
+        Start a worker process.
+        """
+        self._starting += 1
+        path = theSystemPath["twisted.internet._processpoolworker"].filePath
+        env = dict(os.environ)
+        env[_PYTHONPATH] = os.pathsep.join(sys.path)
+        endpoint = ProcessEndpoint(
+            self._reactor, self.executable, [self.executable, path.path],
+            env=env)
+        d = connectProtocol(endpoint, _WorkerProtocol(self))
+        d.addCallbacks(self._started, self._failedToStart)
+
+
+    def _started(self, worker):
+        """
+        Add a worker which has started to the pool, and give it work.
+        """
+        self._starting -= 1
+        self.workers.append(worker)
+        self._adjust()
+
+
+    def _failedToStart(self, reason):
+        """
+        Log a worker which could not be started, and fail the queued calls if
+        there is no worker to run them.
+
+        No other worker is started in its place until there is more work, so
+        that a worker which cannot be started is not tried again and again.
+        """
+        self._starting -= 1
+        log.err(reason, "Could not start a process pool worker")
+        if not self.workers and not self._starting:
+            queue, self._queue = self._queue, deque()
+            for task in queue:
+                task.deferred.errback(reason)
+
+
+    def _run(self, worker, task):
+        """
+        Give a call to an idle worker.
+        """
+        if worker.idleTimer is not None:
+            worker.idleTimer.cancel()
+            worker.idleTimer = None
+        worker.task = task
+        worker.tasks += 1
+        task.worker = worker
+        if task.timeout is not None:
+            task.timer = self._reactor.callLater(
+                task.timeout, self._timedOut, task)
+        d = worker.callRemote(_Call, call=task.call)
+        d.addBoth(self._finished, worker, task)
+
+
+    def _timedOut(self, task):
+        """
+        Kill the worker running a call which has run for too long.
+        """
+        task.timer = None
+        task.killed = Failure(WorkerTimeout(
+                "Call did not finish within %s seconds" % (task.timeout,)))
+        task.worker.kill()
+
+
+    def _finished(self, result, worker, task):
+        """
+        Deliver the outcome of a call, and find the worker more work, or
+        replace it.
+        """
+        if task.timer is not None:
+            task.timer.cancel()
+            task.timer = None
+        worker.task = None
+        # Retire the worker before delivering the outcome, since a callback
+        # may make another call, which must not be given to this worker.
+        if (not worker.ended and self.maxTasksPerWorker is not None and
+            worker.tasks >= self.maxTasksPerWorker):
+            self._retire(worker)
+
+        if task.deferred.called:
+            # It was cancelled.
+            pass
+        elif task.killed is not None:
+            task.deferred.errback(task.killed)
+        elif isinstance(result, Failure):
+            task.deferred.errback(result)
+        else:
+            value = pickle.loads(result["value"])
+            if result["failed"]:
+                task.deferred.errback(Failure(value))
+            else:
+                task.deferred.callback(value)
+
+        if not worker.ended:
+            self._adjust()
+
+
+    def _idle(self, worker):
+        """
+        Arrange for an idle worker beyond C{minWorkers} to be ended if it is
+        left idle for C{idleTimeout} seconds.
+        """
+        if self.idleTimeout is not None and worker.idleTimer is None:
+            worker.idleTimer = self._reactor.callLater(
+                self.idleTimeout, self._idleTimedOut, worker)
+
+
+    def _idleTimedOut(self, worker):
+        worker.idleTimer = None
+        if worker.task is None and len(self.workers) > self.minWorkers:
+            self._retire(worker)
+
+
+    def _retire(self, worker):
+        """
+        Take a worker out of the pool, and end it by closing its input.
+        """
+        if worker.idleTimer is not None:
+            worker.idleTimer.cancel()
+            worker.idleTimer = None
+        if worker in self.workers:
+            self.workers.remove(worker)
+            self._retiring.append(worker)
+            worker.transport.loseConnection()
+
+
+    def _workerEnded(self, worker):
+        """
+        Forget a worker which has exited, and start another if it is needed.
+        """
+        if worker.idleTimer is not None:
+            worker.idleTimer.cancel()
+            worker.idleTimer = None
+        if worker in self.workers:
+            self.workers.remove(worker)
+        elif worker in self._retiring:
+            self._retiring.remove(worker)
+        self._adjust()
+
+
+    def __repr__(self):
+        return "<%s workers=%d/%d queued=%d>" % (
+            qual(self.__class__), len(self.workers), self.maxWorkers,
+            len(self._queue))
+
+
+
+def _cpuCount():
+    """
+    Return the number of CPUs, or 1 if it cannot be found.
+    """
+    try:
+        import multiprocessing
+        return multiprocessing.cpu_count()
+    except (ImportError, NotImplementedError):
+        return 1
+
+
+
+def _main(stdin=0, stdout=1):
+    """
+    Run a worker: read L{_Call}s from standard input, and write the responses
+    to what was standard output.
+
+    Standard output is redirected to standard error first, so that anything
+    the functions print is logged by the pool rather than mixed into the
+    responses.
+    """
+    output = os.fdopen(os.dup(stdout), "wb")
+    os.dup2(2, stdout)
+    protocol = amp.AMP(locator=_WorkerLocator())
+    protocol.makeConnection(FileWrapper(output))
+    while True:
+        try:
+            data = os.read(stdin, 2 ** 16)
+        except OSError as e:
+            if e.errno == errno.EINTR:
+                continue
+            raise
+        if not data:
+            break
+        protocol.dataReceived(data)
+        output.flush()
@@ -0,0 +1,297 @@
+# -*- test-case-name: twisted.internet.test.test_reactorgroup -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Groups of reactors, each running in its own thread, which share the
+connections accepted by a listening port.
+
+A L{ReactorGroup} belongs to a reactor running in the main thread, which
+listens for connections and hands each accepted connection to one of the
+members of the group, using
+L{IReactorSocket.adoptStreamConnection<twisted.internet.interfaces.IReactorSocket.adoptStreamConnection>}.
+The connection's protocol is then built by, and runs in, that member::
+
+    from twisted.internet import reactor
+    from twisted.internet.reactorgroup import ReactorGroup
+
+    group = ReactorGroup(4)
+    group.start()
+    group.listenTCP(8080, factory)
+    reactor.run()
+
+Code running in one reactor must not use another reactor directly, except to
+call C{callFromThread}; use L{ReactorGroup.callInReactor} to run code in a
+member and get its result.  A factory given to L{ReactorGroup.listenTCP}
+builds protocols in every member, so its C{buildProtocol} must be safe to call
+from several threads at once.
+"""
+
+from __future__ import division, absolute_import
+
+import threading
+
+from twisted.python import log
+from twisted.internet import defer, tcp
+from twisted.protocols.policies import WrappingFactory
+
+
+
+class _MemberFactory(WrappingFactory):
+    """
+    Wraps the factory of a port for one member of a L{ReactorGroup}, and
+    counts the connections it has open in that member.
+
+    @ivar _group: The L{ReactorGroup}.
+
+    @ivar _index: The index of the member in L{ReactorGroup.members}.
+    """
+
+    def __init__(self, wrappedFactory, group, index):
+        WrappingFactory.__init__(self, wrappedFactory)
+        self._group = group
+        self._index = index
+
+
+    def registerProtocol(self, p):
+        WrappingFactory.registerProtocol(self, p)
+        self._group._connections[self._index] += 1
+
+
+    def unregisterProtocol(self, p):
+        WrappingFactory.unregisterProtocol(self, p)
+        self._group._connections[self._index] -= 1
+
+
+
+class _GroupPort(tcp.Port):
+    """
+    A TCP port which hands the connections it accepts to the members of a
+    L{ReactorGroup}, instead of connecting them in its own reactor.
+
+    @ivar group: The L{ReactorGroup}.
+
+    @ivar _factories: A C{list} with the factory to build protocols with in
+        each member of C{group}.
+    """
+
+    def __init__(self, port, factory, backlog, interface, reactor, group):
+        tcp.Port.__init__(self, port, factory, backlog, interface, reactor)
+        self.group = group
+        if group.leastConnections:
+            self._factories = [
+                _MemberFactory(factory, group, i)
+                for i in range(len(group.members))]
+        else:
+            self._factories = [factory] * len(group.members)
+
+
+    def _connectionAccepted(self, skt, addr):
+        """
+        Hand a newly accepted connection to the member of C{group} chosen by
+        L{ReactorGroup.chooseMember}.
+        """
+        index = self.group.chooseMember()
+        skt.setblocking(False)
+        member = self.group.members[index]
+        member.callFromThread(
+            self._adopt, member, skt, self._factories[index])
+
+
+    def _adopt(self, member, skt, factory):
+        """
+        Connect a connection handed to C{member}.  This runs in the thread of
+        C{member}.
+        """
+        try:
+            member.adoptStreamConnection(
+                skt.fileno(), self.addressFamily, factory)
+        except:
+            log.err(None, "Could not adopt connection in %r" % (member,))
+        finally:
+            skt.close()
+
+
+
+class ReactorGroup(object):
+    """
+    A group of reactors, each running in its own thread.
+
+    @ivar members: A C{list} of the reactors in the group.
+
+    @ivar leastConnections: If C{True}, connections accepted by the ports
+        created by L{listenTCP} are handed to the member with the fewest
+        connections from such ports, which are counted by wrapping their
+        protocols.  Otherwise they are handed to each member in turn.
+    @type leastConnections: C{bool}
+
+    @ivar _reactor: The reactor the group belongs to.
+
+    @ivar _threads: A C{list} of the threads the members run in, once
+        started.
+
+    @ivar _stopped: A C{list} of L{defer.Deferred}s, fired in C{_reactor} when
+        the corresponding member stops running.
+
+    @ivar _connections: A C{list} with the number of connections from the
+        ports created by L{listenTCP} open in each member, if
+        C{leastConnections} is set.  Each count is only changed by the thread
+        of its member.
+
+    @ivar _next: The index of the member to hand the next connection to, if
+        C{leastConnections} is not set.
+
+    @ivar _shutdownTrigger: The ID of the system event trigger which stops the
+        members before C{_reactor} shuts down, or C{None}.
+    """
+
+    def __init__(self, size, reactorFactory=None, reactor=None,
+                 leastConnections=False):
+        """
+        @param size: The number of reactors in the group.
+        @type size: C{int}
+
+        @param reactorFactory: A callable returning a new reactor, which must
+            provide L{IReactorSocket<twisted.internet.interfaces.IReactorSocket>}.
+            If C{None}, L{EPollReactor<twisted.internet.epollreactor.EPollReactor>}
+            is used.
+
+        @param reactor: The reactor the group belongs to.  If C{None}, the
+            global reactor is used.
+
+        @param leastConnections: See C{leastConnections}.
+        """
+        if size < 1:
+            raise ValueError("A reactor group needs at least one member")
+        if reactorFactory is None:
+            from twisted.internet.epollreactor import EPollReactor
+            reactorFactory = EPollReactor
+        if reactor is None:
+            from twisted.internet import reactor
+        self._reactor = reactor
+        self.members = [reactorFactory() for i in range(size)]
+        self.leastConnections = leastConnections
+        self._threads = []
+        self._stopped = []
+        self._connections = [0] * size
+        self._next = 0
+        self._shutdownTrigger = None
+
+
+    def start(self):
+        """
+        Start running each member in a new thread.  The members are stopped
+        before the reactor the group belongs to shuts down.
+        """
+        if self._threads:
+            raise RuntimeError("%r was already started" % (self,))
+        for i, member in enumerate(self.members):
+            # The members' threads are not "the" I/O thread, which is the one
+            # the group's own reactor runs in.
+            member._registerAsIOThread = False
+            stopped = defer.Deferred()
+            thread = threading.Thread(
+                target=self._run, args=(member, stopped),
+                name="ReactorGroup-%d" % (i,))
+            thread.daemon = True
+            self._threads.append(thread)
+            self._stopped.append(stopped)
+            thread.start()
+        self._shutdownTrigger = self._reactor.addSystemEventTrigger(
+            "before", "shutdown", self.stop)
+
+
+    def _run(self, member, stopped):
+        """
+        Run C{member} in the calling thread, and fire C{stopped} in the
+        reactor the group belongs to once it stops.
+        """
+        try:
+            member.run(installSignalHandlers=False)
+        finally:
+            self._reactor.callFromThread(stopped.callback, None)
+
+
+    def stop(self):
+        """
+        Stop every member.
+
+        @return: A L{defer.Deferred} which fires when every member has
+            stopped.
+        """
+        if self._shutdownTrigger is not None:
+            self._reactor.removeSystemEventTrigger(self._shutdownTrigger)
+            self._shutdownTrigger = None
+        for member in self.members:
+            member.callFromThread(self._stopMember, member)
+        return defer.gatherResults(self._stopped)
+
+
+    def _stopMember(self, member):
+        """
+        Stop C{member} if it is still running.  This runs in the thread of
+        C{member}.
+        """
+        if member.running:
+            member.stop()
+
+
+    def chooseMember(self):
+        """
+        Choose the member of the group to hand a new connection to.
+
+        @return: The index of the chosen member in C{members}.
+        @rtype: C{int}
+        """
+        if self.leastConnections:
+            connections = self._connections
+            return connections.index(min(connections))
+        index = self._next
+        self._next = (index + 1) % len(self.members)
+        return index
+
+
+    def listenTCP(self, port, factory, backlog=50, interface=''):
+        """
+        Listen for TCP connections in the reactor the group belongs to, and
+        hand each accepted connection to a member of the group.
+
+        Arguments are the same as to
+        L{IReactorTCP.listenTCP<twisted.internet.interfaces.IReactorTCP.listenTCP>}.
+
+        @return: An L{IListeningPort<twisted.internet.interfaces.IListeningPort>}
+            provider.
+        """
+        p = _GroupPort(port, factory, backlog, interface, self._reactor, self)
+        p.startListening()
+        return p
+
+
+    def callInReactor(self, target, f, *args, **kwargs):
+        """
+        Run a function in one of the reactors in the group, from the thread
+        of the reactor the group belongs to.
+
+        @param target: The member of the group to run C{f} in.
+
+        @param f: The callable to run in the thread of C{target}.
+        @param args: The arguments to pass to C{f}.
+        @param kwargs: The keyword arguments to pass to C{f}.
+
+        @return: A L{defer.Deferred} which fires, in the reactor the group
+            belongs to, with the result of C{f} or, if C{f} returns a
+            L{defer.Deferred}, its result.
+        """
+        result = defer.Deferred()
+        callFromThread = self._reactor.callFromThread
+        def call():
+            d = defer.maybeDeferred(f, *args, **kwargs)
+            d.addCallbacks(
+                lambda value: callFromThread(result.callback, value),
+                lambda reason: callFromThread(result.errback, reason))
+        target.callFromThread(call)
+        return result
+
+
+
+__all__ = ["ReactorGroup"]
@@ -366,19 +366,47 @@ class CooperativeTask(object):
         C{StopIteration}.
 
     @type _completionState: L{TaskFinished}
+
+    @ivar priority: The number of units of work this task may do each time
+        the L{Cooperator} goes around all of its tasks.  It may be changed
+        while the task is running.
+    @type priority: C{int}
+
+    @ivar budget: The most time, in seconds, this task may spend working in
+        each step of the L{Cooperator}, or C{None} if it may keep working
+        until the step ends.
+    @type budget: C{float} or C{NoneType}
+
+    @ivar iterations: The number of units of work this task has done.
+    @type iterations: C{int}
+
+    @ivar elapsed: The time, in seconds, this task has spent working.
+    @type elapsed: C{float}
+
+    @ivar _spent: The time, in seconds, this task has spent working in the
+        current step of the L{Cooperator}.
+    @type _spent: C{float}
     """
 
-    def __init__(self, iterator, cooperator):
+    def __init__(self, iterator, cooperator, priority=1, budget=None):
         """
         A private constructor: to create a new L{CooperativeTask}, see
         L{Cooperator.cooperate}.
         """
+        if priority < 1:
+            raise ValueError("priority must be at least 1, not %r" % (
+                    priority,))
         self._iterator = iterator
         self._cooperator = cooperator
         self._deferreds = []
         self._pauseCount = 0
         self._completionState = None
         self._completionResult = None
+        self.priority = priority
+        self.budget = budget
+        self.iterations = 0
+        self.elapsed = 0.0
+        self._spent = 0.0
         cooperator._addTask(self)
 
 
@@ -480,6 +508,7 @@ class CooperativeTask(object):
         iterator, stopping if there are no further items in the iterator, and
         pausing if the result was a L{defer.Deferred}.
         """
+        self.iterations += 1
         try:
             result = next(self._iterator)
         except StopIteration:
@@ -507,7 +536,13 @@ class Cooperator(object):
     L{defer.Deferred} fires and completes its callback chain.
 
     When a L{Cooperator} has more than one task, it distributes work between
-    all tasks.
+    all tasks.  It goes around them in turn, letting each one do as many units
+    of work as its L{priority<CooperativeTask.priority>}, so a task with a
+    higher priority gets more of the work done but every task gets some of
+    it.  A task with a L{budget<CooperativeTask.budget>} is left out for the
+    rest of a step once it has worked for that long, and when every task has
+    used up its budget the step ends early, so that long-running bulk work
+    leaves the reactor time for other events.
 
     There are two ways to add tasks to a L{Cooperator}, L{cooperate} and
     L{coiterate}.  L{cooperate} is the more useful of the two, as it returns a
@@ -527,8 +562,13 @@ class Cooperator(object):
 
     Multiple L{Cooperator}s do not cooperate with each other, so for most
     cases you should use the L{global cooperator<task.cooperate>}.
+
+    @ivar _seconds: A no-argument callable returning the current time in
+        seconds, used to measure how long each unit of work takes.
     """
 
+    _seconds = staticmethod(time.time)
+
     def __init__(self,
                  terminationPredicateFactory=_Timer,
                  scheduler=_defaultScheduler,
@@ -559,7 +599,7 @@ class Cooperator(object):
         self._started = started
 
 
-    def coiterate(self, iterator, doneDeferred=None):
+    def coiterate(self, iterator, doneDeferred=None, priority=1, budget=None):
         """
         Add an iterator to the list of iterators this L{Cooperator} is
         currently running.
@@ -571,24 +611,39 @@ class Cooperator(object):
             the completion deferred.  It is suggested that you use the default,
             which creates a new Deferred for you.
 
+        @param priority: See L{cooperate}.
+
+        @param budget: See L{cooperate}.
+
         @return: a Deferred that will fire when the iterator finishes.
         """
         if doneDeferred is None:
             doneDeferred = defer.Deferred()
-        CooperativeTask(iterator, self).whenDone().chainDeferred(doneDeferred)
+        CooperativeTask(iterator, self, priority, budget).whenDone(
+            ).chainDeferred(doneDeferred)
         return doneDeferred
 
 
-    def cooperate(self, iterator):
+    def cooperate(self, iterator, priority=1, budget=None):
         """
         Start running the given iterator as a long-running cooperative task, by
         calling next() on it as a periodic timed event.
 
         @param iterator: the iterator to invoke.
 
+        @param priority: The number of units of work the task may do each time
+            this L{Cooperator} goes around its tasks.
+        @type priority: C{int}
+
+        @param budget: The most time, in seconds, the task may spend working in
+            each step, or C{None} for no limit.
+        @type budget: C{float} or C{NoneType}
+
+        @raise ValueError: If C{priority} is less than 1.
+
         @return: a L{CooperativeTask} object representing this task.
         """
-        return CooperativeTask(iterator, self)
+        return CooperativeTask(iterator, self, priority, budget)
 
 
     def _addTask(self, task):
@@ -600,6 +655,7 @@ class Cooperator(object):
                                      # does the inverse
             task._completeWith(SchedulerStopped(), Failure(SchedulerStopped()))
         else:
+            task._spent = 0.0
             self._tasks.append(task)
             self._reschedule()
 
@@ -619,13 +675,32 @@ class Cooperator(object):
         """
         Yield all L{CooperativeTask} objects in a loop as long as this
         L{Cooperator}'s termination condition has not been met.
+
+        Each task is yielded as many times in a row as its priority, unless it
+        stops being runnable or uses up its budget first.  Tasks which have
+        used up their budget are left out, and once every task has, the loop
+        ends.
         """
         terminator = self._terminationPredicateFactory()
+        skipped = 0
         while self._tasks:
             for t in self._metarator:
-                yield t
-                if terminator():
-                    return
+                if t.budget is not None and t._spent >= t.budget:
+                    skipped += 1
+                    if skipped >= len(self._tasks):
+                        return
+                    continue
+                skipped = 0
+                units = t.priority
+                while True:
+                    yield t
+                    if terminator():
+                        return
+                    units -= 1
+                    if (units < 1 or t._pauseCount or
+                            t._completionState is not None or
+                            (t.budget is not None and t._spent >= t.budget)):
+                        break
             self._metarator = iter(self._tasks)
 
 
@@ -634,8 +709,15 @@ class Cooperator(object):
         Run one scheduler tick.
         """
         self._delayedCall = None
+        for taskObj in self._tasks:
+            taskObj._spent = 0.0
+        seconds = self._seconds
         for taskObj in self._tasksWhileNotStopped():
+            started = seconds()
             taskObj._oneWorkUnit()
+            spent = seconds() - started
+            taskObj._spent += spent
+            taskObj.elapsed += spent
         self._reschedule()
 
 
@@ -688,7 +770,7 @@ class Cooperator(object):
 
 _theCooperator = Cooperator()
 
-def coiterate(iterator):
+def coiterate(iterator, priority=1, budget=None):
     """
     Cooperatively iterate over the given iterator, dividing runtime between it
     and all other iterators which have been passed to this function and not yet
@@ -696,13 +778,17 @@ def coiterate(iterator):
 
     @param iterator: the iterator to invoke.
 
+    @param priority: See L{Cooperator.cooperate}.
+
+    @param budget: See L{Cooperator.cooperate}.
+
     @return: a Deferred that will fire when the iterator finishes.
     """
-    return _theCooperator.coiterate(iterator)
+    return _theCooperator.coiterate(iterator, priority=priority, budget=budget)
 
 
 
-def cooperate(iterator):
+def cooperate(iterator, priority=1, budget=None):
     """
     Start running the given iterator as a long-running cooperative task, by
     calling next() on it as a periodic timed event.
@@ -715,9 +801,13 @@ def cooperate(iterator):
 
     @param iterator: the iterator to invoke.
 
+    @param priority: See L{Cooperator.cooperate}.
+
+    @param budget: See L{Cooperator.cooperate}.
+
     @return: a L{CooperativeTask} object representing this task.
     """
-    return _theCooperator.cooperate(iterator)
+    return _theCooperator.cooperate(iterator, priority, budget)
 
 
 
@@ -20,7 +20,7 @@ import struct
 from zope.interface import implementer
 
 from twisted.python.compat import _PY3, lazyByteSlice
-from twisted.python.runtime import platformType
+from twisted.python.runtime import platformType, seconds as _seconds
 from twisted.python import versions, deprecate
 
 try:
@@ -91,7 +91,7 @@ else:
     from os import strerror
 
 
-from errno import errorcode
+from errno import errorcode, ENOPROTOOPT
 
 # Twisted Imports
 from twisted.internet import base, address, fdesc
@@ -99,11 +99,37 @@ from twisted.internet.task import deferLater
 from twisted.python import log, failure, _reflectpy3 as reflect
 from twisted.python.util import untilConcludes
 from twisted.internet.error import CannotListenError
+
+try:
+    from twisted.python._sendfile import sendfile as _sendfile
+except ImportError:
+    _sendfile = None
+try:
+    from twisted.python._writev import writev as _writev
+except ImportError:
+    _writev = None
 from twisted.internet import abstract, main, interfaces, error
 
 # Not all platforms have, or support, this flag.
 _AI_NUMERICSERV = getattr(socket, "AI_NUMERICSERV", 0)
 
+# Nor this one, which older versions of Python do not define even where the
+# platform supports it.
+_SO_REUSEPORT = getattr(socket, "SO_REUSEPORT", None)
+if _SO_REUSEPORT is None and sys.platform.startswith("linux"):
+    _SO_REUSEPORT = 15
+
+# How to write several buffers to a socket at once: with its sendmsg method
+# where there is one, and with writev, through ctypes, on Python 2.
+if getattr(socket.socket, "sendmsg", None) is not None:
+    def _sendVectors(skt, vectors):
+        return skt.sendmsg(vectors)
+elif _writev is not None:
+    def _sendVectors(skt, vectors):
+        return _writev(skt.fileno(), vectors)
+else:
+    _sendVectors = None
+
 
 # The type for service names passed to socket.getservbyname:
 if _PY3:
@@ -169,7 +195,8 @@ class _AbortingMixin(object):
 
 
 
-@implementer(interfaces.ITCPTransport, interfaces.ISystemHandle)
+@implementer(interfaces.ITCPTransport, interfaces.ISystemHandle,
+             interfaces.IFileTransport)
 class Connection(_TLSConnectionMixin, abstract.FileDescriptor, _SocketCloser,
                  _AbortingMixin):
     """
@@ -180,8 +207,18 @@ class Connection(_TLSConnectionMixin, abstract.FileDescriptor, _SocketCloser,
 
     @ivar logstr: prefix used when logging events related to this connection.
     @type logstr: C{str}
+
+    @ivar _readIntoProtocol: The protocol for which C{_readInto} was last
+        determined.
+
+    @ivar _readInto: Whether data can be read directly into the buffer of
+        C{_readIntoProtocol}, using L{IBufferedProtocol}.
+    @type _readInto: C{bool}
     """
 
+    _readIntoProtocol = None
+    _readInto = False
+    _edgeTriggerable = True
 
     def __init__(self, skt, protocol, reactor=None):
         abstract.FileDescriptor.__init__(self, reactor=reactor)
@@ -203,11 +240,21 @@ class Connection(_TLSConnectionMixin, abstract.FileDescriptor, _SocketCloser,
         calls self.dataReceived(data) to process it.  If the connection is not
         lost through an error in the physical recv(), this function will return
         the result of the dataReceived call.
+
+        If the protocol provides L{interfaces.IBufferedProtocol}, the data is
+        read directly into the protocol's buffer instead.
         """
+        if self.protocol is not self._readIntoProtocol:
+            self._readIntoProtocol = self.protocol
+            self._readInto = self._canReadInto(self.protocol)
+        if self._readInto:
+            return self._doReadInto()
+
         try:
             data = self.socket.recv(self.bufferSize)
         except socket.error as se:
             if se.args[0] == EWOULDBLOCK:
+                self._readBlocked = True
                 return
             else:
                 return main.CONNECTION_LOST
@@ -215,6 +262,37 @@ class Connection(_TLSConnectionMixin, abstract.FileDescriptor, _SocketCloser,
         return self._dataReceived(data)
 
 
+    def _canReadInto(self, protocol):
+        """
+        Determine whether data can be read directly into the buffer of a
+        protocol.
+
+        @return: C{True} if C{protocol} provides
+            L{interfaces.IBufferedProtocol}, C{False} otherwise.
+        """
+        return interfaces.IBufferedProtocol.providedBy(protocol)
+
+
+    def _doReadInto(self):
+        """
+        Read up to C{self.bufferSize} bytes from the socket into the buffer
+        given by the protocol's L{interfaces.IBufferedProtocol.getBuffer}, and
+        tell it how much was read.
+        """
+        protocol = self.protocol
+        try:
+            count = self.socket.recv_into(protocol.getBuffer(self.bufferSize))
+        except socket.error as se:
+            if se.args[0] == EWOULDBLOCK:
+                self._readBlocked = True
+                return
+            else:
+                return main.CONNECTION_LOST
+        if not count:
+            return main.CONNECTION_DONE
+        protocol.bufferUpdated(count)
+
+
     def _dataReceived(self, data):
         if not data:
             return main.CONNECTION_DONE
@@ -247,11 +325,64 @@ class Connection(_TLSConnectionMixin, abstract.FileDescriptor, _SocketCloser,
             return untilConcludes(self.socket.send, limitedData)
         except socket.error as se:
             if se.args[0] in (EWOULDBLOCK, ENOBUFS):
+                self._writeBlocked = True
                 return 0
             else:
                 return main.CONNECTION_LOST
 
 
+    if _sendVectors is not None:
+        def _writeSomeVectors(self, vectors):
+            """
+            Write as much as possible of the given buffers to this TCP
+            connection, with a single C{sendmsg} or C{writev} system call.
+
+            @param vectors: A C{list} of bytes-like objects.
+
+            @return: The number of bytes successfully written, or an exception
+                if the connection was lost.
+            """
+            try:
+                return untilConcludes(_sendVectors, self.socket, vectors)
+            except socket.error as se:
+                if se.args[0] in (EWOULDBLOCK, ENOBUFS):
+                    self._writeBlocked = True
+                    return 0
+                else:
+                    return main.CONNECTION_LOST
+
+
+    if _sendfile is not None:
+        def _writeSomeFile(self, fileno, offset, count):
+            """
+            Write as much as possible of part of a file to this TCP
+            connection, with the C{sendfile} system call.
+
+            @return: The number of bytes written, C{None} if the socket's send
+                buffer is full, or an exception if the connection was lost.
+            """
+            try:
+                return untilConcludes(
+                    _sendfile, self.socket.fileno(), fileno, offset, count)
+            except (OSError, IOError, socket.error) as e:
+                if e.args[0] in (EWOULDBLOCK, EAGAIN, ENOBUFS):
+                    self._writeBlocked = True
+                    return None
+                else:
+                    return main.CONNECTION_LOST
+
+
+    def canWriteFile(self):
+        """
+        Determine whether L{writeFile} can be used: the platform must support
+        it and TLS must not have been started.
+
+        @see: L{interfaces.IFileTransport.canWriteFile}
+        """
+        return (not self.TLS and
+                abstract.FileDescriptor.canWriteFile(self))
+
+
     def _closeWriteConnection(self):
         try:
             getattr(self.socket, self._socketShutdownMethod)(1)
@@ -576,6 +707,8 @@ class BaseClient(_BaseBaseClient, _TLSClientMixin, Connection):
             # http://msdn.microsoft.com/library/default.asp?url=/library/en-us/winsock/winsock/connect_2.asp
             elif ((connectResult in (EWOULDBLOCK, EINPROGRESS, EALREADY)) or
                   (connectResult == EINVAL and platformType == "win32")):
+                # Not ready until the connection attempt completes.
+                self._readBlocked = self._writeBlocked = True
                 self.startReading()
                 self.startWriting()
                 return
@@ -884,10 +1017,58 @@ class Port(base.BasePort, _SocketCloser):
         when the TLS implementation re-uses this class it overrides the value
         with C{"TLS"}.  Only used for logging.
 
+    @ivar reusePort: Whether to set C{SO_REUSEPORT} on the listening socket,
+        so that other sockets (in this or other processes) may listen on the
+        same port at the same time, with the kernel distributing the incoming
+        connections among them.
+    @type reusePort: C{bool}
+
     @ivar _preexistingSocket: If not C{None}, a L{socket.socket} instance which
         was created and initialized outside of the reactor and will be used to
         listen for connections (instead of a new socket being created by this
         L{Port}).
+
+    @ivar numberAccepts: The largest number of connections accepted each time
+        the listening socket is readable.
+    @type numberAccepts: C{int}
+
+    @ivar acceptBudget: The number of seconds after which no more
+        connections are accepted each time the listening socket is readable,
+        so that a storm of new connections does not keep the reactor from
+        handling the established ones.
+    @type acceptBudget: C{float}
+
+    @ivar minimumBackoff: The number of seconds to stop accepting connections
+        for when C{accept(2)} fails for lack of resources, such as file
+        descriptors.  It is doubled each time it fails again before a
+        connection is accepted, up to C{maximumBackoff}.
+    @type minimumBackoff: C{float}
+
+    @ivar maximumBackoff: The largest number of seconds to stop accepting
+        connections for.
+    @type maximumBackoff: C{float}
+
+    @ivar accepted: The number of connections accepted.
+    @type accepted: C{int}
+
+    @ivar acceptFailures: The number of times C{accept(2)} failed for lack of
+        resources.
+    @type acceptFailures: C{int}
+
+    @ivar backoffs: The number of times this port stopped accepting
+        connections for a while because C{accept(2)} failed for lack of
+        resources.
+    @type backoffs: C{int}
+
+    @ivar backoffTime: The total number of seconds this port stopped
+        accepting connections for.
+    @type backoffTime: C{float}
+
+    @ivar _backoff: The number of seconds this port last stopped accepting
+        connections for, or C{None} if it has accepted one since.
+
+    @ivar _backoffCall: The L{IDelayedCall} which will start accepting
+        connections again, or C{None}.
     """
 
     socketType = socket.SOCK_STREAM
@@ -896,8 +1077,21 @@ class Port(base.BasePort, _SocketCloser):
     sessionno = 0
     interface = ''
     backlog = 50
+    reusePort = False
 
     _type = 'TCP'
+    _edgeTriggerable = True
+
+    numberAccepts = 1000
+    acceptBudget = 0.005
+    minimumBackoff = 0.01
+    maximumBackoff = 1.0
+    accepted = 0
+    acceptFailures = 0
+    backoffs = 0
+    backoffTime = 0.0
+    _backoff = None
+    _backoffCall = None
 
     # Actual port number being listened on, only set to a non-None
     # value when we are actually listening.
@@ -910,13 +1104,15 @@ class Port(base.BasePort, _SocketCloser):
     addressFamily = socket.AF_INET
     _addressType = address.IPv4Address
 
-    def __init__(self, port, factory, backlog=50, interface='', reactor=None):
+    def __init__(self, port, factory, backlog=50, interface='', reactor=None,
+                 reusePort=False):
         """Initialize with a numeric port to listen on.
         """
         base.BasePort.__init__(self, reactor=reactor)
         self.port = port
         self.factory = factory
         self.backlog = backlog
+        self.reusePort = reusePort
         if abstract.isIPv6Address(interface):
             self.addressFamily = socket.AF_INET6
             self._addressType = address.IPv6Address
@@ -958,6 +1154,13 @@ class Port(base.BasePort, _SocketCloser):
         s = base.BasePort.createInternetSocket(self)
         if platformType == "posix" and sys.platform != "cygwin":
             s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reusePort:
+            if _SO_REUSEPORT is None:
+                s.close()
+                raise socket.error(
+                    ENOPROTOOPT, "SO_REUSEPORT is not supported on this "
+                    "platform")
+            s.setsockopt(socket.SOL_SOCKET, _SO_REUSEPORT, 1)
         return s
 
 
@@ -999,7 +1202,6 @@ class Port(base.BasePort, _SocketCloser):
         self.connected = True
         self.socket = skt
         self.fileno = self.socket.fileno
-        self.numberAccepts = 100
 
         self.startReading()
 
@@ -1012,8 +1214,9 @@ class Port(base.BasePort, _SocketCloser):
     def doRead(self):
         """Called when my socket is ready for reading.
 
-        This accepts a connection and calls self.protocol() to handle the
-        wire-level protocol.
+        This accepts connections until there are none left to accept, or it
+        has accepted C{numberAccepts} of them or used up C{acceptBudget}, and
+        calls self.protocol() to handle the wire-level protocol of each.
         """
         try:
             if platformType == "posix":
@@ -1022,16 +1225,21 @@ class Port(base.BasePort, _SocketCloser):
                 # win32 event loop breaks if we do more than one accept()
                 # in an iteration of the event loop.
                 numAccepts = 1
-            for i in range(numAccepts):
+            deadline = _seconds() + self.acceptBudget
+            attempts = 0
+            while attempts < numAccepts:
                 # we need this so we can deal with a factory's buildProtocol
                 # calling our loseConnection
                 if self.disconnecting:
                     return
+                if attempts and _seconds() > deadline:
+                    break
+                attempts += 1
                 try:
                     skt, addr = self.socket.accept()
                 except socket.error as e:
                     if e.args[0] in (EWOULDBLOCK, EAGAIN):
-                        self.numberAccepts = i
+                        self._readBlocked = True
                         break
                     elif e.args[0] == EPERM:
                         # Netfilter on Linux may have rejected the
@@ -1056,20 +1264,19 @@ class Port(base.BasePort, _SocketCloser):
 
                         log.msg("Could not accept new connection (%s)" % (
                             errorcode[e.args[0]],))
+                        if e.args[0] != ECONNABORTED:
+                            # The listening socket stays readable, so stop
+                            # trying for a while rather than failing again
+                            # on every iteration.
+                            self.acceptFailures += 1
+                            self._backOff()
                         break
                     raise
 
+                self.accepted += 1
+                self._backoff = None
                 fdesc._setCloseOnExec(skt.fileno())
-                protocol = self.factory.buildProtocol(self._buildAddr(addr))
-                if protocol is None:
-                    skt.close()
-                    continue
-                s = self.sessionno
-                self.sessionno = s+1
-                transport = self.transport(skt, protocol, addr, self, s, self.reactor)
-                protocol.makeConnection(transport)
-            else:
-                self.numberAccepts = self.numberAccepts+20
+                self._connectionAccepted(skt, addr)
         except:
             # Note that in TLS mode, this will possibly catch SSL.Errors
             # raised by self.socket.accept()
@@ -1080,6 +1287,55 @@ class Port(base.BasePort, _SocketCloser):
             # and return, so handling it here works just as well.
             log.deferr()
 
+
+    def _backOff(self):
+        """
+        Stop accepting connections for C{minimumBackoff} seconds, or twice as
+        long as the last time if no connection has been accepted since.
+        """
+        if self._backoff is None:
+            delay = self.minimumBackoff
+        else:
+            delay = min(self._backoff * 2, self.maximumBackoff)
+        self._backoff = delay
+        self.backoffs += 1
+        self.backoffTime += delay
+        self.stopReading()
+        self._backoffCall = self.reactor.callLater(delay, self._resume)
+
+
+    def _resume(self):
+        """
+        Start accepting connections again after backing off.
+        """
+        self._backoffCall = None
+        if self.connected and not self.disconnecting:
+            self.startReading()
+
+
+    def _connectionAccepted(self, skt, addr):
+        """
+        Build a protocol and a transport for a newly accepted connection, and
+        connect them.
+
+        Subclasses may override this to handle accepted connections some
+        other way.
+
+        @param skt: The accepted L{socket.socket}.
+
+        @param addr: The address of the peer, as returned by
+            L{socket.socket.accept}.
+        """
+        protocol = self.factory.buildProtocol(self._buildAddr(addr))
+        if protocol is None:
+            skt.close()
+            return
+        s = self.sessionno
+        self.sessionno = s+1
+        transport = self.transport(skt, protocol, addr, self, s, self.reactor)
+        protocol.makeConnection(transport)
+
+
     def loseConnection(self, connDone=failure.Failure(main.CONNECTION_DONE)):
         """
         Stop accepting connections on this port.
@@ -1090,6 +1346,9 @@ class Port(base.BasePort, _SocketCloser):
         """
         self.disconnecting = True
         self.stopReading()
+        if self._backoffCall is not None:
+            self._backoffCall.cancel()
+            self._backoffCall = None
         if self.connected:
             self.deferred = deferLater(
                 self.reactor, 0, self.connectionLost, connDone)
@@ -13,6 +13,7 @@ import socket
 from gc import collect
 from weakref import ref
 
+from zope.interface import implementer
 from zope.interface.verify import verifyObject
 
 from twisted.python import context, log
@@ -20,7 +21,8 @@ from twisted.python.failure import Failure
 from twisted.python.runtime import platform
 from twisted.python.log import ILogContext, msg, err
 from twisted.internet.defer import Deferred, gatherResults
-from twisted.internet.interfaces import IConnector, IReactorFDSet
+from twisted.internet.interfaces import (
+    IConnector, IReactorFDSet, IBufferedProtocol)
 from twisted.internet.protocol import ClientFactory, Protocol, ServerFactory
 from twisted.trial.unittest import SkipTest
 from twisted.internet.test.reactormixins import needsRunningReactor
@@ -321,6 +323,44 @@ class ConnectionTestsMixin(object):
         self.assertIn("Custom Server", server.system)
 
 
+    def test_bufferedProtocol(self):
+        """
+        A protocol providing L{IBufferedProtocol} receives all of the data
+        written by its peer, read directly into its own buffer by transports
+        which support that.
+        """
+        payload = b"x" * (2 ** 18) + b"y"
+
+        class Sender(ConnectableProtocol):
+            def connectionMade(self):
+                self.transport.write(payload)
+                self.transport.loseConnection()
+
+        @implementer(IBufferedProtocol)
+        class Receiver(ConnectableProtocol):
+            def __init__(self):
+                self.buffer = bytearray(len(payload) + 1)
+                self.received = 0
+                self.bufferUpdates = 0
+
+            def getBuffer(self, sizeHint):
+                return memoryview(self.buffer)[self.received:]
+
+            def bufferUpdated(self, nbytes):
+                self.received += nbytes
+                self.bufferUpdates += 1
+
+            def dataReceived(self, data):
+                self.buffer[self.received:self.received + len(data)] = data
+                self.received += len(data)
+
+        server = Receiver()
+        runProtocolsWithReactor(self, server, Sender(), self.endpoints)
+        self.assertEqual(bytes(server.buffer[:server.received]), payload)
+        if getattr(server.transport, '_canReadInto', None) is not None:
+            self.assertTrue(server.bufferUpdates > 0)
+
+
     def test_writeAfterDisconnect(self):
         """
         After a connection is disconnected, L{ITransport.write} and
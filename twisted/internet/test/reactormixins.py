@@ -76,6 +76,22 @@ def needsRunningReactor(reactor, thunk):
 
 
 
+try:
+    from twisted.internet.epollreactor import EPollReactor
+except ImportError:
+    EdgeTriggeredEPollReactor = None
+else:
+    class EdgeTriggeredEPollReactor(EPollReactor):
+        """
+        An L{EPollReactor} which uses edge-triggered notifications, so that
+        the reactor tests also cover that mode.
+        """
+
+        def __init__(self):
+            EPollReactor.__init__(self, edgeTriggered=True)
+
+
+
 class ReactorBuilder:
     """
     L{SynchronousTestCase} mixin which provides a reactor-creation API.  This
@@ -126,7 +142,9 @@ class ReactorBuilder:
         else:
             _reactors.extend([
                     "twisted.internet.pollreactor.PollReactor",
-                    "twisted.internet.epollreactor.EPollReactor"])
+                    "twisted.internet.epollreactor.EPollReactor",
+                    "twisted.internet.test.reactormixins."
+                    "EdgeTriggeredEPollReactor"])
             if not platform.isLinux():
                 # Presumably Linux is not going to start supporting kqueue, so
                 # skip even trying this configuration.
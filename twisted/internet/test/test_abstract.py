@@ -10,7 +10,10 @@ from __future__ import division, absolute_import
 
 from twisted.trial.unittest import SynchronousTestCase
 
-from twisted.internet.abstract import isIPv6Address
+from twisted.python.failure import Failure
+from twisted.internet.abstract import isIPv6Address, FileDescriptor
+from twisted.internet.error import ConnectionLost
+from twisted.internet.main import CONNECTION_LOST, CONNECTION_DONE
 
 class IPv6AddressTests(SynchronousTestCase):
     """
@@ -56,3 +59,376 @@ class IPv6AddressTests(SynchronousTestCase):
         self.assertFalse(isIPv6Address("%eth0"))
         self.assertFalse(isIPv6Address(":%eth0"))
         self.assertFalse(isIPv6Address("hello%eth0"))
+
+
+
+class FakeFDSetReactor(object):
+    """
+    A reactor which just keeps track of the readers and writers added to it.
+    """
+    def __init__(self):
+        self.readers = set()
+        self.writers = set()
+
+
+    def addReader(self, reader):
+        self.readers.add(reader)
+
+
+    def removeReader(self, reader):
+        self.readers.discard(reader)
+
+
+    def addWriter(self, writer):
+        self.writers.add(writer)
+
+
+    def removeWriter(self, writer):
+        self.writers.discard(writer)
+
+
+
+class VectorWriter(FileDescriptor):
+    """
+    A L{FileDescriptor} which writes segments with C{_writeSomeVectors}.
+
+    @ivar vectors: A C{list} of the segments passed to each call of
+        C{_writeSomeVectors}, as C{bytes}.
+
+    @ivar results: A C{list} of the values to return from the following
+        calls to C{_writeSomeVectors}.  When it is empty, all of the data is
+        written.
+    """
+    connected = True
+
+    def __init__(self):
+        FileDescriptor.__init__(self, FakeFDSetReactor())
+        self.vectors = []
+        self.results = []
+
+
+    def _writeSomeVectors(self, vectors):
+        self.vectors.append(
+            [memoryview(vector).tobytes() for vector in vectors])
+        if self.results:
+            return self.results.pop(0)
+        return sum([len(vector) for vector in vectors])
+
+
+
+class VectoredWriteTests(SynchronousTestCase):
+    """
+    Tests for the writing of segments by L{FileDescriptor.doWrite} when
+    C{_writeSomeVectors} is provided.
+    """
+
+    def test_segmentsNotJoined(self):
+        """
+        The chunks given to L{FileDescriptor.writeSequence} and
+        L{FileDescriptor.write} are passed to C{_writeSomeVectors} as separate
+        segments, and once they are all written the descriptor stops writing.
+        """
+        writer = VectorWriter()
+        writer.writeSequence([b"a", b"bc"])
+        writer.write(b"def")
+        self.assertIn(writer, writer.reactor.writers)
+        self.assertEqual(writer.doWrite(), None)
+        self.assertEqual(writer.vectors, [[b"a", b"bc", b"def"]])
+        self.assertEqual(writer._tempDataBuffer, ())
+        self.assertEqual((writer._tempDataLen, writer.offset), (0, 0))
+        self.assertNotIn(writer, writer.reactor.writers)
+
+
+    def test_partialWrite(self):
+        """
+        After a partial write, only the unwritten parts of the segments are
+        passed to the next call of C{_writeSomeVectors}.
+        """
+        writer = VectorWriter()
+        writer.results = [2, 3, 0]
+        writer.writeSequence([b"a", b"bcd", b"ef"])
+        writer.doWrite()
+        writer.doWrite()
+        writer.doWrite()
+        self.assertIn(writer, writer.reactor.writers)
+        writer.doWrite()
+        self.assertEqual(writer.vectors, [
+                [b"a", b"bcd", b"ef"], [b"cd", b"ef"], [b"f"], [b"f"]])
+        self.assertNotIn(writer, writer.reactor.writers)
+
+
+    def test_maxVectors(self):
+        """
+        No more than C{_maxVectors} segments are passed to
+        C{_writeSomeVectors} at once.
+        """
+        writer = VectorWriter()
+        writer._maxVectors = 2
+        writer.writeSequence([b"a", b"b", b"c"])
+        writer.doWrite()
+        writer.doWrite()
+        self.assertEqual(writer.vectors, [[b"a", b"b"], [b"c"]])
+
+
+    def test_sendLimit(self):
+        """
+        Segments after the one which reaches C{SEND_LIMIT} bytes are not
+        passed to C{_writeSomeVectors}.
+        """
+        writer = VectorWriter()
+        writer.SEND_LIMIT = 3
+        writer.writeSequence([b"ab", b"cd", b"ef"])
+        writer.doWrite()
+        self.assertEqual(writer.vectors, [[b"ab", b"cd"]])
+
+
+    def test_connectionLost(self):
+        """
+        If C{_writeSomeVectors} returns an exception, L{FileDescriptor.doWrite}
+        returns it and keeps the data.
+        """
+        writer = VectorWriter()
+        writer.results = [CONNECTION_LOST]
+        writer.write(b"abc")
+        self.assertIdentical(writer.doWrite(), CONNECTION_LOST)
+        self.assertEqual(writer._tempDataBuffer, [b"abc"])
+        self.assertEqual(writer._tempDataLen, 3)
+
+
+    def test_nothingWritten(self):
+        """
+        If L{FileDescriptor.doWrite} is called with nothing to write, an empty
+        list of segments is passed to C{_writeSomeVectors}.
+        """
+        writer = VectorWriter()
+        writer.startWriting()
+        self.assertEqual(writer.doWrite(), None)
+        self.assertEqual(writer.vectors, [[]])
+        self.assertNotIn(writer, writer.reactor.writers)
+
+
+
+class IdleBufferTests(SynchronousTestCase):
+    """
+    Tests for the sharing of an empty C{_tempDataBuffer} by L{FileDescriptor}s
+    with nothing to write.
+    """
+
+    def test_notCreated(self):
+        """
+        A new L{FileDescriptor} does not have a C{_tempDataBuffer} of its own.
+        """
+        writer = FileWriter()
+        self.assertNotIn("_tempDataBuffer", writer.__dict__)
+        self.assertEqual(writer._tempDataBuffer, ())
+
+
+    def test_write(self):
+        """
+        L{FileDescriptor.write} creates a C{list} for C{_tempDataBuffer}.
+        """
+        writer = FileWriter()
+        writer.write(b"abc")
+        writer.write(b"de")
+        self.assertEqual(writer._tempDataBuffer, [b"abc", b"de"])
+        self.assertEqual(writer._tempDataLen, 5)
+
+
+    def test_writeSequence(self):
+        """
+        L{FileDescriptor.writeSequence} creates a C{list} for
+        C{_tempDataBuffer}, which is not the sequence it was given.
+        """
+        writer = FileWriter()
+        chunks = [b"abc", b"de"]
+        writer.writeSequence(chunks)
+        self.assertEqual(writer._tempDataBuffer, chunks)
+        self.assertNotIdentical(writer._tempDataBuffer, chunks)
+
+
+    def test_released(self):
+        """
+        Once everything written has been written, the C{list} is dropped.
+        """
+        writer = FileWriter()
+        writer.write(b"abc")
+        writer.doWrite()
+        self.assertEqual(writer.written, [b"abc"])
+        self.assertEqual(writer._tempDataBuffer, ())
+        self.assertEqual(writer._tempDataLen, 0)
+
+
+
+class FileWriter(FileDescriptor):
+    """
+    A L{FileDescriptor} which writes files with C{_writeSomeFile}.
+
+    @ivar written: A C{list} of the C{bytes} passed to L{writeSomeData} and
+        of three-tuples of the arguments passed to C{_writeSomeFile}.
+
+    @ivar results: A C{list} of the values to return from the following
+        calls to C{_writeSomeFile}.  When it is empty, all of the requested
+        bytes are written.
+    """
+    connected = True
+
+    def __init__(self):
+        FileDescriptor.__init__(self, FakeFDSetReactor())
+        self.written = []
+        self.results = []
+
+
+    def writeSomeData(self, data):
+        self.written.append(bytes(data))
+        return len(data)
+
+
+    def _writeSomeFile(self, fileno, offset, count):
+        self.written.append((fileno, offset, count))
+        if self.results:
+            return self.results.pop(0)
+        return count
+
+
+
+class FakeFile(object):
+    """
+    An object with a C{fileno} method.
+    """
+    def fileno(self):
+        return 7
+
+
+
+class WriteFileTests(SynchronousTestCase):
+    """
+    Tests for L{FileDescriptor.writeFile}.
+    """
+
+    def flush(self, writer):
+        """
+        Call C{writer.doWrite} until it stops writing.
+        """
+        for i in range(100):
+            if writer not in writer.reactor.writers:
+                return
+            self.assertEqual(writer.doWrite(), None)
+        self.fail("%r did not stop writing" % (writer,))
+
+
+    def test_canWriteFile(self):
+        """
+        L{FileDescriptor.canWriteFile} returns C{True} only if the descriptor
+        provides C{_writeSomeFile}, and otherwise L{FileDescriptor.writeFile}
+        raises L{RuntimeError}.
+        """
+        self.assertTrue(FileWriter().canWriteFile())
+        descriptor = FileDescriptor(FakeFDSetReactor())
+        self.assertFalse(descriptor.canWriteFile())
+        self.assertRaises(
+            RuntimeError, descriptor.writeFile, FakeFile(), 0, 10)
+
+
+    def test_ordering(self):
+        """
+        The part of a file passed to L{FileDescriptor.writeFile} is written
+        after the data written before it and before the data written after
+        it, and the returned L{Deferred} fires once it has all been written.
+        """
+        writer = FileWriter()
+        writer.write(b"before")
+        d = writer.writeFile(FakeFile(), 5, 10)
+        writer.writeSequence([b"af", b"ter"])
+        writer.results = [4, None, 6]
+        fired = []
+        d.addCallback(fired.append)
+        self.flush(writer)
+        self.assertEqual(fired, [None])
+        self.assertEqual(writer.written, [
+                b"before", (7, 5, 10), (7, 9, 6), (7, 9, 6), b"after"])
+
+
+    def test_endOfFile(self):
+        """
+        If the end of the file is reached early, the L{Deferred} returned by
+        L{FileDescriptor.writeFile} fires and the following data is written.
+        """
+        writer = FileWriter()
+        d = writer.writeFile(FakeFile(), 0, 10)
+        writer.write(b"after")
+        writer.results = [3, 0]
+        fired = []
+        d.addCallback(fired.append)
+        self.flush(writer)
+        self.assertEqual(fired, [None])
+        self.assertEqual(
+            writer.written, [(7, 0, 10), (7, 3, 7), b"after"])
+
+
+    def test_loseConnection(self):
+        """
+        A connection which is asked to close while a file is pending is only
+        closed once the file has been written.
+        """
+        writer = FileWriter()
+        writer.writeFile(FakeFile(), 0, 10)
+        writer.loseConnection()
+        writer.results = [5]
+        self.assertEqual(writer.doWrite(), None)
+        self.assertEqual(writer.doWrite(), CONNECTION_DONE)
+
+
+    def test_connectionLost(self):
+        """
+        The L{Deferred}s for pending files fail when the connection is lost.
+        """
+        writer = FileWriter()
+        first = writer.writeFile(FakeFile(), 0, 10)
+        second = writer.writeFile(FakeFile(), 0, 10)
+        writer.connectionLost(Failure(CONNECTION_LOST))
+        self.failureResultOf(first, ConnectionLost)
+        self.failureResultOf(second, ConnectionLost)
+
+
+    def test_notConnected(self):
+        """
+        The L{Deferred} returned by L{FileDescriptor.writeFile} fails if the
+        descriptor is not connected.
+        """
+        writer = FileWriter()
+        writer.connected = False
+        self.failureResultOf(
+            writer.writeFile(FakeFile(), 0, 10), ConnectionLost)
+
+
+    def test_pausesProducer(self):
+        """
+        The bytes of pending files count towards the size of the buffer, so a
+        streaming producer is paused while a large file is written.
+        """
+        writer = FileWriter()
+        producer = Producer()
+        writer.registerProducer(producer, True)
+        writer.writeFile(FakeFile(), 0, writer.bufferSize + 1)
+        self.assertEqual(producer.events, ["pause"])
+
+
+
+class Producer(object):
+    """
+    A producer which records the calls made to it.
+    """
+    def __init__(self):
+        self.events = []
+
+
+    def pauseProducing(self):
+        self.events.append("pause")
+
+
+    def resumeProducing(self):
+        self.events.append("resume")
+
+
+    def stopProducing(self):
+        self.events.append("stop")
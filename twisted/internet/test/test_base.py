@@ -6,6 +6,7 @@ Tests for L{twisted.internet.base}.
 """
 
 import socket
+import weakref
 try:
     from Queue import Queue
 except ImportError:
@@ -16,7 +17,7 @@ from zope.interface import implementer
 from twisted.python.threadpool import ThreadPool
 from twisted.internet.interfaces import IReactorTime, IReactorThreads
 from twisted.internet.error import DNSLookupError
-from twisted.internet.base import ThreadedResolver, DelayedCall
+from twisted.internet.base import ThreadedResolver, DelayedCall, ReactorBase
 from twisted.internet.task import Clock
 from twisted.trial.unittest import TestCase
 
@@ -270,3 +271,163 @@ class DelayedCallTests(TestCase):
         self.assertTrue(self.zero != self.one)
         self.assertFalse(self.zero != self.zero)
         self.assertFalse(self.one != self.one)
+
+
+    def test_attributes(self):
+        """
+        L{DelayedCall} instances can be weakly referenced, and can have
+        C{debug} and other attributes set on them.
+        """
+        self.assertIdentical(weakref.ref(self.zero)(), self.zero)
+        self.zero.debug = True
+        self.assertTrue(self.zero.debug)
+        self.assertFalse(self.one.debug)
+        self.zero.extra = "extra"
+        self.assertEqual(self.zero.extra, "extra")
+
+
+    def test_debug(self):
+        """
+        If L{DelayedCall.debug} is set, the string representation of a
+        L{DelayedCall} includes the stack it was created from, and once it is
+        cancelled it still includes the function which was to be called.
+        """
+        self.patch(DelayedCall, "debug", True)
+        dc = DelayedCall(12, nothing, (), {}, lambda dc: None, None,
+                         lambda: 1.5)
+        self.assertIn("traceback at creation", str(dc))
+        dc.cancel()
+        self.assertIn("cancelled=1 nothing()", str(dc))
+
+
+
+class WakeCountingReactor(ReactorBase):
+    """
+    A L{ReactorBase} which counts how many times it is woken up.
+
+    @ivar wakeUps: The number of calls to L{wakeUp}.
+    """
+    wakeUps = 0
+
+    def installWaker(self):
+        pass
+
+
+    def wakeUp(self):
+        self.wakeUps += 1
+
+
+
+class CallFromThreadTests(TestCase):
+    """
+    Tests for L{ReactorBase.callFromThread} and the running of the calls it
+    queues by L{ReactorBase.runUntilCurrent}.
+    """
+
+    def setUp(self):
+        self.reactor = WakeCountingReactor()
+
+
+    def test_wakeUpCoalesced(self):
+        """
+        Only the first call to L{ReactorBase.callFromThread} since the queued
+        calls were last run wakes the reactor up.
+        """
+        calls = []
+        for i in range(3):
+            self.reactor.callFromThread(calls.append, i)
+        self.assertEqual(self.reactor.wakeUps, 1)
+        self.reactor.runUntilCurrent()
+        self.assertEqual(calls, [0, 1, 2])
+        self.reactor.callFromThread(calls.append, 3)
+        self.assertEqual(self.reactor.wakeUps, 2)
+
+
+    def test_callsAddedWhileRunning(self):
+        """
+        Calls queued by the calls being run by L{ReactorBase.runUntilCurrent}
+        are run by the next call to it, and wake the reactor up so that it
+        does not wait for anything else first.
+        """
+        calls = []
+        def first():
+            calls.append("first")
+            self.reactor.callFromThread(calls.append, "second")
+        self.reactor.callFromThread(first)
+        self.reactor.runUntilCurrent()
+        self.assertEqual(calls, ["first"])
+        self.assertEqual(self.reactor.wakeUps, 2)
+        self.reactor.runUntilCurrent()
+        self.assertEqual(calls, ["first", "second"])
+
+
+    def test_staleWakeUpCleared(self):
+        """
+        L{ReactorBase.runUntilCurrent} forgets that a wake up is pending even
+        if there are no queued calls, as happens when a thread sets the flag
+        after seeing it unset just before the reactor last cleared it, so that
+        the next call queued wakes the reactor up.
+        """
+        self.reactor._wakeUpPending = True
+        self.reactor.runUntilCurrent()
+        self.reactor.callFromThread(lambda: None)
+        self.assertEqual(self.reactor.wakeUps, 1)
+
+
+    def test_callsQueuedWithoutWakeUp(self):
+        """
+        If calls are left in the queue after L{ReactorBase.runUntilCurrent}
+        without a wake up pending, it wakes the reactor up.
+        """
+        calls = []
+        def first():
+            calls.append("first")
+            self.reactor.threadCallQueue.append(
+                (calls.append, ("second",), {}))
+        self.reactor.callFromThread(first)
+        self.reactor.runUntilCurrent()
+        self.assertEqual(self.reactor.wakeUps, 2)
+        self.reactor.runUntilCurrent()
+        self.assertEqual(calls, ["first", "second"])
+
+
+    def test_exceptionLogged(self):
+        """
+        An exception raised by a call queued with
+        L{ReactorBase.callFromThread} is logged, and the calls queued after it
+        are still run.
+        """
+        calls = []
+        self.reactor.callFromThread(lambda: 1 // 0)
+        self.reactor.callFromThread(calls.append, 1)
+        self.reactor.runUntilCurrent()
+        self.assertEqual(calls, [1])
+        self.assertEqual(len(self.flushLoggedErrors(ZeroDivisionError)), 1)
+
+
+
+class CallLaterTests(TestCase):
+    """
+    Tests for L{ReactorBase.callLater}.
+    """
+
+    def setUp(self):
+        self.reactor = WakeCountingReactor()
+
+
+    def test_sharedMethods(self):
+        """
+        The L{DelayedCall}s returned by L{ReactorBase.callLater} share the
+        reactor's canceller and resetter, which still cancel and reschedule
+        each call.
+        """
+        calls = []
+        first = self.reactor.callLater(10, calls.append, "first")
+        second = self.reactor.callLater(20, calls.append, "second")
+        self.assertIdentical(first.canceller, second.canceller)
+        self.assertIdentical(first.resetter, second.resetter)
+        first.cancel()
+        second.reset(0)
+        self.reactor.runUntilCurrent()
+        self.assertEqual(calls, ["second"])
+        self.assertEqual(self.reactor.getDelayedCalls(), [])
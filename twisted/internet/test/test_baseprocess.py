@@ -10,6 +10,7 @@ __metaclass__ = type
 
 from twisted.python.deprecate import getWarningMethod, setWarningMethod
 from twisted.trial.unittest import TestCase
+from twisted.internet.address import _ProcessAddress
 from twisted.internet._baseprocess import BaseProcess
 
 
@@ -71,3 +72,14 @@ class BaseProcessTests(TestCase):
         # I think would be more misleading than having it point inside the
         # warning system itself. -exarkun
         self.assertEqual(stacklevel, 0)
+
+
+    def test_address(self):
+        """
+        L{BaseProcess.getHost} and L{BaseProcess.getPeer} return a
+        L{_ProcessAddress}, since processes have no address, so that protocols
+        which ask for one can run over a process.
+        """
+        process = BaseProcess(None)
+        self.assertIsInstance(process.getHost(), _ProcessAddress)
+        self.assertIsInstance(process.getPeer(), _ProcessAddress)
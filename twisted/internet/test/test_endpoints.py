@@ -2221,6 +2221,20 @@ class ParserTestCase(unittest.TestCase):
             ('TCP', (80, self.f), {'interface': '', 'backlog': 6}))
 
 
+    def test_reusePortTCP(self):
+        """
+        TCP port descriptions parse their 'reuseport' argument as a boolean,
+        passed on as C{reusePort} only if it is set.
+        """
+        self.assertEqual(
+            self.parse('tcp:80:reuseport=1', self.f),
+            ('TCP', (80, self.f),
+             {'interface': '', 'backlog': 50, 'reusePort': True}))
+        self.assertEqual(
+            self.parse('tcp:80:reuseport=0', self.f),
+            ('TCP', (80, self.f), {'interface': '', 'backlog': 50}))
+
+
     def test_simpleUNIX(self):
         """
         L{endpoints._parseServer} returns a C{'UNIX'} port description with
@@ -2325,6 +2339,27 @@ class ServerStringTests(unittest.TestCase):
         self.assertEqual(server._port, 1234)
         self.assertEqual(server._backlog, 12)
         self.assertEqual(server._interface, "10.0.0.1")
+        self.assertFalse(server._reusePort)
+
+
+    def test_tcpReusePort(self):
+        """
+        The C{reuseport} argument of a TCP strports description is passed to
+        L{TCP4ServerEndpoint}, which passes it on to C{listenTCP}.
+        """
+        listened = []
+        class ListeningReactor(object):
+            def listenTCP(self, *args, **kwargs):
+                listened.append((args, kwargs))
+
+        server = endpoints.serverFromString(
+            ListeningReactor(), "tcp:1234:reuseport=1")
+        self.assertTrue(server._reusePort)
+        server.listen("factory")
+        self.assertEqual(
+            listened,
+            [((1234, "factory"),
+              {'backlog': 50, 'interface': '', 'reusePort': True})])
 
 
     def test_ssl(self):
@@ -3049,6 +3084,17 @@ class TCP6ServerEndpointPluginTests(unittest.TestCase):
         self.assertEqual(ep._port, 8080)
         self.assertEqual(ep._backlog, 12)
         self.assertEqual(ep._interface, '::1')
+        self.assertFalse(ep._reusePort)
+
+
+    def test_reusePort(self):
+        """
+        The C{reuseport} argument of a 'tcp6' endpoint string description is
+        passed to L{TCP6ServerEndpoint}.
+        """
+        ep = endpoints.serverFromString(
+            MemoryReactor(), "tcp6:8080:reuseport=1")
+        self.assertTrue(ep._reusePort)
 
 
 
@@ -9,11 +9,15 @@ from __future__ import division, absolute_import
 
 from twisted.trial.unittest import TestCase
 try:
-    from twisted.internet.epollreactor import _ContinuousPolling
+    from twisted.internet.epollreactor import _ContinuousPolling, EPollReactor
+    from select import EPOLLIN, EPOLLOUT, EPOLLET
 except ImportError:
-    _ContinuousPolling = None
+    _ContinuousPolling = EPollReactor = None
+import socket
+
 from twisted.internet.task import Clock
 from twisted.internet.error import ConnectionDone
+from twisted.internet.abstract import FileDescriptor
 
 
 
@@ -246,3 +250,229 @@ class ContinuousPollingTests(TestCase):
 
     if _ContinuousPolling is None:
         skip = "epoll not supported in this environment."
+
+
+
+class RecordingPoller(object):
+    """
+    Records the registration changes made to an C{epoll} object, and passes
+    them on to it.
+
+    @ivar calls: A C{list} of the names and arguments of the calls made.
+    """
+
+    def __init__(self, poller):
+        self._poller = poller
+        self.calls = []
+
+
+    def register(self, fd, flags):
+        self.calls.append(("register", fd, flags))
+        self._poller.register(fd, flags)
+
+
+    def modify(self, fd, flags):
+        self.calls.append(("modify", fd, flags))
+        self._poller.modify(fd, flags)
+
+
+    def unregister(self, fd):
+        self.calls.append(("unregister", fd))
+        self._poller.unregister(fd)
+
+
+    def poll(self, timeout, maxevents):
+        return self._poller.poll(timeout, maxevents)
+
+
+    def close(self):
+        self._poller.close()
+
+
+
+class SocketDescriptor(FileDescriptor):
+    """
+    Reads a byte at a time from one end of a socket pair, reporting when it
+    would block as C{tcp.Connection} does.
+
+    @ivar received: A C{list} of the bytes read.
+    """
+    _edgeTriggerable = True
+
+    def __init__(self, reactor, skt):
+        FileDescriptor.__init__(self, reactor)
+        self.socket = skt
+        self.received = []
+
+
+    def fileno(self):
+        return self.socket.fileno()
+
+
+    def doRead(self):
+        try:
+            data = self.socket.recv(1)
+        except socket.error:
+            self._readBlocked = True
+        else:
+            self.received.append(data)
+
+
+    def writeSomeData(self, data):
+        return self.socket.send(data)
+
+
+
+class EdgeTriggeredTests(TestCase):
+    """
+    Tests for L{EPollReactor} created with C{edgeTriggered=True}.
+    """
+
+    def setUp(self):
+        self.reactor = EPollReactor(edgeTriggered=True)
+        self.addCleanup(self.reactor._poller.close)
+        self.addCleanup(self.reactor.waker.connectionLost, None)
+        self.poller = self.reactor._poller = RecordingPoller(
+            self.reactor._poller)
+        self.client, server = socket.socketpair()
+        self.addCleanup(self.client.close)
+        self.addCleanup(server.close)
+        server.setblocking(False)
+        self.descriptor = SocketDescriptor(self.reactor, server)
+        self.fd = server.fileno()
+
+
+    def test_registeredOnce(self):
+        """
+        A descriptor which sets C{_edgeTriggerable} is registered for
+        edge-triggered read and write notifications when it is first added,
+        and stays registered when it stops reading or writing.
+        """
+        self.descriptor.startReading()
+        self.descriptor.stopReading()
+        self.descriptor.startWriting()
+        self.descriptor.stopWriting()
+        self.descriptor.startReading()
+        self.assertEqual(
+            self.poller.calls,
+            [("register", self.fd, EPOLLIN | EPOLLOUT | EPOLLET)])
+        self.assertIn(self.descriptor, self.reactor.getReaders())
+        self.assertNotIn(self.descriptor, self.reactor.getWriters())
+
+
+    def test_unregisteredWhenDisconnected(self):
+        """
+        A descriptor registered for edge-triggered notifications is
+        unregistered when it is removed after being disconnected.
+        """
+        self.descriptor.startReading()
+        self.descriptor.startWriting()
+        self.descriptor.disconnected = True
+        self.descriptor.stopReading()
+        self.assertEqual(len(self.poller.calls), 1)
+        self.descriptor.stopWriting()
+        self.assertEqual(
+            self.poller.calls[1:], [("unregister", self.fd)])
+        self.assertNotIn(self.fd, self.reactor._selectables)
+        self.assertNotIn(self.fd, self.reactor._ready)
+
+
+    def test_readUntilBlocked(self):
+        """
+        A descriptor which is ready for reading is read from on every
+        iteration until it reports that reading would block, without waiting
+        for another notification.
+        """
+        self.descriptor.startReading()
+        self.client.send(b"abc")
+        for i in range(3):
+            self.reactor.doPoll(0)
+        self.assertEqual(self.descriptor.received, [b"a", b"b", b"c"])
+        self.assertTrue(self.reactor._ready[self.fd] & EPOLLIN)
+        self.reactor.doPoll(0)
+        self.assertTrue(self.descriptor._readBlocked)
+        self.assertNotIn(self.fd, self.reactor._ready)
+
+
+    def test_idleReaderNotReady(self):
+        """
+        A reader which has nothing to read is not kept in C{_ready} because
+        it is ready for writing, but is handled as soon as it starts writing.
+        """
+        self.descriptor.connected = True
+        self.descriptor.startReading()
+        self.reactor.doPoll(0)
+        self.reactor.doPoll(0)
+        self.assertTrue(self.descriptor._readBlocked)
+        self.assertFalse(self.descriptor._writeBlocked)
+        self.assertNotIn(self.fd, self.reactor._ready)
+        self.descriptor.write(b"x")
+        self.assertEqual(self.reactor._ready, {self.fd: EPOLLOUT})
+        self.reactor.doPoll(0)
+        self.assertEqual(self.client.recv(1), b"x")
+        self.assertNotIn(self.fd, self.reactor._ready)
+
+
+    def test_readinessKeptWhilePaused(self):
+        """
+        Readiness reported while a descriptor is not reading is handled as
+        soon as it starts reading again.
+        """
+        self.descriptor.startReading()
+        self.descriptor.stopReading()
+        self.client.send(b"a")
+        self.reactor.doPoll(0)
+        self.assertEqual(self.descriptor.received, [])
+        self.descriptor.startReading()
+        self.reactor.doPoll(None)
+        self.assertEqual(self.descriptor.received, [b"a"])
+
+
+    def test_levelTriggeredDescriptor(self):
+        """
+        A descriptor which does not set C{_edgeTriggerable} is registered for
+        level-triggered notifications.
+        """
+        self.descriptor._edgeTriggerable = False
+        self.descriptor.startReading()
+        self.descriptor.stopReading()
+        self.assertEqual(
+            self.poller.calls,
+            [("register", self.fd, EPOLLIN), ("unregister", self.fd)])
+
+
+    def test_becomesLevelTriggered(self):
+        """
+        A descriptor registered for edge-triggered notifications which stops
+        setting C{_edgeTriggerable} is registered for level-triggered
+        notifications of the events it is interested in.
+        """
+        self.descriptor.startReading()
+        self.descriptor._edgeTriggerable = False
+        self.descriptor.startWriting()
+        self.assertEqual(
+            self.poller.calls,
+            [("register", self.fd, EPOLLIN | EPOLLOUT | EPOLLET),
+             ("modify", self.fd, EPOLLIN),
+             ("modify", self.fd, EPOLLIN | EPOLLOUT)])
+        self.assertEqual(self.reactor._edgeFDs, set())
+
+
+    def test_levelTriggeredByDefault(self):
+        """
+        L{EPollReactor} registers every descriptor for level-triggered
+        notifications unless it is created with C{edgeTriggered=True}.
+        """
+        reactor = EPollReactor()
+        self.addCleanup(reactor._poller.close)
+        self.addCleanup(reactor.waker.connectionLost, None)
+        poller = reactor._poller = RecordingPoller(reactor._poller)
+        self.descriptor.reactor = reactor
+        self.descriptor.startReading()
+        self.descriptor.stopReading()
+        self.assertEqual(
+            poller.calls,
+            [("register", self.fd, EPOLLIN), ("unregister", self.fd)])
+
+    if EPollReactor is None:
+        skip = "epoll not supported in this environment."
@@ -12,7 +12,8 @@ well.
 from __future__ import division, absolute_import
 
 from twisted.trial.unittest import TestCase
-from twisted.internet.defer import Deferred, returnValue, inlineCallbacks
+from twisted.internet.defer import (
+    Deferred, returnValue, inlineCallbacks, succeed, fail)
 
 class NonLocalExitTests(TestCase):
     """
@@ -88,3 +89,59 @@ class NonLocalExitTests(TestCase):
         self.assertMistakenMethodWarning(results)
 
 
+
+class FiredDeferredTests(TestCase):
+    """
+    Tests for yielding a L{Deferred} which already has a result from a
+    function decorated with L{inlineCallbacks}.
+    """
+
+    def test_result(self):
+        """
+        The result of a L{Deferred} which already has one is sent into the
+        generator, and the L{Deferred} is left with C{None} as its result.
+        """
+        fired = succeed("result")
+        @inlineCallbacks
+        def inline():
+            result = yield fired
+            returnValue(result)
+        self.assertEqual(self.successResultOf(inline()), "result")
+        self.assertEqual(self.successResultOf(fired), None)
+
+
+    def test_failure(self):
+        """
+        The failure of a L{Deferred} which already has one is thrown into the
+        generator, and the L{Deferred} is left with C{None} as its result, so
+        the failure is not logged as unhandled.
+        """
+        fired = fail(ZeroDivisionError())
+        @inlineCallbacks
+        def inline():
+            try:
+                yield fired
+            except ZeroDivisionError:
+                returnValue("caught")
+        self.assertEqual(self.successResultOf(inline()), "caught")
+        self.assertEqual(self.successResultOf(fired), None)
+
+
+    def test_runningCallbacks(self):
+        """
+        If a L{Deferred} is yielded by a function called from one of its own
+        callbacks, the generator is sent the result of the callbacks after
+        that one, rather than the result so far.
+        """
+        results = []
+        @inlineCallbacks
+        def inline(d):
+            results.append((yield d))
+        def first(result):
+            inline(d)
+            return result
+        d = Deferred()
+        d.addCallback(first)
+        d.addCallback(lambda result: result + 1)
+        d.callback(1)
+        self.assertEqual(results, [2])
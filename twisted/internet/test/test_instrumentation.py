@@ -0,0 +1,240 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.internet.instrumentation}.
+"""
+
+from __future__ import division, absolute_import
+
+from twisted.python import log
+from twisted.trial.unittest import SynchronousTestCase, SkipTest
+from twisted.internet.test.reactormixins import ReactorBuilder
+from twisted.internet.interfaces import IReactorTime, IReactorThreads
+from twisted.internet.instrumentation import Histogram, ReactorInstrumentation
+
+
+
+class HistogramTests(SynchronousTestCase):
+    """
+    Tests for L{Histogram}.
+    """
+
+    def test_empty(self):
+        """
+        A new L{Histogram} has no durations and no percentiles.
+        """
+        histogram = Histogram()
+        self.assertEqual(
+            (histogram.count, histogram.total, histogram.maximum,
+             histogram.buckets),
+            (0, 0.0, 0.0, {}))
+        self.assertEqual(histogram.percentile(0.5), None)
+
+
+    def test_add(self):
+        """
+        L{Histogram.add} counts a duration in the bucket for its number of
+        microseconds, and updates the count, total and maximum.
+        """
+        histogram = Histogram()
+        histogram.add(0.0000005)
+        histogram.add(0.000003)
+        histogram.add(0.0025)
+        self.assertEqual(histogram.count, 3)
+        self.assertAlmostEqual(histogram.total, 0.0025035)
+        self.assertEqual(histogram.maximum, 0.0025)
+        self.assertEqual(histogram.buckets, {0: 1, 2: 1, 12: 1})
+
+
+    def test_percentile(self):
+        """
+        L{Histogram.percentile} gives the upper bound of the bucket which
+        contains the requested fraction of the durations, capped at the
+        maximum duration.
+        """
+        histogram = Histogram()
+        for i in range(99):
+            histogram.add(0.000003)
+        histogram.add(0.5)
+        self.assertEqual(histogram.percentile(0.5), 0.000004)
+        self.assertEqual(histogram.percentile(0.99), 0.000004)
+        self.assertEqual(histogram.percentile(1.0), 0.5)
+
+
+
+class FakeClock(object):
+    """
+    A clock which advances by C{step} seconds every time it is read.
+    """
+    def __init__(self, step):
+        self.now = 0.0
+        self.step = step
+
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+
+class ReactorInstrumentationTests(SynchronousTestCase):
+    """
+    Tests for L{ReactorInstrumentation}.
+    """
+
+    def setUp(self):
+        self.events = []
+        log.addObserver(self.events.append)
+        self.addCleanup(log.removeObserver, self.events.append)
+
+
+    def slowEvents(self):
+        return [e for e in self.events if 'slowCallback' in e]
+
+
+    def test_record(self):
+        """
+        L{ReactorInstrumentation.record} adds a duration to the named
+        histogram.
+        """
+        instrumentation = ReactorInstrumentation()
+        instrumentation.record("iteration", 0.25)
+        histogram = instrumentation.histograms["iteration"]
+        self.assertEqual((histogram.count, histogram.total), (1, 0.25))
+
+
+    def test_slowCallback(self):
+        """
+        L{ReactorInstrumentation.record} emits a log event describing a
+        callback which took longer than the threshold.
+        """
+        instrumentation = ReactorInstrumentation(slowThreshold=0.1)
+        instrumentation.record("timedCall", 0.05, "fast")
+        instrumentation.record("timedCall", 0.5, "slow")
+        events = self.slowEvents()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['slowCallback'], "slow")
+        self.assertEqual(events[0]['category'], "timedCall")
+        self.assertEqual(events[0]['duration'], 0.5)
+
+
+    def test_noThreshold(self):
+        """
+        Without a threshold, no callback is reported as slow.
+        """
+        instrumentation = ReactorInstrumentation()
+        instrumentation.record("timedCall", 1000, "slow")
+        self.assertEqual(self.slowEvents(), [])
+
+
+    def test_callThreadCall(self):
+        """
+        L{ReactorInstrumentation.callThreadCall} calls the function with the
+        given arguments and records how long it took.
+        """
+        instrumentation = ReactorInstrumentation(clock=FakeClock(2))
+        called = []
+        instrumentation.callThreadCall(
+            lambda *a, **kw: called.append((a, kw)), (1,), {"x": 2})
+        self.assertEqual(called, [((1,), {"x": 2})])
+        self.assertEqual(instrumentation.histograms["threadCall"].total, 2)
+
+
+    def test_callTimedCallRaises(self):
+        """
+        L{ReactorInstrumentation.callTimedCall} records the time taken by a
+        call even if it raises an exception, and lets the exception through.
+        """
+        class Call(object):
+            def func(self):
+                1 // 0
+            args = ()
+            kw = {}
+
+        instrumentation = ReactorInstrumentation(clock=FakeClock(3))
+        self.assertRaises(
+            ZeroDivisionError, instrumentation.callTimedCall, Call())
+        self.assertEqual(instrumentation.histograms["timedCall"].total, 3)
+
+
+    def test_wrapDoReadOrWrite(self):
+        """
+        The wrapper returned by L{ReactorInstrumentation.wrapDoReadOrWrite}
+        passes its arguments through, and reports the selectable if handling
+        the event was slow.
+        """
+        instrumentation = ReactorInstrumentation(
+            slowThreshold=1, clock=FakeClock(5))
+        calls = []
+        wrapped = instrumentation.wrapDoReadOrWrite(
+            lambda *args: calls.append(args))
+        wrapped("selectable", 10, "event")
+        self.assertEqual(calls, [("selectable", 10, "event")])
+        self.assertEqual(instrumentation.histograms["io"].count, 1)
+        self.assertEqual(
+            [e['slowCallback'] for e in self.slowEvents()], ["selectable"])
+
+
+    def test_reset(self):
+        """
+        L{ReactorInstrumentation.reset} discards all measurements.
+        """
+        instrumentation = ReactorInstrumentation()
+        instrumentation.record("io", 1)
+        instrumentation.reset()
+        self.assertEqual(instrumentation.histograms["io"].count, 0)
+
+
+
+class InstrumentationTestsBuilder(ReactorBuilder):
+    """
+    Builder for tests of reactors with L{ReactorInstrumentation} installed.
+    """
+    requiredInterfaces = (IReactorTime, IReactorThreads)
+
+    def buildInstrumentedReactor(self, instrumentation):
+        reactor = self.buildReactor()
+        if not hasattr(reactor, 'installInstrumentation'):
+            raise SkipTest("%r does not support instrumentation" % (reactor,))
+        self.assertEqual(reactor.installInstrumentation(instrumentation), None)
+        return reactor
+
+
+    def test_loopMeasured(self):
+        """
+        The iterations of the reactor, and the thread and timed calls it runs,
+        are recorded by the installed instrumentation.
+        """
+        instrumentation = ReactorInstrumentation()
+        reactor = self.buildInstrumentedReactor(instrumentation)
+        called = []
+        reactor.callLater(0, reactor.callFromThread, called.append, 1)
+        reactor.callLater(0.01, reactor.stop)
+        self.runReactor(reactor)
+        self.assertEqual(called, [1])
+        histograms = instrumentation.histograms
+        self.assertTrue(histograms["iteration"].count > 0)
+        self.assertTrue(histograms["threadCall"].count >= 1)
+        self.assertTrue(histograms["threadCalls"].count >= 1)
+        self.assertTrue(histograms["timedCall"].count >= 2)
+        self.assertTrue(histograms["timedCalls"].count > 0)
+
+
+    def test_uninstall(self):
+        """
+        Installing C{None} instead of some instrumentation stops measurements
+        and returns the previously installed instrumentation.
+        """
+        instrumentation = ReactorInstrumentation()
+        reactor = self.buildInstrumentedReactor(instrumentation)
+        self.assertIdentical(
+            reactor.installInstrumentation(None), instrumentation)
+        reactor.callLater(0, reactor.stop)
+        self.runReactor(reactor)
+        self.assertEqual(instrumentation.histograms["iteration"].count, 0)
+        self.assertEqual(instrumentation.histograms["timedCall"].count, 0)
+
+
+
+globals().update(InstrumentationTestsBuilder.makeTestCaseClasses())
@@ -338,3 +338,218 @@ class FileDescriptorTests(TestCase):
             os.close(fd)
         # And it should not appear in the result.
         self.assertNotIn(fd, process._listOpenFDs())
+
+
+
+class FakePosixSpawn(object):
+    """
+    A fake of L{twisted.python._posixspawn} which records the processes it is
+    asked to start.
+
+    @ivar spawned: The arguments L{spawn} was called with.
+
+    @ivar error: If not C{None}, an exception for L{spawn} to raise.
+    """
+    error = None
+
+    def __init__(self):
+        self.spawned = []
+
+
+    def findExecutable(self, executable, environment):
+        if executable == "missing":
+            return None
+        return "/bin/" + executable
+
+
+    def spawn(self, executable, args, environment, fdmap, path, signals):
+        if self.error is not None:
+            raise self.error
+        self.spawned.append((executable, args, environment, fdmap, path))
+        return 1234
+
+
+
+class SpawnTests(TestCase):
+    """
+    Tests for L{process.Process._spawn}, which starts processes with
+    posix_spawn where it can.
+    """
+    skip = platformSkip
+
+    def setUp(self):
+        self.posixspawn = FakePosixSpawn()
+        self.patch(process, "_posixspawn", self.posixspawn)
+        self.process = process.Process.__new__(process.Process)
+
+
+    def spawn(self, uid=None, gid=None, executable="program",
+              fdmap={0: 10, 1: 11, 2: 11}):
+        return self.process._spawn(
+            "/path", uid, gid, executable, ["program"], {"A": "B"}, fdmap)
+
+
+    def test_spawned(self):
+        """
+        A process with no user to switch to and descriptors numbered from 0
+        is started with posix_spawn.
+        """
+        self.assertTrue(self.spawn())
+        self.assertEqual(self.posixspawn.spawned, [
+                ("/bin/program", ["program"], {"A": "B"},
+                 {0: 10, 1: 11, 2: 11}, "/path")])
+        self.assertEqual(self.process.pid, 1234)
+        self.assertEqual(self.process.status, -1)
+
+
+    def test_unavailable(self):
+        """
+        If posix_spawn is not available, the process is not spawned.
+        """
+        self.patch(process, "_posixspawn", None)
+        self.assertFalse(self.spawn())
+
+
+    def test_switchUser(self):
+        """
+        A process which is to run as another user or group must be forked.
+        """
+        self.assertFalse(self.spawn(uid=0))
+        self.assertFalse(self.spawn(gid=0))
+        self.assertEqual(self.posixspawn.spawned, [])
+
+
+    def test_descriptorGaps(self):
+        """
+        A process whose descriptors are not numbered from 0 without gaps must
+        be forked.
+        """
+        self.assertFalse(self.spawn(fdmap={0: 10, 1: 11, 3: 12}))
+        self.assertFalse(self.spawn(fdmap={1: 11, 2: 11}))
+        self.assertEqual(self.posixspawn.spawned, [])
+
+
+    def test_notFound(self):
+        """
+        If the executable is not found, the process must be forked, so that
+        the error is reported the way it always has been.
+        """
+        self.assertFalse(self.spawn(executable="missing"))
+
+
+    def test_error(self):
+        """
+        If posix_spawn fails, the process must be forked.
+        """
+        self.posixspawn.error = OSError(errno.ENOENT, "No such file")
+        self.assertFalse(self.spawn())
+        self.assertIdentical(self.process.pid, None)
+
+
+
+class FakeWaitid(object):
+    """
+    A fake of L{twisted.python._waitid} which reports the children in a list
+    as having exited.
+
+    @ivar exited: The process IDs of the children which have exited.
+    """
+
+    def __init__(self, exited):
+        self.exited = exited
+
+
+    def exitedChild(self):
+        if self.exited:
+            return self.exited[0]
+        return None
+
+
+
+class FakeReapedProcess(object):
+    """
+    A registered process which records being asked to reap itself.
+    """
+
+    def __init__(self, pid, waitid, reaped):
+        self.pid = pid
+        self.waitid = waitid
+        self.reaped = reaped
+
+
+    def reapProcess(self):
+        self.reaped.append(self.pid)
+        if self.pid in self.waitid.exited:
+            self.waitid.exited.remove(self.pid)
+            del process.reapProcessHandlers[self.pid]
+
+
+
+class ReapAllProcessesTests(TestCase):
+    """
+    Tests for L{process.reapAllProcesses}.
+    """
+    skip = platformSkip
+
+    def setUp(self):
+        self.waitid = FakeWaitid([])
+        self.reaped = []
+        self.patch(process, "_waitid", self.waitid)
+        self.patch(process, "reapProcessHandlers", {})
+        for pid in range(1, 101):
+            process.reapProcessHandlers[pid] = FakeReapedProcess(
+                pid, self.waitid, self.reaped)
+
+
+    def test_onlyExited(self):
+        """
+        Only the registered processes which have exited are asked to reap
+        themselves.
+        """
+        self.waitid.exited.extend([7, 42])
+        process.reapAllProcesses()
+        self.assertEqual(self.reaped, [7, 42])
+        self.assertNotIn(7, process.reapProcessHandlers)
+        self.assertNotIn(42, process.reapProcessHandlers)
+
+
+    def test_nothingExited(self):
+        """
+        If no child has exited, no process is asked to reap itself.
+        """
+        process.reapAllProcesses()
+        self.assertEqual(self.reaped, [])
+
+
+    def test_unregisteredChild(self):
+        """
+        If a child which is not registered has exited, every registered
+        process is asked to reap itself.
+        """
+        self.waitid.exited.extend([7, 1000])
+        process.reapAllProcesses()
+        self.assertEqual(sorted(set(self.reaped)), list(range(1, 101)))
+        self.assertNotIn(7, process.reapProcessHandlers)
+
+
+    def test_notReaped(self):
+        """
+        If a process which has exited is still registered after being asked
+        to reap itself, every registered process is asked to reap itself,
+        rather than the same one again and again.
+        """
+        self.waitid.exited.append(7)
+        stuck = process.reapProcessHandlers[7]
+        stuck.waitid = FakeWaitid([])
+        process.reapAllProcesses()
+        self.assertEqual(
+            sorted(self.reaped), sorted([7] + list(range(1, 101))))
+
+
+    def test_withoutWaitid(self):
+        """
+        Without waitid, every registered process is asked to reap itself.
+        """
+        self.patch(process, "_waitid", None)
+        process.reapAllProcesses()
+        self.assertEqual(sorted(self.reaped), list(range(1, 101)))
@@ -0,0 +1,388 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.internet.processpool}.
+"""
+
+from __future__ import division, absolute_import
+
+import errno
+import os
+import sys
+import time
+
+from twisted.trial import unittest
+from twisted.internet import error, interfaces, reactor
+from twisted.internet.defer import (
+    CancelledError, Deferred, gatherResults, inlineCallbacks)
+from twisted.internet.processpool import (
+    ProcessPool, RemoteCallError, WorkerTimeout, _Bytes)
+from twisted.protocols import amp
+
+
+# Functions to call in workers.  They must be importable by name.
+
+def add(a, b=0):
+    return a + b
+
+
+
+def divide(a, b):
+    return a / b
+
+
+
+def getpid():
+    return os.getpid()
+
+
+
+def slowGetpid(seconds):
+    time.sleep(seconds)
+    return os.getpid()
+
+
+
+def loudAdd(a, b):
+    sys.stdout.write("a lot of output " * 100)
+    sys.stdout.flush()
+    return a + b
+
+
+
+def unpicklable():
+    return lambda: None
+
+
+
+def crash():
+    os._exit(3)
+
+
+
+class BytesTests(unittest.TestCase):
+    """
+    Tests for L{_Bytes}, the AMP argument for byte strings of any length.
+    """
+
+    def roundTrip(self, value):
+        argument = _Bytes()
+        strings = amp.AmpBox()
+        argument.toBox(b"value", strings, {b"value": value}, None)
+        for key, chunk in strings.items():
+            self.assertTrue(len(chunk) <= amp.MAX_VALUE_LENGTH)
+        objects = {}
+        argument.fromBox(b"value", strings, objects, None)
+        self.assertEqual(strings, {})
+        return objects[b"value"]
+
+
+    def test_empty(self):
+        """
+        An empty string is encoded as no chunks.
+        """
+        self.assertEqual(self.roundTrip(b""), b"")
+
+
+    def test_long(self):
+        """
+        A string longer than L{amp.MAX_VALUE_LENGTH} is split into chunks
+        which fit, and joined back together.
+        """
+        value = b"0123456789" * (amp.MAX_VALUE_LENGTH // 5 + 1)
+        self.assertEqual(self.roundTrip(value), value)
+
+
+
+class ProcessPoolArgumentTests(unittest.TestCase):
+    """
+    Tests for the arguments of L{ProcessPool}.
+    """
+
+    def test_maxWorkersDefault(self):
+        """
+        If C{maxWorkers} is not given, it is at least one and at least
+        C{minWorkers}.
+        """
+        pool = ProcessPool(minWorkers=3)
+        self.assertTrue(pool.maxWorkers >= 3)
+
+
+    def test_invalid(self):
+        """
+        L{ProcessPool} raises L{ValueError} for impossible limits.
+        """
+        self.assertRaises(ValueError, ProcessPool, maxWorkers=0)
+        self.assertRaises(ValueError, ProcessPool, minWorkers=3, maxWorkers=2)
+        self.assertRaises(ValueError, ProcessPool, minWorkers=-1)
+        self.assertRaises(ValueError, ProcessPool, maxTasksPerWorker=0)
+
+
+    def test_unpicklableCall(self):
+        """
+        A call which cannot be pickled fails at once.
+        """
+        pool = ProcessPool()
+        d = pool.deferToProcess(lambda: None)
+        self.assertFailure(d, Exception)
+        self.assertEqual(len(pool._queue), 0)
+        return d
+
+
+
+class ProcessPoolTests(unittest.TestCase):
+    """
+    Tests for L{ProcessPool}, with real worker processes.
+    """
+    if not interfaces.IReactorProcess.providedBy(reactor):
+        skip = "This reactor does not support processes."
+
+    def makePool(self, **kwargs):
+        """
+        Create and start a pool, and stop it when the test is done.
+        """
+        pool = ProcessPool(**kwargs)
+        pool.startService()
+        self.addCleanup(self.stopPool, pool)
+        return pool
+
+
+    def stopPool(self, pool):
+        if pool.running:
+            return pool.stopService()
+
+
+    @inlineCallbacks
+    def test_result(self):
+        """
+        L{ProcessPool.deferToProcess} calls a function in a worker, and fires
+        with its result.
+        """
+        pool = self.makePool()
+        result = yield pool.deferToProcess(add, 2, b=3)
+        self.assertEqual(result, 5)
+        pid = yield pool.deferToProcess(getpid)
+        self.assertNotEqual(pid, os.getpid())
+
+
+    def test_exception(self):
+        """
+        If the function raises an exception, the L{Deferred} fails with it.
+        """
+        pool = self.makePool()
+        return self.assertFailure(
+            pool.deferToProcess(divide, 1, 0), ZeroDivisionError)
+
+
+    def test_unpicklableResult(self):
+        """
+        If the result cannot be pickled, the L{Deferred} fails with
+        L{RemoteCallError}.
+        """
+        pool = self.makePool()
+        return self.assertFailure(
+            pool.deferToProcess(unpicklable), RemoteCallError)
+
+
+    @inlineCallbacks
+    def test_largeArguments(self):
+        """
+        Arguments and results may be larger than an AMP value.
+        """
+        pool = self.makePool()
+        value = b"x" * (amp.MAX_VALUE_LENGTH * 3)
+        result = yield pool.deferToProcess(add, value, value)
+        self.assertEqual(result, value * 2)
+
+
+    @inlineCallbacks
+    def test_output(self):
+        """
+        What the function writes to standard output does not disturb the
+        responses of the worker.
+        """
+        pool = self.makePool()
+        result = yield pool.deferToProcess(loudAdd, 1, 2)
+        self.assertEqual(result, 3)
+
+
+    @inlineCallbacks
+    def test_minWorkers(self):
+        """
+        Starting the pool starts C{minWorkers} workers.
+        """
+        pool = self.makePool(minWorkers=2, maxWorkers=4)
+        self.assertEqual(len(pool.workers) + pool._starting, 2)
+        yield pool.deferToProcess(add, 1)
+        self.assertEqual(len(pool.workers), 2)
+
+
+    @inlineCallbacks
+    def test_maxWorkers(self):
+        """
+        No more than C{maxWorkers} calls run at once; the rest wait for a
+        worker to be free.
+        """
+        pool = self.makePool(minWorkers=0, maxWorkers=2)
+        calls = [pool.deferToProcess(slowGetpid, 0.1) for i in range(6)]
+        self.assertEqual(len(pool.workers) + pool._starting, 2)
+        self.assertEqual(len(pool._queue), 4)
+        pids = yield gatherResults(calls)
+        self.assertEqual(len(set(pids)), 2)
+
+
+    @inlineCallbacks
+    def test_leastUsedIdleWorker(self):
+        """
+        A call goes to the idle worker which has run the fewest calls.
+        """
+        pool = self.makePool(minWorkers=2, maxWorkers=2)
+        first = yield pool.deferToProcess(getpid)
+        second = yield pool.deferToProcess(getpid)
+        third = yield pool.deferToProcess(getpid)
+        self.assertNotEqual(first, second)
+        self.assertEqual(sorted([worker.tasks for worker in pool.workers]),
+                         [1, 2])
+        self.assertIn(third, (first, second))
+
+
+    @inlineCallbacks
+    def test_maxTasksPerWorker(self):
+        """
+        A worker which has run C{maxTasksPerWorker} calls is replaced by a new
+        one.
+        """
+        pool = self.makePool(minWorkers=1, maxWorkers=1, maxTasksPerWorker=2)
+        pids = []
+        for i in range(5):
+            pid = yield pool.deferToProcess(getpid)
+            pids.append(pid)
+        self.assertEqual(pids[0], pids[1])
+        self.assertEqual(pids[2], pids[3])
+        self.assertEqual(len(set(pids)), 3)
+
+
+    @inlineCallbacks
+    def test_timeout(self):
+        """
+        A call which runs for longer than its timeout fails with
+        L{WorkerTimeout}, and the worker running it is killed and replaced.
+        """
+        pool = self.makePool(minWorkers=1, maxWorkers=1, timeout=0.5)
+        # Only the slow call is given the short timeout of the pool, so that
+        # the others do not fail on a busy machine.
+        before = yield pool.callWithTimeout(None, getpid)
+        yield self.assertFailure(
+            pool.deferToProcess(slowGetpid, 30), WorkerTimeout)
+        after = yield pool.callWithTimeout(None, getpid)
+        self.assertNotEqual(before, after)
+
+
+    @inlineCallbacks
+    def test_callWithTimeout(self):
+        """
+        L{ProcessPool.callWithTimeout} overrides the timeout of the pool for
+        one call.
+        """
+        pool = self.makePool(timeout=0.5)
+        yield self.assertFailure(
+            pool.callWithTimeout(1, slowGetpid, 30), WorkerTimeout)
+        pid = yield pool.callWithTimeout(None, slowGetpid, 1)
+        self.assertNotEqual(pid, os.getpid())
+
+
+    @inlineCallbacks
+    def test_crash(self):
+        """
+        If a worker dies while running a call, the call fails with
+        L{error.ProcessTerminated}, and the worker is replaced.
+        """
+        pool = self.makePool(minWorkers=1, maxWorkers=1)
+        yield self.assertFailure(
+            pool.deferToProcess(crash), error.ProcessTerminated)
+        result = yield pool.deferToProcess(add, 1, 1)
+        self.assertEqual(result, 2)
+
+
+    @inlineCallbacks
+    def test_cancelRunning(self):
+        """
+        Cancelling the L{Deferred} of a running call kills the worker running
+        it.
+        """
+        pool = self.makePool(minWorkers=1, maxWorkers=1)
+        before = yield pool.deferToProcess(getpid)
+        d = pool.deferToProcess(slowGetpid, 30)
+        d.cancel()
+        yield self.assertFailure(d, CancelledError)
+        after = yield pool.deferToProcess(getpid)
+        self.assertNotEqual(before, after)
+
+
+    @inlineCallbacks
+    def test_cancelQueued(self):
+        """
+        Cancelling the L{Deferred} of a call which is waiting for a worker
+        takes it out of the queue.
+        """
+        pool = self.makePool(minWorkers=1, maxWorkers=1)
+        running = pool.deferToProcess(slowGetpid, 0.1)
+        queued = pool.deferToProcess(getpid)
+        self.assertEqual(len(pool._queue), 1)
+        queued.cancel()
+        self.assertEqual(len(pool._queue), 0)
+        yield self.assertFailure(queued, CancelledError)
+        yield running
+
+
+    @inlineCallbacks
+    def test_idleTimeout(self):
+        """
+        Workers beyond C{minWorkers} which stay idle for C{idleTimeout} seconds
+        are ended.
+        """
+        pool = self.makePool(minWorkers=1, maxWorkers=3, idleTimeout=0.1)
+        yield gatherResults(
+            [pool.deferToProcess(slowGetpid, 0.1) for i in range(3)])
+        self.assertEqual(len(pool.workers), 3)
+        d = Deferred()
+        reactor.callLater(0.5, d.callback, None)
+        yield d
+        self.assertEqual(len(pool.workers), 1)
+
+
+    @inlineCallbacks
+    def test_callsBeforeStart(self):
+        """
+        Calls made before the pool is started wait until it is.
+        """
+        pool = ProcessPool()
+        d = pool.deferToProcess(add, 1, 2)
+        self.assertEqual(len(pool._queue), 1)
+        self.assertEqual(pool._starting, 0)
+        pool.startService()
+        self.addCleanup(pool.stopService)
+        result = yield d
+        self.assertEqual(result, 3)
+
+
+    @inlineCallbacks
+    def test_stopService(self):
+        """
+        Stopping the pool lets the calls already made finish, and then ends
+        every worker, firing the L{Deferred} it returns once they have all
+        exited.
+        """
+        pool = ProcessPool(minWorkers=2, maxWorkers=2)
+        pool.startService()
+        calls = [pool.deferToProcess(slowGetpid, 0.1) for i in range(4)]
+        stopped = pool.stopService()
+        pids = yield gatherResults(calls)
+        self.assertEqual(len(set(pids)), 2)
+        yield stopped
+        self.assertEqual(pool.workers, [])
+        for pid in set(pids):
+            # The worker has been reaped, so there is no process to signal.
+            exc = self.assertRaises(OSError, os.kill, pid, 0)
+            self.assertEqual(exc.errno, errno.ESRCH)
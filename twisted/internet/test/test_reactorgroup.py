@@ -0,0 +1,219 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.internet.reactorgroup}.
+"""
+
+from __future__ import division, absolute_import
+
+import threading
+
+from twisted.python import threadable
+from twisted.trial.unittest import TestCase
+from twisted.internet import reactor
+from twisted.internet.defer import Deferred
+from twisted.internet.protocol import (
+    Protocol, ServerFactory, ClientCreator)
+from twisted.internet.reactorgroup import ReactorGroup
+try:
+    from twisted.internet.epollreactor import EPollReactor
+except ImportError:
+    EPollReactor = None
+
+
+
+class ThreadNameProtocol(Protocol):
+    """
+    Sends the name of the thread it was connected in.
+    """
+
+    def connectionMade(self):
+        self.transport.write(threading.current_thread().name.encode("ascii"))
+
+
+
+class ReceivingProtocol(Protocol):
+    """
+    Fires C{received} with the first data it receives.
+    """
+
+    def __init__(self):
+        self.received = Deferred()
+
+
+    def dataReceived(self, data):
+        self.received.callback(data)
+
+
+
+class ChooseMemberTests(TestCase):
+    """
+    Tests for L{ReactorGroup.chooseMember}.
+    """
+
+    def test_roundRobin(self):
+        """
+        By default, L{ReactorGroup.chooseMember} chooses each member in turn.
+        """
+        group = ReactorGroup(3, object, reactor)
+        self.assertEqual(
+            [group.chooseMember() for i in range(5)], [0, 1, 2, 0, 1])
+
+
+    def test_leastConnections(self):
+        """
+        If C{leastConnections} is set, L{ReactorGroup.chooseMember} chooses the
+        member with the fewest connections.
+        """
+        group = ReactorGroup(3, object, reactor, leastConnections=True)
+        group._connections = [2, 0, 1]
+        self.assertEqual(group.chooseMember(), 1)
+
+
+    def test_emptyGroup(self):
+        """
+        L{ReactorGroup} raises L{ValueError} if it is asked for a group with
+        no members.
+        """
+        self.assertRaises(ValueError, ReactorGroup, 0, object, reactor)
+
+
+
+class ReactorGroupTests(TestCase):
+    """
+    Tests for L{ReactorGroup} running L{EPollReactor}s.
+    """
+
+    def startGroup(self, size, **kwargs):
+        """
+        Create and start a L{ReactorGroup}, which is stopped when the test
+        ends.
+        """
+        group = ReactorGroup(size, EPollReactor, reactor, **kwargs)
+        for member in group.members:
+            self.addCleanup(member._poller.close)
+            self.addCleanup(member.waker.connectionLost, None)
+        group.start()
+        self.addCleanup(group.stop)
+        return group
+
+
+    def test_callInReactor(self):
+        """
+        L{ReactorGroup.callInReactor} runs a function in the thread of a
+        member, and returns a L{Deferred} which fires with its result.
+        """
+        group = self.startGroup(2)
+        d = group.callInReactor(
+            group.members[1], lambda: threading.current_thread().name)
+        d.addCallback(self.assertEqual, "ReactorGroup-1")
+        return d
+
+
+    def test_ioThread(self):
+        """
+        The members of a group do not register their threads as the I/O
+        thread.
+        """
+        ioThread = threadable.ioThread
+        group = self.startGroup(1)
+        d = group.callInReactor(group.members[0], threadable.isInIOThread)
+        def called(result):
+            self.assertFalse(result)
+            self.assertEqual(threadable.ioThread, ioThread)
+        return d.addCallback(called)
+
+
+    def test_callInReactorDeferred(self):
+        """
+        If the function run by L{ReactorGroup.callInReactor} returns a
+        L{Deferred}, the L{Deferred} returned by C{callInReactor} fires with
+        its result.
+        """
+        group = self.startGroup(1)
+        member = group.members[0]
+        def later():
+            d = Deferred()
+            member.callLater(0, d.callback, 3)
+            return d
+        d = group.callInReactor(member, later)
+        d.addCallback(self.assertEqual, 3)
+        return d
+
+
+    def test_callInReactorFailure(self):
+        """
+        If the function run by L{ReactorGroup.callInReactor} raises an
+        exception, the L{Deferred} returned by C{callInReactor} fails with it.
+        """
+        group = self.startGroup(1)
+        d = group.callInReactor(group.members[0], lambda: 1 // 0)
+        return self.assertFailure(d, ZeroDivisionError)
+
+
+    def _connect(self, port):
+        """
+        Connect to C{port}, and return a L{Deferred} which fires with the
+        first data received.
+        """
+        d = ClientCreator(reactor, ReceivingProtocol).connectTCP(
+            "127.0.0.1", port.getHost().port)
+        def connected(protocol):
+            self.addCleanup(protocol.transport.loseConnection)
+            return protocol.received
+        return d.addCallback(connected)
+
+
+    def test_listenTCP(self):
+        """
+        The connections accepted by a port created by
+        L{ReactorGroup.listenTCP} are handed to each member in turn.
+        """
+        group = self.startGroup(2)
+        factory = ServerFactory()
+        factory.protocol = ThreadNameProtocol
+        port = group.listenTCP(0, factory, interface="127.0.0.1")
+        self.addCleanup(port.stopListening)
+        d = self._connect(port)
+        d.addCallback(self.assertEqual, b"ReactorGroup-0")
+        d.addCallback(lambda ignored: self._connect(port))
+        d.addCallback(self.assertEqual, b"ReactorGroup-1")
+        return d
+
+
+    def test_listenTCPLeastConnections(self):
+        """
+        If C{leastConnections} is set, the connections accepted by a port
+        created by L{ReactorGroup.listenTCP} are handed to the member with the
+        fewest open connections.
+        """
+        group = self.startGroup(2, leastConnections=True)
+        factory = ServerFactory()
+        factory.protocol = ThreadNameProtocol
+        port = group.listenTCP(0, factory, interface="127.0.0.1")
+        self.addCleanup(port.stopListening)
+        d = self._connect(port)
+        d.addCallback(self.assertEqual, b"ReactorGroup-0")
+        d.addCallback(
+            lambda ignored: self.assertEqual(group._connections, [1, 0]))
+        d.addCallback(lambda ignored: self._connect(port))
+        d.addCallback(self.assertEqual, b"ReactorGroup-1")
+        return d
+
+
+    def test_stop(self):
+        """
+        L{ReactorGroup.stop} returns a L{Deferred} which fires once every
+        member has stopped running.
+        """
+        group = self.startGroup(2)
+        d = group.stop()
+        def stopped(ignored):
+            for member, thread in zip(group.members, group._threads):
+                thread.join()
+                self.assertFalse(member.running)
+        return d.addCallback(stopped)
+
+    if EPollReactor is None:
+        skip = "epoll is not supported in this environment."
@@ -25,7 +25,7 @@ from twisted.python import log
 from twisted.trial.unittest import SkipTest, TestCase
 from twisted.internet.error import (
     ConnectionLost, UserError, ConnectionRefusedError, ConnectionDone,
-    ConnectionAborted, DNSLookupError)
+    ConnectionAborted, DNSLookupError, CannotListenError)
 from twisted.internet.test.connectionmixins import (
     LogObserverMixin, ConnectionTestsMixin, StreamClientTestsMixin,
     findFreePort, ConnectableProtocol, EndpointCreator,
@@ -34,7 +34,7 @@ from twisted.internet.test.reactormixins import (
     ReactorBuilder, needsRunningReactor)
 from twisted.internet.interfaces import (
     ILoggingContext, IConnector, IReactorFDSet, IReactorSocket, IReactorTCP,
-    IResolverSimple, ITLSTransport)
+    IResolverSimple, ITLSTransport, IFileTransport)
 from twisted.internet.address import IPv4Address, IPv6Address
 from twisted.internet.defer import (
     Deferred, DeferredList, maybeDeferred, gatherResults, succeed, fail)
@@ -42,6 +42,7 @@ from twisted.internet.endpoints import TCP4ServerEndpoint, TCP4ClientEndpoint
 from twisted.internet.protocol import ServerFactory, ClientFactory, Protocol
 from twisted.internet.interfaces import (
     IPushProducer, IPullProducer, IHalfCloseableProtocol)
+from twisted.internet import tcp
 from twisted.internet.tcp import Connection, Server, _resolveIPv6
 from twisted.internet.test.test_core import ObjectModelIntegrationMixin
 from twisted.test.test_tcp import MyClientFactory, MyServerFactory
@@ -1244,6 +1245,46 @@ class TCPFDPortTestsBuilder(ReactorBuilder, SocketTCPMixin, TCPPortTestsMixin,
 
 
 
+class TCPReusePortTestsBuilder(ReactorBuilder):
+    """
+    Tests for the C{reusePort} argument of C{listenTCP}, which only
+    L{twisted.internet.posixbase.PosixReactorBase} accepts.
+    """
+    requiredInterfaces = (IReactorFDSet, IReactorTCP)
+
+    if tcp._SO_REUSEPORT is None:
+        skip = "SO_REUSEPORT is not supported on this platform."
+
+    def test_reusePort(self):
+        """
+        Several ports listening with C{reusePort=True} can share a port
+        number.
+        """
+        reactor = self.buildReactor()
+        first = reactor.listenTCP(
+            0, ServerFactory(), interface="127.0.0.1", reusePort=True)
+        portNumber = first.getHost().port
+        second = reactor.listenTCP(
+            portNumber, ServerFactory(), interface="127.0.0.1",
+            reusePort=True)
+        self.assertEqual(second.getHost().port, portNumber)
+        self.assertTrue(second.reusePort)
+
+
+    def test_withoutReusePort(self):
+        """
+        A port listening with C{reusePort=True} does not let a port listening
+        without it use the same port number.
+        """
+        reactor = self.buildReactor()
+        first = reactor.listenTCP(
+            0, ServerFactory(), interface="127.0.0.1", reusePort=True)
+        self.assertRaises(
+            CannotListenError, reactor.listenTCP, first.getHost().port,
+            ServerFactory(), interface="127.0.0.1")
+
+
+
 class StopStartReadingProtocol(Protocol):
     """
     Protocol that pauses and resumes the transport a few times
@@ -1523,6 +1564,45 @@ class TCPConnectionTestsBuilder(ReactorBuilder):
             self, ListenerProtocol(), Client(), TCPCreator())
 
 
+    def test_writeFile(self):
+        """
+        L{IFileTransport.writeFile} sends part of a file over the connection,
+        in order with the data written before and after it.
+        """
+        path = self.mktemp()
+        with open(path, "wb") as f:
+            f.write(b"x" * 100 + b"y" * (2 ** 20) + b"z")
+        fileObject = open(path, "rb")
+        self.addCleanup(fileObject.close)
+        written = []
+
+        class Server(ConnectableProtocol):
+            def connectionMade(self):
+                if not (IFileTransport.providedBy(self.transport) and
+                        self.transport.canWriteFile()):
+                    written.append("unsupported")
+                    self.transport.loseConnection()
+                    return
+                self.transport.write(b"head")
+                d = self.transport.writeFile(fileObject, 100, 2 ** 20)
+                d.addCallback(written.append)
+                self.transport.write(b"tail")
+                self.transport.loseConnection()
+
+        class Client(ConnectableProtocol):
+            received = b""
+            def dataReceived(self, data):
+                self.received += data
+
+        client = Client()
+        runProtocolsWithReactor(self, Server(), client, TCPCreator())
+        if written == ["unsupported"]:
+            raise SkipTest("Transport cannot write files.")
+        self.assertEqual(written, [None])
+        self.assertEqual(
+            client.received, b"head" + b"y" * (2 ** 20) + b"tail")
+
+
 
 class WriteSequenceTestsMixin(object):
     """
@@ -1878,6 +1958,7 @@ globals().update(TCP4ClientTestsBuilder.makeTestCaseClasses())
 globals().update(TCP6ClientTestsBuilder.makeTestCaseClasses())
 globals().update(TCPPortTestsBuilder.makeTestCaseClasses())
 globals().update(TCPFDPortTestsBuilder.makeTestCaseClasses())
+globals().update(TCPReusePortTestsBuilder.makeTestCaseClasses())
 globals().update(TCPConnectionTestsBuilder.makeTestCaseClasses())
 globals().update(TCP4ConnectorTestsBuilder.makeTestCaseClasses())
 globals().update(TCP6ConnectorTestsBuilder.makeTestCaseClasses())
@@ -13,6 +13,7 @@ from twisted.python.runtime import platform
 from twisted.trial.unittest import SkipTest
 from twisted.internet.test.reactormixins import ReactorBuilder
 from twisted.internet.interfaces import IReactorTime, IReactorThreads
+from twisted.internet.timers import TimingWheel
 
 
 class TimeTestsBuilder(ReactorBuilder):
@@ -71,6 +72,30 @@ class TimeTestsBuilder(ReactorBuilder):
         self.assertIn(delayedCall, reactor.getDelayedCalls())
 
 
+    def test_timingWheel(self):
+        """
+        Delayed calls are run in order, and cancelled and rescheduled delayed
+        calls are handled, when the reactor uses a L{TimingWheel}.
+        """
+        reactor = self.buildReactor()
+        if not hasattr(reactor, 'installTimerQueue'):
+            raise SkipTest("%r does not support alternate timer queues" % (
+                    reactor,))
+        pending = reactor.callLater(0.01, lambda: None)
+        reactor.installTimerQueue(TimingWheel())
+        self.assertEqual(reactor.getDelayedCalls(), [pending])
+
+        called = []
+        reactor.callLater(0.03, called.append, 3)
+        reactor.callLater(0.02, called.append, 2)
+        reactor.callLater(0.01, called.append, 1).reset(0.04)
+        reactor.callLater(0.01, called.append, None).cancel()
+        reactor.callLater(0.05, reactor.stop)
+        self.runReactor(reactor)
+        self.assertEqual(called, [2, 3, 1])
+        self.assertEqual(reactor.getDelayedCalls(), [])
+
+
 
 class GlibTimeTestsBuilder(ReactorBuilder):
     """
@@ -0,0 +1,244 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.internet.timers}.
+"""
+
+from __future__ import division, absolute_import
+
+import random
+
+from zope.interface.verify import verifyObject
+
+from twisted.trial.unittest import SynchronousTestCase
+from twisted.internet.base import DelayedCall
+from twisted.internet.timers import ITimerQueue, HeapTimerQueue, TimingWheel
+
+
+
+class TimerQueueTestsMixin(object):
+    """
+    Tests for L{ITimerQueue} implementations.
+
+    Subclasses must define C{createQueue} to return a new, empty timer queue.
+    """
+
+    def setUp(self):
+        self.now = 1000.0
+        self.queue = self.createQueue()
+
+
+    def seconds(self):
+        """
+        The clock used by the L{DelayedCall}s created by L{callAt}.
+        """
+        return self.now
+
+
+    def callAt(self, when):
+        """
+        Create a L{DelayedCall} for the given time and add it to the queue,
+        wired up to the queue the way L{ReactorBase.callLater} does it.
+        """
+        call = DelayedCall(when, lambda: None, (), {},
+                           self.queue.cancel, self.queue.moveSooner,
+                           seconds=self.seconds)
+        self.queue.add(call)
+        return call
+
+
+    def popAll(self, now):
+        """
+        Take all of the calls due at C{now} out of the queue.
+        """
+        self.now = now
+        result = []
+        while True:
+            call = self.queue.popDue(now)
+            if call is None:
+                return result
+            call.called = 1
+            result.append(call)
+
+
+    def test_interface(self):
+        """
+        The queue provides L{ITimerQueue}.
+        """
+        self.assertTrue(verifyObject(ITimerQueue, self.queue))
+
+
+    def test_empty(self):
+        """
+        An empty queue has no next time and nothing to pop.
+        """
+        self.assertEqual(self.queue.nextTime(), None)
+        self.assertEqual(self.queue.popDue(self.now), None)
+        self.assertEqual(self.queue.getDelayedCalls(), [])
+
+
+    def test_popDueInOrder(self):
+        """
+        L{ITimerQueue.popDue} returns the calls which are due, earliest
+        first.
+        """
+        calls = [self.callAt(self.now + delay) for delay in (3, 1, 2)]
+        self.assertEqual(
+            self.popAll(self.now + 5), [calls[1], calls[2], calls[0]])
+        self.assertEqual(self.queue.nextTime(), None)
+
+
+    def test_notDue(self):
+        """
+        L{ITimerQueue.popDue} does not return calls scheduled after the given
+        time.
+        """
+        early = self.callAt(self.now + 1)
+        late = self.callAt(self.now + 10)
+        self.assertEqual(self.popAll(self.now + 5), [early])
+        self.assertEqual(self.queue.getDelayedCalls(), [late])
+        self.assertEqual(self.popAll(self.now + 10), [late])
+
+
+    def test_nextTime(self):
+        """
+        L{ITimerQueue.nextTime} is no later than the time of the earliest call
+        in the queue.
+        """
+        self.callAt(self.now + 20)
+        self.callAt(self.now + 7)
+        nextTime = self.queue.nextTime()
+        self.assertTrue(nextTime <= self.now + 7)
+        self.assertTrue(nextTime > self.now)
+
+
+    def test_cancel(self):
+        """
+        A cancelled call is not returned by L{ITimerQueue.popDue} or
+        L{ITimerQueue.getDelayedCalls}.
+        """
+        first = self.callAt(self.now + 1)
+        second = self.callAt(self.now + 2)
+        first.cancel()
+        self.assertEqual(self.queue.getDelayedCalls(), [second])
+        self.assertEqual(self.popAll(self.now + 3), [second])
+
+
+    def test_moveSooner(self):
+        """
+        A call which is reset to an earlier time is returned by
+        L{ITimerQueue.popDue} at that time.
+        """
+        other = self.callAt(self.now + 5)
+        call = self.callAt(self.now + 10)
+        call.reset(1)
+        self.assertTrue(self.queue.nextTime() <= self.now + 1)
+        self.assertEqual(self.popAll(self.now + 2), [call])
+        self.assertEqual(self.popAll(self.now + 5), [other])
+
+
+    def test_distantCall(self):
+        """
+        A call scheduled very far in the future stays in the queue until it
+        is due.
+        """
+        near = self.callAt(self.now + 1)
+        far = self.callAt(self.now + 2 ** 40)
+        self.assertEqual(self.popAll(self.now + 10), [near])
+        self.assertEqual(self.queue.getDelayedCalls(), [far])
+        self.assertEqual(self.popAll(self.now + 2 ** 40), [far])
+
+
+    def test_callInThePast(self):
+        """
+        A call scheduled before the current time is due immediately.
+        """
+        call = self.callAt(self.now - 10)
+        self.assertEqual(self.popAll(self.now), [call])
+
+
+    def test_randomSchedule(self):
+        """
+        Calls added, moved and cancelled in an arbitrary order are all
+        returned by L{ITimerQueue.popDue} once they are due, in order, and
+        never before.
+        """
+        rand = random.Random(1234)
+        pending = []
+        for step in range(200):
+            for i in range(rand.randrange(10)):
+                pending.append(self.callAt(self.now + rand.expovariate(0.1)))
+            for call in rand.sample(pending, min(3, len(pending))):
+                if rand.random() < 0.5:
+                    call.cancel()
+                    pending.remove(call)
+                else:
+                    call.reset(rand.random() * 5)
+            now = self.now + rand.expovariate(1)
+            popped = self.popAll(now)
+            self.assertEqual(
+                sorted(popped, key=id),
+                sorted([c for c in pending if c.time <= now], key=id))
+            self.assertEqual(
+                [c.time for c in popped], sorted([c.time for c in popped]))
+            pending = [c for c in pending if c not in popped]
+            nextTime = self.queue.nextTime()
+            if pending:
+                self.assertTrue(nextTime <= min([c.time for c in pending]))
+            else:
+                self.assertEqual(nextTime, None)
+
+
+
+class HeapTimerQueueTests(TimerQueueTestsMixin, SynchronousTestCase):
+    """
+    Tests for L{HeapTimerQueue}.
+    """
+
+    def createQueue(self):
+        return HeapTimerQueue()
+
+
+
+class TimingWheelTests(TimerQueueTestsMixin, SynchronousTestCase):
+    """
+    Tests for L{TimingWheel}.
+    """
+
+    def createQueue(self):
+        return TimingWheel()
+
+
+    def test_cancelRemoves(self):
+        """
+        Cancelling a call removes it from the wheel immediately.
+        """
+        call = self.callAt(self.now + 60)
+        self.assertEqual(len(self.queue), 1)
+        call.cancel()
+        self.assertEqual(len(self.queue), 0)
+        self.assertEqual(self.queue.nextTime(), None)
+
+
+    def test_resolution(self):
+        """
+        Calls which fall in the same tick are still returned in order, and
+        only once they are due.
+        """
+        self.queue = TimingWheel(resolution=1.0)
+        second = self.callAt(self.now + 0.75)
+        first = self.callAt(self.now + 0.25)
+        self.assertEqual(self.popAll(self.now + 0.5), [first])
+        self.assertEqual(self.popAll(self.now + 0.8), [second])
+
+
+
+class SmallTimingWheelTests(TimerQueueTestsMixin, SynchronousTestCase):
+    """
+    Tests for a L{TimingWheel} with few, small levels, so that calls often
+    cascade from one level to the next or overflow the wheel.
+    """
+
+    def createQueue(self):
+        return TimingWheel(resolution=0.5, slotBits=2, levels=3)
@@ -20,13 +20,14 @@ from twisted.python.log import ILogContext, err
 from twisted.internet.test.reactormixins import ReactorBuilder
 from twisted.internet.defer import Deferred, maybeDeferred
 from twisted.internet.interfaces import (
-    ILoggingContext, IListeningPort, IReactorUDP, IReactorSocket)
+    ILoggingContext, IListeningPort, IReactorUDP, IReactorSocket,
+    IBatchDatagramProtocol, IBatchUDPTransport)
 from twisted.internet.address import IPv4Address, IPv6Address
 from twisted.internet.protocol import DatagramProtocol
 
 from twisted.internet.test.connectionmixins import (LogObserverMixin,
                                                     findFreePort)
-from twisted.internet import defer, error
+from twisted.internet import defer, error, udp
 from twisted.test.test_udp import Server, GoodClient
 from twisted.trial.unittest import SkipTest
 
@@ -313,6 +314,87 @@ class UDPPortTestsMixin(object):
         self.assertEqual(packet, (b'spam', (cAddr.host, cAddr.port)))
 
 
+    def _receiveBatches(self):
+        """
+        Send datagrams from one port to another with C{writeBatch}, and
+        return the batches received by the other's protocol, which provides
+        L{IBatchDatagramProtocol}.
+        """
+        reactor = self.buildReactor()
+        expected = [b"spam", b"", b"eggs" * 100, b"ham"]
+        batches = []
+
+        @implementer(IBatchDatagramProtocol)
+        class BatchServer(Server):
+            def datagramsReceived(self, datagrams):
+                batches.append(datagrams)
+                if sum(map(len, batches)) == len(expected):
+                    reactor.stop()
+
+        server = BatchServer()
+        serverStarted = server.startedDeferred = defer.Deferred()
+        self.getListeningPort(reactor, server, interface="127.0.0.1")
+
+        client = GoodClient()
+        clientStarted = client.startedDeferred = defer.Deferred()
+        self.getListeningPort(reactor, client, interface="127.0.0.1")
+        cAddr = client.transport.getHost()
+        if not IBatchUDPTransport.providedBy(client.transport):
+            raise SkipTest("%r does not support batches of datagrams" % (
+                    client.transport,))
+
+        def cbStarted(ignored):
+            sAddr = ("127.0.0.1", server.transport.getHost().port)
+            client.transport.writeBatch(
+                [(datagram, sAddr) for datagram in expected])
+
+        d = defer.gatherResults([serverStarted, clientStarted])
+        d.addCallback(cbStarted)
+        d.addErrback(err)
+        self.runReactor(reactor)
+
+        self.assertEqual(server.packets, [])
+        self.assertEqual(
+            [datagram for batch in batches for datagram in batch],
+            [(datagram, (cAddr.host, cAddr.port)) for datagram in expected])
+        return batches
+
+
+    def test_datagramsReceived(self):
+        """
+        Datagrams written with L{IBatchUDPTransport.writeBatch} are delivered
+        in order to the C{datagramsReceived} method of a protocol which
+        provides L{IBatchDatagramProtocol}, instead of to its
+        C{datagramReceived} method.
+        """
+        self._receiveBatches()
+
+
+    def test_datagramsReceivedWithoutMultipleMessages(self):
+        """
+        Datagrams are also batched, and sent by C{writeBatch}, where the
+        C{recvmmsg} and C{sendmmsg} system calls are not available.
+        """
+        self.patch(udp, "_ReceiveArena", None)
+        self.patch(udp, "_sendmmsg", None)
+        self._receiveBatches()
+
+
+    def test_writeBatchInvalidAddress(self):
+        """
+        L{IBatchUDPTransport.writeBatch} raises L{error.InvalidAddressError}
+        when given a hostname instead of an IP address, as C{write} does.
+        """
+        reactor = self.buildReactor()
+        port = self.getListeningPort(reactor, DatagramProtocol())
+        if not IBatchUDPTransport.providedBy(port):
+            raise SkipTest("%r does not support batches of datagrams" % (
+                    port,))
+        self.assertRaises(
+            error.InvalidAddressError,
+            port.writeBatch, [(b'spam', ('example.invalid', 1))])
+
+
     def test_writingToHostnameRaisesInvalidAddressError(self):
         """
         Writing to a hostname instead of an IP address will raise an
@@ -16,6 +16,7 @@ else:
     import queue as Queue
 
 from twisted.python import failure
+from twisted.python.threadpool import ThreadPoolFull
 from twisted.internet import defer
 
 
@@ -40,7 +41,8 @@ def deferToThreadPool(reactor, threadpool, f, *args, **kwargs):
 
     @return: A Deferred which fires a callback with the result of f, or an
         errback with a L{twisted.python.failure.Failure} if f throws an
-        exception.
+        exception, or if the threadpool refuses it with
+        L{twisted.python.threadpool.ThreadPoolFull}.
     """
     d = defer.Deferred()
 
@@ -50,11 +52,42 @@ def deferToThreadPool(reactor, threadpool, f, *args, **kwargs):
         else:
             reactor.callFromThread(d.errback, result)
 
-    threadpool.callInThreadWithCallback(onResult, f, *args, **kwargs)
+    try:
+        threadpool.callInThreadWithCallback(onResult, f, *args, **kwargs)
+    except ThreadPoolFull:
+        return defer.fail()
 
     return d
 
 
+def deferToThreadPoolNoWait(reactor, threadpool, f, *args, **kwargs):
+    """
+    Like L{deferToThreadPool}, but fail at once rather than leave C{f} waiting
+    for a thread if the threadpool is saturated.
+
+    This suits work for which an answer that comes late is no better than
+    none, so that a caller can shed load or fall back to something else as
+    soon as the threadpool falls behind.
+
+    @param reactor: The reactor in whose main thread the Deferred will be
+        invoked.
+
+    @param threadpool: A L{twisted.python.threadpool.ThreadPool}.
+
+    @param f: The function to call.
+    @param *args: positional arguments to pass to f.
+    @param **kwargs: keyword arguments to pass to f.
+
+    @return: A Deferred which fires as described by L{deferToThreadPool}, or
+        which has already failed with
+        L{twisted.python.threadpool.ThreadPoolFull} if every thread in the
+        threadpool is busy and no more may be started.
+    """
+    if threadpool.isSaturated():
+        return defer.fail(ThreadPoolFull())
+    return deferToThreadPool(reactor, threadpool, f, *args, **kwargs)
+
+
 def deferToThread(f, *args, **kwargs):
     """
     Run a function in a thread and return the result as a Deferred.
@@ -123,5 +156,5 @@ def blockingCallFromThread(reactor, f, *a, **kw):
     return result
 
 
-__all__ = ["deferToThread", "deferToThreadPool", "callMultipleInThread",
-           "blockingCallFromThread"]
+__all__ = ["deferToThread", "deferToThreadPool", "deferToThreadPoolNoWait",
+           "callMultipleInThread", "blockingCallFromThread"]
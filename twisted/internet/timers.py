@@ -0,0 +1,534 @@
+# -*- test-case-name: twisted.internet.test.test_timers -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Timer queues which keep track of the pending L{DelayedCall}s of a reactor.
+
+L{twisted.internet.base.ReactorBase} delegates the bookkeeping of its timed
+calls to an L{ITimerQueue} provider.  By default a L{HeapTimerQueue} is used;
+a L{TimingWheel} can be installed instead with
+L{ReactorBase.installTimerQueue
+<twisted.internet.base.ReactorBase.installTimerQueue>} by applications which
+keep a very large number of timers (for example, idle timeouts) alive::
+
+    from twisted.internet import reactor
+    from twisted.internet.timers import TimingWheel
+    reactor.installTimerQueue(TimingWheel())
+"""
+
+from __future__ import division, absolute_import
+
+from heapq import heappush, heappop, heapify
+from math import floor
+
+from zope.interface import Interface, implementer
+
+
+
+class ITimerQueue(Interface):
+    """
+    A collection of L{DelayedCall}s ordered by the time at which they are
+    due to run.
+
+    Timer queues only ever hold calls which are neither cancelled nor called;
+    the reactor is responsible for running the calls it takes out of the
+    queue, and for putting them back if they turn out to have been delayed.
+    """
+
+    def add(call):
+        """
+        Add a call to the queue.
+
+        @param call: The L{DelayedCall} to add.  Its C{delayed_time} must
+            already have been folded into its C{time}.
+        """
+
+
+    def moveSooner(call):
+        """
+        Notify the queue that the C{time} of a call it holds has decreased.
+
+        @param call: A L{DelayedCall} previously passed to L{add}.  Calls
+            which are not in the queue are ignored.
+        """
+
+
+    def cancel(call):
+        """
+        Notify the queue that a call is being cancelled.
+
+        @param call: A L{DelayedCall} previously passed to L{add}.  Calls
+            which are not in the queue are ignored.
+        """
+
+
+    def nextTime():
+        """
+        Determine when the queue will next have a call which is due.
+
+        @return: C{None} if the queue is empty, otherwise a time no later than
+            the C{time} of the earliest call in the queue.  Queues may return
+            an earlier time than that (causing the reactor to wake up early),
+            but never a later one.
+        @rtype: C{float} or C{NoneType}
+        """
+
+
+    def popDue(now):
+        """
+        Remove and return the earliest call whose C{time} is not after
+        C{now}.
+
+        @param now: The current time.
+        @type now: C{float}
+
+        @return: A L{DelayedCall}, or C{None} if no call is due.
+        """
+
+
+    def getDelayedCalls():
+        """
+        @return: A C{list} of all the calls in the queue, in no particular
+            order.
+        """
+
+
+    def __len__():
+        """
+        @return: An upper bound on the number of calls in the queue.
+        """
+
+
+
+@implementer(ITimerQueue)
+class HeapTimerQueue(object):
+    """
+    An L{ITimerQueue} based on a binary heap.
+
+    Adding and removing the earliest call are O(log n).  Moving a call sooner
+    requires a linear search of the heap, and cancelled calls are left in the
+    heap until they reach the top or until enough of them accumulate for the
+    heap to be rebuilt.
+
+    @ivar _heap: The heap of L{DelayedCall}s.
+
+    @ivar _cancellations: The number of cancelled calls (approximately)
+        remaining in C{_heap}.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._cancellations = 0
+
+
+    def __len__(self):
+        return len(self._heap)
+
+
+    def add(self, call):
+        """
+        See L{ITimerQueue.add}.
+        """
+        heappush(self._heap, call)
+
+
+    def moveSooner(self, call):
+        """
+        See L{ITimerQueue.moveSooner}.
+        """
+        # Linear time find: slow.
+        heap = self._heap
+        try:
+            pos = heap.index(call)
+
+            # Move elt up the heap until it rests at the right place.
+            elt = heap[pos]
+            while pos != 0:
+                parent = (pos-1) // 2
+                if heap[parent] <= elt:
+                    break
+                # move parent down
+                heap[pos] = heap[parent]
+                pos = parent
+            heap[pos] = elt
+        except ValueError:
+            # element was not found in heap - oh well...
+            pass
+
+
+    def cancel(self, call):
+        """
+        See L{ITimerQueue.cancel}.
+        """
+        self._cancellations += 1
+
+
+    def nextTime(self):
+        """
+        See L{ITimerQueue.nextTime}.
+        """
+        heap = self._heap
+        while heap and heap[0].cancelled:
+            heappop(heap)
+            self._cancellations -= 1
+        if heap:
+            return heap[0].time
+        return None
+
+
+    def popDue(self, now):
+        """
+        See L{ITimerQueue.popDue}.
+        """
+        heap = self._heap
+        while heap and heap[0].time <= now:
+            call = heappop(heap)
+            if call.cancelled:
+                self._cancellations -= 1
+                continue
+            return call
+
+        if (self._cancellations > 50 and
+             self._cancellations > len(heap) >> 1):
+            self._cancellations = 0
+            self._heap = [x for x in heap if not x.cancelled]
+            heapify(self._heap)
+        return None
+
+
+    def getDelayedCalls(self):
+        """
+        See L{ITimerQueue.getDelayedCalls}.
+        """
+        return [x for x in self._heap if not x.cancelled]
+
+
+
+@implementer(ITimerQueue)
+class TimingWheel(object):
+    """
+    An L{ITimerQueue} based on a hierarchical timing wheel.
+
+    Time is divided into ticks of C{resolution} seconds.  The wheel has
+    C{levels} levels of C{2 ** slotBits} slots each; a slot of the first level
+    covers a single tick and a slot of each following level covers as many
+    ticks as the whole of the level below it.  A call is stored in the lowest
+    level which can represent its due time and is moved to lower levels as
+    the wheel turns.  Calls which are too far in the future for the highest
+    level are kept aside until the wheel has turned far enough.
+
+    Adding, moving and cancelling a call are O(1).  Taking due calls out of
+    the wheel costs O(1) per call, plus a sort of the calls which become due
+    together.
+
+    @ivar _resolution: The length of a tick, in seconds.
+
+    @ivar _tick: The current tick.  Every call in the wheel is due at or after
+        this tick.
+
+    @ivar _wheels: A C{list} of C{levels} C{list}s of slots.  Each slot is a
+        C{set} of L{DelayedCall}s.
+
+    @ivar _counts: A C{list} giving the number of calls in each level.
+
+    @ivar _overflow: A C{set} of calls too far in the future for any level.
+
+    @ivar _locations: A C{dict} mapping each call in the wheel to a two-tuple
+        of its level (C{len(_wheels)} for C{_overflow}) and the C{set} which
+        holds it.
+
+    @ivar _due: A C{list} of calls which were found to be due, in reverse
+        order of their C{time}.
+
+    @ivar _nextTime: A lower bound on the time of the earliest call in the
+        wheel, or C{None} if that needs to be recomputed.
+    """
+
+    def __init__(self, resolution=0.001, slotBits=8, levels=4):
+        """
+        @param resolution: The length of a tick, in seconds.
+        @type resolution: C{float}
+
+        @param slotBits: The base two logarithm of the number of slots in each
+            level of the wheel.
+        @type slotBits: C{int}
+
+        @param levels: The number of levels of the wheel.
+        @type levels: C{int}
+        """
+        self._resolution = resolution
+        self._bits = slotBits
+        self._mask = (1 << slotBits) - 1
+        self._tick = None
+        self._wheels = [[set() for i in range(1 << slotBits)]
+                        for j in range(levels)]
+        self._counts = [0] * levels
+        self._overflow = set()
+        self._locations = {}
+        self._due = []
+        self._nextTime = None
+
+
+    def __len__(self):
+        return len(self._locations) + len(self._due)
+
+
+    def _tickFor(self, when):
+        """
+        @return: The tick during which the time C{when} falls.
+        """
+        return int(floor(when / self._resolution))
+
+
+    def _insert(self, call):
+        """
+        Put a call in the slot matching its C{time}, relative to the current
+        tick.
+        """
+        tick = self._tick
+        expires = self._tickFor(call.time)
+        if expires < tick:
+            expires = tick
+        delta = expires - tick
+        bits = self._bits
+        for level, wheel in enumerate(self._wheels):
+            if delta >> (bits * (level + 1)) == 0:
+                slot = wheel[(expires >> (bits * level)) & self._mask]
+                self._counts[level] += 1
+                break
+        else:
+            level = len(self._wheels)
+            slot = self._overflow
+        slot.add(call)
+        self._locations[call] = (level, slot)
+
+
+    def _remove(self, call):
+        """
+        Take a call out of the slot which holds it, if any.
+
+        @return: C{True} if the call was found, C{False} otherwise.
+        """
+        location = self._locations.pop(call, None)
+        if location is None:
+            return False
+        level, slot = location
+        slot.discard(call)
+        if level < len(self._counts):
+            self._counts[level] -= 1
+        return True
+
+
+    def add(self, call):
+        """
+        See L{ITimerQueue.add}.
+        """
+        if not self._locations:
+            # Nothing in the wheel depends on the current tick, so catch up
+            # with the clock of the call without turning the wheel.
+            tick = self._tickFor(call.seconds())
+            if self._tick is None or tick > self._tick:
+                self._tick = tick
+        self._insert(call)
+        if self._nextTime is not None and call.time < self._nextTime:
+            self._nextTime = call.time
+
+
+    def moveSooner(self, call):
+        """
+        See L{ITimerQueue.moveSooner}.
+        """
+        if self._remove(call):
+            self._insert(call)
+            if self._nextTime is not None and call.time < self._nextTime:
+                self._nextTime = call.time
+
+
+    def cancel(self, call):
+        """
+        See L{ITimerQueue.cancel}.
+        """
+        # The call may also be in _due; popDue skips it there.
+        self._remove(call)
+
+
+    def nextTime(self):
+        """
+        See L{ITimerQueue.nextTime}.
+        """
+        for call in reversed(self._due):
+            if not call.cancelled:
+                return call.time
+        del self._due[:]
+        if not self._locations:
+            return None
+        if self._nextTime is None:
+            self._nextTime = self._computeNextTime()
+        return self._nextTime
+
+
+    def _computeNextTime(self):
+        """
+        Find a lower bound on the time of the earliest call in the wheel by
+        looking for the first non-empty slot of each level.
+        """
+        best = None
+        tick = self._tick
+        bits = self._bits
+        size = self._mask + 1
+        wheel = self._wheels[0]
+        if self._counts[0]:
+            for offset in range(size):
+                slot = wheel[(tick + offset) & self._mask]
+                if slot:
+                    best = min([call.time for call in slot])
+                    break
+        for level in range(1, len(self._wheels)):
+            if not self._counts[level]:
+                continue
+            wheel = self._wheels[level]
+            shift = bits * level
+            block = tick >> shift
+            for offset in range(1, size + 1):
+                start = ((block + offset) << shift) * self._resolution
+                if best is not None and start >= best:
+                    break
+                if wheel[(block + offset) & self._mask]:
+                    best = start
+                    break
+        if self._overflow:
+            earliest = min([call.time for call in self._overflow])
+            if best is None or earliest < best:
+                best = earliest
+        return best
+
+
+    def popDue(self, now):
+        """
+        See L{ITimerQueue.popDue}.
+        """
+        due = self._due
+        while True:
+            while due:
+                call = due.pop()
+                if not call.cancelled:
+                    return call
+            if not self._locations:
+                return None
+            if self._nextTime is not None and now < self._nextTime:
+                return None
+            if not self._collect(now):
+                return None
+
+
+    def _collect(self, now):
+        """
+        Turn the wheel up to the tick of C{now}, moving the calls which are
+        due by then into C{_due}.
+
+        @return: C{True} if any call was found to be due, C{False} otherwise.
+        """
+        bits = self._bits
+        mask = self._mask
+        levels = len(self._wheels)
+        counts = self._counts
+        wheel = self._wheels[0]
+        locations = self._locations
+        due = self._due
+        nowTick = self._tickFor(now)
+        tick = startTick = self._tick
+        while True:
+            slot = wheel[tick & mask]
+            if slot:
+                if tick < nowTick:
+                    ready = list(slot)
+                else:
+                    ready = [call for call in slot if call.time <= now]
+                for call in ready:
+                    slot.discard(call)
+                    del locations[call]
+                counts[0] -= len(ready)
+                due.extend(ready)
+
+            if tick >= nowTick:
+                break
+
+            # Skip ahead to the next tick at which there may be work to do:
+            # the next tick if the first level has any calls, otherwise the
+            # next time a non-empty level cascades into the ones below it.
+            level = 0
+            while level < levels and not counts[level]:
+                level += 1
+            if level == 0:
+                end = min(nowTick, (tick | mask) + 1)
+                tick += 1
+                while tick < end and not wheel[tick & mask]:
+                    tick += 1
+            elif level == levels and not self._overflow:
+                tick = nowTick
+                continue
+            else:
+                shift = bits * level
+                tick = ((tick >> shift) + 1) << shift
+                if level == levels:
+                    # Go straight to the turn of the wheel during which the
+                    # earliest overflowing call falls.
+                    earliest = self._tickFor(
+                        min([call.time for call in self._overflow]))
+                    tick = max(tick, (earliest >> shift) << shift)
+                if tick > nowTick:
+                    tick = nowTick
+                    continue
+            self._tick = tick
+            if tick & mask == 0:
+                self._cascade(tick)
+        self._tick = max(tick, self._tick)
+        if self._tick != startTick or due:
+            self._nextTime = None
+
+        if not due:
+            return False
+        # Calls are handed out from the end of the list.
+        due.sort(key=_callTime, reverse=True)
+        return True
+
+
+    def _cascade(self, tick):
+        """
+        Redistribute the calls of the higher level slots which start at
+        C{tick} into the lower levels.
+        """
+        bits = self._bits
+        for level in range(1, len(self._wheels)):
+            index = (tick >> (bits * level)) & self._mask
+            slot = self._wheels[level][index]
+            if slot:
+                self._wheels[level][index] = set()
+                self._counts[level] -= len(slot)
+                for call in slot:
+                    self._insert(call)
+            if index:
+                break
+        else:
+            if self._overflow:
+                overflow = self._overflow
+                self._overflow = set()
+                for call in overflow:
+                    self._insert(call)
+
+
+    def getDelayedCalls(self):
+        """
+        See L{ITimerQueue.getDelayedCalls}.
+        """
+        return list(self._locations) + [
+            call for call in self._due if not call.cancelled]
+
+
+
+def _callTime(call):
+    """
+    Sort key for L{DelayedCall}s.
+    """
+    return call.time
@@ -52,10 +52,16 @@ from twisted.internet import base, defer, address
 from twisted.python import log, failure
 from twisted.internet import abstract, error, interfaces
 
+try:
+    from twisted.python._mmsg import ReceiveArena as _ReceiveArena
+    from twisted.python._mmsg import sendmmsg as _sendmmsg
+except ImportError:
+    _ReceiveArena = _sendmmsg = None
+
 
 
 @implementer(
-    interfaces.IListeningPort, interfaces.IUDPTransport,
+    interfaces.IListeningPort, interfaces.IBatchUDPTransport,
     interfaces.ISystemHandle)
 class Port(base.BasePort):
     """
@@ -64,6 +70,9 @@ class Port(base.BasePort):
     @ivar maxThroughput: Maximum number of bytes read in one event
         loop iteration.
 
+    @ivar batchSize: Maximum number of datagrams read at once for a protocol
+        providing L{interfaces.IBatchDatagramProtocol}.
+
     @ivar addressFamily: L{socket.AF_INET} or L{socket.AF_INET6}, depending on
         whether this port is listening on an IPv4 address or an IPv6 address.
 
@@ -74,14 +83,24 @@ class Port(base.BasePort):
         was created and initialized outside of the reactor and will be used to
         listen for connections (instead of a new socket being created by this
         L{Port}).
+
+    @ivar _receiveBatches: Whether the protocol provides
+        L{interfaces.IBatchDatagramProtocol}.
+
+    @ivar _arena: C{None}, or the L{twisted.python._mmsg.ReceiveArena} into
+        which batches of datagrams are received with C{recvmmsg}.  It is
+        allocated by the first batched read.
     """
 
     addressFamily = socket.AF_INET
     socketType = socket.SOCK_DGRAM
     maxThroughput = 256 * 1024
+    batchSize = 32
 
     _realPortNumber = None
     _preexistingSocket = None
+    _receiveBatches = False
+    _arena = None
 
     def __init__(self, port, proto, interface='', maxPacketSize=8192, reactor=None):
         """
@@ -211,6 +230,8 @@ class Port(base.BasePort):
 
 
     def _connectToProtocol(self):
+        self._receiveBatches = interfaces.IBatchDatagramProtocol.providedBy(
+            self.protocol)
         self.protocol.makeConnection(self)
         self.startReading()
 
@@ -219,6 +240,8 @@ class Port(base.BasePort):
         """
         Called when my socket is ready for reading.
         """
+        if self._receiveBatches:
+            return self._doReadBatches()
         read = 0
         while read < self.maxThroughput:
             try:
@@ -248,6 +271,66 @@ class Port(base.BasePort):
                     log.err()
 
 
+    def _doReadBatches(self):
+        """
+        Read datagrams in batches of up to C{batchSize}, and deliver each batch
+        to the protocol's C{datagramsReceived} method.
+        """
+        read = 0
+        while read < self.maxThroughput:
+            datagrams = []
+            try:
+                self._receiveBatch(datagrams)
+            except socket.error as se:
+                readError = se
+            else:
+                readError = None
+            if datagrams:
+                for data, addr in datagrams:
+                    read += len(data)
+                try:
+                    self.protocol.datagramsReceived(datagrams)
+                except:
+                    log.err()
+            if readError is None:
+                if len(datagrams) < self.batchSize:
+                    # The socket has no more datagrams waiting.
+                    return
+                continue
+            no = readError.args[0]
+            if no in _sockErrReadIgnore:
+                return
+            if no in _sockErrReadRefuse:
+                if self._connectedAddr:
+                    self.protocol.connectionRefused()
+                return
+            raise readError
+
+
+    def _receiveBatch(self, datagrams):
+        """
+        Receive up to C{batchSize} datagrams, with C{recvmmsg} if it is
+        available or one C{recvfrom} call at a time if it is not.
+
+        @param datagrams: A C{list} to which the C{(data, addr)} tuples of the
+            datagrams received are appended.  Datagrams received before an
+            error are appended before it is raised.
+
+        @raise socket.error: If reading from the socket fails.
+        """
+        if _ReceiveArena is not None:
+            if self._arena is None:
+                self._arena = _ReceiveArena(self.batchSize, self.maxPacketSize)
+            datagrams.extend(self._arena.receive(self.socket.fileno()))
+            return
+        while len(datagrams) < self.batchSize:
+            data, addr = self.socket.recvfrom(self.maxPacketSize)
+            if self.addressFamily == socket.AF_INET6:
+                # Reduce the address to (host, port), as in doRead.
+                addr = addr[:2]
+            datagrams.append((data, addr))
+
+
     def write(self, datagram, addr=None):
         """
         Write a datagram.
@@ -275,22 +358,7 @@ class Port(base.BasePort):
                 else:
                     raise
         else:
-            assert addr != None
-            if (not abstract.isIPAddress(addr[0])
-                    and not abstract.isIPv6Address(addr[0])
-                    and addr[0] != "<broadcast>"):
-                raise error.InvalidAddressError(
-                    addr[0],
-                    "write() only accepts IP addresses, not hostnames")
-            if ((abstract.isIPAddress(addr[0]) or addr[0] == "<broadcast>")
-                    and self.addressFamily == socket.AF_INET6):
-                raise error.InvalidAddressError(
-                    addr[0],
-                    "IPv6 port write() called with IPv4 or broadcast address")
-            if (abstract.isIPv6Address(addr[0])
-                    and self.addressFamily == socket.AF_INET):
-                raise error.InvalidAddressError(
-                    addr[0], "IPv4 port write() called with IPv6 address")
+            self._checkAddress(addr)
             try:
                 return self.socket.sendto(datagram, addr)
             except socket.error as se:
@@ -307,6 +375,65 @@ class Port(base.BasePort):
                 else:
                     raise
 
+
+    def _checkAddress(self, addr):
+        """
+        Check that a datagram can be written to an address.
+
+        @param addr: The address passed to L{write} when not connected.
+
+        @raise error.InvalidAddressError: If C{addr} does not have an IP
+            address of this port's address family.
+        """
+        assert addr != None
+        if (not abstract.isIPAddress(addr[0])
+                and not abstract.isIPv6Address(addr[0])
+                and addr[0] != "<broadcast>"):
+            raise error.InvalidAddressError(
+                addr[0],
+                "write() only accepts IP addresses, not hostnames")
+        if ((abstract.isIPAddress(addr[0]) or addr[0] == "<broadcast>")
+                and self.addressFamily == socket.AF_INET6):
+            raise error.InvalidAddressError(
+                addr[0],
+                "IPv6 port write() called with IPv4 or broadcast address")
+        if (abstract.isIPv6Address(addr[0])
+                and self.addressFamily == socket.AF_INET):
+            raise error.InvalidAddressError(
+                addr[0], "IPv4 port write() called with IPv6 address")
+
+
+    def writeBatch(self, datagrams):
+        """
+        Write several datagrams, with one C{sendmmsg} call where it is
+        available.
+
+        @see: L{interfaces.IBatchUDPTransport.writeBatch}
+        """
+        if _sendmmsg is None:
+            for datagram, addr in datagrams:
+                self.write(datagram, addr)
+            return
+        datagrams = list(datagrams)
+        for i, (datagram, addr) in enumerate(datagrams):
+            if self._connectedAddr:
+                assert addr in (None, self._connectedAddr)
+                datagrams[i] = (datagram, None)
+            else:
+                self._checkAddress(addr)
+        fd = self.socket.fileno()
+        sent = 0
+        while sent < len(datagrams):
+            try:
+                sent += _sendmmsg(fd, self.addressFamily, datagrams[sent:])
+            except socket.error:
+                # Let write handle the error the first unsent datagram causes,
+                # in the same way as if it had been written by itself.
+                datagram, addr = datagrams[sent]
+                self.write(datagram, addr or self._connectedAddr)
+                sent += 1
+
+
     def writeSequence(self, seq, addr):
         self.write("".join(seq), addr)
 
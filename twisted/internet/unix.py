@@ -64,6 +64,10 @@ class _SendmsgMixin(object):
 
     _writeSomeDataBase = None
     _fileDescriptorBufferSize = 64
+    # File descriptors are sent along with the data given to writeSomeData.
+    _writeSomeVectors = None
+    # doRead and writeSomeData do not record when the socket would block.
+    _edgeTriggerable = False
 
     def __init__(self):
         self._sendmsgQueue = []
@@ -156,6 +160,12 @@ class _SendmsgMixin(object):
         connection is not lost through an error in the underlying recvmsg(),
         this function will return the result of the dataReceived call.
         """
+        if self.protocol is not self._readIntoProtocol:
+            self._readIntoProtocol = self.protocol
+            self._readInto = self._canReadInto(self.protocol)
+        if self._readInto:
+            return self._doReadInto()
+
         try:
             data, flags, ancillary = untilConcludes(
                 sendmsg.recv1msg, self.socket.fileno(), 0, self.bufferSize)
@@ -182,6 +192,23 @@ class _SendmsgMixin(object):
 
         return self._dataReceived(data)
 
+
+    def _canReadInto(self, protocol):
+        """
+        Determine whether data can be read directly into the buffer of a
+        protocol.
+
+        Reading into a buffer does not receive file descriptors, so this is
+        only done for protocols which do not want to receive any.  (Any file
+        descriptors sent to them are discarded by the kernel.)
+
+        @return: C{True} if C{protocol} provides
+            L{interfaces.IBufferedProtocol} and does not provide
+            L{interfaces.IFileDescriptorReceiver}, C{False} otherwise.
+        """
+        return (interfaces.IBufferedProtocol.providedBy(protocol) and
+                not interfaces.IFileDescriptorReceiver.providedBy(protocol))
+
 if sendmsg is None:
     class _SendmsgMixin(object):
         """
@@ -2178,6 +2178,18 @@ class BinaryBoxProtocol(StatefulStringProtocol, Int16StringReceiver,
         return Int16StringReceiver.dataReceived(self, data)
 
 
+    def bufferUpdated(self, nbytes):
+        """
+        Parse data read into the buffer from L{getBuffer} as L{AmpBox}es, or
+        relay it to our nested protocol.
+        """
+        if self._justStartedTLS or self.innerProtocol is not None:
+            self.dataReceived(self._takeReceived(nbytes))
+            return
+        self._bufferEnd += nbytes
+        self._parseBuffer()
+
+
     def connectionLost(self, reason):
         """
         The connection was lost; notify any nested protocol.
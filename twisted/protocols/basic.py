@@ -11,7 +11,7 @@ from __future__ import absolute_import, division
 
 # System imports
 import re
-from struct import pack, unpack, calcsize
+from struct import pack, unpack, unpack_from, calcsize
 from io import BytesIO
 import math
 
@@ -674,20 +674,47 @@ class _RecvdCompatHack(object):
     the default __set__ behavior in both new-style and old-style subclasses.
     """
     def __get__(self, oself, type=None):
-        return oself._unprocessed[oself._compatibilityOffset:]
+        unprocessed = oself._unprocessed[oself._compatibilityOffset:]
+        if oself._bufferStart != oself._bufferEnd:
+            unprocessed += memoryview(oself._buffer)[
+                oself._bufferStart:oself._bufferEnd].tobytes()
+        return unprocessed
 
 
 
+@implementer(interfaces.IBufferedProtocol)
 class IntNStringReceiver(protocol.Protocol, _PauseableMixin):
     """
     Generic class for length prefixed protocols.
 
+    Transports which support L{interfaces.IBufferedProtocol} read data for this
+    protocol straight into C{_buffer}, where it is parsed without being copied
+    until each complete string is extracted.  Data delivered to
+    L{dataReceived} is handled as before, by slicing C{_unprocessed}.  At most
+    one of the two holds unparsed data at any time.
+
+    C{_buffer} only grows as far as the string being received needs, and is
+    dropped once everything in it has been parsed, so that an idle connection
+    does not keep one.
+
     @ivar _unprocessed: bytes received, but not yet broken up into messages /
         sent to stringReceived.  _compatibilityOffset must be updated when this
         value is updated so that the C{recvd} attribute can be generated
         correctly.
     @type _unprocessed: C{bytes}
 
+    @ivar _buffer: The buffer handed out by L{getBuffer}, allocated when
+        needed, or C{None} when it holds no unparsed data.
+    @type _buffer: C{bytearray}
+
+    @ivar _bufferStart: The offset within C{_buffer} of the first byte not
+        yet parsed.
+    @type _bufferStart: C{int}
+
+    @ivar _bufferEnd: The offset within C{_buffer} just past the last byte
+        received.
+    @type _bufferEnd: C{int}
+
     @ivar structFormat: format used for struct packing/unpacking. Define it in
         subclass.
     @type structFormat: C{str}
@@ -704,6 +731,9 @@ class IntNStringReceiver(protocol.Protocol, _PauseableMixin):
     MAX_LENGTH = 99999
     _unprocessed = b""
     _compatibilityOffset = 0
+    _buffer = None
+    _bufferStart = 0
+    _bufferEnd = 0
 
     # Backwards compatibility support for applications which directly touch the
     # "internal" parse buffer.
@@ -736,6 +766,15 @@ class IntNStringReceiver(protocol.Protocol, _PauseableMixin):
         """
         Convert int prefixed strings into calls to stringReceived.
         """
+        if self._bufferStart != self._bufferEnd:
+            # Earlier data was read into _buffer and is still waiting there;
+            # this data has to go after it.
+            end = self._reserve(len(data))
+            self._buffer[end:end + len(data)] = data
+            self._bufferEnd += len(data)
+            self._parseBuffer()
+            return
+
         # Try to minimize string copying (via slices) by keeping one buffer
         # containing all the data we have so far and a separate offset into that
         # buffer.
@@ -782,6 +821,144 @@ class IntNStringReceiver(protocol.Protocol, _PauseableMixin):
         self._compatibilityOffset = 0
 
 
+    def _reserve(self, count):
+        """
+        Make room for at least C{count} more bytes at the end of C{_buffer},
+        moving any data left over from L{dataReceived} into it.
+
+        @return: The offset within C{_buffer} at which to put new data.
+        """
+        if self._buffer is None:
+            self._buffer = bytearray(count)
+        unprocessed = self._unprocessed[self._compatibilityOffset:]
+        if unprocessed:
+            self._unprocessed = b""
+            self._compatibilityOffset = 0
+            count += len(unprocessed)
+
+        buf = self._buffer
+        start, end = self._bufferStart, self._bufferEnd
+        if len(buf) - end < count:
+            # Move the unparsed data to the front of the buffer, and grow the
+            # buffer if that is not enough.
+            pending = end - start
+            if start:
+                buf[:pending] = buf[start:end]
+                start, end = 0, pending
+            if len(buf) - end < count:
+                buf.extend(bytearray(count - (len(buf) - end)))
+            self._bufferStart, self._bufferEnd = start, end
+
+        if unprocessed:
+            buf[end:end + len(unprocessed)] = unprocessed
+            end = self._bufferEnd = end + len(unprocessed)
+        return end
+
+
+    def getBuffer(self, sizeHint):
+        """
+        Get the buffer into which to read the next data.
+
+        See L{interfaces.IBufferedProtocol.getBuffer}.
+        """
+        if self._bufferStart == self._bufferEnd and not self._unprocessed:
+            self._bufferStart = self._bufferEnd = 0
+        pending = self._bufferEnd - self._bufferStart
+        if pending >= self.prefixLength:
+            # Only make room for the rest of the string being received, so
+            # that the buffer is no bigger than the longest string.
+            length, = unpack_from(
+                self.structFormat, self._buffer, self._bufferStart)
+            if pending < self.prefixLength + length <= (
+                    self.prefixLength + self.MAX_LENGTH):
+                sizeHint = self.prefixLength + length - pending
+        end = self._reserve(sizeHint)
+        return memoryview(self._buffer)[end:]
+
+
+    def bufferUpdated(self, nbytes):
+        """
+        Parse data read into the buffer returned by L{getBuffer}.
+
+        See L{interfaces.IBufferedProtocol.bufferUpdated}.
+        """
+        if (getattr(self.dataReceived, '__func__', None) is not
+                IntNStringReceiver.__dict__['dataReceived']):
+            # A subclass wants to see the data in dataReceived.
+            self.dataReceived(self._takeReceived(nbytes))
+            self._releaseBuffer()
+            return
+        self._bufferEnd += nbytes
+        self._parseBuffer()
+
+
+    def _takeReceived(self, nbytes):
+        """
+        Copy out data read into the buffer returned by L{getBuffer}, without
+        adding it to the data to be parsed.
+
+        @return: The data.
+        @rtype: C{bytes}
+        """
+        end = self._bufferEnd
+        return memoryview(self._buffer)[end:end + nbytes].tobytes()
+
+
+    def _parseBuffer(self):
+        """
+        Convert int prefixed strings in C{_buffer} into calls to
+        stringReceived.
+        """
+        buf = self._buffer
+        start = self._bufferStart
+        prefixLength = self.prefixLength
+        fmt = self.structFormat
+
+        while self._bufferEnd - start >= prefixLength and not self.paused:
+            length, = unpack_from(fmt, buf, start)
+            if length > self.MAX_LENGTH:
+                self._bufferStart = start
+                self.lengthLimitExceeded(length)
+                return
+            messageStart = start + prefixLength
+            messageEnd = messageStart + length
+            if self._bufferEnd < messageEnd:
+                break
+
+            packet = memoryview(buf)[messageStart:messageEnd].tobytes()
+            self._bufferStart = messageEnd
+            self.stringReceived(packet)
+
+            # As in dataReceived, honour writes to the "recvd" attribute.
+            if 'recvd' in self.__dict__:
+                alldata = self.__dict__.pop('recvd')
+                self._bufferStart = self._bufferEnd = 0
+                if alldata:
+                    if self._buffer is None:
+                        self._buffer = bytearray()
+                    self._buffer[:len(alldata)] = alldata
+                    self._bufferEnd = len(alldata)
+
+            # stringReceived may have parsed more of the buffer itself, for
+            # example by resuming this protocol, and so dropped it.
+            buf = self._buffer
+            if buf is None:
+                return
+            start = self._bufferStart
+
+        self._bufferStart = start
+        self._releaseBuffer()
+
+
+    def _releaseBuffer(self):
+        """
+        Drop C{_buffer} if all of the data in it has been parsed.
+        """
+        if self._bufferStart == self._bufferEnd:
+            self._buffer = None
+            self._bufferStart = self._bufferEnd = 0
+
+
     def sendString(self, string):
         """
         Send a prefixed string to the other end of the connection.
@@ -18,7 +18,7 @@ from zope.interface import directlyProvides, providedBy
 # twisted imports
 from twisted.internet.protocol import ServerFactory, Protocol, ClientFactory
 from twisted.internet import error
-from twisted.internet.interfaces import ILoggingContext
+from twisted.internet.interfaces import ILoggingContext, IFileTransport
 from twisted.python import log
 
 
@@ -68,8 +68,12 @@ class ProtocolWrapper(Protocol):
         When a connection is made, register this wrapper with its factory,
         save the real transport, and connect the wrapped protocol to this
         L{ProtocolWrapper} to intercept any transport calls it makes.
+
+        L{IFileTransport} is not passed on: files written with it would go
+        straight to the real transport, around whatever this wrapper does with
+        the data given to L{write}.
         """
-        directlyProvides(self, providedBy(transport))
+        directlyProvides(self, providedBy(transport) - IFileTransport)
         Protocol.makeConnection(self, transport)
         self.factory.registerProtocol(self)
         self.wrappedProtocol.makeConnection(self)
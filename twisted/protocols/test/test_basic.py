@@ -17,7 +17,7 @@ from twisted.python.compat import _PY3, iterbytes
 from twisted.trial import unittest
 from twisted.protocols import basic
 from twisted.internet import protocol, error, task
-from twisted.internet.interfaces import IProducer
+from twisted.internet.interfaces import IProducer, IBufferedProtocol
 from twisted.test import proto_helpers
 
 _PY3NEWSTYLESKIP = "All classes are new style on Python 3."
@@ -959,6 +959,180 @@ class RecvdAttributeMixin(object):
 
 
 
+class BufferedReceiverMixin(object):
+    """
+    Mixin defining tests for the L{IBufferedProtocol} implementation of
+    string receiving protocols, to be combined with L{IntNTestCaseMixin} on a
+    L{TestCase} subclass.
+    """
+
+    def makeMessage(self, protocol, data):
+        """
+        Return C{data} prefixed with message length in C{protocol.structFormat}
+        form.
+        """
+        return struct.pack(protocol.structFormat, len(data)) + data
+
+
+    def bufferReceived(self, protocol, data, sizeHint=16):
+        """
+        Deliver C{data} to C{protocol} the way a transport supporting
+        L{IBufferedProtocol} would, C{sizeHint} bytes at a time.
+        """
+        while data:
+            buf = protocol.getBuffer(sizeHint)
+            chunk = data[:min(sizeHint, len(buf))]
+            buf[:len(chunk)] = chunk
+            del buf
+            data = data[len(chunk):]
+            protocol.bufferUpdated(len(chunk))
+
+
+    def test_interface(self):
+        """
+        The protocol provides L{IBufferedProtocol}.
+        """
+        self.assertTrue(verifyObject(IBufferedProtocol, self.getProtocol()))
+
+
+    def test_bufferedReceive(self):
+        """
+        Strings read into the buffer from L{IntNStringReceiver.getBuffer} are
+        delivered to C{stringReceived}, however the data is split up.
+        """
+        r = self.getProtocol()
+        data = b"".join([self.makeMessage(r, s) for s in self.strings])
+        for sizeHint in [1, 2, 3, len(data)]:
+            r = self.getProtocol()
+            self.bufferReceived(r, data * 3, sizeHint)
+            self.assertEqual(r.received, self.strings * 3)
+
+
+    def test_bufferGrows(self):
+        """
+        A string longer than the buffer first allocated is accumulated until
+        it is complete.
+        """
+        r = self.getProtocol()
+        payload = b"x" * 40
+        self.bufferReceived(r, self.makeMessage(r, payload), 2)
+        self.assertEqual(r.received, [payload])
+
+
+    def test_bufferSizedToString(self):
+        """
+        While a string is partially received, the buffer grows only as far as
+        that string needs.
+        """
+        r = self.getProtocol()
+        payload = b"x" * 40
+        message = self.makeMessage(r, payload)
+        self.bufferReceived(r, message[:-1], 8)
+        self.assertEqual(len(r._buffer), len(message))
+
+
+    def test_bufferReleased(self):
+        """
+        Once every complete string in the buffer has been delivered, the
+        buffer is dropped rather than kept for the next read.
+        """
+        r = self.getProtocol()
+        self.bufferReceived(r, self.makeMessage(r, b"x" * 40), 8)
+        self.assertEqual(r.received, [b"x" * 40])
+        self.assertIsNone(r._buffer)
+
+
+    def test_mixed(self):
+        """
+        Data delivered to C{dataReceived} and data read into the buffer are
+        parsed in the order in which they arrive.
+        """
+        r = self.getProtocol()
+        data = b"".join([self.makeMessage(r, s) for s in self.strings])
+        middle = len(data) // 2
+        r.dataReceived(data[:middle])
+        self.bufferReceived(r, data[middle:], 3)
+        self.bufferReceived(r, data[:middle], 3)
+        r.dataReceived(data[middle:])
+        self.assertEqual(r.received, self.strings * 2)
+
+
+    def test_pauseResume(self):
+        """
+        A protocol paused while data is waiting in the buffer delivers the
+        remaining strings when it is resumed.
+        """
+        r = self.getProtocol()
+        def stringReceived(receivedString):
+            r.received.append(receivedString)
+            r.pauseProducing()
+        r.stringReceived = stringReceived
+        data = b"".join([self.makeMessage(r, s) for s in self.strings])
+        self.bufferReceived(r, data, len(data))
+        self.assertEqual(r.received, self.strings[:1])
+        r.resumeProducing()
+        self.assertEqual(r.received, self.strings[:2])
+
+
+    def test_bufferedRecvd(self):
+        """
+        In stringReceived, C{recvd} contains the data read into the buffer
+        which is not part of the current message, and messages are parsed from
+        a new value assigned to it.
+        """
+        r = self.getProtocol()
+        recvd = []
+        def stringReceived(receivedString):
+            recvd.append(r.recvd)
+            r.received.append(receivedString)
+            if len(r.received) == 1:
+                r.recvd = self.makeMessage(r, b"c")
+        r.stringReceived = stringReceived
+        incomplete = self.makeMessage(r, b"bbb")[:-1]
+        data = self.makeMessage(r, b"a") + incomplete
+        self.bufferReceived(r, data, len(data))
+        self.assertEqual(recvd, [incomplete, b""])
+        self.assertEqual(r.received, [b"a", b"c"])
+
+
+    def test_bufferedLengthLimitExceeded(self):
+        """
+        When a length prefix greater than C{MAX_LENGTH} is read into the
+        buffer, C{lengthLimitExceeded} is called and C{recvd} contains the
+        unprocessed data.
+        """
+        r = self.getProtocol()
+        r.MAX_LENGTH = 5
+        result = []
+        def lengthLimitExceeded(length):
+            result.append((length, r.recvd))
+        r.lengthLimitExceeded = lengthLimitExceeded
+        message = self.makeMessage(r, b"x" * 6)
+        self.bufferReceived(r, message, len(message))
+        self.assertEqual(result, [(6, message)])
+        self.assertEqual(r.received, [])
+
+
+    def test_dataReceivedOverridden(self):
+        """
+        If a subclass overrides C{dataReceived}, data read into the buffer is
+        passed to it.
+        """
+        received = []
+        class Receiver(self.protocol):
+            def dataReceived(self, data):
+                received.append(data)
+                self.protocol.dataReceived(self, data)
+        Receiver.protocol = self.protocol
+        r = Receiver()
+        r.makeConnection(proto_helpers.StringTransport())
+        data = b"".join([self.makeMessage(r, s) for s in self.strings])
+        self.bufferReceived(r, data, 4)
+        self.assertEqual(b"".join(received), data)
+        self.assertEqual(r.received, self.strings)
+
+
+
 class TestInt32(TestMixin, basic.Int32StringReceiver):
     """
     A L{basic.Int32StringReceiver} storing received strings in an array.
@@ -968,7 +1142,8 @@ class TestInt32(TestMixin, basic.Int32StringReceiver):
 
 
 
-class Int32TestCase(unittest.SynchronousTestCase, IntNTestCaseMixin, RecvdAttributeMixin):
+class Int32TestCase(unittest.SynchronousTestCase, IntNTestCaseMixin,
+                  RecvdAttributeMixin, BufferedReceiverMixin):
     """
     Test case for int32-prefixed protocol
     """
@@ -998,7 +1173,8 @@ class TestInt16(TestMixin, basic.Int16StringReceiver):
 
 
 
-class Int16TestCase(unittest.SynchronousTestCase, IntNTestCaseMixin, RecvdAttributeMixin):
+class Int16TestCase(unittest.SynchronousTestCase, IntNTestCaseMixin,
+                  RecvdAttributeMixin, BufferedReceiverMixin):
     """
     Test case for int16-prefixed protocol
     """
@@ -1056,7 +1232,8 @@ class TestInt8(TestMixin, basic.Int8StringReceiver):
 
 
 
-class Int8TestCase(unittest.SynchronousTestCase, IntNTestCaseMixin, RecvdAttributeMixin):
+class Int8TestCase(unittest.SynchronousTestCase, IntNTestCaseMixin,
+                  RecvdAttributeMixin, BufferedReceiverMixin):
     """
     Test case for int8-prefixed protocol
     """
@@ -8,7 +8,7 @@ Tests for L{twisted.protocols.tls}.
 from __future__ import division, absolute_import
 
 from zope.interface.verify import verifyObject
-from zope.interface import Interface, directlyProvides
+from zope.interface import Interface, directlyProvides, implementer
 
 from twisted.python.compat import intToBytes, iterbytes
 try:
@@ -23,7 +23,7 @@ else:
     from OpenSSL.crypto import X509Type
     from OpenSSL.SSL import (TLSv1_METHOD, Error, Context, ConnectionType,
                              WantReadError)
-    from twisted.internet.ssl import PrivateCertificate
+    from twisted.internet.ssl import PrivateCertificate, CertificateOptions
     from twisted.test.ssl_helpers import (ClientTLSContext, ServerTLSContext,
                                           certPath)
 
@@ -31,13 +31,13 @@ from twisted.python.filepath import FilePath
 from twisted.python.failure import Failure
 from twisted.python import log
 from twisted.internet.interfaces import ISystemHandle, ISSLTransport
-from twisted.internet.interfaces import IPushProducer
+from twisted.internet.interfaces import IPushProducer, IFileTransport
 from twisted.internet.error import ConnectionDone, ConnectionLost
 from twisted.internet.defer import Deferred, gatherResults
 from twisted.internet.protocol import Protocol, ClientFactory, ServerFactory
 from twisted.internet.task import TaskStopped
 from twisted.protocols.loopback import loopbackAsync, collapsingPumpPolicy
-from twisted.trial.unittest import TestCase
+from twisted.trial.unittest import SkipTest, TestCase
 from twisted.test.test_tcp import ConnectionLostNotifyingProtocol
 from twisted.test.proto_helpers import StringTransport
 
@@ -237,6 +237,29 @@ class TLSMemoryBIOTests(TestCase):
         self.assertTrue(ITransport.providedBy(tlsProtocol))
 
 
+    def test_wrappedFileTransport(self):
+        """
+        L{TLSMemoryBIOProtocol} instances do not provide L{IFileTransport},
+        even if the transport they wrap does, since files written with it
+        would be sent without being encrypted.
+        """
+        @implementer(IFileTransport)
+        class FileTransport(object):
+            def write(self, bytes):
+                pass
+
+        serverFactory = ServerFactory()
+        serverFactory.protocol = Protocol
+        wrapperFactory = TLSMemoryBIOFactory(
+            ServerTLSContext(), False, serverFactory)
+
+        tlsProtocol = wrapperFactory.buildProtocol(None)
+        tlsProtocol.makeConnection(FileTransport())
+        self.assertFalse(IFileTransport.providedBy(tlsProtocol))
+        self.assertFalse(
+            IFileTransport.providedBy(tlsProtocol.wrappedProtocol.transport))
+
+
     def test_getHandle(self):
         """
         L{TLSMemoryBIOProtocol.getHandle} returns the L{OpenSSL.SSL.Connection}
@@ -409,6 +432,69 @@ class TLSMemoryBIOTests(TestCase):
         return handshakeDeferred
 
 
+    def negotiateProtocols(self, serverProtocols, clientProtocols):
+        """
+        Connect a client and a server which offer some application protocols,
+        and return a L{Deferred} which fires with the protocols each of them
+        found was agreed on.
+        """
+        certificate = PrivateCertificate.loadPEM(
+            FilePath(certPath).getContent())
+
+        received = Deferred()
+        class Receiver(Protocol):
+            def dataReceived(self, data):
+                received.callback(None)
+
+        class Sender(Protocol):
+            def connectionMade(self):
+                self.transport.write(b"x")
+
+        clientFactory = ClientFactory()
+        clientFactory.protocol = Receiver
+        sslClientProtocol = TLSMemoryBIOFactory(
+            CertificateOptions(acceptableProtocols=clientProtocols), True,
+            clientFactory).buildProtocol(None)
+
+        serverFactory = ServerFactory()
+        serverFactory.protocol = Sender
+        sslServerProtocol = TLSMemoryBIOFactory(
+            CertificateOptions(
+                privateKey=certificate.privateKey.original,
+                certificate=certificate.original,
+                acceptableProtocols=serverProtocols), False,
+            serverFactory).buildProtocol(None)
+
+        loopbackAsync(sslServerProtocol, sslClientProtocol)
+        return received.addCallback(
+            lambda ignored: (sslServerProtocol.getNegotiatedProtocol(),
+                             sslClientProtocol.getNegotiatedProtocol()))
+
+
+    def test_getNegotiatedProtocol(self):
+        """
+        L{TLSMemoryBIOProtocol.getNegotiatedProtocol} returns the most
+        preferred application protocol of the server which the client offered.
+        """
+        if not (hasattr(Context, "set_alpn_select_callback") or
+                hasattr(Context, "set_npn_advertise_callback")):
+            raise SkipTest("pyOpenSSL supports neither ALPN nor NPN.")
+        d = self.negotiateProtocols(
+            [b"h2", b"http/1.1"], [b"http/1.1", b"h2"])
+        d.addCallback(self.assertEqual, (b"h2", b"h2"))
+        return d
+
+
+    def test_noNegotiatedProtocol(self):
+        """
+        L{TLSMemoryBIOProtocol.getNegotiatedProtocol} returns C{None} if no
+        application protocol was agreed on.
+        """
+        d = self.negotiateProtocols(None, None)
+        d.addCallback(self.assertEqual, (None, None))
+        return d
+
+
     def test_writeAfterHandshake(self):
         """
         Bytes written to L{TLSMemoryBIOProtocol} before the handshake is
@@ -55,6 +55,7 @@ from twisted.python import log
 from twisted.python._reflectpy3 import safe_str
 from twisted.internet.interfaces import ISystemHandle, ISSLTransport
 from twisted.internet.interfaces import IPushProducer, ILoggingContext
+from twisted.internet.interfaces import IFileTransport
 from twisted.internet.main import CONNECTION_LOST
 from twisted.internet.protocol import Protocol
 from twisted.internet.task import cooperate
@@ -300,9 +301,11 @@ class TLSMemoryBIOProtocol(ProtocolWrapper):
             self._tlsConnection.set_accept_state()
         self._appSendBuffer = []
 
-        # Add interfaces provided by the transport we are wrapping:
+        # Add interfaces provided by the transport we are wrapping, except
+        # IFileTransport: files written with it would be sent in plaintext.
         for interface in providedBy(transport):
-            directlyProvides(self, interface)
+            if interface is not IFileTransport:
+                directlyProvides(self, interface)
 
         # Intentionally skip ProtocolWrapper.makeConnection - it might call
         # wrappedProtocol.makeConnection, which we want to make conditional.
@@ -551,6 +554,29 @@ class TLSMemoryBIOProtocol(ProtocolWrapper):
         return self._tlsConnection.get_peer_certificate()
 
 
+    def getNegotiatedProtocol(self):
+        """
+        Find out which application protocol was agreed on during the
+        handshake, using ALPN or NPN, as set up by the C{acceptableProtocols}
+        of L{twisted.internet.ssl.CertificateOptions}.
+
+        @return: The protocol, such as C{b"h2"}, or C{None} if none was agreed
+            on or the handshake is not done yet.
+        @rtype: C{bytes} or C{NoneType}
+        """
+        for name in ["get_alpn_proto_negotiated", "get_next_proto_negotiated"]:
+            getProtocol = getattr(self._tlsConnection, name, None)
+            if getProtocol is None:
+                continue
+            try:
+                protocol = getProtocol()
+            except NotImplementedError:
+                continue
+            if protocol:
+                return protocol
+        return None
+
+
     def registerProducer(self, producer, streaming):
         # If we've already disconnected, nothing to do here:
         if self._lostTLSConnection:
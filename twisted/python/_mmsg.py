@@ -0,0 +1,242 @@
+# -*- test-case-name: twisted.python.test.test_mmsg -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Access to the recvmmsg(2) and sendmmsg(2) system calls, which receive or send
+several datagrams on a socket at once.
+
+The C library's functions are called using ctypes.  Importing this module
+raises C{ImportError} on platforms other than Linux, or if the C library does
+not provide these functions.
+"""
+
+from __future__ import division, absolute_import
+
+import os
+import sys
+import socket
+import struct
+import ctypes
+
+__all__ = ["ReceiveArena", "sendmmsg"]
+
+
+if not sys.platform.startswith("linux"):
+    raise ImportError("recvmmsg and sendmmsg are only supported on Linux")
+
+try:
+    _libc = ctypes.CDLL(None, use_errno=True)
+    _recvmmsg = _libc.recvmmsg
+    _sendmmsg = _libc.sendmmsg
+except (OSError, AttributeError):
+    raise ImportError("recvmmsg and sendmmsg are not available from the C "
+                      "library")
+
+
+
+class _iovec(ctypes.Structure):
+    _fields_ = [
+        ("iov_base", ctypes.c_void_p),
+        ("iov_len", ctypes.c_size_t)]
+
+
+
+class _msghdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_iovec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int)]
+
+
+
+class _mmsghdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_hdr", _msghdr),
+        ("msg_len", ctypes.c_uint)]
+
+
+
+_recvmmsg.argtypes = [
+    ctypes.c_int, ctypes.POINTER(_mmsghdr), ctypes.c_uint, ctypes.c_int,
+    ctypes.c_void_p]
+_recvmmsg.restype = ctypes.c_int
+_sendmmsg.argtypes = [
+    ctypes.c_int, ctypes.POINTER(_mmsghdr), ctypes.c_uint, ctypes.c_int]
+_sendmmsg.restype = ctypes.c_int
+
+# The size of a struct sockaddr_storage, big enough for any address.
+_SOCKADDR_SIZE = 128
+
+_familyStruct = struct.Struct("=H")
+_portStruct = struct.Struct("!H")
+
+
+
+def _raiseSocketError():
+    """
+    Raise a L{socket.error} for the error reported by the last C library call.
+    """
+    errno = ctypes.get_errno()
+    raise socket.error(errno, os.strerror(errno))
+
+
+
+def _decodeAddress(name):
+    """
+    Convert a C{struct sockaddr_in} or C{struct sockaddr_in6} to a
+    C{(host, port)} tuple.
+
+    @param name: The bytes of the address structure.
+    @type name: C{bytes}
+
+    @return: A C{(host, port)} tuple, or C{None} for any other kind of address.
+    """
+    if len(name) < 8:
+        return None
+    family = _familyStruct.unpack_from(name)[0]
+    port = _portStruct.unpack_from(name, 2)[0]
+    if family == socket.AF_INET:
+        return (socket.inet_ntop(socket.AF_INET, name[4:8]), port)
+    elif family == socket.AF_INET6 and len(name) >= 24:
+        return (socket.inet_ntop(socket.AF_INET6, name[8:24]), port)
+    return None
+
+
+
+def _encodeAddress(family, addr):
+    """
+    Convert a C{(host, port)} (or, for IPv6, C{(host, port, flowinfo,
+    scopeid)}) tuple to a C{struct sockaddr_in} or C{struct sockaddr_in6}.
+
+    @param family: L{socket.AF_INET} or L{socket.AF_INET6}.
+
+    @param addr: The address, with an IP address (or C{"<broadcast>"}) as the
+        host.
+
+    @rtype: C{bytes}
+    """
+    host, port = addr[:2]
+    if family == socket.AF_INET:
+        if host == "<broadcast>":
+            host = "255.255.255.255"
+        return (_familyStruct.pack(family) + _portStruct.pack(port) +
+                socket.inet_pton(family, host) + b"\0" * 8)
+    flowinfo, scopeid = (tuple(addr[2:4]) + (0, 0))[:2]
+    return (_familyStruct.pack(family) + _portStruct.pack(port) +
+            struct.pack("!I", flowinfo) + socket.inet_pton(family, host) +
+            struct.pack("=I", scopeid))
+
+
+
+class ReceiveArena(object):
+    """
+    Memory allocated once for receiving a batch of datagrams with
+    C{recvmmsg}, reused for every batch.
+
+    @ivar count: The maximum number of datagrams received at once.
+    @type count: C{int}
+
+    @ivar size: The maximum size of each datagram; longer datagrams are
+        truncated.
+    @type size: C{int}
+    """
+
+    def __init__(self, count, size):
+        self.count = count
+        self.size = size
+        self._data = ctypes.create_string_buffer(count * size)
+        self._names = ctypes.create_string_buffer(count * _SOCKADDR_SIZE)
+        self._iovecs = (_iovec * count)()
+        self._headers = (_mmsghdr * count)()
+        dataAddress = ctypes.addressof(self._data)
+        namesAddress = ctypes.addressof(self._names)
+        for i in range(count):
+            self._iovecs[i].iov_base = dataAddress + i * size
+            self._iovecs[i].iov_len = size
+            header = self._headers[i].msg_hdr
+            header.msg_name = namesAddress + i * _SOCKADDR_SIZE
+            header.msg_iov = ctypes.pointer(self._iovecs[i])
+            header.msg_iovlen = 1
+
+
+    def receive(self, fd):
+        """
+        Receive as many datagrams as are waiting on a socket, up to C{count}.
+
+        @param fd: The file descriptor of a non-blocking datagram socket.
+        @type fd: C{int}
+
+        @return: A C{list} of C{(data, (host, port))} tuples, at least one
+            long.
+
+        @raise socket.error: If no datagram can be received.
+        """
+        headers = self._headers
+        for i in range(self.count):
+            headers[i].msg_hdr.msg_namelen = _SOCKADDR_SIZE
+        received = _recvmmsg(fd, headers, self.count, 0, None)
+        if received < 0:
+            _raiseSocketError()
+        dataAddress = ctypes.addressof(self._data)
+        namesAddress = ctypes.addressof(self._names)
+        size = self.size
+        datagrams = []
+        for i in range(received):
+            header = headers[i]
+            datagrams.append((
+                ctypes.string_at(dataAddress + i * size, header.msg_len),
+                _decodeAddress(ctypes.string_at(
+                    namesAddress + i * _SOCKADDR_SIZE,
+                    header.msg_hdr.msg_namelen))))
+        return datagrams
+
+
+
+def sendmmsg(fd, family, datagrams):
+    """
+    Send several datagrams on a socket at once.
+
+    @param fd: The file descriptor of a datagram socket.
+    @type fd: C{int}
+
+    @param family: The address family of the socket, L{socket.AF_INET} or
+        L{socket.AF_INET6}.
+
+    @param datagrams: A sequence of C{(data, addr)} tuples, where C{addr} is
+        either an address accepted by L{socket.socket.sendto}, with an IP
+        address as the host, or C{None} to send to the address the socket is
+        connected to.
+
+    @return: The number of datagrams sent, from the start of C{datagrams}.
+    @rtype: C{int}
+
+    @raise socket.error: If not even the first datagram could be sent.
+    """
+    count = len(datagrams)
+    headers = (_mmsghdr * count)()
+    iovecs = (_iovec * count)()
+    # Keep the buffers referenced until the call returns.
+    buffers = []
+    for i, (data, addr) in enumerate(datagrams):
+        dataBuffer = ctypes.create_string_buffer(data, len(data))
+        buffers.append(dataBuffer)
+        iovecs[i].iov_base = ctypes.addressof(dataBuffer)
+        iovecs[i].iov_len = len(data)
+        header = headers[i].msg_hdr
+        header.msg_iov = ctypes.pointer(iovecs[i])
+        header.msg_iovlen = 1
+        if addr is not None:
+            name = _encodeAddress(family, addr)
+            nameBuffer = ctypes.create_string_buffer(name, len(name))
+            buffers.append(nameBuffer)
+            header.msg_name = ctypes.addressof(nameBuffer)
+            header.msg_namelen = len(name)
+    sent = _sendmmsg(fd, headers, count, 0)
+    if sent < 0:
+        _raiseSocketError()
+    return sent
@@ -0,0 +1,201 @@
+# -*- test-case-name: twisted.python.test.test_posixspawn -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Access to posix_spawn(3) and close_range(2), to start child processes without
+copying the parent process with C{fork}, and to close all of the file
+descriptors a child should not inherit without listing them one by one.
+
+The C library's functions are called using ctypes.  The file actions needed to
+close every file descriptor the child is not given are a GNU extension, so
+importing this module raises C{ImportError} unless the C library is glibc 2.34
+or later.
+"""
+
+from __future__ import division, absolute_import
+
+import ctypes
+import os
+
+__all__ = ["spawn", "findExecutable", "closeOtherFDs"]
+
+try:
+    _libc = ctypes.CDLL(None, use_errno=True)
+    _posix_spawn = _libc.posix_spawn
+    _actionsInit = _libc.posix_spawn_file_actions_init
+    _actionsDestroy = _libc.posix_spawn_file_actions_destroy
+    _addDup2 = _libc.posix_spawn_file_actions_adddup2
+    _addCloseFrom = _libc.posix_spawn_file_actions_addclosefrom_np
+    _addChdir = _libc.posix_spawn_file_actions_addchdir_np
+    _attributesInit = _libc.posix_spawnattr_init
+    _attributesDestroy = _libc.posix_spawnattr_destroy
+    _setFlags = _libc.posix_spawnattr_setflags
+    _setSignalDefaults = _libc.posix_spawnattr_setsigdefault
+    _sigemptyset = _libc.sigemptyset
+    _sigaddset = _libc.sigaddset
+    _close_range = _libc.close_range
+except (OSError, AttributeError):
+    raise ImportError("posix_spawn file actions are not available from the "
+                      "C library")
+
+_posix_spawn.argtypes = [
+    ctypes.POINTER(ctypes.c_int), ctypes.c_char_p, ctypes.c_void_p,
+    ctypes.c_void_p, ctypes.POINTER(ctypes.c_char_p),
+    ctypes.POINTER(ctypes.c_char_p)]
+_addDup2.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int]
+_addCloseFrom.argtypes = [ctypes.c_void_p, ctypes.c_int]
+_addChdir.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+_setFlags.argtypes = [ctypes.c_void_p, ctypes.c_short]
+_setSignalDefaults.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+_sigaddset.argtypes = [ctypes.c_void_p, ctypes.c_int]
+_close_range.argtypes = [ctypes.c_uint, ctypes.c_uint, ctypes.c_int]
+for _function in [_posix_spawn, _actionsInit, _actionsDestroy, _addDup2,
+                  _addCloseFrom, _addChdir, _attributesInit,
+                  _attributesDestroy, _setFlags, _setSignalDefaults,
+                  _sigemptyset, _sigaddset, _close_range]:
+    _function.restype = ctypes.c_int
+del _function
+
+# Room for posix_spawn_file_actions_t, posix_spawnattr_t and sigset_t, which
+# glibc makes 80, 336 and 128 bytes long on 64 bit platforms.
+_ACTIONS_SIZE = 256
+_ATTRIBUTES_SIZE = 1024
+_SIGSET_SIZE = 128
+
+# From glibc's spawn.h.
+_POSIX_SPAWN_SETSIGDEF = 0x04
+
+_MAX_FD = 0xffffffff
+
+
+
+def _check(result):
+    """
+    Raise L{OSError} for the error number returned by a posix_spawn function.
+    """
+    if result:
+        raise OSError(result, os.strerror(result))
+
+
+
+def _strings(strings):
+    """
+    Make a C{NULL} terminated array of C strings.
+    """
+    return (ctypes.c_char_p * (len(strings) + 1))(*(list(strings) + [None]))
+
+
+
+def findExecutable(executable, environment):
+    """
+    Find an executable the way C{os.execvpe} would, by searching the C{PATH}
+    of the environment it will be run with, rather than the C{PATH} of this
+    process as C{posix_spawnp} does.
+
+    @param executable: The name or path of the executable.
+
+    @param environment: The environment the executable will be run with.
+
+    @return: The path of the executable, or C{None} if none was found.
+    """
+    if os.path.dirname(executable):
+        return executable
+    for directory in environment.get("PATH", os.defpath).split(os.pathsep):
+        candidate = os.path.join(directory, executable)
+        if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+            return candidate
+    return None
+
+
+
+def spawn(executable, args, environment, fdmap, path=None, signals=()):
+    """
+    Start a child process with posix_spawn(3).
+
+    @param executable: The path of the executable.
+
+    @param args: The arguments of the process, including its name.
+
+    @param environment: The environment of the process.
+    @type environment: C{dict}
+
+    @param fdmap: A mapping of the file descriptors of the child to those of
+        this process which they should be copies of.  Its keys must be the
+        numbers from C{0} up to one less than its size; every other file
+        descriptor is closed in the child.
+
+    @param path: The directory to start the child in, or C{None} for this
+        process's.
+
+    @param signals: The numbers of the signals to restore the default action
+        of in the child.
+
+    @raise OSError: If the child could not be started.
+
+    @return: The process ID of the child.
+    """
+    actions = ctypes.create_string_buffer(_ACTIONS_SIZE)
+    attributes = ctypes.create_string_buffer(_ATTRIBUTES_SIZE)
+    _check(_actionsInit(actions))
+    try:
+        _check(_attributesInit(attributes))
+        try:
+            # A descriptor of this process may be the number of a child's
+            # descriptor which still has to be copied from it, so each is
+            # first copied above all of them.
+            parents = sorted(set(fdmap.values()))
+            base = max(list(fdmap) + parents + [-1]) + 1
+            temporary = {}
+            for i, parentFD in enumerate(parents):
+                temporary[parentFD] = base + i
+                _check(_addDup2(actions, parentFD, base + i))
+            for childFD, parentFD in fdmap.items():
+                _check(_addDup2(actions, temporary[parentFD], childFD))
+            _check(_addCloseFrom(actions, len(fdmap)))
+            if path is not None:
+                _check(_addChdir(actions, path))
+
+            if signals:
+                signalSet = ctypes.create_string_buffer(_SIGSET_SIZE)
+                _sigemptyset(signalSet)
+                for signalNumber in signals:
+                    _sigaddset(signalSet, signalNumber)
+                _check(_setSignalDefaults(attributes, signalSet))
+                _check(_setFlags(attributes, _POSIX_SPAWN_SETSIGDEF))
+
+            pid = ctypes.c_int()
+            _check(_posix_spawn(
+                    ctypes.byref(pid), executable, actions, attributes,
+                    _strings(args),
+                    _strings(["%s=%s" % item for item in environment.items()])))
+            return pid.value
+        finally:
+            _attributesDestroy(attributes)
+    finally:
+        _actionsDestroy(actions)
+
+
+
+def closeOtherFDs(keep):
+    """
+    Close every file descriptor of this process except some, with as few
+    calls to close_range(2) as there are gaps between them.
+
+    @param keep: The file descriptors to leave open.
+
+    @return: C{True}, or C{False} if the kernel does not support close_range,
+        in which case nothing was closed.
+    """
+    first = 0
+    closed = False
+    for fd in sorted(set(keep)) + [_MAX_FD + 1]:
+        if fd > first:
+            if _close_range(first, fd - 1, 0) != 0:
+                if not closed:
+                    return False
+                error = ctypes.get_errno()
+                raise OSError(error, os.strerror(error))
+            closed = True
+        first = fd + 1
+    return True
@@ -0,0 +1,71 @@
+# -*- test-case-name: twisted.python.test.test_sendfile -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Access to the sendfile(2) system call, which copies data from a file
+descriptor to a socket without passing it through user space.
+
+On Python 3.3 and newer, L{os.sendfile} is used.  On older versions of Python
+on Linux, the C library's C{sendfile64} is called using ctypes.  Importing
+this module raises C{ImportError} where neither is available.
+"""
+
+from __future__ import division, absolute_import
+
+import os
+import sys
+
+__all__ = ["sendfile"]
+
+
+_osSendfile = getattr(os, "sendfile", None)
+
+if _osSendfile is not None:
+    def sendfile(outFD, inFD, offset, count):
+        """
+        Copy up to C{count} bytes, starting at C{offset}, from the file
+        descriptor C{inFD} to the socket C{outFD}.
+
+        @return: The number of bytes copied, which is C{0} if C{offset} is at
+            or beyond the end of the file.
+        @rtype: C{int}
+
+        @raise OSError: If the system call fails.
+        """
+        return _osSendfile(outFD, inFD, offset, count)
+
+elif sys.platform.startswith("linux"):
+    import ctypes
+
+    try:
+        _libc = ctypes.CDLL(None, use_errno=True)
+        _sendfile64 = _libc.sendfile64
+    except (OSError, AttributeError):
+        raise ImportError("sendfile64 is not available from the C library")
+
+    _sendfile64.argtypes = [
+        ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_int64),
+        ctypes.c_size_t]
+    _sendfile64.restype = ctypes.c_ssize_t
+
+    def sendfile(outFD, inFD, offset, count):
+        """
+        Copy up to C{count} bytes, starting at C{offset}, from the file
+        descriptor C{inFD} to the socket C{outFD}.
+
+        @return: The number of bytes copied, which is C{0} if C{offset} is at
+            or beyond the end of the file.
+        @rtype: C{int}
+
+        @raise OSError: If the system call fails.
+        """
+        result = _sendfile64(outFD, inFD, ctypes.byref(ctypes.c_int64(offset)),
+                             count)
+        if result < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        return result
+
+else:
+    raise ImportError("sendfile is not available on this platform")
@@ -0,0 +1,73 @@
+# -*- test-case-name: twisted.python.test.test_waitid -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Access to the waitid(2) system call, to find out which child process has
+exited without reaping it.
+
+C{os.waitpid(-1, ...)} also says which child has exited, but reaps it, which
+would take the exit status of a child started by other code, such as the
+C{subprocess} module, from under it.  With C{WNOWAIT}, waitid leaves the child
+to be reaped by whoever started it.
+
+The C library's C{waitid} is called using ctypes, and the process ID is read
+from the C{siginfo_t} it fills in, whose layout is only known here for Linux,
+so importing this module raises C{ImportError} elsewhere.
+"""
+
+from __future__ import division, absolute_import
+
+import ctypes
+import os
+import sys
+from errno import ECHILD, EINTR
+
+__all__ = ["exitedChild"]
+
+
+if not sys.platform.startswith("linux"):
+    raise ImportError("waitid is only used on Linux")
+
+try:
+    _libc = ctypes.CDLL(None, use_errno=True)
+    _waitid = _libc.waitid
+except (OSError, AttributeError):
+    raise ImportError("waitid is not available from the C library")
+
+_waitid.argtypes = [ctypes.c_int, ctypes.c_uint, ctypes.c_void_p, ctypes.c_int]
+_waitid.restype = ctypes.c_int
+
+# From the Linux headers.
+_P_ALL = 0
+_WNOHANG = 1
+_WEXITED = 4
+_WNOWAIT = 0x01000000
+
+# siginfo_t is 128 bytes long.  It starts with three ints, followed by a union
+# aligned for pointers, whose first member for SIGCHLD is si_pid.
+_SIGINFO_SIZE = 128
+_POINTER_SIZE = ctypes.sizeof(ctypes.c_void_p)
+_PID_OFFSET = (3 * 4 + _POINTER_SIZE - 1) // _POINTER_SIZE * _POINTER_SIZE
+
+
+
+def exitedChild():
+    """
+    Find a child process which has exited, without reaping it.
+
+    @raise OSError: If the system call fails for a reason other than this
+        process having no children.
+
+    @return: The process ID of a child which has exited and has not been
+        reaped, or C{None} if there is none.
+    """
+    info = ctypes.create_string_buffer(_SIGINFO_SIZE)
+    while _waitid(_P_ALL, 0, info, _WEXITED | _WNOHANG | _WNOWAIT) != 0:
+        error = ctypes.get_errno()
+        if error == ECHILD:
+            return None
+        if error != EINTR:
+            raise OSError(error, os.strerror(error))
+    pid = ctypes.c_int.from_buffer(info, _PID_OFFSET).value
+    return pid or None
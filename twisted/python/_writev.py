@@ -0,0 +1,107 @@
+# -*- test-case-name: twisted.python.test.test_writev -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Access to the writev(2) system call, which writes several buffers to a file
+descriptor, such as a socket's, at once.
+
+The C library's function is called using ctypes, so that vectored writes are
+available on Python 2, which has no C{socket.sendmsg}.  Importing this module
+raises C{ImportError} on platforms other than POSIX ones, or if the C library
+does not provide C{writev}.
+"""
+
+from __future__ import division, absolute_import
+
+import os
+import socket
+import ctypes
+
+__all__ = ["writev"]
+
+
+if os.name != "posix":
+    raise ImportError("writev is only supported on POSIX platforms")
+
+try:
+    _libc = ctypes.CDLL(None, use_errno=True)
+    _writev = _libc.writev
+except (OSError, AttributeError):
+    raise ImportError("writev is not available from the C library")
+
+
+
+class _iovec(ctypes.Structure):
+    _fields_ = [
+        ("iov_base", ctypes.c_void_p),
+        ("iov_len", ctypes.c_size_t)]
+
+
+
+_writev.argtypes = [ctypes.c_int, ctypes.POINTER(_iovec), ctypes.c_int]
+_writev.restype = ctypes.c_ssize_t
+
+# Python 2's way of getting at the memory of a str or buffer object without
+# copying it.
+_asReadBuffer = getattr(ctypes.pythonapi, "PyObject_AsReadBuffer", None)
+if _asReadBuffer is not None:
+    _asReadBuffer.argtypes = [
+        ctypes.py_object, ctypes.POINTER(ctypes.c_void_p),
+        ctypes.POINTER(ctypes.c_ssize_t)]
+    _asReadBuffer.restype = ctypes.c_int
+
+
+
+def _address(data):
+    """
+    Find the memory holding a bytes-like object.
+
+    @param data: A C{bytes} object, or another object providing the buffer
+        interface, such as a C{buffer} on Python 2 or a C{memoryview}.
+
+    @return: A 3-C{tuple} of an object which must be kept alive while the
+        memory is used, the address of the memory and its length.
+    """
+    if not isinstance(data, bytes):
+        if _asReadBuffer is not None and not isinstance(data, memoryview):
+            address = ctypes.c_void_p()
+            length = ctypes.c_ssize_t()
+            if _asReadBuffer(data, ctypes.byref(address),
+                             ctypes.byref(length)) == 0:
+                return data, address.value, length.value
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        else:
+            data = bytes(data)
+    address = ctypes.cast(ctypes.c_char_p(data), ctypes.c_void_p).value
+    return data, address, len(data)
+
+
+
+def writev(fd, vectors):
+    """
+    Write as much as possible of several buffers to a file descriptor, in
+    order, with one system call.
+
+    @param fd: The file descriptor to write to.
+    @type fd: C{int}
+
+    @param vectors: The buffers to write.
+    @type vectors: C{list} of bytes-like objects
+
+    @return: The number of bytes written.
+    @rtype: C{int}
+
+    @raise socket.error: If the system call fails.
+    """
+    iovecs = (_iovec * len(vectors))()
+    keepAlive = []
+    for iovec, data in zip(iovecs, vectors):
+        data, iovec.iov_base, iovec.iov_len = _address(data)
+        keepAlive.append(data)
+    result = _writev(fd, iovecs, len(vectors))
+    if result < 0:
+        errno = ctypes.get_errno()
+        raise socket.error(errno, os.strerror(errno))
+    return result
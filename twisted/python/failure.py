@@ -142,6 +142,145 @@ class _Code(object):
         self.co_filename = filename
 
 
+def _extractFrames(tb, stackOffset, captureVars):
+    """
+    Extract the frames of a traceback, and of the stack above it.
+
+    @param tb: A traceback object.
+
+    @param stackOffset: The number of frames above the first frame of C{tb}
+        to leave out of the stack.
+
+    @param captureVars: Whether to copy the locals and globals of each frame.
+
+    @return: A C{(frames, stack)} tuple of lists, as described by L{Failure}.
+    """
+    frames = []
+    stack = []
+
+    f = tb.tb_frame
+    while stackOffset and f:
+        # This excludes the frame which created the Failure from the stack,
+        # leaving it to start with its caller instead.
+        f = f.f_back
+        stackOffset -= 1
+
+    # Keeps the *full* stack.  Formerly in spread.pb.print_excFullStack:
+    #
+    #   The need for this function arises from the fact that several
+    #   PB classes have the peculiar habit of discarding exceptions
+    #   with bareword "except:"s.  This premature exception
+    #   catching means tracebacks generated here don't tend to show
+    #   what called upon the PB object.
+
+    while f:
+        if captureVars:
+            localz = f.f_locals.copy()
+            if f.f_locals is f.f_globals:
+                globalz = {}
+            else:
+                globalz = f.f_globals.copy()
+            for d in globalz, localz:
+                if "__builtins__" in d:
+                    del d["__builtins__"]
+            localz = localz.items()
+            globalz = globalz.items()
+        else:
+            localz = globalz = ()
+        stack.append((
+            f.f_code.co_name,
+            f.f_code.co_filename,
+            f.f_lineno,
+            localz,
+            globalz,
+            ))
+        f = f.f_back
+    stack.reverse()
+
+    while tb is not None:
+        f = tb.tb_frame
+        if captureVars:
+            localz = f.f_locals.copy()
+            if f.f_locals is f.f_globals:
+                globalz = {}
+            else:
+                globalz = f.f_globals.copy()
+            for d in globalz, localz:
+                if "__builtins__" in d:
+                    del d["__builtins__"]
+            localz = list(localz.items())
+            globalz = list(globalz.items())
+        else:
+            localz = globalz = ()
+        frames.append((
+            f.f_code.co_name,
+            f.f_code.co_filename,
+            tb.tb_lineno,
+            localz,
+            globalz,
+            ))
+        tb = tb.tb_next
+    return frames, stack
+
+
+
+_parentsCache = {}
+
+
+def _parents(exceptionType):
+    """
+    Return the fully-qualified names of the classes an exception class
+    inherits from, including itself, for L{Failure.parents}.
+
+    The names are only computed once for each class.
+
+    @param exceptionType: The type of the exception, which need not be a
+        subclass of L{Exception}.
+
+    @return: A new C{list} of names, or one containing C{exceptionType}
+        itself if it is not a subclass of L{Exception}.
+    """
+    try:
+        parents = _parentsCache[exceptionType]
+    except (KeyError, TypeError):
+        if not (inspect.isclass(exceptionType) and
+                issubclass(exceptionType, Exception)):
+            return [exceptionType]
+        parents = _parentsCache[exceptionType] = tuple(
+            map(reflect.qual, getmro(exceptionType)))
+    return list(parents)
+
+
+
+class _LazyFrames(object):
+    """
+    The C{frames} and C{stack} attributes of a L{Failure}, which are only
+    extracted from its traceback when one of them is first used.
+
+    This is a non-data descriptor, so once they have been extracted and set
+    on the L{Failure}, they are found there instead.
+
+    @ivar name: The name of the attribute.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+
+    def __get__(self, failure, cls=None):
+        if failure is None:
+            return self
+        if failure.tb is None:
+            frames, stack = [], []
+        else:
+            frames, stack = _extractFrames(
+                failure.tb, failure._stackOffset, False)
+        failure.__dict__.setdefault("frames", frames)
+        failure.__dict__.setdefault("stack", stack)
+        return failure.__dict__[self.name]
+
+
+
 class Failure:
     """
     A basic abstraction for an error that has occurred.
@@ -155,14 +294,35 @@ class Failure:
     C{locals().items()}/C{globals().items()} for that frame, or an empty tuple
     if those details were not captured.
 
+    Unless C{captureVars} is set, C{frames} and C{stack} are only extracted
+    from the traceback when they are first used, for example to format the
+    traceback or by L{cleanFailure}.  Most failures are handled by an errback
+    and never formatted, so this work is usually avoided.  The line numbers
+    of the frames in C{stack}, which are still running when the failure is
+    created, are the ones they have when C{stack} is first used.
+
+    A failure created from an exception which was never raised, as is done
+    for expected errors such as L{ConnectionDone
+    <twisted.internet.error.ConnectionDone>} and L{CancelledError
+    <twisted.internet.defer.CancelledError>}, has no traceback at all, and
+    is cheap to create and to pass along.
+
     @ivar value: The exception instance responsible for this failure.
     @ivar type: The exception's class.
     @ivar stack: list of frames, innermost last, excluding C{Failure.__init__}.
     @ivar frames: list of frames, innermost first.
+    @ivar tb: The traceback, if there was one, or C{None}.
+    @ivar parents: A C{list} of the fully-qualified names of the classes
+        C{type} inherits from, including itself.
+
+    @ivar _stackOffset: The number of frames above the first frame of C{tb}
+        which are left out of C{stack}.
     """
 
     pickled = 0
-    stack = None
+    _stackOffset = 0
+    frames = _LazyFrames("frames")
+    stack = _LazyFrames("stack")
 
     # The opcode of "yield" in Python bytecode. We need this in _findFailure in
     # order to identify whether an exception was thrown by a
@@ -231,87 +391,20 @@ class Failure:
             elif _PY3:
                 tb = self.value.__traceback__
 
-        frames = self.frames = []
-        stack = self.stack = []
-
         # added 2003-06-23 by Chris Armstrong. Yes, I actually have a
         # use case where I need this traceback object, and I've made
         # sure that it'll be cleaned up.
         self.tb = tb
 
-        if tb:
-            f = tb.tb_frame
-        elif not isinstance(self.value, Failure):
-            # we don't do frame introspection since it's expensive,
-            # and if we were passed a plain exception with no
-            # traceback, it's not useful anyway
-            f = stackOffset = None
-
-        while stackOffset and f:
-            # This excludes this Failure.__init__ frame from the
-            # stack, leaving it to start with our caller instead.
-            f = f.f_back
-            stackOffset -= 1
-
-        # Keeps the *full* stack.  Formerly in spread.pb.print_excFullStack:
-        #
-        #   The need for this function arises from the fact that several
-        #   PB classes have the peculiar habit of discarding exceptions
-        #   with bareword "except:"s.  This premature exception
-        #   catching means tracebacks generated here don't tend to show
-        #   what called upon the PB object.
-
-        while f:
+        if tb is not None:
             if captureVars:
-                localz = f.f_locals.copy()
-                if f.f_locals is f.f_globals:
-                    globalz = {}
-                else:
-                    globalz = f.f_globals.copy()
-                for d in globalz, localz:
-                    if "__builtins__" in d:
-                        del d["__builtins__"]
-                localz = localz.items()
-                globalz = globalz.items()
-            else:
-                localz = globalz = ()
-            stack.insert(0, (
-                f.f_code.co_name,
-                f.f_code.co_filename,
-                f.f_lineno,
-                localz,
-                globalz,
-                ))
-            f = f.f_back
-
-        while tb is not None:
-            f = tb.tb_frame
-            if captureVars:
-                localz = f.f_locals.copy()
-                if f.f_locals is f.f_globals:
-                    globalz = {}
-                else:
-                    globalz = f.f_globals.copy()
-                for d in globalz, localz:
-                    if "__builtins__" in d:
-                        del d["__builtins__"]
-                localz = list(localz.items())
-                globalz = list(globalz.items())
-            else:
-                localz = globalz = ()
-            frames.append((
-                f.f_code.co_name,
-                f.f_code.co_filename,
-                tb.tb_lineno,
-                localz,
-                globalz,
-                ))
-            tb = tb.tb_next
-        if inspect.isclass(self.type) and issubclass(self.type, Exception):
-            parentCs = getmro(self.type)
-            self.parents = list(map(reflect.qual, parentCs))
-        else:
-            self.parents = [self.type]
+                # The variables have to be copied now, before they change.
+                self.frames, self.stack = _extractFrames(
+                    tb, stackOffset, True)
+            elif stackOffset:
+                self._stackOffset = stackOffset
+
+        self.parents = _parents(self.type)
 
     def trap(self, *errorTypes):
         """Trap this failure if its type is in a predetermined list.
@@ -351,9 +444,12 @@ class Failure:
                           fully-qualified class names.
         @returns: the matching L{Exception} type, or None if no match.
         """
+        mro = getattr(self.type, "__mro__", ())
         for error in errorTypes:
             err = error
             if inspect.isclass(error) and issubclass(error, Exception):
+                if error in mro:
+                    return error
                 err = reflect.qual(error)
             if err in self.parents:
                 return error
@@ -458,6 +554,9 @@ class Failure:
         """
         if self.pickled:
             return self.__dict__
+        # Extract the frames first, if that has not been done yet, so that
+        # they are in the copy.
+        self.frames
         c = self.__dict__.copy()
 
         c['frames'] = [
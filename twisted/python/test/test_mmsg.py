@@ -0,0 +1,140 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.python._mmsg}.
+"""
+
+from __future__ import division, absolute_import
+
+import errno
+import socket
+
+from twisted.trial.unittest import TestCase, SkipTest
+
+try:
+    from twisted.python._mmsg import ReceiveArena, sendmmsg
+except ImportError as e:
+    importSkip = str(e)
+else:
+    importSkip = None
+
+
+
+class MultipleMessageTests(TestCase):
+    """
+    Tests for L{ReceiveArena} and L{sendmmsg}.
+    """
+    if importSkip is not None:
+        skip = importSkip
+
+    def makeSocket(self, family=socket.AF_INET, host="127.0.0.1"):
+        """
+        Make a non-blocking UDP socket bound to some port on C{host}.
+        """
+        s = socket.socket(family, socket.SOCK_DGRAM)
+        self.addCleanup(s.close)
+        s.bind((host, 0))
+        s.setblocking(False)
+        return s
+
+
+    def test_sendAndReceive(self):
+        """
+        Datagrams sent with L{sendmmsg} are received, with the address of
+        their sender, by L{ReceiveArena.receive}.
+        """
+        sender = self.makeSocket()
+        receiver = self.makeSocket()
+        address = receiver.getsockname()
+        datagrams = [(b"a", address), (b"bc", address), (b"", address)]
+        self.assertEqual(sendmmsg(sender.fileno(), sender.family, datagrams),
+                         3)
+        arena = ReceiveArena(8, 16)
+        self.assertEqual(
+            arena.receive(receiver.fileno()),
+            [(b"a", sender.getsockname()), (b"bc", sender.getsockname()),
+             (b"", sender.getsockname())])
+
+
+    def test_receiveAtMostCount(self):
+        """
+        L{ReceiveArena.receive} receives at most C{count} datagrams, leaving
+        the others to be received by the next call.
+        """
+        sender = self.makeSocket()
+        receiver = self.makeSocket()
+        address = receiver.getsockname()
+        for i in range(3):
+            sender.sendto(b"x" * i, address)
+        arena = ReceiveArena(2, 16)
+        self.assertEqual(
+            [data for (data, addr) in arena.receive(receiver.fileno())],
+            [b"", b"x"])
+        self.assertEqual(
+            [data for (data, addr) in arena.receive(receiver.fileno())],
+            [b"xx"])
+
+
+    def test_truncated(self):
+        """
+        Datagrams longer than C{size} are truncated by L{ReceiveArena}.
+        """
+        sender = self.makeSocket()
+        receiver = self.makeSocket()
+        sender.sendto(b"abcdef", receiver.getsockname())
+        arena = ReceiveArena(2, 4)
+        self.assertEqual(arena.receive(receiver.fileno())[0][0], b"abcd")
+
+
+    def test_receiveWouldBlock(self):
+        """
+        L{ReceiveArena.receive} raises L{socket.error} with C{EAGAIN} if no
+        datagram is waiting.
+        """
+        receiver = self.makeSocket()
+        exc = self.assertRaises(
+            socket.error, ReceiveArena(2, 4).receive, receiver.fileno())
+        self.assertEqual(exc.args[0], errno.EAGAIN)
+
+
+    def test_connected(self):
+        """
+        L{sendmmsg} sends datagrams with no address to the address the socket
+        is connected to.
+        """
+        sender = self.makeSocket()
+        receiver = self.makeSocket()
+        sender.connect(receiver.getsockname())
+        sendmmsg(sender.fileno(), sender.family, [(b"a", None), (b"b", None)])
+        self.assertEqual(
+            [data for (data, addr) in
+             ReceiveArena(4, 4).receive(receiver.fileno())],
+            [b"a", b"b"])
+
+
+    def test_sendError(self):
+        """
+        L{sendmmsg} raises L{socket.error} if the first datagram cannot be
+        sent.
+        """
+        sender = self.makeSocket()
+        self.assertRaises(
+            socket.error, sendmmsg, sender.fileno(), sender.family,
+            [(b"a", None)])
+
+
+    def test_ipv6(self):
+        """
+        L{sendmmsg} and L{ReceiveArena} support IPv6 addresses.
+        """
+        try:
+            sender = self.makeSocket(socket.AF_INET6, "::1")
+            receiver = self.makeSocket(socket.AF_INET6, "::1")
+        except socket.error:
+            raise SkipTest("IPv6 is not available")
+        sendmmsg(sender.fileno(), sender.family,
+                 [(b"a", receiver.getsockname())])
+        self.assertEqual(
+            ReceiveArena(4, 4).receive(receiver.fileno()),
+            [(b"a", sender.getsockname()[:2])])
@@ -0,0 +1,216 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.python._posixspawn}.
+"""
+
+from __future__ import division, absolute_import
+
+import os
+import signal
+import sys
+
+from twisted.trial.unittest import SkipTest, TestCase
+
+try:
+    from twisted.python import _posixspawn
+except ImportError:
+    _posixspawn = None
+
+
+# Print the open file descriptors, the working directory, an environment
+# variable and the disposition of SIGUSR1, for the child process to run.
+_REPORT = (
+    "import os, signal, sys; "
+    "sys.stdout.write(repr(("
+    "sorted(int(fd) for fd in os.listdir('/proc/self/fd')), "
+    "os.getcwd(), os.environ.get('SPAWNED'), "
+    "signal.getsignal(signal.SIGUSR1) == signal.SIG_DFL)))")
+
+
+
+class FindExecutableTests(TestCase):
+    """
+    Tests for L{_posixspawn.findExecutable}.
+    """
+    if _posixspawn is None:
+        skip = "posix_spawn is not used on this platform."
+
+    def setUp(self):
+        self.bin = self.mktemp()
+        os.makedirs(self.bin)
+        self.executable = os.path.join(self.bin, "program")
+        open(self.executable, "w").close()
+        os.chmod(self.executable, 0o755)
+
+
+    def test_searchesEnvironmentPath(self):
+        """
+        A name without a directory is looked for in the C{PATH} of the given
+        environment.
+        """
+        path = os.pathsep.join(["/nonexistent", self.bin])
+        self.assertEqual(
+            _posixspawn.findExecutable("program", {"PATH": path}),
+            self.executable)
+
+
+    def test_notFound(self):
+        """
+        If no executable of the name is found, C{None} is returned.
+        """
+        self.assertIdentical(
+            _posixspawn.findExecutable("program", {"PATH": "/nonexistent"}),
+            None)
+
+
+    def test_notExecutable(self):
+        """
+        Files which are not executable are skipped.
+        """
+        os.chmod(self.executable, 0o644)
+        self.assertIdentical(
+            _posixspawn.findExecutable("program", {"PATH": self.bin}), None)
+
+
+    def test_path(self):
+        """
+        A name with a directory is returned as it is.
+        """
+        self.assertEqual(
+            _posixspawn.findExecutable("./program", {"PATH": self.bin}),
+            "./program")
+
+
+
+class SpawnTests(TestCase):
+    """
+    Tests for L{_posixspawn.spawn}.
+    """
+    if _posixspawn is None:
+        skip = "posix_spawn is not used on this platform."
+
+    def spawn(self, fdmap, **kwargs):
+        """
+        Run L{_REPORT} in a child process, and return what it reports.
+        """
+        r, w = os.pipe()
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        self.addCleanup(os.close, devnull)
+        fdmap = dict((child, {"r": r, "w": w, "n": devnull}[parent])
+                     for child, parent in fdmap.items())
+        environment = {"SPAWNED": "yes"}
+        pid = _posixspawn.spawn(
+            sys.executable, [sys.executable, "-c", _REPORT], environment,
+            fdmap, **kwargs)
+        os.close(w)
+        chunks = []
+        while True:
+            chunk = os.read(r, 4096)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        os.close(r)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(status, 0)
+        return eval(b"".join(chunks))
+
+
+    def test_descriptors(self):
+        """
+        The child has the descriptors in the map, at the numbers given, and no
+        others.
+        """
+        fds, cwd, spawned, default = self.spawn({0: "n", 1: "w", 2: "w"})
+        # listdir opens one more descriptor while it runs.
+        self.assertEqual(fds[:3], [0, 1, 2])
+        self.assertTrue(len(fds) <= 4)
+
+
+    def test_environment(self):
+        """
+        The child gets the environment given, and the working directory of
+        this process.
+        """
+        fds, cwd, spawned, default = self.spawn({0: "n", 1: "w", 2: "w"})
+        self.assertEqual(spawned, "yes")
+        self.assertEqual(cwd, os.getcwd())
+
+
+    def test_path(self):
+        """
+        The child is started in the directory given.
+        """
+        path = os.path.realpath(self.mktemp())
+        os.makedirs(path)
+        fds, cwd, spawned, default = self.spawn(
+            {0: "n", 1: "w", 2: "w"}, path=path)
+        self.assertEqual(cwd, path)
+
+
+    def test_signals(self):
+        """
+        The default action of the signals given is restored in the child.
+        """
+        handler = signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+        self.addCleanup(signal.signal, signal.SIGUSR1, handler)
+        fds, cwd, spawned, default = self.spawn({0: "n", 1: "w", 2: "w"})
+        self.assertFalse(default)
+        fds, cwd, spawned, default = self.spawn(
+            {0: "n", 1: "w", 2: "w"}, signals=[signal.SIGUSR1])
+        self.assertTrue(default)
+
+
+    def test_error(self):
+        """
+        If the executable cannot be run, L{OSError} is raised.
+        """
+        self.assertRaises(
+            OSError, _posixspawn.spawn, "/nonexistent", ["nonexistent"], {},
+            {})
+
+
+
+class CloseOtherFDsTests(TestCase):
+    """
+    Tests for L{_posixspawn.closeOtherFDs}.
+    """
+    if _posixspawn is None:
+        skip = "posix_spawn is not used on this platform."
+
+    def test_closeOthers(self):
+        """
+        Every descriptor but those given is closed.
+        """
+        r, w = os.pipe()
+        kept = os.open(os.devnull, os.O_RDONLY)
+        closed = os.open(os.devnull, os.O_RDONLY)
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.close(r)
+                if _posixspawn.closeOtherFDs([w, kept]):
+                    fds = os.listdir("/proc/self/fd")
+                    os.write(w, repr(sorted(int(fd) for fd in fds)).encode())
+            finally:
+                os._exit(0)
+        os.close(w)
+        os.close(kept)
+        os.close(closed)
+        chunks = []
+        while True:
+            chunk = os.read(r, 4096)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        os.close(r)
+        os.waitpid(pid, 0)
+        if not chunks:
+            raise SkipTest("close_range is not supported by the kernel.")
+        fds = eval(b"".join(chunks))
+        # listdir opens one more descriptor while it runs.
+        self.assertIn(w, fds)
+        self.assertIn(kept, fds)
+        self.assertNotIn(closed, fds)
+        self.assertTrue(len(fds) <= 3)
@@ -0,0 +1,67 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.python._sendfile}.
+"""
+
+from __future__ import division, absolute_import
+
+import socket
+
+from twisted.trial.unittest import TestCase
+
+try:
+    from twisted.python._sendfile import sendfile
+except ImportError:
+    sendfile = None
+
+
+
+class SendfileTests(TestCase):
+    """
+    Tests for L{sendfile}.
+    """
+    if sendfile is None:
+        skip = "sendfile is not available on this platform."
+
+    def setUp(self):
+        self.sender, self.receiver = socket.socketpair()
+        self.addCleanup(self.sender.close)
+        self.addCleanup(self.receiver.close)
+        path = self.mktemp()
+        with open(path, "wb") as f:
+            f.write(b"0123456789")
+        self.file = open(path, "rb")
+        self.addCleanup(self.file.close)
+
+
+    def test_copy(self):
+        """
+        L{sendfile} copies the requested part of a file to a socket and
+        returns the number of bytes copied.
+        """
+        self.assertEqual(
+            sendfile(self.sender.fileno(), self.file.fileno(), 3, 4), 4)
+        self.assertEqual(self.receiver.recv(100), b"3456")
+
+
+    def test_endOfFile(self):
+        """
+        L{sendfile} copies no more than the rest of the file, and returns
+        C{0} at the end of the file.
+        """
+        self.assertEqual(
+            sendfile(self.sender.fileno(), self.file.fileno(), 8, 100), 2)
+        self.assertEqual(
+            sendfile(self.sender.fileno(), self.file.fileno(), 10, 100), 0)
+        self.assertEqual(self.receiver.recv(100), b"89")
+
+
+    def test_error(self):
+        """
+        L{sendfile} raises L{OSError} if the system call fails.
+        """
+        self.assertRaises(
+            OSError, sendfile, -1,
+            self.file.fileno(), 0, 1)
@@ -0,0 +1,101 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.python._waitid}.
+"""
+
+from __future__ import division, absolute_import
+
+import os
+import time
+
+from twisted.trial.unittest import TestCase
+
+try:
+    from twisted.python._waitid import exitedChild
+except ImportError:
+    exitedChild = None
+
+
+
+class ExitedChildTests(TestCase):
+    """
+    Tests for L{exitedChild}.
+
+    L{exitedChild} reports on every child of the calling process, and the
+    test process may have children which other tests have left behind, so
+    each check runs in a helper process of its own.
+    """
+    if exitedChild is None:
+        skip = "waitid is not used on this platform."
+
+    def inHelper(self, check):
+        """
+        Call a function in a forked helper process, which has no children but
+        the ones it starts.
+
+        @param check: A no-argument callable returning a C{bytes} result.
+
+        @return: The result of C{check}.
+        """
+        r, w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.close(r)
+                os.write(w, check())
+            finally:
+                os._exit(0)
+        os.close(w)
+        try:
+            chunks = []
+            while True:
+                chunk = os.read(r, 1024)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        finally:
+            os.close(r)
+            os.waitpid(pid, 0)
+        return b"".join(chunks)
+
+
+    def test_exited(self):
+        """
+        L{exitedChild} returns the process ID of a child which has exited,
+        and leaves it to be reaped.
+        """
+        def check():
+            pid = os.fork()
+            if pid == 0:
+                os._exit(3)
+            deadline = time.time() + 10
+            while exitedChild() is None and time.time() < deadline:
+                time.sleep(0.01)
+            found = exitedChild()
+            reaped, status = os.waitpid(pid, 0)
+            return repr(
+                (found == pid, reaped == pid, os.WEXITSTATUS(status),
+                 exitedChild())).encode("ascii")
+        self.assertEqual(self.inHelper(check), b"(True, True, 3, None)")
+
+
+    def test_running(self):
+        """
+        L{exitedChild} returns C{None} if no child has exited.
+        """
+        def check():
+            r, w = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(w)
+                os.read(r, 1)
+                os._exit(0)
+            os.close(r)
+            try:
+                return repr(exitedChild()).encode("ascii")
+            finally:
+                os.close(w)
+                os.waitpid(pid, 0)
+        self.assertEqual(self.inHelper(check), b"None")
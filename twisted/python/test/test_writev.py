@@ -0,0 +1,74 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.python._writev}.
+"""
+
+from __future__ import division, absolute_import
+
+import socket
+
+from twisted.python.compat import _PY3
+from twisted.trial.unittest import TestCase
+
+try:
+    from twisted.python._writev import writev
+except ImportError:
+    writev = None
+
+
+
+class WritevTests(TestCase):
+    """
+    Tests for L{writev}.
+    """
+    if writev is None:
+        skip = "writev is not available on this platform."
+
+    def setUp(self):
+        self.sender, self.receiver = socket.socketpair()
+        self.addCleanup(self.sender.close)
+        self.addCleanup(self.receiver.close)
+
+
+    def test_write(self):
+        """
+        L{writev} writes all of the given buffers, in order, and returns the
+        number of bytes written.
+        """
+        self.assertEqual(
+            writev(self.sender.fileno(), [b"hello", b"", b", ", b"world"]),
+            12)
+        self.assertEqual(self.receiver.recv(100), b"hello, world")
+
+
+    def test_views(self):
+        """
+        L{writev} writes the part of a buffer which a C{memoryview} or, on
+        Python 2, a C{buffer} covers.
+        """
+        vectors = [memoryview(b"0123456789")[4:]]
+        if not _PY3:
+            vectors.append(buffer(b"abcdef", 2, 3))
+        writev(self.sender.fileno(), vectors)
+        expected = b"456789" if _PY3 else b"456789cde"
+        self.assertEqual(self.receiver.recv(100), expected)
+
+
+    def test_partial(self):
+        """
+        L{writev} returns how much it wrote when the socket's send buffer does
+        not have room for all of the buffers.
+        """
+        self.sender.setblocking(False)
+        data = b"x" * (2 ** 16)
+        written = writev(self.sender.fileno(), [data] * 64)
+        self.assertTrue(0 < written < len(data) * 64)
+
+
+    def test_error(self):
+        """
+        L{writev} raises L{socket.error} if the system call fails.
+        """
+        self.assertRaises(socket.error, writev, -1, [b"hello"])
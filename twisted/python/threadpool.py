@@ -12,12 +12,13 @@ instead of creating a thread pool directly.
 from __future__ import division, absolute_import
 
 try:
-    from Queue import Queue
+    from Queue import Queue, Empty
 except ImportError:
-    from queue import Queue
+    from queue import Queue, Empty
 import contextlib
 import threading
 import copy
+import time
 
 from twisted.python import log, context, failure
 
@@ -25,6 +26,56 @@ from twisted.python import log, context, failure
 WorkerStop = object()
 
 
+class ThreadPoolFull(Exception):
+    """
+    Work could not be given to a L{ThreadPool}, because as much work as it
+    allows is already waiting for a thread.
+    """
+
+
+
+class ThreadPoolStatistics(object):
+    """
+    A snapshot of the state of a L{ThreadPool}, and of the work it has done.
+
+    @ivar workers: The number of threads in the pool.
+    @ivar busy: The number of threads running work.
+    @ivar idle: The number of threads waiting for work.
+    @ivar queued: The number of calls waiting for a thread.
+    @ivar completed: The number of calls which have been run.
+    @ivar rejected: The number of calls which were refused with
+        L{ThreadPoolFull}.
+    @ivar waitTime: The total time, in seconds, that the calls which have
+        been run waited for a thread.
+    @ivar maxWaitTime: The longest time, in seconds, that a call has waited
+        for a thread.
+    @ivar runTime: The total time, in seconds, spent running calls.
+    """
+
+    def __init__(self, workers, busy, idle, queued, completed, rejected,
+                 waitTime, maxWaitTime, runTime):
+        self.workers = workers
+        self.busy = busy
+        self.idle = idle
+        self.queued = queued
+        self.completed = completed
+        self.rejected = rejected
+        self.waitTime = waitTime
+        self.maxWaitTime = maxWaitTime
+        self.runTime = runTime
+
+
+    def __repr__(self):
+        return (
+            "<ThreadPoolStatistics workers=%d busy=%d idle=%d queued=%d "
+            "completed=%d rejected=%d waitTime=%.6f maxWaitTime=%.6f "
+            "runTime=%.6f>" % (
+                self.workers, self.busy, self.idle, self.queued,
+                self.completed, self.rejected, self.waitTime,
+                self.maxWaitTime, self.runTime))
+
+
+
 class ThreadPool:
     """
     This class (hopefully) generalizes the functionality of a pool of
@@ -33,6 +84,23 @@ class ThreadPool:
     L{callInThread} and L{stop} should only be called from
     a single thread, unless you make a subclass where L{stop} and
     L{_startSomeWorkers} are synchronized.
+
+    @ivar maxQueued: The most calls which may wait for a thread, or C{0} for
+        no limit.
+    @ivar blockWhenFull: If C{True}, a call given to the pool while
+        C{maxQueued} calls are waiting blocks until one of them is taken by a
+        thread; otherwise it is refused with L{ThreadPoolFull}.
+    @ivar idleTimeout: The time, in seconds, after which a thread which has
+        had no work to do exits, as long as at least C{min} threads are left,
+        or C{None} to keep threads until the pool is stopped.
+
+    @ivar _slots: A semaphore counting the calls which may still be queued,
+        or C{None} if there is no limit.
+    @ivar _lock: A lock held while the number of threads is changed, so that
+        threads which exit when idle do so safely.
+    @ivar _statsLock: A lock held while the statistics are updated.
+    @ivar _seconds: A no-argument callable returning the current time in
+        seconds, used to measure how long calls wait and run.
     """
     min = 5
     max = 20
@@ -40,32 +108,64 @@ class ThreadPool:
     started = False
     workers = 0
     name = None
+    maxQueued = 0
+    blockWhenFull = False
+    idleTimeout = None
 
     threadFactory = threading.Thread
     currentThread = staticmethod(threading.currentThread)
+    _seconds = staticmethod(time.time)
 
-    def __init__(self, minthreads=5, maxthreads=20, name=None):
+    def __init__(self, minthreads=5, maxthreads=20, name=None, maxQueued=0,
+                 blockWhenFull=False, idleTimeout=None):
         """
         Create a new threadpool.
 
         @param minthreads: minimum number of threads in the pool
         @param maxthreads: maximum number of threads in the pool
+        @param name: the name of the pool, used to name its threads
+        @param maxQueued: the most calls which may wait for a thread, or C{0}
+            for no limit
+        @param blockWhenFull: whether a call given to a full pool blocks until
+            there is room for it, rather than being refused
+        @param idleTimeout: the time in seconds after which an idle thread
+            exits, or C{None} to keep idle threads
         """
         assert minthreads >= 0, 'minimum is negative'
         assert minthreads <= maxthreads, 'minimum is greater than maximum'
+        assert maxQueued >= 0, 'maximum queued is negative'
         self.q = Queue(0)
         self.min = minthreads
         self.max = maxthreads
         self.name = name
+        self.maxQueued = maxQueued
+        self.blockWhenFull = blockWhenFull
+        self.idleTimeout = idleTimeout
         self.waiters = []
         self.threads = []
         self.working = []
+        if maxQueued:
+            self._slots = threading.Semaphore(maxQueued)
+        else:
+            self._slots = None
+        self._lock = threading.RLock()
+        self._statsLock = threading.Lock()
+        self._queued = 0
+        self._completed = 0
+        self._rejected = 0
+        self._waitTime = 0.0
+        self._maxWaitTime = 0.0
+        self._runTime = 0.0
 
 
     def start(self):
         """
         Start the threadpool.
         """
+        if self.joined and self._slots is not None:
+            # Take back the room stop() made to wake blocked callers.
+            for i in range(self.maxQueued):
+                self._slots.acquire(False)
         self.joined = False
         self.started = True
         # Start some threads.
@@ -73,35 +173,43 @@ class ThreadPool:
 
 
     def startAWorker(self):
-        self.workers += 1
-        name = "PoolThread-%s-%s" % (self.name or id(self), self.workers)
-        newThread = self.threadFactory(target=self._worker, name=name)
-        self.threads.append(newThread)
+        with self._lock:
+            self.workers += 1
+            name = "PoolThread-%s-%s" % (self.name or id(self), self.workers)
+            newThread = self.threadFactory(target=self._worker, name=name)
+            self.threads.append(newThread)
         newThread.start()
 
 
     def stopAWorker(self):
-        self.q.put(WorkerStop)
-        self.workers -= 1
+        with self._lock:
+            self.q.put(WorkerStop)
+            self.workers -= 1
 
 
     def __setstate__(self, state):
         self.__dict__ = state
-        ThreadPool.__init__(self, self.min, self.max)
+        ThreadPool.__init__(
+            self, self.min, self.max, maxQueued=self.maxQueued,
+            blockWhenFull=self.blockWhenFull, idleTimeout=self.idleTimeout)
 
 
     def __getstate__(self):
         state = {}
         state['min'] = self.min
         state['max'] = self.max
+        state['maxQueued'] = self.maxQueued
+        state['blockWhenFull'] = self.blockWhenFull
+        state['idleTimeout'] = self.idleTimeout
         return state
 
 
     def _startSomeWorkers(self):
-        neededSize = self.q.qsize() + len(self.working)
-        # Create enough, but not too many
-        while self.workers < min(self.max, neededSize):
-            self.startAWorker()
+        with self._lock:
+            neededSize = self.q.qsize() + len(self.working)
+            # Create enough, but not too many
+            while self.workers < min(self.max, neededSize):
+                self.startAWorker()
 
 
     def callInThread(self, func, *args, **kw):
@@ -146,16 +254,69 @@ class ThreadPool:
         @param *args: positional arguments to be passed to C{func}
 
         @param **kwargs: keyword arguments to be passed to C{func}
+
+        @raise ThreadPoolFull: if C{maxQueued} calls are already waiting for a
+            thread and C{blockWhenFull} is not set.  If it is set, this blocks
+            until there is room instead, or until the pool is stopped, so it
+            must not be used from a thread which the calls in the pool wait
+            for.
         """
         if self.joined:
             return
+        if self._slots is not None:
+            if not self._slots.acquire(self.blockWhenFull):
+                with self._statsLock:
+                    self._rejected += 1
+                raise ThreadPoolFull()
+            if self.joined:
+                # The pool was stopped while this call waited for room; pass
+                # the wake-up on to any other call still waiting.
+                self._slots.release()
+                return
         ctx = context.theContextTracker.currentContext().contexts[-1]
-        o = (ctx, func, args, kw, onResult)
+        o = (ctx, func, args, kw, onResult, self._seconds())
+        with self._statsLock:
+            self._queued += 1
         self.q.put(o)
         if self.started:
             self._startSomeWorkers()
 
 
+    def isSaturated(self):
+        """
+        Determine whether a call given to this pool now would have to wait for
+        a thread, because C{max} threads are already busy or have a call to
+        take.
+
+        Calls given to a pool which has not been started yet are counted as
+        taking the threads it will start, so such a pool is only saturated
+        once C{max} calls are queued.
+
+        The answer may be out of date as soon as it is given, since threads
+        finish their work independently.
+
+        @return: C{True} if the pool is saturated.
+        @rtype: C{bool}
+        """
+        return len(self.working) + self._queued >= self.max
+
+
+    def statistics(self):
+        """
+        Take a snapshot of the state of this pool, and of the work it has
+        done.
+
+        @rtype: L{ThreadPoolStatistics}
+        """
+        with self._statsLock:
+            return ThreadPoolStatistics(
+                workers=self.workers, busy=len(self.working),
+                idle=len(self.waiters), queued=self._queued,
+                completed=self._completed, rejected=self._rejected,
+                waitTime=self._waitTime, maxWaitTime=self._maxWaitTime,
+                runTime=self._runTime)
+
+
     @contextlib.contextmanager
     def _workerState(self, stateList, workerThread):
         """
@@ -181,11 +342,12 @@ class ThreadPool:
         threadpool is stopped.
         """
         ct = self.currentThread()
-        o = self.q.get()
+        o = self._getWork(ct)
         while o is not WorkerStop:
             with self._workerState(self.working, ct):
-                ctx, function, args, kwargs, onResult = o
+                ctx, function, args, kwargs, onResult, queuedAt = o
                 del o
+                started = self._seconds()
 
                 try:
                     result = context.call(ctx, function, *args, **kwargs)
@@ -199,6 +361,7 @@ class ThreadPool:
                         result = failure.Failure()
 
                 del function, args, kwargs
+                self._recordRun(started - queuedAt, self._seconds() - started)
 
             if onResult is not None:
                 try:
@@ -208,21 +371,81 @@ class ThreadPool:
 
             del ctx, onResult, result
 
-            with self._workerState(self.waiters, ct):
-                o = self.q.get()
+            o = self._getWork(ct)
 
         self.threads.remove(ct)
 
 
+    def _getWork(self, workerThread):
+        """
+        Wait for a call to run.
+
+        If C{idleTimeout} is set and no call comes within it, and there are
+        more than C{min} threads, this thread stops being counted as one of
+        them and L{WorkerStop} is returned to make it exit.
+
+        @param workerThread: the thread waiting, used to represent it in
+            C{waiters}
+
+        @return: a call to run, or L{WorkerStop}
+        """
+        with self._workerState(self.waiters, workerThread):
+            if self.idleTimeout is None:
+                o = self.q.get()
+            else:
+                while True:
+                    try:
+                        o = self.q.get(timeout=self.idleTimeout)
+                    except Empty:
+                        with self._lock:
+                            # Anything queued after the timeout is left for
+                            # this thread, since it was still counted when
+                            # the pool decided whether to start another.
+                            if self.workers > self.min and not self.q.qsize():
+                                self.workers -= 1
+                                return WorkerStop
+                    else:
+                        break
+        if o is not WorkerStop:
+            if self._slots is not None:
+                self._slots.release()
+            with self._statsLock:
+                self._queued -= 1
+        return o
+
+
+    def _recordRun(self, waited, ran):
+        """
+        Add a call which has been run to the statistics.
+
+        @param waited: the time in seconds it waited for a thread
+        @param ran: the time in seconds it took to run
+        """
+        with self._statsLock:
+            self._completed += 1
+            self._waitTime += waited
+            self._runTime += ran
+            if waited > self._maxWaitTime:
+                self._maxWaitTime = waited
+
+
     def stop(self):
         """
         Shutdown the threads in the threadpool.
+
+        Calls blocked waiting for room in the queue return without being
+        queued.
         """
+        wasJoined = self.joined
         self.joined = True
-        threads = copy.copy(self.threads)
-        while self.workers:
-            self.q.put(WorkerStop)
-            self.workers -= 1
+        if self._slots is not None and not wasJoined:
+            for i in range(self.maxQueued):
+                self._slots.release()
+        with self._lock:
+            threads = copy.copy(self.threads)
+            while self.workers:
+                self.q.put(WorkerStop)
+                self.workers -= 1
 
         # and let's just make sure
         # FIXME: threads that have died before calling stop() are not joined.
@@ -244,14 +467,15 @@ class ThreadPool:
         if not self.started:
             return
 
-        # Kill of some threads if we have too many.
-        while self.workers > self.max:
-            self.stopAWorker()
-        # Start some threads if we have too few.
-        while self.workers < self.min:
-            self.startAWorker()
-        # Start some threads if there is a need.
-        self._startSomeWorkers()
+        with self._lock:
+            # Kill of some threads if we have too many.
+            while self.workers > self.max:
+                self.stopAWorker()
+            # Start some threads if we have too few.
+            while self.workers < self.min:
+                self.startAWorker()
+            # Start some threads if there is a need.
+            self._startSomeWorkers()
 
 
     def dumpStats(self):
@@ -259,3 +483,4 @@ class ThreadPool:
         log.msg('waiters: %s' % self.waiters)
         log.msg('workers: %s' % self.working)
         log.msg('total: %s'   % self.threads)
+        log.msg('statistics: %r' % (self.statistics(),))
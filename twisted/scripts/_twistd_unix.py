@@ -2,7 +2,7 @@
 # Copyright (c) Twisted Matrix Laboratories.
 # See LICENSE for details.
 
-import os, errno, sys
+import os, errno, sys, signal, time, select
 
 from twisted.python import log, syslog, logfile, usage
 from twisted.python.util import (
@@ -42,6 +42,12 @@ class ServerOptions(app.ServerOptions):
                      ['gid', 'g', None, "The gid to run as.", gidFromString],
                      ['umask', None, None,
                       "The (octal) file creation mask to apply.", _umask],
+                     ['workers', None, 0,
+                      "Run the application in the given number of worker "
+                      "processes, restarting them if they exit and replacing "
+                      "them one at a time on SIGHUP.  Listening ports must "
+                      "allow this, for example with tcp:PORT:reuseport=1.",
+                      int],
                     ]
 
     compData = usage.Completions(
@@ -63,10 +69,29 @@ class ServerOptions(app.ServerOptions):
 
     def postOptions(self):
         app.ServerOptions.postOptions(self)
+        if self['workers'] < 0:
+            raise usage.UsageError("--workers must not be negative")
+        # Removed, so that processes this one starts are not taken for
+        # workers themselves.
+        statusPipe = os.environ.pop(_WORKER_STATUS_PIPE, None)
+        if statusPipe is not None:
+            # This is one of the workers started by a supervisor, which
+            # daemonizes and keeps the PID file itself.
+            self['workers'] = 0
+            self['nodaemon'] = True
+            self['pidfile'] = ''
+            self['statusPipe'] = int(statusPipe)
         if self['pidfile']:
             self['pidfile'] = os.path.abspath(self['pidfile'])
 
 
+# The environment variable giving a worker process the file descriptor to
+# which to report whether it started, in the same way as a daemonized process
+# reports it to its original parent.
+_WORKER_STATUS_PIPE = "_TWISTD_WORKER_STATUS_PIPE"
+
+
+
 def checkPID(pidfile):
     if not pidfile:
         return
@@ -165,12 +190,249 @@ def launchWithName(name):
 
 
 
+class WorkerStartError(Exception):
+    """
+    A worker process started by L{WorkerSupervisor} failed to start its
+    application.
+    """
+
+
+
+class WorkerSupervisor(object):
+    """
+    Start and supervise the worker processes of C{twistd --workers}.
+
+    Each worker is a new twistd process, with a reactor of its own, running
+    the application from the same command line.  It reports whether it has
+    started the application through a pipe, as a daemonized twistd does to
+    its original parent.  Workers which exit are replaced, workers are
+    replaced one at a time on C{SIGHUP}, and they are all stopped on
+    C{SIGTERM} or C{SIGINT}.
+
+    @ivar count: The number of workers to keep running.
+    @type count: C{int}
+
+    @ivar argv: The command line with which to run a worker, starting with
+        the Python executable.
+    @type argv: C{list} of C{str}
+
+    @ivar workers: The process IDs of the workers running.
+    @type workers: C{set}
+
+    @ivar restartDelay: The number of seconds to wait after a worker fails to
+        start before starting another.
+
+    @ivar pollInterval: The number of seconds between checks for exited
+        workers and received signals.
+
+    @ivar startTimeout: The number of seconds to wait for a worker to report
+        whether it has started the application before killing it.
+
+    @ivar stopTimeout: The number of seconds to wait for a worker to exit
+        after asking it to stop before killing it.
+    """
+    restartDelay = 1.0
+    pollInterval = 0.1
+    startTimeout = 60.0
+    stopTimeout = 10.0
+
+    _fork = staticmethod(os.fork)
+    _kill = staticmethod(os.kill)
+    _waitpid = staticmethod(os.waitpid)
+    _sleep = staticmethod(time.sleep)
+    _time = staticmethod(time.time)
+    _select = staticmethod(select.select)
+
+    def __init__(self, count, argv):
+        self.count = count
+        self.argv = argv
+        self.workers = set()
+        self._stopping = False
+        self._restartRequested = False
+        self._nextStart = 0
+
+
+    def spawnWorker(self):
+        """
+        Start a worker and wait until it has started the application.
+
+        @return: The process ID of the worker.
+        @rtype: C{int}
+
+        @raise WorkerStartError: If the worker failed to start the
+            application, or did not say whether it had within
+            C{startTimeout} seconds.
+        """
+        readPipe, writePipe = os.pipe()
+        if getattr(os, "set_inheritable", None) is not None:
+            os.set_inheritable(writePipe, True)
+        environ = dict(os.environ)
+        environ[_WORKER_STATUS_PIPE] = str(writePipe)
+        pid = self._fork()
+        if pid == 0:
+            try:
+                os.close(readPipe)
+                os.execve(self.argv[0], self.argv, environ)
+            finally:
+                os._exit(127)
+        os.close(writePipe)
+        try:
+            readable = untilConcludes(
+                self._select, [readPipe], [], [], self.startTimeout)[0]
+            if readable:
+                data = untilConcludes(os.read, readPipe, 100)
+        finally:
+            os.close(readPipe)
+        if not readable:
+            self._kill(pid, signal.SIGKILL)
+            untilConcludes(self._waitpid, pid, 0)
+            raise WorkerStartError(
+                "worker did not start within %s seconds" % (
+                    self.startTimeout,))
+        if data != "0":
+            untilConcludes(self._waitpid, pid, 0)
+            raise WorkerStartError(data[2:] or "worker exited")
+        self.workers.add(pid)
+        log.msg("Started worker %d." % (pid,))
+        return pid
+
+
+    def startWorkers(self):
+        """
+        Start all of the workers.  If one of them fails to start, stop those
+        started already.
+
+        @raise WorkerStartError: If a worker failed to start.
+        """
+        try:
+            while len(self.workers) < self.count:
+                self.spawnWorker()
+        except WorkerStartError:
+            self.stopWorkers()
+            raise
+
+
+    def _stop(self, pids):
+        """
+        Ask some workers to stop, and wait until they have, killing any which
+        have not after C{stopTimeout} seconds.
+        """
+        for pid in pids:
+            self._kill(pid, signal.SIGTERM)
+        running = set(pids)
+        deadline = self._time() + self.stopTimeout
+        while True:
+            for pid in list(running):
+                exited, status = untilConcludes(
+                    self._waitpid, pid, os.WNOHANG)
+                if exited:
+                    running.discard(pid)
+                    self.workers.discard(pid)
+            if not running or self._time() >= deadline:
+                break
+            self._sleep(self.pollInterval)
+        for pid in running:
+            log.msg("Worker %d did not stop, killing it." % (pid,))
+            self._kill(pid, signal.SIGKILL)
+            untilConcludes(self._waitpid, pid, 0)
+            self.workers.discard(pid)
+
+
+    def stopWorker(self, pid):
+        """
+        Ask a worker to stop, and wait until it has, killing it if it has not
+        after C{stopTimeout} seconds.
+        """
+        self._stop([pid])
+
+
+    def stopWorkers(self):
+        """
+        Ask all of the workers to stop, and wait until they all have, killing
+        any which have not after C{stopTimeout} seconds.
+        """
+        self._stop(list(self.workers))
+
+
+    def reapWorkers(self):
+        """
+        Forget about the workers which have exited.
+        """
+        for pid in list(self.workers):
+            exited, status = untilConcludes(self._waitpid, pid, os.WNOHANG)
+            if exited:
+                self.workers.discard(pid)
+                log.msg("Worker %d exited with status %d." % (pid, status))
+
+
+    def replaceWorkers(self):
+        """
+        Start new workers until there are C{count} of them again, unless one
+        failed to start less than C{restartDelay} seconds ago.
+        """
+        while len(self.workers) < self.count:
+            if self._time() < self._nextStart:
+                return
+            try:
+                self.spawnWorker()
+            except WorkerStartError as e:
+                log.msg("Worker failed to start: %s" % (e,))
+                self._nextStart = self._time() + self.restartDelay
+
+
+    def restartWorkers(self):
+        """
+        Replace each worker by a new one in turn, starting the new one before
+        stopping the old one, so that there is no time at which the
+        application is not running.  If a new worker fails to start, the
+        remaining old ones are kept.
+        """
+        for pid in list(self.workers):
+            try:
+                self.spawnWorker()
+            except WorkerStartError as e:
+                log.msg("Worker failed to start, not restarting the others: "
+                        "%s" % (e,))
+                return
+            self.stopWorker(pid)
+
+
+    def _requestStop(self, signum, frame):
+        self._stopping = True
+
+
+    def _requestRestart(self, signum, frame):
+        self._restartRequested = True
+
+
+    def run(self):
+        """
+        Supervise the workers until C{SIGTERM} or C{SIGINT} is received, then
+        stop them.
+        """
+        signal.signal(signal.SIGTERM, self._requestStop)
+        signal.signal(signal.SIGINT, self._requestStop)
+        signal.signal(signal.SIGHUP, self._requestRestart)
+        while not self._stopping:
+            if self._restartRequested:
+                self._restartRequested = False
+                log.msg("Restarting workers.")
+                self.restartWorkers()
+            self.reapWorkers()
+            self.replaceWorkers()
+            self._sleep(self.pollInterval)
+        log.msg("Stopping workers.")
+        self.stopWorkers()
+
+
+
 class UnixApplicationRunner(app.ApplicationRunner):
     """
     An ApplicationRunner which does Unix-specific things, like fork,
     shed privileges, and maintain a PID file.
     """
     loggerFactory = UnixAppLogger
+    supervisorFactory = WorkerSupervisor
 
     def preApplication(self):
         """
@@ -188,7 +450,12 @@ class UnixApplicationRunner(app.ApplicationRunner):
         To be called after the application is created: start the application
         and run the reactor. After the reactor stops, clean up PID files and
         such.
+
+        If worker processes were requested, supervise them instead.
         """
+        if self.config['workers']:
+            self.superviseWorkers()
+            return
         try:
             self.startApplication(self.application)
         except Exception as ex:
@@ -209,6 +476,34 @@ class UnixApplicationRunner(app.ApplicationRunner):
         self.removePID(self.config['pidfile'])
 
 
+    def superviseWorkers(self):
+        """
+        Set up the environment as for running the application, then start and
+        supervise C{config['workers']} worker processes which run it, until
+        told to stop.
+        """
+        self.setupEnvironment(
+            self.config['chroot'], self.config['rundir'],
+            self.config['nodaemon'], self.config['umask'],
+            self.config['pidfile'])
+        supervisor = self.supervisorFactory(
+            self.config['workers'], [sys.executable] + sys.argv)
+        statusPipe = self.config.get("statusPipe", None)
+        try:
+            supervisor.startWorkers()
+        except WorkerStartError as e:
+            if statusPipe is not None:
+                untilConcludes(os.write, statusPipe, "1 %s" % (str(e)[:98],))
+                untilConcludes(os.close, statusPipe)
+            self.removePID(self.config['pidfile'])
+            raise
+        if statusPipe is not None:
+            untilConcludes(os.write, statusPipe, "0")
+            untilConcludes(os.close, statusPipe)
+        supervisor.run()
+        self.removePID(self.config['pidfile'])
+
+
     def removePID(self, pidfile):
         """
         Remove the specified PID file, if possible.  Errors are logged, not
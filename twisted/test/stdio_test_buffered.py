@@ -0,0 +1,50 @@
+# -*- test-case-name: twisted.test.test_stdio.StandardInputOutputTestCase.test_bufferedProtocol -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Main program for the child process run by
+L{twisted.test.test_stdio.StandardInputOutputTestCase.test_bufferedProtocol}
+to test that standard input is read into the buffer of a protocol providing
+IBufferedProtocol.
+"""
+
+import sys, _preamble
+
+from zope.interface import implementer
+
+from twisted.internet import stdio, protocol, interfaces
+from twisted.python import reflect
+
+
+@implementer(interfaces.IBufferedProtocol)
+class BufferedChild(protocol.Protocol):
+    def __init__(self):
+        self.buf = bytearray(4096)
+
+
+    def getBuffer(self, sizeHint):
+        return memoryview(self.buf)
+
+
+    def bufferUpdated(self, nbytes):
+        data = bytes(self.buf[:nbytes])
+        self.transport.write(data)
+        if data.endswith('\n0\n'):
+            self.transport.loseConnection()
+
+
+    def dataReceived(self, bytes):
+        self.transport.write("dataReceived called instead of bufferUpdated")
+        self.transport.loseConnection()
+
+
+    def connectionLost(self, reason):
+        reactor.stop()
+
+
+if __name__ == '__main__':
+    reflect.namedAny(sys.argv[1]).install()
+    from twisted.internet import reactor
+    stdio.StandardIO(BufferedChild())
+    reactor.run()
@@ -1118,6 +1118,53 @@ class BinaryProtocolTests(unittest.TestCase):
         self.assertRaises(amp.ProtocolSwitched, a.sendBox, anyOldBox)
 
 
+    def bufferReceived(self, protocol, data):
+        """
+        Deliver C{data} to C{protocol} through its L{IBufferedProtocol}
+        methods, the way a transport which supports them would.
+        """
+        while data:
+            buf = protocol.getBuffer(len(data))
+            chunk = data[:len(buf)]
+            buf[:len(chunk)] = chunk
+            del buf
+            data = data[len(chunk):]
+            protocol.bufferUpdated(len(chunk))
+
+
+    def test_bufferedReceiveBoxData(self):
+        """
+        When the serialized form of AMP boxes is read into the buffer of a
+        binary box protocol, it emits similar boxes to its boxReceiver.
+        """
+        a = amp.BinaryBoxProtocol(self)
+        box = amp.Box({"testKey": "valueTest", "anotherKey": "anotherValue"})
+        data = box.serialize() * 2
+        self.bufferReceived(a, data[:7])
+        self.bufferReceived(a, data[7:])
+        self.assertEqual(self.boxes, [box, box])
+
+
+    def test_bufferedProtocolSwitch(self):
+        """
+        After switching to a different protocol, the data read into the
+        buffer of a L{BinaryBoxProtocol} is delivered to the new protocol.
+        """
+        otherProto = TestProto(None, "outgoing data")
+        class SwitchyReceiver:
+            def startReceivingBoxes(self, sender):
+                pass
+            def ampBoxReceived(self, box):
+                a._lockForSwitch()
+                a._switchTo(otherProto)
+        a = amp.BinaryBoxProtocol(SwitchyReceiver())
+        a.makeConnection(self)
+        self.bufferReceived(
+            a, amp.Box({"include": "data"}).serialize() + "\x00\x00Hello")
+        self.bufferReceived(a, ", world!")
+        self.assertEqual("".join(otherProto.data), "\x00\x00Hello, world!")
+
+
     def test_protocolSwitchEmptyBuffer(self):
         """
         After switching to a different protocol, if no extra bytes beyond
@@ -709,3 +709,177 @@ class RunStateTests(unittest.TestCase):
 
 
 
+
+
+
+class CountingTerminator(object):
+    """
+    A termination predicate factory which ends each step of a L{Cooperator}
+    after a fixed number of units of work.
+
+    @ivar units: The number of units of work to allow in each step, or
+        C{None} to never end a step.
+    """
+    def __init__(self, units):
+        self.units = units
+
+
+    def __call__(self):
+        """
+        Return a predicate for a new step.
+        """
+        if self.units is None:
+            return lambda: False
+        remaining = [self.units]
+        def terminator():
+            remaining[0] -= 1
+            return remaining[0] <= 0
+        return terminator
+
+
+
+class PriorityTests(unittest.TestCase):
+    """
+    Tests for the priorities and budgets of L{task.CooperativeTask}s, and the
+    statistics kept about them.
+    """
+
+    def setUp(self):
+        """
+        Create a L{task.Cooperator} with a fake scheduler and a fake clock,
+        which ends each step after eight units of work.
+        """
+        self.now = 0.0
+        self.work = []
+        self.scheduler = FakeScheduler()
+        self.terminator = CountingTerminator(8)
+        self.cooperator = task.Cooperator(
+            scheduler=self.scheduler,
+            terminationPredicateFactory=self.terminator)
+        self.cooperator._seconds = lambda: self.now
+
+
+    def worker(self, name, cost=0.0):
+        """
+        Return an iterator which never ends, and records C{name} in
+        C{self.work} and advances the clock by C{cost} for each unit of work.
+        """
+        while True:
+            self.work.append(name)
+            self.now += cost
+            yield None
+
+
+    def test_defaultPriority(self):
+        """
+        The priority of a task is 1 by default, and it has no budget.
+        """
+        t = self.cooperator.cooperate(self.worker("a"))
+        self.assertEqual(t.priority, 1)
+        self.assertIdentical(t.budget, None)
+
+
+    def test_invalidPriority(self):
+        """
+        L{task.Cooperator.cooperate} raises L{ValueError} if the priority is
+        less than 1.
+        """
+        self.assertRaises(
+            ValueError, self.cooperator.cooperate, self.worker("a"), 0)
+        self.assertEqual(self.cooperator._tasks, [])
+
+
+    def test_priority(self):
+        """
+        Each time a L{task.Cooperator} goes around its tasks, each task does as
+        many units of work as its priority.
+        """
+        self.cooperator.cooperate(self.worker("a"), priority=3)
+        self.cooperator.cooperate(self.worker("b"))
+        self.scheduler.pump()
+        self.assertEqual(self.work, list("aaabaaab"))
+
+
+    def test_priorityChanged(self):
+        """
+        A task's priority may be changed while it is running.
+        """
+        t = self.cooperator.cooperate(self.worker("a"), priority=3)
+        self.cooperator.cooperate(self.worker("b"))
+        t.priority = 1
+        self.scheduler.pump()
+        self.assertEqual(self.work, list("abababab"))
+
+
+    def test_coiteratePriority(self):
+        """
+        L{task.Cooperator.coiterate} accepts a priority, too.
+        """
+        self.cooperator.coiterate(self.worker("a"), priority=2)
+        self.cooperator.coiterate(self.worker("b"))
+        self.scheduler.pump()
+        self.assertEqual(self.work, list("aabaabaa"))
+
+
+    def test_lowPriorityNotStarved(self):
+        """
+        A task with a low priority still does work when another task has a
+        priority so high that a whole step ends before it is done, because
+        the next step carries on with the next task.
+        """
+        self.cooperator.cooperate(self.worker("a"), priority=100)
+        self.cooperator.cooperate(self.worker("b"))
+        self.scheduler.pump()
+        self.assertEqual(self.work, ["a"] * 8)
+        self.scheduler.pump()
+        self.assertEqual(self.work, ["a"] * 8 + ["b"] + ["a"] * 7)
+
+
+    def test_budget(self):
+        """
+        A task which has used up its budget is left out for the rest of the
+        step, and may work again in the next step.
+        """
+        self.cooperator.cooperate(self.worker("a", 0.5), budget=1.0)
+        self.cooperator.cooperate(self.worker("b"))
+        self.scheduler.pump()
+        self.assertEqual(self.work, list("ababbbbb"))
+        self.scheduler.pump()
+        self.assertEqual(self.work[8:10], list("ab"))
+
+
+    def test_budgetEndsPriority(self):
+        """
+        A task stops doing the units of work its priority allows it once it
+        has used up its budget.
+        """
+        self.cooperator.cooperate(
+            self.worker("a", 0.5), priority=4, budget=1.0)
+        self.cooperator.cooperate(self.worker("b"))
+        self.scheduler.pump()
+        self.assertEqual(self.work, list("aabbbbbb"))
+
+
+    def test_allBudgetsUsed(self):
+        """
+        Once every task has used up its budget, the step ends, and the next
+        one is scheduled.
+        """
+        self.terminator.units = None
+        self.cooperator.cooperate(self.worker("a", 0.5), budget=1.0)
+        self.cooperator.cooperate(self.worker("b", 1.0), budget=1.0)
+        self.scheduler.pump()
+        self.assertEqual(self.work, list("aba"))
+        self.assertEqual(len(self.scheduler.work), 1)
+
+
+    def test_statistics(self):
+        """
+        A task counts the units of work it has done, and the time it has
+        spent doing them.
+        """
+        a = self.cooperator.cooperate(self.worker("a", 0.25))
+        b = self.cooperator.cooperate(self.worker("b", 1.0))
+        self.scheduler.pump()
+        self.assertEqual((a.iterations, a.elapsed), (4, 1.0))
+        self.assertEqual((b.iterations, b.elapsed), (4, 4.0))
@@ -829,6 +829,72 @@ class DeferredTestCase(unittest.SynchronousTestCase, ImmediateFailureMixin):
         self.assertEqual(exception.args, (exceptionMessage,))
 
 
+    def test_callbacksRemovedWhenRun(self):
+        """
+        The callbacks of a L{Deferred} are removed from C{callbacks} once they
+        have been run, including when a callback returns a L{Deferred} without
+        a result and the remaining callbacks have to wait for it.
+        """
+        inner = defer.Deferred()
+        deferred = defer.Deferred()
+        results = []
+        deferred.addCallback(lambda result: inner)
+        deferred.addCallback(results.append)
+        deferred.callback(None)
+        self.assertEqual(len(deferred.callbacks), 1)
+        inner.callback("result")
+        self.assertEqual(results, ["result"])
+        self.assertEqual(deferred.callbacks, [])
+        self.assertEqual(inner.callbacks, [])
+
+
+    def test_longCallbackChain(self):
+        """
+        Every callback of a long chain is run, in order.
+        """
+        deferred = defer.Deferred()
+        for i in range(1000):
+            deferred.addCallback(lambda result, i=i: result + [i])
+        deferred.callback([])
+        self.assertEqual(self.successResultOf(deferred), list(range(1000)))
+
+
+    def test_callbackArguments(self):
+        """
+        The positional and keyword arguments given to L{Deferred.addCallback},
+        L{Deferred.addErrback} and L{Deferred.addBoth} are passed to the
+        callback after the result.
+        """
+        results = []
+        def record(result, *args, **kw):
+            results.append((result, args, kw))
+            return result
+        deferred = defer.Deferred()
+        deferred.addCallback(record, 1, a=2)
+        deferred.addCallback(record, 3)
+        deferred.addCallback(record, b=4)
+        deferred.addBoth(record, 5, c=6)
+        deferred.addCallback(lambda result: 1 // 0)
+        deferred.addErrback(lambda reason, *args, **kw: (args, kw), 7, d=8)
+        deferred.callback("r")
+        self.assertEqual(results, [
+                ("r", (1,), {"a": 2}), ("r", (3,), {}), ("r", (), {"b": 4}),
+                ("r", (5,), {"c": 6})])
+        self.assertEqual(self.successResultOf(deferred), ((7,), {"d": 8}))
+
+
+    def test_passthruWithArguments(self):
+        """
+        If arguments are given to L{Deferred.addCallbacks} for a callback or
+        errback which was left out, they are still passed to the default
+        which passes the result through, which fails.
+        """
+        deferred = defer.Deferred()
+        deferred.addCallbacks(lambda result: result, callbackArgs=(1,))
+        deferred.callback(None)
+        self.failureResultOf(deferred, TypeError)
+
+
     def test_synchronousImplicitChain(self):
         """
         If a first L{Deferred} with a result is returned from a callback on a
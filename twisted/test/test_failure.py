@@ -41,6 +41,14 @@ def getDivisionFailure(*args, **kwargs):
     return f
 
 
+
+class ExpectedError(Exception):
+    """
+    An exception used by tests which need a type of their own.
+    """
+
+
+
 class FailureTestCase(SynchronousTestCase):
     """
     Tests for L{failure.Failure}.
@@ -547,6 +555,82 @@ class FailureTestCase(SynchronousTestCase):
         f.cleanFailure()
         self.assertIdentical(f.value.__traceback__, None)
 
+
+    def test_framesExtractedLazily(self):
+        """
+        The frames of a L{failure.Failure} are only extracted from its
+        traceback when they are first used, and then include the frames of
+        the traceback and the stack above the frame which created it.
+        """
+        f = getDivisionFailure()
+        self.assertNotIn("frames", f.__dict__)
+        self.assertNotIn("stack", f.__dict__)
+        self.assertEqual(f.frames[-1][0], "getDivisionFailure")
+        self.assertEqual(f.stack[-1][0], "test_framesExtractedLazily")
+        self.assertIn("frames", f.__dict__)
+        self.assertIn("stack", f.__dict__)
+
+
+    def test_framesExtractedWithCaptureVars(self):
+        """
+        The frames of a L{failure.Failure} created with C{captureVars} are
+        extracted when it is created, so that the variables they capture are
+        the ones at that time.
+        """
+        f = getDivisionFailure(captureVars=True)
+        self.assertIn("frames", f.__dict__)
+        self.assertIn(("kwargs", {"captureVars": True}), f.frames[-1][3])
+
+
+    def test_framesExtractedWhenCleaned(self):
+        """
+        L{failure.Failure.cleanFailure} extracts the frames before it drops
+        the traceback, so they can still be formatted afterwards.
+        """
+        f = getDivisionFailure()
+        frames = f.__getstate__()["frames"]
+        self.assertEqual(frames[-1][0], "getDivisionFailure")
+        f.cleanFailure()
+        self.assertIdentical(f.tb, None)
+        self.assertEqual(f.frames[-1][0], "getDivisionFailure")
+        self.assertIn("getDivisionFailure", f.getTraceback())
+
+
+    def test_noFramesWithoutTraceback(self):
+        """
+        A L{failure.Failure} without a traceback has no frames.
+        """
+        f = failure.Failure(Exception("some error"))
+        self.assertEqual(f.frames, [])
+        self.assertEqual(f.stack, [])
+
+
+    def test_parents(self):
+        """
+        L{failure.Failure.parents} is a new list, for each failure, of the
+        fully-qualified names of the classes its exception type inherits
+        from.
+        """
+        first = failure.Failure(ExpectedError("first"))
+        second = failure.Failure(ExpectedError("second"))
+        self.assertEqual(
+            first.parents, list(map(reflect.qual, ExpectedError.__mro__)))
+        self.assertEqual(first.parents, second.parents)
+        self.assertIsNot(first.parents, second.parents)
+
+
+    def test_checkByName(self):
+        """
+        L{failure.Failure.check} matches an exception class with the same
+        fully-qualified name as a class the failure's type inherits from,
+        even if it is not the same class.
+        """
+        f = failure.Failure(ExpectedError("error"))
+        f.type = type("ExpectedError", (Exception,), {})
+        self.assertIdentical(
+            f.check(ValueError, ExpectedError), ExpectedError)
+        self.assertIdentical(f.check(ValueError), None)
+
     if not _PY3:
         test_tracebackFromExceptionInPython3.skip = "Python 3 only."
         test_cleanFailureRemovesTracebackInPython3.skip = "Python 3 only."
@@ -15,6 +15,7 @@ from twisted.test.proto_helpers import StringTransport
 from twisted.test.proto_helpers import StringTransportWithDisconnection
 
 from twisted.internet import protocol, reactor, address, defer, task
+from twisted.internet.interfaces import ITransport, IFileTransport
 from twisted.protocols import policies
 
 
@@ -165,6 +166,25 @@ class WrapperTestCase(unittest.TestCase):
         self.assertTrue(IStubTransport.providedBy(proto.transport))
 
 
+    def test_transportFileInterface(self):
+        """
+        The transport wrapper passed to the wrapped protocol's
+        C{makeConnection} does not provide L{IFileTransport}, even if the
+        original transport does, since files written with it would not pass
+        through the wrapper.
+        """
+        @implementer(IFileTransport)
+        class FileTransport(StringTransport):
+            pass
+
+        proto = protocol.Protocol()
+        wrapper = policies.ProtocolWrapper(policies.WrappingFactory(None), proto)
+
+        wrapper.makeConnection(FileTransport())
+        self.assertFalse(IFileTransport.providedBy(proto.transport))
+        self.assertTrue(ITransport.providedBy(proto.transport))
+
+
     def test_factoryLogPrefix(self):
         """
         L{WrappingFactory.logPrefix} is customized to mention both the original
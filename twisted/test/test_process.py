@@ -1135,6 +1135,8 @@ class PosixProcessBase:
         p = TrivialProcessProtocol(d)
         def buggyexecvpe(command, args, environment):
             raise RuntimeError("Ouch")
+        # Only a forked child calls execvpe.
+        self.patch(process, "_posixspawn", None)
         oldexecvpe = os.execvpe
         os.execvpe = buggyexecvpe
         try:
@@ -1677,6 +1679,7 @@ class MockProcessTestCase(unittest.TestCase):
         self.patch(process.Process, "processReaderFactory", DumbProcessReader)
         self.patch(process.Process, "processWriterFactory", DumbProcessWriter)
         self.patch(process, "pty", self.mockos)
+        self.patch(process, "_posixspawn", None)
 
         self.mocksig = MockSignal()
         self.patch(process, "signal", self.mocksig)
@@ -138,6 +138,8 @@ class FakeContext(object):
     @ivar _sessionID: Set by L{set_session_id}.
     @ivar _extraCertChain: Accumulated C{list} of all extra certificates added
         by L{add_extra_chain_cert}.
+    @ivar _alpnSelectCallback: Set by L{set_alpn_select_callback}.
+    @ivar _alpnProtocols: Set by L{set_alpn_protos}.
     """
     _options = 0
 
@@ -169,6 +171,12 @@ class FakeContext(object):
     def add_extra_chain_cert(self, cert):
         self._extraCertChain.append(cert)
 
+    def set_alpn_select_callback(self, callback):
+        self._alpnSelectCallback = callback
+
+    def set_alpn_protos(self, protocols):
+        self._alpnProtocols = protocols
+
 
 
 class OpenSSLOptions(unittest.TestCase):
@@ -375,6 +383,38 @@ class OpenSSLOptions(unittest.TestCase):
         self.assertIsInstance(ctx, SSL.Context)
 
 
+    def test_acceptableProtocols(self):
+        """
+        If C{acceptableProtocols} is set, contexts offer those protocols using
+        ALPN, and choose the most preferred of those offered by the peer.
+        """
+        opts = sslverify.OpenSSLCertificateOptions(
+            privateKey=self.sKey,
+            certificate=self.sCert,
+            acceptableProtocols=[b"h2", b"http/1.1"],
+        )
+        opts._contextFactory = FakeContext
+        ctx = opts.getContext()
+        self.assertEqual(ctx._alpnProtocols, [b"h2", b"http/1.1"])
+        choose = ctx._alpnSelectCallback
+        self.assertEqual(choose(None, [b"http/1.1", b"h2"]), b"h2")
+        self.assertEqual(choose(None, [b"http/1.1"]), b"http/1.1")
+        self.assertEqual(choose(None, [b"spdy/3"]), b"")
+
+
+    def test_noAcceptableProtocols(self):
+        """
+        If C{acceptableProtocols} is not set, contexts do not use ALPN.
+        """
+        opts = sslverify.OpenSSLCertificateOptions(
+            privateKey=self.sKey,
+            certificate=self.sCert,
+        )
+        opts._contextFactory = FakeContext
+        ctx = opts.getContext()
+        self.assertFalse(hasattr(ctx, "_alpnProtocols"))
+
+
     def test_abbreviatingDistinguishedNames(self):
         """
         Check that abbreviations used in certificates correctly map to
@@ -296,6 +296,29 @@ class StandardInputOutputTestCase(unittest.TestCase):
         return self._requireFailure(d, processEnded)
 
 
+    def test_bufferedProtocol(self):
+        """
+        Data written to the standard input of a process is read into the
+        buffer of a protocol connected to L{StandardIO} which provides
+        L{twisted.internet.interfaces.IBufferedProtocol}.
+        """
+        p = StandardIOTestProcessProtocol()
+        d = p.onCompletion
+
+        written = 'x' * 100000 + '\n0\n'
+        proc = self._spawnProcess(p, 'stdio_test_buffered.py')
+        p.onConnection.addCallback(lambda ign: proc.write(written))
+
+        def processEnded(reason):
+            self.assertEqual(p.data[1], written)
+            reason.trap(error.ProcessDone)
+        return self._requireFailure(d, processEnded)
+
+    if platform.isWindows():
+        test_bufferedProtocol.skip = (
+            "Standard input is not read into protocol buffers on Windows.")
+
+
     def test_consumer(self):
         """
         Verify that the transport of a protocol connected to L{StandardIO}
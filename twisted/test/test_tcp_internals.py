@@ -18,7 +18,8 @@ from twisted.python.compat import _PY3
 from twisted.trial.unittest import TestCase
 
 from twisted.python import log
-from twisted.internet.tcp import ECONNABORTED, ENOMEM, ENFILE, EMFILE, ENOBUFS, EINPROGRESS, Port
+from twisted.internet import tcp
+from twisted.internet.tcp import ECONNABORTED, ENOMEM, ENFILE, EMFILE, ENOBUFS, EINPROGRESS, EAGAIN, Port
 from twisted.internet.protocol import ServerFactory
 from twisted.python.runtime import platform
 from twisted.internet.defer import maybeDeferred, gatherResults
@@ -248,6 +249,130 @@ class SelectReactorTestCase(TestCase):
     if platform.getType() == 'win32':
         test_noMemoryFromAccept.skip = "Windows accept(2) cannot generate ENOMEM"
 
+
+    def _fakeAccepts(self, port, results):
+        """
+        Replace the socket of C{port} with one whose C{accept} returns new
+        sockets or raises L{socket.error}s, as given by C{results}, and then
+        raises L{socket.error} with C{EAGAIN}.
+
+        @param results: A C{list} of error numbers, or C{None} for the
+            accepts which succeed.
+
+        @return: The original socket of C{port}.
+        """
+        results = list(results)
+        openSockets = []
+        def closeAll():
+            for skt in openSockets:
+                skt.close()
+        self.addCleanup(closeAll)
+        class FakeSocket(object):
+            def accept(self):
+                if not results:
+                    raise socket.error(EAGAIN, os.strerror(EAGAIN))
+                result = results.pop(0)
+                if result is not None:
+                    raise socket.error(result, os.strerror(result))
+                skt = socket.socket()
+                openSockets.append(skt)
+                return skt, ("127.0.0.1", 12345)
+        originalSocket = port.socket
+        self.addCleanup(setattr, port, "socket", originalSocket)
+        port.socket = FakeSocket()
+        return originalSocket
+
+
+    def test_acceptCounted(self):
+        """
+        L{Port.accepted} counts the connections the port has accepted.
+        """
+        factory = ServerFactory()
+        factory.buildProtocol = lambda addr: None
+        port = self.port(0, factory, interface='127.0.0.1')
+        self._fakeAccepts(port, [None, None, None])
+        port.doRead()
+        self.assertEqual(port.accepted, 3)
+
+
+    def test_acceptBudget(self):
+        """
+        L{Port.doRead} stops accepting connections once it has spent
+        L{Port.acceptBudget} seconds doing so.
+        """
+        factory = ServerFactory()
+        factory.buildProtocol = lambda addr: None
+        port = self.port(0, factory, interface='127.0.0.1')
+        port.acceptBudget = 2.5
+        now = [0]
+        def seconds():
+            now[0] += 1
+            return now[0]
+        self.patch(tcp, "_seconds", seconds)
+        self._fakeAccepts(port, [None] * 10)
+        port.doRead()
+        self.assertEqual(port.accepted, 3)
+
+
+    def test_backOffAfterResourceFailure(self):
+        """
+        When C{accept(2)} fails for lack of resources, L{Port} stops reading
+        for L{Port.minimumBackoff} seconds, and records it.
+        """
+        port = self.port(0, ServerFactory(), interface='127.0.0.1')
+        self._fakeAccepts(port, [EMFILE])
+        port.doRead()
+        self.assertNotIn(port, reactor.getReaders())
+        self.assertTrue(port._backoffCall.active())
+        self.assertEqual(port._backoff, port.minimumBackoff)
+        self.assertEqual(port.acceptFailures, 1)
+        self.assertEqual(port.backoffs, 1)
+        self.assertEqual(port.backoffTime, port.minimumBackoff)
+
+        port._backoffCall.cancel()
+        port._resume()
+        self.assertIn(port, reactor.getReaders())
+
+
+    def test_backOffDoubles(self):
+        """
+        Each time C{accept(2)} fails for lack of resources again before a
+        connection has been accepted, L{Port} stops reading for twice as long
+        as the last time, up to L{Port.maximumBackoff} seconds.  Once it
+        accepts a connection, it starts with L{Port.minimumBackoff} again.
+        """
+        factory = ServerFactory()
+        factory.buildProtocol = lambda addr: None
+        port = self.port(0, factory, interface='127.0.0.1')
+        port.minimumBackoff = 1.0
+        port.maximumBackoff = 3.0
+        self._fakeAccepts(port, [ENFILE, ENFILE, ENFILE, None, ENFILE])
+        delays = []
+        for i in range(4):
+            port.doRead()
+            delays.append(port._backoff)
+            port._backoffCall.cancel()
+            port._resume()
+        self.assertEqual(delays, [1.0, 2.0, 3.0, 1.0])
+        self.assertEqual(port.backoffs, 4)
+        self.assertEqual(port.backoffTime, 7.0)
+
+
+    def test_stopListeningCancelsBackOff(self):
+        """
+        L{Port.stopListening} cancels the call which would start accepting
+        connections again after backing off.
+        """
+        port = self.port(0, ServerFactory(), interface='127.0.0.1')
+        originalSocket = self._fakeAccepts(port, [EMFILE])
+        port.doRead()
+        port.socket = originalSocket
+        call = port._backoffCall
+        self.ports.remove(port)
+        d = port.stopListening()
+        self.assertFalse(call.active())
+        return d
+
 if not interfaces.IReactorFDSet.providedBy(reactor):
     skipMsg = 'This test only applies to reactors that implement IReactorFDset'
     PlatformAssumptionsTestCase.skip = skipMsg
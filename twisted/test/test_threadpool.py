@@ -544,6 +544,266 @@ class ThreadPoolTestCase(unittest.SynchronousTestCase):
 
 
 
+class LimitsTests(unittest.SynchronousTestCase):
+    """
+    Tests for the limits on the calls which may wait in a L{ThreadPool}, for
+    the threads which exit when idle, and for the statistics it keeps.
+    """
+
+    def getTimeout(self):
+        """
+        Return number of seconds to wait before giving up.
+        """
+        return 5
+
+
+    def _waitFor(self, condition):
+        """
+        Wait until C{condition} returns true, or fail the test if that takes
+        too long.
+        """
+        deadline = time.time() + self.getTimeout()
+        while not condition():
+            if time.time() > deadline:
+                self.fail("A long time passed without succeeding")
+            time.sleep(0.0005)
+
+
+    def _blockWorker(self, pool):
+        """
+        Give the pool a call which blocks until released, and wait for it to
+        start running.
+
+        @return: A L{threading.Event} which releases the call.
+        """
+        working = threading.Event()
+        finish = threading.Event()
+        def blocked():
+            working.set()
+            finish.wait()
+        pool.callInThread(blocked)
+        working.wait(self.getTimeout())
+        self.assertTrue(working.isSet())
+        return finish
+
+
+    def test_defaults(self):
+        """
+        By default, a L{ThreadPool} queues any number of calls, and keeps idle
+        threads.
+        """
+        pool = threadpool.ThreadPool()
+        self.assertEqual(pool.maxQueued, 0)
+        self.assertFalse(pool.blockWhenFull)
+        self.assertIdentical(pool.idleTimeout, None)
+
+
+    def test_rejectWhenFull(self):
+        """
+        L{ThreadPool.callInThreadWithCallback} raises
+        L{threadpool.ThreadPoolFull} if C{maxQueued} calls are already waiting
+        for a thread, and counts the call as rejected.
+        """
+        pool = threadpool.ThreadPool(0, 1, maxQueued=2)
+        pool.callInThread(lambda: None)
+        pool.callInThread(lambda: None)
+        self.assertRaises(
+            threadpool.ThreadPoolFull, pool.callInThread, lambda: None)
+        stats = pool.statistics()
+        self.assertEqual((stats.queued, stats.rejected), (2, 1))
+
+
+    def test_roomWhenTaken(self):
+        """
+        A call taken from the queue by a thread leaves room for another.
+        """
+        pool = threadpool.ThreadPool(0, 1, maxQueued=1)
+        pool.start()
+        self.addCleanup(pool.stop)
+        finish = self._blockWorker(pool)
+        self.addCleanup(finish.set)
+        pool.callInThread(lambda: None)
+        self.assertRaises(
+            threadpool.ThreadPoolFull, pool.callInThread, lambda: None)
+
+
+    def test_blockWhenFull(self):
+        """
+        If C{blockWhenFull} is set, a call given to a full L{ThreadPool}
+        blocks until a thread takes one of the calls waiting.
+        """
+        pool = threadpool.ThreadPool(0, 1, maxQueued=1, blockWhenFull=True)
+        self.addCleanup(pool.stop)
+        ran = []
+        pool.callInThread(ran.append, 1)
+        submitted = threading.Event()
+        def submit():
+            pool.callInThread(ran.append, 2)
+            submitted.set()
+        submitter = threading.Thread(target=submit)
+        submitter.start()
+        self.assertFalse(submitted.wait(0.05))
+        pool.start()
+        submitted.wait(self.getTimeout())
+        self.assertTrue(submitted.isSet())
+        submitter.join()
+        self._waitFor(lambda: len(ran) == 2)
+        self.assertEqual(ran, [1, 2])
+
+
+    def test_stopWakesBlocked(self):
+        """
+        L{ThreadPool.stop} wakes up a call blocked because the pool is full,
+        and the call returns without being queued.
+        """
+        pool = threadpool.ThreadPool(0, 1, maxQueued=1, blockWhenFull=True)
+        ran = []
+        pool.callInThread(ran.append, 1)
+        submitted = threading.Event()
+        def submit():
+            pool.callInThread(ran.append, 2)
+            submitted.set()
+        submitter = threading.Thread(target=submit)
+        submitter.start()
+        self.assertFalse(submitted.wait(0.05))
+        pool.stop()
+        submitted.wait(self.getTimeout())
+        self.assertTrue(submitted.isSet())
+        submitter.join()
+        self.assertEqual(pool.statistics().queued, 1)
+
+
+    def test_restartAfterStop(self):
+        """
+        A L{ThreadPool} started again after being stopped allows only
+        C{maxQueued} calls to wait for a thread.
+        """
+        pool = threadpool.ThreadPool(0, 1, maxQueued=1)
+        pool.start()
+        pool.stop()
+        pool.start()
+        self.addCleanup(pool.stop)
+        finish = self._blockWorker(pool)
+        self.addCleanup(finish.set)
+        pool.callInThread(lambda: None)
+        self.assertRaises(
+            threadpool.ThreadPoolFull, pool.callInThread, lambda: None)
+
+
+    def test_statistics(self):
+        """
+        L{ThreadPool.statistics} reports how long the calls run waited for a
+        thread and took to run.
+        """
+        times = iter([10.0, 11.0, 13.0])
+        pool = threadpool.ThreadPool(0, 1)
+        pool._seconds = lambda: next(times)
+        done = threading.Event()
+        pool.callInThreadWithCallback(lambda success, result: done.set(),
+                                      lambda: None)
+        self.assertEqual(pool.statistics().queued, 1)
+        pool.start()
+        self.addCleanup(pool.stop)
+        done.wait(self.getTimeout())
+        stats = pool.statistics()
+        self.assertEqual(
+            (stats.workers, stats.queued, stats.completed, stats.rejected),
+            (1, 0, 1, 0))
+        self.assertEqual(
+            (stats.waitTime, stats.maxWaitTime, stats.runTime),
+            (1.0, 1.0, 2.0))
+
+
+    def test_busyWorkers(self):
+        """
+        L{ThreadPool.statistics} reports the number of threads running calls
+        and waiting for them.
+        """
+        pool = threadpool.ThreadPool(2, 2)
+        pool.start()
+        self.addCleanup(pool.stop)
+        self._waitFor(lambda: len(pool.waiters) == 2)
+        finish = self._blockWorker(pool)
+        self.addCleanup(finish.set)
+        stats = pool.statistics()
+        self.assertEqual((stats.busy, stats.idle), (1, 1))
+
+
+    def test_idleTimeout(self):
+        """
+        A thread which has had no work for C{idleTimeout} seconds exits.
+        """
+        pool = threadpool.ThreadPool(0, 2, idleTimeout=0.01)
+        pool.start()
+        self.addCleanup(pool.stop)
+        done = threading.Event()
+        pool.callInThreadWithCallback(lambda success, result: done.set(),
+                                      lambda: None)
+        done.wait(self.getTimeout())
+        self._waitFor(lambda: not pool.threads)
+        self.assertEqual(pool.workers, 0)
+
+
+    def test_idleTimeoutKeepsMinimum(self):
+        """
+        Threads do not exit when idle if that would leave fewer than C{min}.
+        """
+        pool = threadpool.ThreadPool(1, 3, idleTimeout=0.01)
+        pool.start()
+        self.addCleanup(pool.stop)
+        first = self._blockWorker(pool)
+        second = self._blockWorker(pool)
+        self.assertEqual(pool.workers, 2)
+        first.set()
+        second.set()
+        self._waitFor(lambda: len(pool.threads) == 1)
+        time.sleep(0.05)
+        self.assertEqual(pool.workers, 1)
+        self.assertEqual(len(pool.threads), 1)
+
+
+    def test_isSaturated(self):
+        """
+        L{ThreadPool.isSaturated} returns C{True} if every thread is busy and
+        no more may be started.
+        """
+        pool = threadpool.ThreadPool(0, 1)
+        pool.start()
+        self.addCleanup(pool.stop)
+        self.assertFalse(pool.isSaturated())
+        finish = self._blockWorker(pool)
+        self.assertTrue(pool.isSaturated())
+        finish.set()
+        self._waitFor(lambda: pool.waiters)
+        self.assertFalse(pool.isSaturated())
+
+
+    def test_isSaturatedNotStarted(self):
+        """
+        L{ThreadPool.isSaturated} returns C{False} for a pool which has not
+        been started until C{max} calls are waiting for it.
+        """
+        pool = threadpool.ThreadPool(0, 2)
+        self.assertFalse(pool.isSaturated())
+        pool.callInThread(lambda: None)
+        self.assertFalse(pool.isSaturated())
+        pool.callInThread(lambda: None)
+        self.assertTrue(pool.isSaturated())
+
+
+    def test_persistence(self):
+        """
+        The limits of a L{ThreadPool} are kept when it is pickled.
+        """
+        pool = threadpool.ThreadPool(
+            1, 2, maxQueued=5, blockWhenFull=True, idleTimeout=3)
+        copy = pickle.loads(pickle.dumps(pool))
+        self.assertEqual(
+            (copy.maxQueued, copy.blockWhenFull, copy.idleTimeout),
+            (5, True, 3))
+
+
+
 class RaceConditionTestCase(unittest.SynchronousTestCase):
 
     def getTimeout(self):
@@ -327,6 +327,53 @@ class DeferToThreadPoolTestCase(unittest.TestCase):
         return self.assertFailure(d, NewError)
 
 
+    def test_poolFull(self):
+        """
+        If the threadpool refuses the call, the L{Deferred} returned by
+        L{threads.deferToThreadPool} has already failed with
+        L{threadpool.ThreadPoolFull}.
+        """
+        tp = threadpool.ThreadPool(0, 1, maxQueued=1)
+        tp.callInThread(lambda: None)
+        d = threads.deferToThreadPool(reactor, tp, lambda: None)
+        self.failureResultOf(d, threadpool.ThreadPoolFull)
+
+
+    def test_noWait(self):
+        """
+        L{threads.deferToThreadPoolNoWait} runs the function in the threadpool
+        if it is not saturated.
+        """
+        d = threads.deferToThreadPoolNoWait(reactor, self.tp, lambda: 7)
+        d.addCallback(self.assertEqual, 7)
+        return d
+
+
+    def test_noWaitSaturated(self):
+        """
+        If the threadpool is saturated, the L{Deferred} returned by
+        L{threads.deferToThreadPoolNoWait} has already failed with
+        L{threadpool.ThreadPoolFull}, and the function is not called.
+        """
+        tp = threadpool.ThreadPool(0, 1)
+        tp.callInThread(lambda: None)
+        called = []
+        d = threads.deferToThreadPoolNoWait(reactor, tp, called.append, 1)
+        self.failureResultOf(d, threadpool.ThreadPoolFull)
+        self.assertEqual(called, [])
+
+
+    def test_noWaitNotStarted(self):
+        """
+        L{threads.deferToThreadPoolNoWait} queues the function in a threadpool
+        which has not been started yet, as L{threads.deferToThreadPool} does.
+        """
+        tp = threadpool.ThreadPool(0, 1)
+        d = threads.deferToThreadPoolNoWait(reactor, tp, lambda: 7)
+        self.assertNoResult(d)
+        self.assertEqual(tp.statistics().queued, 1)
+
+
 
 _callBeforeStartupProgram = """
 import time
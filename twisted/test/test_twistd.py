@@ -48,6 +48,7 @@ except ImportError:
 else:
     from twisted.scripts._twistd_unix import UnixApplicationRunner
     from twisted.scripts._twistd_unix import UnixAppLogger
+    from twisted.scripts._twistd_unix import WorkerSupervisor, WorkerStartError
 
 
 try:
@@ -788,6 +789,395 @@ class UnixApplicationRunnerStartApplicationTests(unittest.TestCase):
 
 
 
+class WorkerOptionsTests(unittest.TestCase):
+    """
+    Tests for the I{--workers} option of the Unix L{twistd.ServerOptions}.
+    """
+    if _twistd_unix is None:
+        skip = "twistd unix not available"
+
+    def test_workers(self):
+        """
+        I{--workers} gives the number of worker processes to run, which is
+        C{0} by default.
+        """
+        self.patch(os, "environ", {})
+        options = twistd.ServerOptions()
+        options.parseOptions([])
+        self.assertEqual(options['workers'], 0)
+        options = twistd.ServerOptions()
+        options.parseOptions(['--workers', '3'])
+        self.assertEqual(options['workers'], 3)
+
+
+    def test_negativeWorkers(self):
+        """
+        A negative number of workers is rejected.
+        """
+        self.patch(os, "environ", {})
+        options = twistd.ServerOptions()
+        self.assertRaises(
+            UsageError, options.parseOptions, ['--workers', '-1'])
+
+
+    def test_worker(self):
+        """
+        In a worker process, which is told the status pipe to write to by its
+        environment, the options are changed to run the application without
+        daemonizing or writing the PID file, and to report to the status pipe.
+        """
+        self.patch(
+            os, "environ", {_twistd_unix._WORKER_STATUS_PIPE: "7"})
+        options = twistd.ServerOptions()
+        options.parseOptions(['--workers', '3', '--pidfile', 'foo.pid'])
+        self.assertEqual(
+            (options['workers'], options['nodaemon'], options['pidfile'],
+             options['statusPipe']),
+            (0, True, '', 7))
+
+
+    def test_workerEnvironment(self):
+        """
+        The status pipe is removed from the environment of a worker process
+        once it has been read, so that the processes the worker starts do not
+        inherit it.
+        """
+        environ = {_twistd_unix._WORKER_STATUS_PIPE: "7", "HOME": "/"}
+        self.patch(os, "environ", environ)
+        options = twistd.ServerOptions()
+        options.parseOptions([])
+        self.assertEqual(options['statusPipe'], 7)
+        self.assertEqual(environ, {"HOME": "/"})
+
+
+
+class FakeWorkerSupervisor(WorkerSupervisor if _twistd_unix else object):
+    """
+    A L{WorkerSupervisor} which pretends to start and stop processes.
+
+    @ivar events: A C{list} of C{('start', pid)}, C{('kill', pid)} and
+        C{('sigkill', pid)} tuples and C{'failed'} strings recording what was
+        done.
+
+    @ivar failures: The number of following attempts to start a worker which
+        fail.
+
+    @ivar exited: The process IDs of the workers which have exited.
+
+    @ivar stubborn: The process IDs of the workers which ignore C{SIGTERM}.
+
+    @ivar now: The current time, which passes only when sleeping.
+    """
+    def __init__(self, count):
+        WorkerSupervisor.__init__(self, count, ["python", "twistd"])
+        self.events = []
+        self.failures = 0
+        self.exited = set()
+        self.stubborn = set()
+        self.now = 0
+        self._nextPID = 100
+
+
+    def spawnWorker(self):
+        if self.failures:
+            self.failures -= 1
+            self.events.append('failed')
+            raise WorkerStartError("broken")
+        pid = self._nextPID
+        self._nextPID += 1
+        self.workers.add(pid)
+        self.events.append(('start', pid))
+        return pid
+
+
+    def _kill(self, pid, signum):
+        if signum == signal.SIGKILL:
+            self.events.append(('sigkill', pid))
+        else:
+            self.events.append(('kill', pid))
+            if pid in self.stubborn:
+                return
+        self.exited.add(pid)
+
+
+    def _waitpid(self, pid, options):
+        if pid in self.exited:
+            return pid, 0
+        return 0, 0
+
+
+    def _time(self):
+        return self.now
+
+
+    def _sleep(self, seconds):
+        self.now += seconds
+
+
+
+class WorkerSupervisorTests(unittest.TestCase):
+    """
+    Tests for L{WorkerSupervisor}.
+    """
+    if _twistd_unix is None:
+        skip = "twistd unix not available"
+
+    def test_startWorkers(self):
+        """
+        L{WorkerSupervisor.startWorkers} starts C{count} workers.
+        """
+        supervisor = FakeWorkerSupervisor(3)
+        supervisor.startWorkers()
+        self.assertEqual(supervisor.workers, set([100, 101, 102]))
+
+
+    def test_startWorkersFailed(self):
+        """
+        If a worker fails to start, L{WorkerSupervisor.startWorkers} stops the
+        workers it started and raises L{WorkerStartError}.
+        """
+        supervisor = FakeWorkerSupervisor(3)
+        supervisor.spawnWorker()
+        supervisor.failures = 1
+        self.assertRaises(WorkerStartError, supervisor.startWorkers)
+        self.assertEqual(
+            supervisor.events, [('start', 100), 'failed', ('kill', 100)])
+        self.assertEqual(supervisor.workers, set())
+
+
+    def test_stopWorkerIgnoringTerm(self):
+        """
+        L{WorkerSupervisor.stopWorker} kills a worker which has not exited
+        C{stopTimeout} seconds after being asked to stop.
+        """
+        supervisor = FakeWorkerSupervisor(1)
+        supervisor.startWorkers()
+        supervisor.stubborn.add(100)
+        supervisor.stopWorker(100)
+        self.assertEqual(
+            supervisor.events,
+            [('start', 100), ('kill', 100), ('sigkill', 100)])
+        self.assertTrue(supervisor.now >= supervisor.stopTimeout)
+        self.assertEqual(supervisor.workers, set())
+
+
+    def test_stopWorkersIgnoringTerm(self):
+        """
+        L{WorkerSupervisor.stopWorkers} kills only the workers which have not
+        exited C{stopTimeout} seconds after being asked to stop.
+        """
+        supervisor = FakeWorkerSupervisor(2)
+        supervisor.startWorkers()
+        supervisor.stubborn.add(101)
+        supervisor.stopWorkers()
+        self.assertEqual(
+            sorted(supervisor.events[2:]),
+            [('kill', 100), ('kill', 101), ('sigkill', 101)])
+        self.assertEqual(supervisor.events[-1], ('sigkill', 101))
+        self.assertEqual(supervisor.workers, set())
+
+
+    def test_replaceExitedWorker(self):
+        """
+        A worker which has exited is forgotten by
+        L{WorkerSupervisor.reapWorkers}, and replaced by
+        L{WorkerSupervisor.replaceWorkers}.
+        """
+        supervisor = FakeWorkerSupervisor(2)
+        supervisor.startWorkers()
+        supervisor.exited.add(100)
+        supervisor.reapWorkers()
+        self.assertEqual(supervisor.workers, set([101]))
+        supervisor.replaceWorkers()
+        self.assertEqual(supervisor.workers, set([101, 102]))
+
+
+    def test_replaceWorkersDelay(self):
+        """
+        After a worker fails to start, L{WorkerSupervisor.replaceWorkers}
+        waits C{restartDelay} seconds before trying again.
+        """
+        supervisor = FakeWorkerSupervisor(1)
+        supervisor.failures = 1
+        supervisor.replaceWorkers()
+        self.assertEqual(supervisor.events, ['failed'])
+        supervisor.now = supervisor.restartDelay / 2
+        supervisor.replaceWorkers()
+        self.assertEqual(supervisor.events, ['failed'])
+        supervisor.now = supervisor.restartDelay
+        supervisor.replaceWorkers()
+        self.assertEqual(supervisor.events, ['failed', ('start', 100)])
+
+
+    def test_restartWorkers(self):
+        """
+        L{WorkerSupervisor.restartWorkers} replaces the workers one at a time,
+        starting each new worker before stopping an old one.
+        """
+        supervisor = FakeWorkerSupervisor(2)
+        supervisor.startWorkers()
+        del supervisor.events[:]
+        supervisor.restartWorkers()
+        self.assertEqual(
+            supervisor.events,
+            [('start', 102), ('kill', 100), ('start', 103), ('kill', 101)])
+        self.assertEqual(supervisor.workers, set([102, 103]))
+
+
+    def test_restartWorkersFailed(self):
+        """
+        If a new worker fails to start, L{WorkerSupervisor.restartWorkers}
+        keeps the old ones.
+        """
+        supervisor = FakeWorkerSupervisor(2)
+        supervisor.startWorkers()
+        supervisor.failures = 1
+        supervisor.restartWorkers()
+        self.assertEqual(supervisor.workers, set([100, 101]))
+
+
+    def test_run(self):
+        """
+        L{WorkerSupervisor.run} replaces exited workers and restarts them all
+        on I{SIGHUP} until I{SIGTERM} is received, when it stops them.
+        """
+        for signum in signal.SIGTERM, signal.SIGINT, signal.SIGHUP:
+            self.addCleanup(signal.signal, signum, signal.getsignal(signum))
+        supervisor = FakeWorkerSupervisor(1)
+        supervisor.startWorkers()
+        supervisor.exited.add(100)
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            if len(sleeps) == 1:
+                os.kill(os.getpid(), signal.SIGHUP)
+            else:
+                os.kill(os.getpid(), signal.SIGTERM)
+        supervisor._sleep = sleep
+        supervisor.run()
+        self.assertEqual(
+            supervisor.events,
+            [('start', 100), ('start', 101), ('start', 102), ('kill', 101),
+             ('kill', 102)])
+        self.assertEqual(sleeps, [supervisor.pollInterval] * 2)
+        self.assertEqual(supervisor.workers, set())
+
+
+    def supervisorReporting(self, status):
+        """
+        Make a L{WorkerSupervisor} whose workers are real processes which
+        write C{status} to their status pipe.
+        """
+        script = ("import os; os.write(int(os.environ[%r]), %r)" % (
+                _twistd_unix._WORKER_STATUS_PIPE, status))
+        return WorkerSupervisor(1, [sys.executable, "-c", script])
+
+
+    def test_spawnWorker(self):
+        """
+        L{WorkerSupervisor.spawnWorker} runs a worker process, returning its
+        process ID once it reports that it has started.
+        """
+        supervisor = self.supervisorReporting(b"0")
+        pid = supervisor.spawnWorker()
+        self.addCleanup(os.waitpid, pid, 0)
+        self.assertEqual(supervisor.workers, set([pid]))
+
+
+    def test_spawnWorkerTimeout(self):
+        """
+        L{WorkerSupervisor.spawnWorker} kills a worker which has not reported
+        whether it started after C{startTimeout} seconds, and raises
+        L{WorkerStartError}.
+        """
+        supervisor = WorkerSupervisor(
+            1, [sys.executable, "-c", "import time; time.sleep(60)"])
+        supervisor.startTimeout = 0.1
+        error = self.assertRaises(WorkerStartError, supervisor.spawnWorker)
+        self.assertEqual(
+            str(error), "worker did not start within 0.1 seconds")
+        self.assertEqual(supervisor.workers, set())
+
+
+    def test_stopWorkerProcessIgnoringTerm(self):
+        """
+        L{WorkerSupervisor.stopWorkers} kills a worker process which ignores
+        C{SIGTERM} once C{stopTimeout} seconds have passed.
+        """
+        script = (
+            "import os, signal, time; "
+            "signal.signal(signal.SIGTERM, signal.SIG_IGN); "
+            "os.write(int(os.environ[%r]), b'0'); "
+            "time.sleep(60)" % (_twistd_unix._WORKER_STATUS_PIPE,))
+        supervisor = WorkerSupervisor(1, [sys.executable, "-c", script])
+        supervisor.stopTimeout = 0.1
+        pid = supervisor.spawnWorker()
+        supervisor.stopWorkers()
+        self.assertEqual(supervisor.workers, set())
+        self.assertRaises(OSError, os.kill, pid, 0)
+
+
+    def test_spawnWorkerFailed(self):
+        """
+        L{WorkerSupervisor.spawnWorker} raises L{WorkerStartError} with the
+        message reported by a worker which failed to start.
+        """
+        supervisor = self.supervisorReporting(b"1 broken")
+        error = self.assertRaises(WorkerStartError, supervisor.spawnWorker)
+        self.assertEqual(str(error), "broken")
+        self.assertEqual(supervisor.workers, set())
+
+
+
+class UnixApplicationRunnerSuperviseWorkersTests(unittest.TestCase):
+    """
+    Tests for L{UnixApplicationRunner.superviseWorkers}.
+    """
+    if _twistd_unix is None:
+        skip = "twistd unix not available"
+
+    def test_superviseWorkers(self):
+        """
+        If I{--workers} is given, L{UnixApplicationRunner.postApplication}
+        sets up the environment and supervises that many workers instead of
+        starting the application.
+        """
+        self.patch(os, "environ", {})
+        options = twistd.ServerOptions()
+        options.parseOptions(['--nodaemon', '--workers', '2', '--pidfile', ''])
+        runner = UnixApplicationRunner(options)
+        supervisors = []
+
+        class Supervisor(FakeWorkerSupervisor):
+            def __init__(self, count, argv):
+                FakeWorkerSupervisor.__init__(self, count)
+                self.argv = argv
+                supervisors.append(self)
+
+            def run(self):
+                self.events.append('run')
+
+        runner.supervisorFactory = Supervisor
+        environments = []
+        self.patch(
+            UnixApplicationRunner, 'setupEnvironment',
+            lambda self, *args: environments.append(args))
+        started = []
+        self.patch(
+            UnixApplicationRunner, 'startApplication',
+            lambda self, application: started.append(application))
+        runner.postApplication()
+
+        self.assertEqual(started, [])
+        self.assertEqual(environments, [(None, '.', True, None, '')])
+        [supervisor] = supervisors
+        self.assertEqual(supervisor.argv, [sys.executable] + sys.argv)
+        self.assertEqual(
+            supervisor.events, [('start', 100), ('start', 101), 'run'])
+
+
+
 class UnixApplicationRunnerRemovePID(unittest.TestCase):
     """
     Tests for L{UnixApplicationRunner.removePID}.
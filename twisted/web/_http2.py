@@ -0,0 +1,591 @@
+# -*- test-case-name: twisted.web.test.test_http2 -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+HTTP/2 support for L{twisted.web.http.HTTPChannel}.
+
+The framing, header compression and flow control state of the protocol are
+kept by the U{h2<https://python-hyper.org/h2/>} library, so this module can
+only be imported if it is installed.
+
+An L{HTTPChannel<twisted.web.http.HTTPChannel>} hands its connection over to
+an L{H2Connection} when ALPN or NPN agree on C{h2} during the TLS handshake,
+or, if its C{cleartextHTTP2} is set, when the client starts the connection
+with the HTTP/2 connection preface or asks for an HTTP/1.1 request to be
+upgraded to C{h2c}.  Each
+stream of the connection is then delivered as an ordinary request made by
+the channel's C{requestFactory}, so existing resources work unchanged.
+"""
+
+from __future__ import division, absolute_import
+
+from collections import deque
+
+from zope.interface import implementer, directlyProvides
+
+from h2.config import H2Configuration
+from h2.connection import H2Connection as _H2ConnectionState
+from h2.errors import ErrorCodes
+from h2.events import (
+    ConnectionTerminated, DataReceived, RemoteSettingsChanged,
+    RequestReceived, StreamEnded, StreamReset, WindowUpdated)
+from h2.exceptions import ProtocolError, StreamClosedError
+
+from twisted.internet.error import ConnectionLost
+from twisted.internet.interfaces import (
+    IConsumer, IPushProducer, ISSLTransport, ITransport)
+from twisted.internet.task import TaskFinished, cooperate
+from twisted.python.compat import intToBytes
+from twisted.python.failure import Failure
+
+__all__ = ["H2Connection", "H2Stream", "PREFACE"]
+
+
+# What a client which knows the server speaks HTTP/2 starts the connection
+# with.
+PREFACE = b"PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n"
+
+# Headers which only mean something for a single HTTP/1.x connection, and
+# which HTTP/2 does not allow.
+_CONNECTION_HEADERS = frozenset([
+    b"connection", b"keep-alive", b"proxy-connection", b"transfer-encoding",
+    b"upgrade", b"http2-settings"])
+
+
+
+@implementer(IPushProducer)
+class H2Connection(object):
+    """
+    The HTTP/2 side of an L{HTTPChannel<twisted.web.http.HTTPChannel>} which
+    has switched protocols.
+
+    The connection is a push producer for the channel's transport, so that
+    streams stop being sent while the transport's buffer is full.
+
+    @ivar channel: The channel whose connection this is.
+
+    @ivar transport: The transport of the channel.
+
+    @ivar state: The L{h2.connection.H2Connection} which keeps the state of
+        the protocol.
+
+    @ivar streams: A C{dict} mapping the IDs of the open streams to their
+        L{H2Stream}s.
+
+    @ivar paused: Whether the transport has asked for nothing more to be
+        written to it for now.
+    """
+    paused = False
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.transport = channel.transport
+        self.state = _H2ConnectionState(
+            config=H2Configuration(client_side=False, header_encoding=None))
+        self.streams = {}
+
+
+    def start(self):
+        """
+        Start the connection, for a client which began it with L{PREFACE}.
+        """
+        self.state.initiate_connection()
+        self._flush()
+        self.transport.registerProducer(self, True)
+
+
+    def upgrade(self, settings, command, path, requestHeaders, body):
+        """
+        Start the connection for a client which asked for an HTTP/1.1 request
+        to be upgraded to C{h2c}, which is answered as stream 1.
+
+        @param settings: The value of the request's I{HTTP2-Settings} header.
+        @type settings: C{bytes}
+
+        @param command: The method of the request.
+        @type command: C{bytes}
+
+        @param path: The path of the request.
+        @type path: C{bytes}
+
+        @param requestHeaders: The headers of the request.
+        @type requestHeaders: L{Headers<twisted.web.http_headers.Headers>}
+
+        @param body: The body of the request.
+        @type body: C{bytes}
+        """
+        self.state.initiate_upgrade_connection(settings)
+        self._flush()
+        self.transport.registerProducer(self, True)
+
+        headers = [(b":method", command), (b":path", path)]
+        for name, values in requestHeaders.getAllRawHeaders():
+            name = name.lower()
+            if name not in _CONNECTION_HEADERS:
+                headers.extend([(name, value) for value in values])
+        stream = self.streams[1] = H2Stream(1, self)
+        stream.headersReceived(headers)
+        if body:
+            stream.dataReceived(body)
+        stream.requestComplete()
+
+
+    def dataReceived(self, data):
+        """
+        Pass bytes received from the client to the protocol state, and handle
+        the events that come of them.
+        """
+        try:
+            events = self.state.receive_data(data)
+        except ProtocolError:
+            self._flush()
+            self.transport.loseConnection()
+            return
+
+        for event in events:
+            if isinstance(event, RequestReceived):
+                stream = self.streams[event.stream_id] = H2Stream(
+                    event.stream_id, self)
+                stream.headersReceived(event.headers)
+            elif isinstance(event, DataReceived):
+                stream = self.streams.get(event.stream_id)
+                if stream is not None:
+                    stream.dataReceived(event.data)
+                if stream is not None and stream.readingPaused:
+                    # The body is streamed to a resource which does not want
+                    # more yet, so the client may not send more until it
+                    # does.
+                    stream.unacknowledged += event.flow_controlled_length
+                    continue
+                # Otherwise the request has taken the body as soon as it
+                # arrived, so the client may send more at once.
+                try:
+                    self.state.acknowledge_received_data(
+                        event.flow_controlled_length, event.stream_id)
+                except StreamClosedError:
+                    pass
+            elif isinstance(event, StreamEnded):
+                stream = self.streams.get(event.stream_id)
+                if stream is not None:
+                    stream.requestComplete()
+            elif isinstance(event, StreamReset):
+                stream = self.streams.pop(event.stream_id, None)
+                if stream is not None:
+                    stream.reset(Failure(ConnectionLost(
+                        "Stream reset by the client (%s)." % (
+                            event.error_code,))))
+            elif isinstance(event, (WindowUpdated, RemoteSettingsChanged)):
+                self._sendAll()
+            elif isinstance(event, ConnectionTerminated):
+                self.transport.loseConnection()
+        self._flush()
+
+
+    def connectionLost(self, reason):
+        """
+        Tell the requests of the streams still open that the connection is
+        gone.
+        """
+        streams = list(self.streams.values())
+        self.streams.clear()
+        for stream in streams:
+            stream.reset(reason)
+
+
+    def _flush(self):
+        """
+        Write whatever the protocol state has to send to the transport.
+        """
+        data = self.state.data_to_send()
+        if data:
+            self.transport.write(data)
+
+
+    def acknowledge(self, stream, length):
+        """
+        Let the client send more of the body of the request on a stream,
+        once some of it which was held back has been taken.
+
+        @param stream: The stream of the request.
+        @type stream: L{H2Stream}
+
+        @param length: How much of the body has been taken.
+        @type length: C{int}
+        """
+        try:
+            self.state.acknowledge_received_data(length, stream.streamID)
+        except StreamClosedError:
+            pass
+        self._flush()
+
+
+    def writeHeaders(self, stream, headers):
+        """
+        Send the status and headers of the response on a stream.
+
+        @param stream: The stream of the response.
+        @type stream: L{H2Stream}
+
+        @param headers: The headers, starting with the C{:status}
+            pseudo-header.
+        @type headers: C{list} of 2-C{tuple}s of C{bytes}
+        """
+        self.state.send_headers(stream.streamID, headers)
+        self._flush()
+
+
+    def send(self, stream):
+        """
+        Send as much of the data buffered by a stream as flow control allows,
+        ending the stream once all of its response has been sent.
+
+        @param stream: The stream with data to send.
+        @type stream: L{H2Stream}
+        """
+        self._send(stream)
+        self._flush()
+
+
+    def _send(self, stream):
+        """
+        Pass as much of the data buffered by a stream as flow control allows
+        to the protocol state, without writing it to the transport yet.
+        """
+        state = self.state
+        streamID = stream.streamID
+        outbound = stream.outbound
+        while outbound and not self.paused:
+            size = min(state.local_flow_control_window(streamID),
+                       state.max_outbound_frame_size)
+            if size <= 0:
+                break
+            data = outbound.popleft()
+            if len(data) > size:
+                outbound.appendleft(data[size:])
+                data = data[:size]
+            state.send_data(streamID, data)
+        if (not outbound and stream.finished and
+            self.streams.pop(streamID, None) is not None):
+            state.end_stream(streamID)
+        stream.updateProducer()
+
+
+    def _sendAll(self):
+        """
+        Send the data buffered by every stream, after the flow control windows
+        have grown or the transport has asked for more.
+        """
+        for stream in list(self.streams.values()):
+            self._send(stream)
+        self._flush()
+
+
+    def resetStream(self, stream):
+        """
+        Abandon the response on a stream.
+
+        @param stream: The stream to reset.
+        @type stream: L{H2Stream}
+        """
+        if self.streams.pop(stream.streamID, None) is None:
+            return
+        try:
+            self.state.reset_stream(stream.streamID, ErrorCodes.CANCEL)
+        except StreamClosedError:
+            pass
+        self._flush()
+        stream.reset(Failure(ConnectionLost("Stream reset by the server.")))
+
+
+    def pauseProducing(self):
+        """
+        Stop sending data, and ask the producers of every stream to stop.
+        """
+        self.paused = True
+        for stream in list(self.streams.values()):
+            stream.updateProducer()
+
+
+    def resumeProducing(self):
+        """
+        Start sending data again.
+        """
+        self.paused = False
+        self._sendAll()
+
+
+    def stopProducing(self):
+        """
+        Nothing needs doing: the connection is about to be lost.
+        """
+
+
+
+@implementer(ITransport, IConsumer)
+class H2Stream(object):
+    """
+    A stream of an HTTP/2 connection, which is both the channel and the
+    transport of the request made for it.
+
+    @ivar streamID: The ID of the stream.
+    @type streamID: C{int}
+
+    @ivar connection: The connection of the stream.
+    @type connection: L{H2Connection}
+
+    @ivar request: The request made for the stream.
+
+    @ivar outbound: A C{deque} of the C{bytes} of the response which flow
+        control has not yet allowed to be sent.
+
+    @ivar finished: Whether the response has been finished, so that the
+        stream is ended once all of C{outbound} has been sent.
+
+    @ivar producer: The producer registered by the request, or C{None}.
+
+    @ivar _producerPaused: Whether C{producer} has been paused.
+
+    @ivar _pullTask: The task calling C{resumeProducing} on C{producer} over
+        and over, if it is a pull producer.
+
+    @ivar readingPaused: Whether the body of the request is streamed to a
+        resource which does not want more of it yet, so that the connection
+        holds back acknowledging it.
+
+    @ivar unacknowledged: How much of the body the connection has held back
+        acknowledging.
+
+    @ivar _reset: Whether the stream has been reset, or the connection lost.
+    """
+    finished = False
+    producer = None
+    readingPaused = False
+    unacknowledged = 0
+    _producerPaused = False
+    _pullTask = None
+    _reset = False
+
+    def __init__(self, streamID, connection):
+        self.streamID = streamID
+        self.connection = connection
+        self.transport = self
+        self.outbound = deque()
+
+        channel = connection.channel
+        for name in ["site", "factory"]:
+            if hasattr(channel, name):
+                setattr(self, name, getattr(channel, name))
+        if ISSLTransport.providedBy(connection.transport):
+            directlyProvides(self, ISSLTransport)
+        self.request = channel.requestFactory(self, False)
+
+
+    def headersReceived(self, headers):
+        """
+        Fill in the request from the headers which opened the stream.
+
+        @param headers: The headers, including the pseudo-headers.
+        @type headers: C{list} of 2-C{tuple}s of C{bytes}
+        """
+        request = self.request
+        requestHeaders = request.requestHeaders
+        self._command = self._path = None
+        authority = None
+        length = None
+        for name, value in headers:
+            if name == b":method":
+                self._command = value
+            elif name == b":path":
+                self._path = value
+            elif name == b":authority":
+                authority = value
+            elif not name.startswith(b":"):
+                requestHeaders.addRawHeader(name, value)
+                if name == b"content-length":
+                    try:
+                        length = int(value)
+                    except ValueError:
+                        pass
+        if authority is not None and not requestHeaders.hasHeader(b"host"):
+            requestHeaders.setRawHeaders(b"host", [authority])
+        request.parseCookies()
+        request.gotLength(length)
+        request.requestHeadReceived(self._command, self._path, b"HTTP/2")
+
+
+    def dataReceived(self, data):
+        """
+        Pass part of the request body to the request.
+        """
+        self.request.handleContentChunk(data)
+
+
+    def requestComplete(self):
+        """
+        Let the request be processed, now that all of it has been received.
+        """
+        self.request.requestReceived(self._command, self._path, b"HTTP/2")
+
+
+    def _pauseReading(self):
+        """
+        Stop the client sending the body of the request, for a resource which
+        it is streamed to, by holding back acknowledging it.
+        """
+        self.readingPaused = True
+
+
+    def _resumeReading(self):
+        """
+        Let the client send the body of the request again.
+        """
+        self.readingPaused = False
+        if self.unacknowledged and not self._reset:
+            length, self.unacknowledged = self.unacknowledged, 0
+            self.connection.acknowledge(self, length)
+
+
+    def reset(self, reason):
+        """
+        Stop the response, because the stream was reset or the connection
+        lost.
+
+        @param reason: Why.
+        @type reason: L{Failure}
+        """
+        self._reset = True
+        self.outbound.clear()
+        if self.producer is not None:
+            self.producer.stopProducing()
+            self.unregisterProducer()
+        if not self.request.finished:
+            self.request.connectionLost(reason)
+
+
+    # The channel interface, as used by the request.
+
+    def writeHeaders(self, code, headers):
+        """
+        Send the status and headers of the response.
+
+        @param code: The status code.
+        @type code: C{int}
+
+        @param headers: The headers.
+        @type headers: C{list} of 2-C{tuple}s of C{bytes}
+        """
+        if self._reset:
+            return
+        block = [(b":status", intToBytes(code))]
+        for name, value in headers:
+            name = name.lower()
+            if name not in _CONNECTION_HEADERS:
+                block.append((name, value))
+        self.connection.writeHeaders(self, block)
+
+
+    def requestDone(self, request):
+        """
+        End the stream once the rest of the response has been sent.
+        """
+        self.finished = True
+        if not self._reset:
+            self.connection.send(self)
+
+
+    # The transport interface.
+
+    def write(self, data):
+        """
+        Send part of the response body, once flow control allows.
+        """
+        if data and not self._reset:
+            self.outbound.append(data)
+            self.connection.send(self)
+
+
+    def writeSequence(self, iovec):
+        self.write(b"".join(iovec))
+
+
+    def loseConnection(self):
+        """
+        Reset the stream, rather than closing the connection it shares with
+        other streams.
+        """
+        self.connection.resetStream(self)
+
+
+    def getPeer(self):
+        return self.connection.transport.getPeer()
+
+
+    def getHost(self):
+        return self.connection.transport.getHost()
+
+
+    def registerProducer(self, producer, streaming):
+        """
+        Register a producer for the response, which is paused while flow
+        control or the connection's transport hold the response back.
+        """
+        if self.producer is not None:
+            raise ValueError(
+                "registering producer %s before previous one (%s) was "
+                "unregistered" % (producer, self.producer))
+        if self._reset:
+            producer.stopProducing()
+            return
+        self.producer = producer
+        if not streaming:
+            self._pullTask = cooperate(self._pull(producer))
+        self.updateProducer()
+
+
+    def unregisterProducer(self):
+        if self._pullTask is not None:
+            try:
+                self._pullTask.stop()
+            except TaskFinished:
+                # The producer had nothing left, or raised an exception.
+                pass
+            self._pullTask = None
+        self.producer = None
+        self._producerPaused = False
+
+
+    def _pull(self, producer):
+        """
+        Ask a pull producer for more of the response, over and over.
+        """
+        while True:
+            producer.resumeProducing()
+            yield None
+
+
+    def updateProducer(self):
+        """
+        Pause the producer while there is data flow control has not let be
+        sent, or the connection is paused, and resume it otherwise.
+        """
+        if self.producer is None:
+            return
+        blocked = bool(self.outbound) or self.connection.paused
+        if blocked == self._producerPaused:
+            return
+        self._producerPaused = blocked
+        if self._pullTask is not None:
+            if not blocked:
+                self._pullTask.resume()
+                return
+            try:
+                self._pullTask.pause()
+            except TaskFinished:
+                # The producer raised an exception, so the task asking it
+                # for more is already over.
+                self._producerPaused = False
+        elif blocked:
+            self.producer.pauseProducing()
+        else:
+            self.producer.resumeProducing()
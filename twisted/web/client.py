@@ -816,12 +816,18 @@ class FileBodyProducer(object):
         schedule all reads.
 
     @ivar _readSize: The number of bytes to read from C{_inputFile} at a time.
+
+    @ivar _priority: The priority of the L{CooperativeTask} which reads the
+        file, as described by L{Cooperator.cooperate}, or C{None} to use the
+        default.
     """
 
-    def __init__(self, inputFile, cooperator=task, readSize=2 ** 16):
+    def __init__(self, inputFile, cooperator=task, readSize=2 ** 16,
+                 priority=None):
         self._inputFile = inputFile
         self._cooperate = cooperator.cooperate
         self._readSize = readSize
+        self._priority = priority
         self.length = self._determineLength(inputFile)
 
 
@@ -860,7 +866,11 @@ class FileBodyProducer(object):
 
         @param consumer: Any L{IConsumer} provider
         """
-        self._task = self._cooperate(self._writeloop(consumer))
+        if self._priority is None:
+            self._task = self._cooperate(self._writeloop(consumer))
+        else:
+            self._task = self._cooperate(
+                self._writeloop(consumer), priority=self._priority)
         d = self._task.whenDone()
         def maybeStopped(reason):
             # IBodyProducer.startProducing's Deferred isn't support to fire if
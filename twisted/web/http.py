@@ -51,7 +51,7 @@ __all__ = [
     'stringToDatetime', 'toChunk', 'fromChunk', 'parseContentRange',
 
     'StringTransport', 'HTTPClient', 'NO_BODY_CODES', 'Request',
-    'PotentialDataLoss', 'HTTPChannel', 'HTTPFactory',
+    'PotentialDataLoss', 'RequestBodyDone', 'HTTPChannel', 'HTTPFactory',
     ]
 
 
@@ -91,11 +91,17 @@ from zope.interface import implementer
 from twisted.python.compat import (_PY3, unicode, intToBytes, networkString,
                                    nativeString)
 from twisted.internet import interfaces, reactor, protocol, address
-from twisted.internet.defer import Deferred
+from twisted.internet.defer import Deferred, succeed
 from twisted.protocols import policies, basic
 from twisted.python import log
+from twisted.python.failure import Failure
 
-from twisted.web.http_headers import _DictHeaders, Headers
+from twisted.web.http_headers import _DictHeaders, Headers, _dashCapitalize
+
+try:
+    from twisted.web import _http2
+except ImportError:
+    _http2 = None
 
 from twisted.web._responses import (
     SWITCHING,
@@ -525,6 +531,131 @@ class HTTPClient(basic.LineReceiver):
 # response codes that must have empty bodies
 NO_BODY_CODES = (204, 304)
 
+# The most status lines and header names to keep encoded in _statusLines and
+# _headerNames, so that responses with unusual values cannot make them grow
+# without bound.
+_MAX_CACHED_HEADS = 1000
+
+# Encoded status lines, by version, code and message.
+_statusLines = {}
+
+# Encoded header line prefixes, C{b"Name: "}, by lowercase header name.
+_headerNames = {}
+
+
+
+def _statusLine(version, code, message):
+    """
+    Get the status line of a response, including its CRLF.
+
+    @type version: C{bytes}
+    @param version: The HTTP version of the response.
+
+    @type code: C{int}
+    @param code: The status code of the response.
+
+    @param message: The status message of the response.
+
+    @rtype: C{bytes}
+    """
+    key = (version, code, message)
+    line = _statusLines.get(key)
+    if line is None:
+        line = (version + b" " + intToBytes(code) + b" " +
+                networkString(message) + b"\r\n")
+        if len(_statusLines) < _MAX_CACHED_HEADS:
+            _statusLines[key] = line
+    return line
+
+
+
+def _headerName(name):
+    """
+    Get the start of a header line, the canonical form of the header's name
+    followed by a colon and a space.
+
+    @type name: C{bytes}
+    @param name: The all-lowercase name of the header.
+
+    @rtype: C{bytes}
+    """
+    prefix = _headerNames.get(name)
+    if prefix is None:
+        prefix = Headers._caseMappings.get(name, _dashCapitalize(name)) + b": "
+        if len(_headerNames) < _MAX_CACHED_HEADS:
+            _headerNames[name] = prefix
+    return prefix
+
+
+
+for _name in [b"accept-ranges", b"cache-control", b"connection",
+              b"content-disposition", b"content-encoding", b"content-length",
+              b"content-range", b"content-type", b"date", b"etag",
+              b"expires", b"last-modified", b"location", b"server",
+              b"set-cookie", b"transfer-encoding", b"vary",
+              b"www-authenticate"]:
+    _headerName(_name)
+del _name
+
+
+@implementer(interfaces.IPushProducer)
+class _RequestBodyProducer(object):
+    """
+    The producer which the protocol given to L{Request.deliverBody} is
+    connected to, which stops and starts the channel reading the request body
+    from the client.
+
+    @ivar paused: Whether the channel has been asked to stop reading.
+
+    @ivar _channel: The channel of the request, or C{None} once all of the
+        body has been received or the connection has been lost.
+    """
+    paused = False
+
+    def __init__(self, channel):
+        self._channel = channel
+
+
+    def pauseProducing(self):
+        """
+        Stop reading the request body.
+        """
+        if self._channel is not None and not self.paused:
+            self.paused = True
+            self._channel._pauseReading()
+
+
+    def resumeProducing(self):
+        """
+        Start reading the request body again.
+        """
+        if self._channel is not None and self.paused:
+            self.paused = False
+            self._channel._resumeReading()
+
+
+    def stopProducing(self):
+        """
+        Give up on the request, by closing the connection it was made over.
+        """
+        if self._channel is not None:
+            self._channel.transport.loseConnection()
+
+
+    def _detach(self, resume):
+        """
+        Stop controlling the channel, since no more of the body is coming.
+
+        @param resume: Whether to start the channel reading again if it has
+            been stopped, which is not wanted once the connection is lost.
+        """
+        channel, self._channel = self._channel, None
+        if self.paused:
+            self.paused = False
+            if resume:
+                channel._resumeReading()
+
+
 
 @implementer(interfaces.IConsumer)
 class Request:
@@ -567,6 +698,20 @@ class Request:
         which this request was received is closed and which is C{True} after
         that.
     @type _disconnected: C{bool}
+
+    @ivar _bodyProducer: The L{_RequestBodyProducer} for a request whose body
+        is delivered by L{deliverBody} as it arrives, rather than kept in
+        C{content}, or C{None}.
+
+    @ivar _bodyChunks: The parts of a streamed body which have arrived before
+        L{deliverBody} was called.
+    @type _bodyChunks: C{list} of C{bytes}
+
+    @ivar _bodyProtocol: The protocol given to L{deliverBody}, until all of
+        the body has been delivered to it.
+
+    @ivar _bodyDone: Why a streamed body ended, once it has: a L{Failure}
+        wrapping L{RequestBodyDone} if all of it was received.
     """
     producer = None
     finished = 0
@@ -585,6 +730,11 @@ class Request:
     content = None
     _forceSSL = 0
     _disconnected = False
+    _bodyProducer = None
+    _bodyChunks = None
+    _bodyProtocol = None
+    _bodyDone = None
+    _bodyDelivered = False
 
     def __init__(self, channel, queued):
         """
@@ -711,7 +861,7 @@ class Request:
             self.transport.registerProducer(self.producer, self.streamingProducer)
 
         # if we're finished, clean up
-        if self.finished:
+        if self.finished and not self._receivingBody():
             self._cleanup()
 
     def gotLength(self, length):
@@ -758,7 +908,32 @@ class Request:
 
         This method is not intended for users.
         """
-        self.content.write(data)
+        if self._bodyProducer is None:
+            self.content.write(data)
+        elif self._bodyProtocol is not None:
+            self._bodyProtocol.dataReceived(data)
+        else:
+            self._bodyChunks.append(data)
+
+
+    def requestHeadReceived(self, command, path, version):
+        """
+        Called by channel when the head of the request has been received,
+        before its body.
+
+        This method is not intended for users.  It does nothing here;
+        L{twisted.web.server.Request} overrides it to let resources start
+        on a request before its body has arrived.
+
+        @type command: C{bytes}
+        @param command: The HTTP verb of this request.
+
+        @type path: C{bytes}
+        @param path: The URI of this request.
+
+        @type version: C{bytes}
+        @param version: The HTTP version of this request.
+        """
 
 
     def requestReceived(self, command, path, version):
@@ -777,24 +952,16 @@ class Request:
         @type version: C{bytes}
         @param version: The HTTP version of this request.
         """
-        self.content.seek(0,0)
-        self.args = {}
-        self.stack = []
-
-        self.method, self.uri = command, path
-        self.clientproto = version
-        x = self.uri.split(b'?', 1)
-
-        if len(x) == 1:
-            self.path = self.uri
-        else:
-            self.path, argstring = x
-            self.args = parse_qs(argstring, 1)
+        if self._bodyProducer is not None:
+            # The request was processed when its head arrived, and all that
+            # is left is to say that the body has ended.
+            self._bodyProducer._detach(True)
+            self._bodyEnded(Failure(
+                RequestBodyDone("Request body fully received")))
+            return
 
-        # cache the client and server information, we'll need this later to be
-        # serialized and sent with the request so CGIs will work remotely
-        self.client = self.channel.transport.getPeer()
-        self.host = self.channel.transport.getHost()
+        self.content.seek(0,0)
+        self._setRequestLine(command, path, version)
 
         # Argument processing
         args = self.args
@@ -826,6 +993,136 @@ class Request:
         self.process()
 
 
+    def _setRequestLine(self, command, path, version):
+        """
+        Set the method, URI, path, query arguments and protocol version of
+        the request from its request line, and the addresses of the
+        connection it was made over.
+
+        @type command: C{bytes}
+        @param command: The HTTP verb of this request.
+
+        @type path: C{bytes}
+        @param path: The URI of this request.
+
+        @type version: C{bytes}
+        @param version: The HTTP version of this request.
+        """
+        self.args = {}
+        self.stack = []
+
+        self.method, self.uri = command, path
+        self.clientproto = version
+        x = self.uri.split(b'?', 1)
+
+        if len(x) == 1:
+            self.path = self.uri
+        else:
+            self.path, argstring = x
+            self.args = parse_qs(argstring, 1)
+
+        # cache the client and server information, we'll need this later to be
+        # serialized and sent with the request so CGIs will work remotely
+        self.client = self.channel.transport.getPeer()
+        self.host = self.channel.transport.getHost()
+
+
+    def _streamBody(self):
+        """
+        Keep the body of the request for L{deliverBody}, as it arrives, rather
+        than in C{content}, which is left empty.  The channel stops reading
+        until L{deliverBody} is called.
+
+        This is for requests which are processed once their head has arrived.
+        """
+        self.content.close()
+        self.content = StringIO()
+        self._bodyChunks = []
+        self._bodyProducer = _RequestBodyProducer(self.channel)
+        self._bodyProducer.pauseProducing()
+
+
+    def _receivingBody(self):
+        """
+        Whether more of a body which is being streamed is still to come, in
+        which case the request must stay the channel's current one even once
+        its response has been finished.
+        """
+        return self._bodyProducer is not None and self._bodyDone is None
+
+
+    def _bodyEnded(self, reason):
+        """
+        Tell the protocol given to L{deliverBody} that the body has ended, or
+        remember why for when a protocol is given, and clean up after a
+        response which was finished before the body ended.
+
+        @param reason: Why the body ended.
+        @type reason: L{Failure}
+        """
+        # A response finished by the protocol when it is told is cleaned up
+        # by finish itself.
+        finished = self.finished
+        self._bodyDone = reason
+        protocol, self._bodyProtocol = self._bodyProtocol, None
+        if protocol is not None:
+            protocol.connectionLost(reason)
+        if finished and not self.queued and not self._disconnected:
+            self._cleanup()
+
+
+    def deliverBody(self, protocol):
+        """
+        Deliver the body of the request to a protocol.
+
+        For a request which was processed before its body had arrived (see
+        L{twisted.web.resource.IStreamingResource}), the body is delivered as
+        it arrives from the client, and the protocol may stop and start the
+        channel reading it with the producer it is connected to.  For any
+        other request, the whole body, kept in C{content}, is delivered at
+        once.
+
+        The protocol is given the body by C{dataReceived}, and is then told by
+        C{connectionLost} with a L{Failure} wrapping L{RequestBodyDone} that
+        all of it has been delivered, or with some other reason if the
+        connection was lost first.
+
+        @param protocol: The protocol to deliver the body to.
+        @type protocol: L{IProtocol<twisted.internet.interfaces.IProtocol>}
+            provider
+
+        @raise RuntimeError: If the body has already been delivered.
+        """
+        if self._bodyDelivered:
+            raise RuntimeError("The request body has already been delivered.")
+        self._bodyDelivered = True
+
+        producer = self._bodyProducer
+        if producer is None:
+            protocol.makeConnection(_RequestBodyProducer(None))
+            self.content.seek(0, 0)
+            data = self.content.read()
+            self.content.seek(0, 0)
+            if data:
+                protocol.dataReceived(data)
+            protocol.connectionLost(Failure(
+                RequestBodyDone("Request body fully received")))
+            return
+
+        # Start reading again before handing over what has arrived, so that
+        # nothing is delivered out of order if more of the body arrives at
+        # once.
+        producer.resumeProducing()
+        protocol.makeConnection(producer)
+        while self._bodyChunks:
+            protocol.dataReceived(self._bodyChunks.pop(0))
+        self._bodyChunks = None
+        if self._bodyDone is not None:
+            protocol.connectionLost(self._bodyDone)
+        else:
+            self._bodyProtocol = protocol
+
+
     def __repr__(self):
         """
         Return a string description of the request including such information
@@ -944,8 +1241,13 @@ class Request:
         if hasattr(self.channel, "factory"):
             self.channel.factory.log(self)
 
+        if self._receivingBody() and not self._bodyDelivered:
+            # Nothing is going to want the rest of the body now, but it has
+            # to be read before the next request can be.
+            self.deliverBody(protocol.Protocol())
+
         self.finished = 1
-        if not self.queued:
+        if not self.queued and not self._receivingBody():
             self._cleanup()
 
 
@@ -963,11 +1265,7 @@ class Request:
         if not self.startedWriting:
             self.startedWriting = 1
             version = self.clientproto
-            l = []
-            l.append(
-                version + b" " +
-                intToBytes(self.code) + b" " +
-                networkString(self.code_message) + b"\r\n")
+            headers = []
 
             # if we don't have a content length, we send data in
             # chunked mode, so that we can support pipelining in
@@ -975,7 +1273,7 @@ class Request:
             if ((version == b"HTTP/1.1") and
                 (self.responseHeaders.getRawHeaders(b'content-length') is None) and
                 self.method != b"HEAD" and self.code not in NO_BODY_CODES):
-                l.append(b'Transfer-Encoding: chunked\r\n')
+                headers.append((b'transfer-encoding', b'chunked'))
                 self.chunked = 1
 
             if self.lastModified is not None:
@@ -990,7 +1288,8 @@ class Request:
             if self.etag is not None:
                 self.responseHeaders.setRawHeaders(b'ETag', [self.etag])
 
-            for name, values in self.responseHeaders.getAllRawHeaders():
+            # The raw headers are keyed by lowercase name already.
+            for name, values in self.responseHeaders._rawHeaders.items():
                 for value in values:
                     if not isinstance(value, bytes):
                         warnings.warn(
@@ -999,23 +1298,40 @@ class Request:
                             category=DeprecationWarning, stacklevel=2)
                         # Backward compatible cast for non-bytes values
                         value = networkString('%s' % (value,))
-                    l.extend([name, b": ", value, b"\r\n"])
+                    headers.append((name, value))
 
             for cookie in self.cookies:
-                l.append(networkString('Set-Cookie: %s\r\n' % (cookie,)))
-
-            l.append(b"\r\n")
+                headers.append((b'set-cookie', networkString(cookie)))
 
-            self.transport.writeSequence(l)
-
-            # if this is a "HEAD" request, we shouldn't return any data
-            if self.method == b"HEAD":
+            if self.method == b"HEAD" or self.code in NO_BODY_CODES:
+                # if this is a "HEAD" request, or the result code is one of
+                # those which never have a body, we shouldn't return any data
                 self.write = lambda data: None
+                data = b""
+
+            # Channels which do not carry responses as HTTP/1.x messages, such
+            # as the streams of an HTTP/2 connection, send the status and
+            # headers themselves.
+            writeHeaders = getattr(self.channel, "writeHeaders", None)
+            if writeHeaders is not None:
+                writeHeaders(self.code, headers)
+            else:
+                # Send the head and the start of the body together, so that
+                # small responses go out in a single write.
+                l = [_statusLine(version, self.code, self.code_message)]
+                for name, value in headers:
+                    l.extend([_headerName(name), value, b"\r\n"])
+                l.append(b"\r\n")
+                if data:
+                    self.sentLength = self.sentLength + len(data)
+                    if self.chunked:
+                        l.extend(toChunk(data))
+                    else:
+                        l.append(data)
+                self.transport.writeSequence(l)
+                self._responseBuffered()
                 return
-
-            # for certain result codes, we should never return any data
-            if self.code in NO_BODY_CODES:
-                self.write = lambda data: None
+            if not data:
                 return
 
         self.sentLength = self.sentLength + len(data)
@@ -1024,6 +1340,59 @@ class Request:
                 self.transport.writeSequence(toChunk(data))
             else:
                 self.transport.write(data)
+            self._responseBuffered()
+
+
+    def _responseBuffered(self):
+        """
+        Let the channel stop reading if this request is queued and its
+        response has pushed the responses buffered on the channel over
+        C{maxPipelinedResponseBytes}.
+        """
+        if self.queued:
+            checkPipeline = getattr(self.channel, "_checkPipeline", None)
+            if checkPipeline is not None:
+                checkPipeline()
+
+
+    def _writeFile(self, fileObject, offset, count):
+        """
+        Write part of a file as (part of) the response body, without reading
+        it into memory, if the transport provides
+        L{interfaces.IFileTransport} and the response is not chunked.
+
+        @param fileObject: See L{interfaces.IFileTransport.writeFile}.
+        @param offset: See L{interfaces.IFileTransport.writeFile}.
+        @param count: See L{interfaces.IFileTransport.writeFile}.
+
+        @return: C{None} if the file cannot be written this way, in which case
+            the caller must read it and pass the data to L{write} itself.
+            Otherwise, a L{Deferred} which fires once the bytes have been
+            written, as L{interfaces.IFileTransport.writeFile}.
+        """
+        transport = self.transport
+        if not (interfaces.IFileTransport.providedBy(transport) and
+                transport.canWriteFile()):
+            return None
+        # Write the response headers, and find out whether the body is chunked
+        # or not sent at all.
+        self.write(b"")
+        if self.method == b"HEAD" or self.code in NO_BODY_CODES:
+            return succeed(None)
+        if self.chunked:
+            return None
+
+        # The transport stops at the end of the file, so only count what is
+        # there.
+        size = os.fstat(fileObject.fileno()).st_size
+        count = max(0, min(count, size - offset))
+
+        def written(result):
+            self.sentLength += count
+            return result
+        return transport.writeFile(fileObject, offset, count).addCallback(
+            written)
+
 
     def addCookie(self, k, v, expires=None, domain=None, path=None, max_age=None, comment=None, secure=None):
         """
@@ -1344,6 +1713,9 @@ class Request:
         self.channel = None
         if self.content is not None:
             self.content.close()
+        if self._receivingBody():
+            self._bodyProducer._detach(False)
+            self._bodyEnded(reason)
         for d in self.notifications:
             d.errback(reason)
         self.notifications = []
@@ -1374,6 +1746,15 @@ class PotentialDataLoss(Exception):
 
 
 
+class RequestBodyDone(Exception):
+    """
+    L{RequestBodyDone} is passed to the C{connectionLost} method of the
+    protocol given to L{Request.deliverBody}, to indicate that all of the
+    request body has been delivered.
+    """
+
+
+
 class _MalformedChunkedDataError(Exception):
     """
     C{_ChunkedTranferDecoder} raises L{_MalformedChunkedDataError} from its
@@ -1588,12 +1969,72 @@ class HTTPChannel(basic.LineReceiver, policies.TimeoutMixin):
     """
     A receiver for HTTP requests.
 
+    If the optional dependency h2 is installed, the channel also speaks
+    HTTP/2 when ALPN or NPN agree on it during the TLS handshake (see the
+    C{acceptableProtocols} of L{twisted.internet.ssl.CertificateOptions}).
+    If C{cleartextHTTP2} is set, it also does when the client starts with the
+    HTTP/2 connection preface, or asks for an HTTP/1.1 request to be upgraded
+    to C{h2c}.  Each stream is delivered as a request made by
+    C{requestFactory}.
+
+    When the whole head of a request has arrived by the time its first line
+    is parsed, as it usually has, the head is parsed at once by
+    L{_headReceived} rather than a line at a time by L{lineReceived} and
+    L{headerReceived}.  Subclasses which override either of those get them
+    called for every line instead.
+
+    Requests pipelined by the client are processed as soon as they have been
+    received, and the responses to those which are waiting for the responses
+    before them are buffered.  Setting C{maxPipelinedRequests} bounds that:
+    when a request has been received, the channel stops reading from the
+    client if that many requests are waiting for their responses to be
+    finished, or if the responses buffered for them amount to more than
+    C{maxPipelinedResponseBytes}, and starts again when the responses before
+    them have been written.  The buffered responses are also checked as they
+    are written, so that a queued request writing a long response stops the
+    channel reading without waiting for another request to arrive.  This
+    does not stop the response itself from growing: a resource producing one
+    should register a producer on the request, which is paused while it is
+    queued.
+
+    @ivar cleartextHTTP2: Whether a client may switch to HTTP/2 without TLS,
+        by starting with the HTTP/2 connection preface or by asking for an
+        upgrade to C{h2c}.
+    @type cleartextHTTP2: C{bool}
+
+    @ivar maxPipelinedRequests: The number of requests which may be waiting
+        for their responses before the channel stops reading, or C{None} to
+        read regardless.
+    @type maxPipelinedRequests: C{int} or C{NoneType}
+
+    @ivar maxPipelinedResponseBytes: The number of bytes of buffered responses
+        above which the channel stops reading, if C{maxPipelinedRequests} is
+        not C{None}.
+    @type maxPipelinedResponseBytes: C{int}
+
     @ivar _transferDecoder: C{None} or an instance of
         L{_ChunkedTransferDecoder} if the request body uses the I{chunked}
         Transfer-Encoding.
+
+    @ivar _pipelinePaused: Whether the channel has stopped reading because of
+        C{maxPipelinedRequests} or C{maxPipelinedResponseBytes}.
+
+    @ivar _bodyPaused: Whether the channel has stopped reading because a
+        request body being streamed to a resource is not wanted yet.
+
+    @ivar _h2: The L{H2Connection<twisted.web._http2.H2Connection>} which
+        the connection has been handed over to, once it has switched to
+        HTTP/2, or C{None}.
+
+    @ivar _h2Possible: Whether the connection may yet switch to HTTP/2 because
+        of the TLS handshake or the HTTP/2 connection preface, which is only
+        the case until the start of the first request has been received.
     """
 
     maxHeaders = 500 # max number of headers allowed per request
+    cleartextHTTP2 = False
+    maxPipelinedRequests = None
+    maxPipelinedResponseBytes = 2 ** 20
 
     length = 0
     persistent = 1
@@ -1606,6 +2047,10 @@ class HTTPChannel(basic.LineReceiver, policies.TimeoutMixin):
 
     _savedTimeOut = None
     _receivedHeaderCount = 0
+    _pipelinePaused = False
+    _bodyPaused = False
+    _h2 = None
+    _h2Possible = _http2 is not None
 
     def __init__(self):
         # the request queue
@@ -1616,6 +2061,241 @@ class HTTPChannel(basic.LineReceiver, policies.TimeoutMixin):
     def connectionMade(self):
         self.setTimeout(self.timeOut)
 
+
+    def _parsesHeadsInBulk(self):
+        """
+        Whether L{_headReceived} may be used, because this class does not
+        override how lines or headers are handled.
+        """
+        cls = self.__class__
+        return (
+            getattr(cls.lineReceived, "__func__", None) is _lineReceived and
+            getattr(cls.headerReceived, "__func__", None) is _headerReceived)
+
+
+    def dataReceived(self, data):
+        """
+        Parse request heads at once where they can be, and otherwise a line
+        at a time, and pass request bodies to L{rawDataReceived}, or pass
+        everything to the L{H2Connection<twisted.web._http2.H2Connection>}
+        once the connection has switched to HTTP/2.
+        """
+        if self._h2 is not None:
+            self.resetTimeout()
+            return self._h2.dataReceived(data)
+        if self._busyReceiving:
+            self._buffer += data
+            return
+        if self._h2Possible:
+            data = self._buffer + data
+            self._buffer = b''
+            if self._negotiatedH2() or (
+                    self.cleartextHTTP2 and data.startswith(_http2.PREFACE)):
+                self._h2Possible = False
+                return self._switchToH2(data)
+            if self.cleartextHTTP2 and _http2.PREFACE.startswith(data):
+                # Too little has arrived to tell yet.
+                self._buffer = data
+                return
+            self._h2Possible = False
+        bulk = self._parsesHeadsInBulk()
+
+        try:
+            self._busyReceiving = True
+            self._buffer += data
+            while self._buffer and not self.paused:
+                if self._h2 is not None:
+                    data = self._buffer
+                    self._buffer = b''
+                    return self._h2.dataReceived(data)
+                if self.line_mode:
+                    if (bulk and self.__first_line and self.persistent and
+                        not self._buffer.startswith(b"\r\n")):
+                        end = self._buffer.find(b"\r\n\r\n")
+                        if end != -1:
+                            why = self._headReceived(end)
+                            if (why or self.transport and
+                                self.transport.disconnecting):
+                                return why
+                            continue
+                    try:
+                        line, self._buffer = self._buffer.split(
+                            self.delimiter, 1)
+                    except ValueError:
+                        if len(self._buffer) > self.MAX_LENGTH:
+                            line, self._buffer = self._buffer, b''
+                            return self.lineLengthExceeded(line)
+                        return
+                    else:
+                        if len(line) > self.MAX_LENGTH:
+                            exceeded = line + self.delimiter + self._buffer
+                            self._buffer = b''
+                            return self.lineLengthExceeded(exceeded)
+                        why = self.lineReceived(line)
+                        if (why or self.transport and
+                            self.transport.disconnecting):
+                            return why
+                else:
+                    data = self._buffer
+                    self._buffer = b''
+                    why = self.rawDataReceived(data)
+                    if why:
+                        return why
+        finally:
+            self._busyReceiving = False
+
+
+    def _negotiatedH2(self):
+        """
+        Whether ALPN or NPN agreed on HTTP/2 during the TLS handshake.
+        """
+        getNegotiatedProtocol = getattr(
+            self.transport, "getNegotiatedProtocol", None)
+        return (getNegotiatedProtocol is not None and
+                getNegotiatedProtocol() == b"h2")
+
+
+    def _switchToH2(self, data):
+        """
+        Hand the connection over to HTTP/2, for a client which negotiated it
+        or started with the HTTP/2 connection preface.
+
+        @param data: What has been received from the client so far.
+        """
+        self._h2 = _http2.H2Connection(self)
+        self._h2.start()
+        if data:
+            self._h2.dataReceived(data)
+
+
+    def _upgradesToH2(self, request):
+        """
+        Whether a request which has been received asks for the connection to
+        be upgraded to HTTP/2 over cleartext, and can be.
+
+        @param request: The request.
+        @type request: L{Request}
+        """
+        if (_http2 is None or not self.cleartextHTTP2 or
+            self._version != b"HTTP/1.1" or
+            len(self.requests) != 1 or request._bodyProducer is not None or
+            interfaces.ISSLTransport.providedBy(self.transport)):
+            return False
+        headers = request.requestHeaders
+        settings = headers.getRawHeaders(b"http2-settings")
+        upgrade = headers.getRawHeaders(b"upgrade", [])
+        tokens = [token.strip().lower()
+                  for value in upgrade for token in value.split(b",")]
+        return (settings is not None and len(settings) == 1 and
+                b"h2c" in tokens)
+
+
+    def _upgradeToH2(self, request):
+        """
+        Switch to HTTP/2 in response to a request asking for an upgrade to
+        C{h2c}, and answer the request as the first stream of the HTTP/2
+        connection.
+
+        @param request: The request.
+        @type request: L{Request}
+        """
+        self.requests.remove(request)
+        request.content.seek(0, 0)
+        body = request.content.read()
+        request.content.close()
+        self.transport.write(
+            b"HTTP/1.1 101 Switching Protocols\r\n"
+            b"Connection: Upgrade\r\n"
+            b"Upgrade: h2c\r\n"
+            b"\r\n")
+        self._h2 = _http2.H2Connection(self)
+        self._h2.upgrade(
+            request.requestHeaders.getRawHeaders(b"http2-settings")[0],
+            self._command, self._path, request.requestHeaders, body)
+
+
+    def _headReceived(self, end):
+        """
+        Parse the whole head of a request from the buffer in one pass, with
+        the same limits on line length and the number of headers as
+        L{lineReceived} and L{headerReceived} apply.
+
+        @param end: The offset in the buffer of the empty line which ends the
+            head.
+        """
+        head = self._buffer[:end]
+        self._buffer = self._buffer[end + 4:]
+        self.resetTimeout()
+
+        lines = head.split(b"\r\n")
+        if max([len(line) for line in lines]) > self.MAX_LENGTH:
+            exceeded = head + b"\r\n\r\n" + self._buffer
+            self._buffer = b''
+            return self.lineLengthExceeded(exceeded)
+
+        request = self.requestFactory(self, len(self.requests))
+        self.requests.append(request)
+        self.__first_line = 0
+
+        parts = lines[0].split()
+        if len(parts) != 3:
+            return self._respondToBadRequest()
+        self._command, self._path, self._version = parts
+
+        fields = []
+        for line in lines[1:]:
+            if line[:1] in (b" ", b"\t"):
+                if not fields:
+                    return self._respondToBadRequest()
+                fields[-1] += b"\n" + line
+            else:
+                fields.append(line)
+        if len(fields) > self.maxHeaders:
+            return self._respondToBadRequest()
+
+        rawHeaders = request.requestHeaders._rawHeaders
+        for field in fields:
+            header, colon, data = field.partition(b":")
+            if not colon:
+                return self._respondToBadRequest()
+            header = header.lower()
+            data = data.strip()
+            if header == b'content-length':
+                try:
+                    self.length = int(data)
+                except ValueError:
+                    self.length = None
+                    return self._respondToBadRequest()
+                self._transferDecoder = _IdentityTransferDecoder(
+                    self.length, request.handleContentChunk,
+                    self._finishRequestBody)
+            elif (header == b'transfer-encoding' and
+                  data.lower() == b'chunked'):
+                self.length = None
+                self._transferDecoder = _ChunkedTransferDecoder(
+                    request.handleContentChunk, self._finishRequestBody)
+            values = rawHeaders.get(header)
+            if values is None:
+                rawHeaders[header] = [data]
+            else:
+                values.append(data)
+
+        self.allHeadersReceived()
+        if self.length == 0:
+            self.allContentReceived()
+        else:
+            self.setRawMode()
+
+
+    def _respondToBadRequest(self):
+        """
+        Respond to a malformed request with a 400 (Bad Request) response, and
+        close the connection.
+        """
+        self.transport.write(b"HTTP/1.1 400 Bad Request\r\n\r\n")
+        self.transport.loseConnection()
+
+
     def lineReceived(self, line):
         self.resetTimeout()
 
@@ -1710,6 +2390,15 @@ class HTTPChannel(basic.LineReceiver, policies.TimeoutMixin):
 
 
     def allContentReceived(self):
+        req = self.requests[-1]
+        if self._upgradesToH2(req):
+            self._upgradeToH2(req)
+            self.length = 0
+            self._receivedHeaderCount = 0
+            self._transferDecoder = None
+            del self._command, self._path, self._version
+            return
+
         command = self._command
         path = self._path
         version = self._version
@@ -1728,6 +2417,7 @@ class HTTPChannel(basic.LineReceiver, policies.TimeoutMixin):
 
         req = self.requests[-1]
         req.requestReceived(command, path, version)
+        self._checkPipeline()
 
 
     def rawDataReceived(self, data):
@@ -1744,11 +2434,13 @@ class HTTPChannel(basic.LineReceiver, policies.TimeoutMixin):
         req.parseCookies()
         self.persistent = self.checkPersistence(req, self._version)
         req.gotLength(self.length)
+        req.requestHeadReceived(self._command, self._path, self._version)
         # Handle 'Expect: 100-continue' with automated 100 response code,
-        # a simplistic implementation of RFC 2686 8.2.3:
+        # a simplistic implementation of RFC 2686 8.2.3, unless the response
+        # has already been started without waiting for the body:
         expectContinue = req.requestHeaders.getRawHeaders(b'expect')
         if (expectContinue and expectContinue[0].lower() == b'100-continue' and
-            self._version == b'HTTP/1.1'):
+            self._version == b'HTTP/1.1' and not req.startedWriting):
             req.transport.write(b"HTTP/1.1 100 Continue\r\n\r\n")
 
 
@@ -1812,6 +2504,56 @@ class HTTPChannel(basic.LineReceiver, policies.TimeoutMixin):
                     self.setTimeout(self._savedTimeOut)
         else:
             self.transport.loseConnection()
+        self._checkPipeline()
+
+
+    def _checkPipeline(self):
+        """
+        Stop reading from the client if too many requests are waiting for
+        their responses, or too much of their responses is buffered, and start
+        again once neither is the case.
+        """
+        if self.maxPipelinedRequests is None:
+            return
+        if self.persistent and not self.transport.disconnecting:
+            buffered = 0
+            for request in self.requests:
+                if request.queued:
+                    buffered += request.transport.tell()
+            full = (len(self.requests) >= self.maxPipelinedRequests or
+                    buffered > self.maxPipelinedResponseBytes)
+        else:
+            full = False
+        if full and not self._pipelinePaused:
+            self._pipelinePaused = True
+            if not self._bodyPaused:
+                self.pauseProducing()
+        elif not full and self._pipelinePaused:
+            self._pipelinePaused = False
+            if not self._bodyPaused and not self.transport.disconnecting:
+                self.resumeProducing()
+
+
+    def _pauseReading(self):
+        """
+        Stop reading from the client, for the body of a request which is
+        streamed to a resource.
+        """
+        if not self._bodyPaused:
+            self._bodyPaused = True
+            if not self._pipelinePaused:
+                self.pauseProducing()
+
+
+    def _resumeReading(self):
+        """
+        Start reading from the client again, once the body of a request
+        which is streamed to a resource is wanted.
+        """
+        if self._bodyPaused:
+            self._bodyPaused = False
+            if not self._pipelinePaused and not self.transport.disconnecting:
+                self.resumeProducing()
 
     def timeoutConnection(self):
         log.msg("Timing out client: %s" % str(self.transport.getPeer()))
@@ -1819,10 +2561,17 @@ class HTTPChannel(basic.LineReceiver, policies.TimeoutMixin):
 
     def connectionLost(self, reason):
         self.setTimeout(None)
+        if self._h2 is not None:
+            self._h2.connectionLost(reason)
         for request in self.requests:
             request.connectionLost(reason)
 
 
+# The implementations which HTTPChannel._parsesHeadsInBulk looks for.
+_lineReceived = HTTPChannel.__dict__["lineReceived"]
+_headerReceived = HTTPChannel.__dict__["headerReceived"]
+
+
 class HTTPFactory(protocol.ServerFactory):
     """
     Factory for HTTP server.
@@ -1834,12 +2583,25 @@ class HTTPFactory(protocol.ServerFactory):
     @ivar _logDateTimeCall: A delayed call for the next update to the cached
         log datetime string.
     @type _logDateTimeCall: L{IDelayedCall} provided
+
+    @ivar _date: A cached value for the C{Date} header of responses, updated
+        along with C{_logDateTime}, or C{None} if the factory has not been
+        started.
+    @type _date: C{bytes}
+
+    @ivar cleartextHTTP2: Whether clients may switch to HTTP/2 without TLS.
+        See L{HTTPChannel.cleartextHTTP2}.  Default to C{False}.
+    @type cleartextHTTP2: C{bool}
     """
 
     protocol = HTTPChannel
 
     logPath = None
 
+    cleartextHTTP2 = False
+
+    _date = None
+
     timeOut = 60 * 60 * 12
 
     def __init__(self, logPath=None, timeout=60*60*12):
@@ -1851,13 +2613,16 @@ class HTTPFactory(protocol.ServerFactory):
         # For storing the cached log datetime and the callback to update it
         self._logDateTime = None
         self._logDateTimeCall = None
+        self._date = None
 
 
     def _updateLogDateTime(self):
         """
         Update log datetime periodically, so we aren't always recalculating it.
+        The value of the C{Date} header is updated at the same time.
         """
         self._logDateTime = datetimeToLogString()
+        self._date = datetimeToString()
         self._logDateTimeCall = reactor.callLater(1, self._updateLogDateTime)
 
 
@@ -1866,6 +2631,7 @@ class HTTPFactory(protocol.ServerFactory):
         # timeOut needs to be on the Protocol instance cause
         # TimeoutMixin expects it there
         p.timeOut = self.timeOut
+        p.cleartextHTTP2 = self.cleartextHTTP2
         return p
 
 
@@ -1891,6 +2657,7 @@ class HTTPFactory(protocol.ServerFactory):
         if self._logDateTimeCall is not None and self._logDateTimeCall.active():
             self._logDateTimeCall.cancel()
             self._logDateTimeCall = None
+        self._date = None
 
 
     def _openLogFile(self, path):
@@ -9,7 +9,7 @@ Implementation of the lowest-level Resource class.
 from __future__ import division, absolute_import
 
 __all__ = [
-    'IResource', 'getChildForRequest',
+    'IResource', 'IStreamingResource', 'getChildForRequest',
     'Resource', 'ErrorPage', 'NoResource', 'ForbiddenResource',
     'EncodingResourceWrapper']
 
@@ -88,6 +88,26 @@ class IResource(Interface):
 
 
 
+class IStreamingResource(IResource):
+    """
+    A web resource which takes the body of a request as it arrives.
+
+    If the C{streamRequestBodies} attribute of a L{twisted.web.server.Site}
+    is set, the resource for each request is found as soon as the head of the
+    request has been received.  A resource which provides this interface is
+    rendered then, before the body has arrived, with C{request.content}
+    empty.  It should call C{request.deliverBody} to be given the body, which
+    is delivered to a protocol as it arrives; the client is not read from
+    until it has been called.  The response may be written at any time, but
+    is only finished once all of the body has been received.
+
+    Any other resource is rendered once all of the body has been received, as
+    usual.  So is this one, when the site does not stream request bodies, and
+    C{request.deliverBody} then delivers all of the body at once.
+    """
+
+
+
 def getChildForRequest(resource, request):
     """
     Traverse resource tree to find who will handle the request.
@@ -101,6 +101,10 @@ class Request(Copyable, http.Request, components.Componentized):
     @ivar defaultContentType: A C{bytes} giving the default I{Content-Type}
         value to send in responses if no other value is set.  C{None} disables
         the default.
+
+    @ivar _resource: The resource found for the request when its head was
+        received, to be rendered once its body has been, or a L{Failure}
+        if finding it failed; C{None} if it has not been looked for.
     """
 
     defaultContentType = b"text/html"
@@ -110,6 +114,7 @@ class Request(Copyable, http.Request, components.Componentized):
     __pychecker__ = 'unusednames=issuer'
     _inFakeHead = False
     _encoder = None
+    _resource = None
 
     def __init__(self, *args, **kw):
         http.Request.__init__(self, *args, **kw)
@@ -164,31 +169,82 @@ class Request(Copyable, http.Request, components.Componentized):
                 return name
 
 
+    def requestHeadReceived(self, command, path, version):
+        """
+        If the site streams request bodies, find the resource for the request
+        as soon as its head has been received, and render it at once if it
+        provides L{resource.IStreamingResource}.  Any other resource is kept
+        to be rendered by L{process}, once the body has been received.
+        """
+        if not getattr(self.channel.site, "streamRequestBodies", False):
+            return
+        self._setRequestLine(command, path, version)
+        self._prepare()
+        try:
+            resrc = self._getResource()
+        except:
+            self._resource = failure.Failure()
+            return
+        if not resource.IStreamingResource.providedBy(resrc):
+            self._resource = resrc
+            return
+        self._streamBody()
+        try:
+            self.render(resrc)
+        except:
+            self.processingFailed(failure.Failure())
+
+
     def process(self):
         """
         Process a request.
         """
+        resrc = self._resource
+        if resrc is None:
+            self._prepare()
+        elif isinstance(resrc, failure.Failure):
+            self.processingFailed(resrc)
+            return
 
+        try:
+            if resrc is None:
+                resrc = self._getResource()
+            self.render(resrc)
+        except:
+            self.processingFailed(failure.Failure())
+
+
+    def _prepare(self):
+        """
+        Set the default headers of the response, and the path to find the
+        resource for the request by.
+        """
         # get site from channel
         self.site = self.channel.site
 
         # set various default headers
         self.setHeader(b'server', version)
-        self.setHeader(b'date', http.datetimeToString())
+        self.setHeader(b'date', getattr(self.site, "_date", None) or
+                                http.datetimeToString())
 
         # Resource Identification
         self.prepath = []
         self.postpath = list(map(unquote, self.path[1:].split(b'/')))
 
-        try:
-            resrc = self.site.getResourceFor(self)
-            if resource._IEncodingResource.providedBy(resrc):
-                encoder = resrc.getEncoder(self)
-                if encoder is not None:
-                    self._encoder = encoder
-            self.render(resrc)
-        except:
-            self.processingFailed(failure.Failure())
+
+    def _getResource(self):
+        """
+        Find the resource for the request, and the encoder for its response.
+
+        @return: The resource.
+        @rtype: L{resource.IResource} provider
+        """
+        resrc = self.site.getResourceFor(self)
+        if resource._IEncodingResource.providedBy(resrc):
+            encoder = resrc.getEncoder(self)
+            if encoder is not None:
+                self._encoder = encoder
+        return resrc
 
 
     def write(self, data):
@@ -217,6 +273,16 @@ class Request(Copyable, http.Request, components.Componentized):
             http.Request.write(self, data)
 
 
+    def _writeFile(self, fileObject, offset, count):
+        """
+        Override C{http.Request._writeFile} to not write the file directly if
+        it has to be encoded, or if this is a HEAD request faked as a GET.
+        """
+        if self._encoder or self._inFakeHead:
+            return None
+        return http.Request._writeFile(self, fileObject, offset, count)
+
+
     def finish(self):
         """
         Override C{http.Request.finish} for possible encoding.
@@ -610,10 +676,15 @@ class Site(http.HTTPFactory):
         rendered pages. Default to C{True}.
     @ivar sessionFactory: factory for sessions objects. Default to L{Session}.
     @ivar sessionCheckTime: Deprecated.  See L{Session.sessionTimeout} instead.
+    @ivar streamRequestBodies: if set, the resource for each request is found
+        as soon as the head of the request has been received, and resources
+        which provide L{resource.IStreamingResource} are given the body as it
+        arrives.  Default to C{False}.
     """
     counter = 0
     requestFactory = Request
     displayTracebacks = True
+    streamRequestBodies = False
     sessionFactory = Session
     sessionCheckTime = 1800
 
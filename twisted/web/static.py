@@ -684,6 +684,39 @@ class StaticProducer(object):
         raise NotImplementedError(self.start)
 
 
+    def _writeFile(self, offset, size=None):
+        """
+        Have the request write part of the file directly from its file
+        descriptor (with C{sendfile}), if it can.
+
+        @param offset: The offset of the first byte to write.
+        @param size: The number of bytes to write, or C{None} to write up to
+            the end of the file.
+
+        @return: C{True} if the request is writing the file, in which case it
+            is finished once that is done.  C{False} if it cannot, in which
+            case the data must be produced by reading the file.
+        """
+        writeFile = getattr(self.request, '_writeFile', None)
+        if writeFile is None:
+            return False
+        if size is None:
+            size = os.fstat(self.fileObject.fileno()).st_size - offset
+        d = writeFile(self.fileObject, offset, size)
+        if d is None:
+            return False
+        d.addCallbacks(self._fileWritten, lambda reason: self.stopProducing())
+        return True
+
+
+    def _fileWritten(self, ignored):
+        """
+        The file has been written by the request; finish it.
+        """
+        self.request.finish()
+        self.stopProducing()
+
+
     def resumeProducing(self):
         raise NotImplementedError(self.resumeProducing)
 
@@ -707,6 +740,8 @@ class NoRangeStaticProducer(StaticProducer):
     """
 
     def start(self):
+        if self._writeFile(0):
+            return
         self.request.registerProducer(self, False)
 
 
@@ -745,6 +780,8 @@ class SingleRangeStaticProducer(StaticProducer):
 
 
     def start(self):
+        if self._writeFile(self.offset, self.size):
+            return
         self.fileObject.seek(self.offset)
         self.bytesWritten = 0
         self.request.registerProducer(self, 0)
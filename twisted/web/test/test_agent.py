@@ -277,6 +277,17 @@ class FileBodyProducerTests(TestCase):
         self.assertEqual(expectedResult[:readSize * 2], output.getvalue())
 
 
+    def test_priority(self):
+        """
+        If L{FileBodyProducer} is given a priority, the L{CooperativeTask}
+        which reads the input file has that priority.
+        """
+        producer = FileBodyProducer(
+            StringIO("hello, world"), self.cooperator, priority=3)
+        producer.startProducing(FileConsumer(StringIO()))
+        self.assertEqual(3, producer._task.priority)
+
+
 
 class FakeReactorAndConnectMixin:
     """
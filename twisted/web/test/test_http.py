@@ -14,6 +14,8 @@ except ImportError:
     from urllib.parse import (
         ParseResultBytes, urlparse, urlunsplit, clear_cache)
 
+from zope.interface import implementer
+
 from twisted.python.compat import _PY3, iterbytes, networkString, unicode, intToBytes
 from twisted.python.failure import Failure
 from twisted.trial import unittest
@@ -22,6 +24,8 @@ from twisted.web import http, http_headers
 from twisted.web.http import PotentialDataLoss, _DataLoss
 from twisted.web.http import _IdentityTransferDecoder
 from twisted.internet.task import Clock
+from twisted.internet.defer import succeed
+from twisted.internet.interfaces import IFileTransport
 from twisted.internet.error import ConnectionLost
 from twisted.protocols import loopback
 from twisted.test.proto_helpers import StringTransport
@@ -1020,6 +1024,258 @@ Hello,
 
 
 
+class BulkParsingTestCase(ParsingTestCase):
+    """
+    Tests for protocol parsing in L{HTTPChannel} when the whole head of a
+    request arrives at once, and is parsed by L{HTTPChannel._headReceived}.
+    """
+    def runRequest(self, httpRequest, requestClass, success=1):
+        httpRequest = httpRequest.replace(b"\n", b"\r\n")
+        b = StringTransport()
+        a = http.HTTPChannel()
+        a.requestFactory = requestClass
+        a.makeConnection(b)
+        a.dataReceived(httpRequest)
+        a.connectionLost(IOError("all done"))
+        if success:
+            self.assertTrue(self.didRequest)
+        else:
+            self.assertFalse(self.didRequest)
+        return a
+
+
+    def test_resetTimeoutOncePerRequest(self):
+        """
+        The timeout of the channel is reset once for the head of each request,
+        rather than once for each of its lines.
+        """
+        resets = []
+        class Channel(http.HTTPChannel):
+            def resetTimeout(self):
+                resets.append(None)
+        processed = []
+        class MyRequest(http.Request):
+            def process(self):
+                processed.append(self)
+                self.finish()
+
+        channel = Channel()
+        channel.requestFactory = MyRequest
+        channel.makeConnection(StringTransport())
+        channel.dataReceived(
+            b"GET / HTTP/1.1\r\nFoo: bar\r\nBaz: quux\r\n\r\n"
+            b"GET / HTTP/1.1\r\nFoo: bar\r\nBaz: quux\r\n\r\n")
+        self.assertEqual(len(processed), 2)
+        self.assertEqual(len(resets), 2)
+
+
+    def test_continuationLine(self):
+        """
+        A header line which starts with a space or a tab continues the value
+        of the header before it.
+        """
+        processed = []
+        class MyRequest(http.Request):
+            def process(self):
+                processed.append(self)
+                self.finish()
+
+        self.runRequest(
+            b"GET / HTTP/1.0\nFoo: bar\n baz\n\tquux\nSpam: eggs\n\n",
+            MyRequest, 0)
+        [request] = processed
+        self.assertEqual(
+            request.requestHeaders.getRawHeaders(b"foo"),
+            [b"bar\n baz\n\tquux"])
+        self.assertEqual(
+            request.requestHeaders.getRawHeaders(b"spam"), [b"eggs"])
+
+
+    def test_malformedHeaders(self):
+        """
+        If a header line has no colon, or a continuation line comes before the
+        first header, a 400 (Bad Request) response is sent to the client and
+        the connection is closed.
+        """
+        for head in [b"GET / HTTP/1.0\nFoo bar\n\n",
+                     b"GET / HTTP/1.0\n foo: bar\n\n",
+                     b"GET /\nFoo: bar\n\n"]:
+            channel = self.runRequest(head, http.Request, 0)
+            self.assertEqual(
+                channel.transport.value(),
+                b"HTTP/1.1 400 Bad Request\r\n\r\n")
+            self.assertTrue(channel.transport.disconnecting)
+
+
+    def test_lineTooLong(self):
+        """
+        If a line of the head is longer than L{HTTPChannel.MAX_LENGTH}, the
+        connection is closed without a request being made.
+        """
+        processed = []
+        class MyRequest(http.Request):
+            def process(self):
+                processed.append(self)
+
+        self.patch(http.HTTPChannel, "MAX_LENGTH", 20)
+        channel = self.runRequest(
+            b"GET / HTTP/1.0\nFoo: " + b"x" * 20 + b"\n\n", MyRequest, 0)
+        self.assertEqual(processed, [])
+        self.assertEqual(channel.requests, [])
+        self.assertTrue(channel.transport.disconnecting)
+
+
+    def test_overriddenHeaderReceived(self):
+        """
+        If a subclass of L{HTTPChannel} overrides C{headerReceived}, it is
+        called for each header of the request.
+        """
+        headers = []
+        class Channel(http.HTTPChannel):
+            def headerReceived(self, line):
+                headers.append(line)
+                http.HTTPChannel.headerReceived(self, line)
+        processed = []
+        class MyRequest(http.Request):
+            def process(self):
+                processed.append(self)
+                self.finish()
+
+        channel = Channel()
+        channel.requestFactory = MyRequest
+        channel.makeConnection(StringTransport())
+        channel.dataReceived(b"GET / HTTP/1.1\r\nFoo: bar\r\n\r\n")
+        self.assertEqual(headers, [b"Foo: bar"])
+        [request] = processed
+        self.assertEqual(request.getHeader(b"foo"), b"bar")
+
+
+
+class PipeliningTests(unittest.TestCase):
+    """
+    Tests for the handling of pipelined requests by L{HTTPChannel}.
+    """
+    def setUp(self):
+        self.processed = []
+        processed = self.processed
+        class MyRequest(http.Request):
+            def process(self):
+                processed.append(self)
+
+        self.channel = http.HTTPChannel()
+        self.channel.requestFactory = MyRequest
+        self.transport = StringTransport()
+        self.channel.makeConnection(self.transport)
+
+
+    def test_processedWhenReceived(self):
+        """
+        Pipelined requests are processed as soon as they have been received,
+        and their responses are written in the order of the requests.
+        """
+        self.channel.dataReceived(
+            b"GET /a HTTP/1.1\r\n\r\n"
+            b"GET /b HTTP/1.1\r\n\r\n"
+            b"GET /c HTTP/1.1\r\n\r\n")
+        a, b, c = self.processed
+        for request in [c, b]:
+            request.write(request.path)
+            request.finish()
+        self.assertEqual(self.transport.value(), b"")
+        a.write(a.path)
+        a.finish()
+        response = self.transport.value()
+        self.assertTrue(
+            response.index(b"/a") < response.index(b"/b") <
+            response.index(b"/c"))
+        self.assertEqual(self.channel.requests, [])
+
+
+    def test_unlimited(self):
+        """
+        By default, L{HTTPChannel} reads however many requests are waiting for
+        their responses.
+        """
+        self.channel.dataReceived(b"GET / HTTP/1.1\r\n\r\n" * 10)
+        self.assertEqual(len(self.processed), 10)
+        self.assertEqual(self.transport.producerState, "producing")
+
+
+    def test_maxPipelinedRequests(self):
+        """
+        L{HTTPChannel} stops reading while C{maxPipelinedRequests} requests are
+        waiting for their responses, and processes the rest once the first
+        response is finished.
+        """
+        self.channel.maxPipelinedRequests = 2
+        self.channel.dataReceived(b"GET / HTTP/1.1\r\n\r\n" * 4)
+        self.assertEqual(len(self.processed), 2)
+        self.assertEqual(self.transport.producerState, "paused")
+
+        self.processed[0].finish()
+        self.assertEqual(len(self.processed), 3)
+        self.assertEqual(self.transport.producerState, "paused")
+
+        self.processed[1].finish()
+        self.processed[2].finish()
+        self.assertEqual(len(self.processed), 4)
+        self.processed[3].finish()
+        self.assertEqual(self.transport.producerState, "producing")
+        self.assertEqual(self.channel.requests, [])
+
+
+    def test_maxPipelinedResponseBytes(self):
+        """
+        L{HTTPChannel} stops reading while more than
+        C{maxPipelinedResponseBytes} of responses are buffered, and processes
+        the requests received meanwhile once they have been written.
+        """
+        self.channel.maxPipelinedRequests = 10
+        self.channel.maxPipelinedResponseBytes = 100
+        self.channel.dataReceived(b"GET / HTTP/1.1\r\n\r\n" * 2)
+        first, second = self.processed
+        second.write(b"x" * 200)
+        self.channel.dataReceived(b"GET / HTTP/1.1\r\n\r\n" * 2)
+        self.assertEqual(len(self.processed), 2)
+        self.assertEqual(self.transport.producerState, "paused")
+
+        first.finish()
+        self.assertEqual(len(self.processed), 4)
+        self.assertEqual(self.transport.producerState, "producing")
+
+
+    def test_maxPipelinedResponseBytesWritten(self):
+        """
+        L{HTTPChannel} stops reading as soon as a queued request writes more
+        than C{maxPipelinedResponseBytes} of its response, without waiting for
+        another request to arrive.
+        """
+        self.channel.maxPipelinedRequests = 10
+        self.channel.maxPipelinedResponseBytes = 100
+        self.channel.dataReceived(b"GET / HTTP/1.1\r\n\r\n" * 2)
+        first, second = self.processed
+        second.write(b"x")
+        self.assertEqual(self.transport.producerState, "producing")
+        second.write(b"x" * 100)
+        self.assertEqual(self.transport.producerState, "paused")
+
+        first.finish()
+        self.assertEqual(self.transport.producerState, "producing")
+
+
+    def test_notPersistent(self):
+        """
+        L{HTTPChannel} does not start reading again once the connection is
+        being closed.
+        """
+        self.channel.maxPipelinedRequests = 1
+        self.channel.dataReceived(b"GET / HTTP/1.0\r\n\r\n")
+        self.assertEqual(self.transport.producerState, "producing")
+        self.processed[0].finish()
+        self.assertTrue(self.transport.disconnecting)
+
+
+
 class QueryArgumentsTestCase(unittest.TestCase):
     def testParseqs(self):
         self.assertEqual(
@@ -1405,6 +1661,60 @@ class RequestTests(unittest.TestCase, ResponseTestMixin):
             "Twisted 12.3. Pass only bytes instead.")
 
 
+    def test_firstWriteSendsHeadWithBody(self):
+        """
+        L{http.Request.write} sends the head of the response together with
+        the first part of the body, in a single call to the transport's
+        C{writeSequence}.
+        """
+        req = http.Request(DummyChannel(), False)
+        trans = StringTransport()
+        writes = []
+        trans.write = writes.append
+        trans.writeSequence = lambda data: writes.append(b"".join(data))
+
+        req.transport = trans
+
+        req.setResponseCode(200)
+        req.clientproto = b"HTTP/1.1"
+        req.responseHeaders.setRawHeaders(b"content-length", [b"5"])
+        req.write(b'Hello')
+
+        self.assertEqual(len(writes), 1)
+        self.assertResponseEquals(
+            writes[0],
+            [(b"HTTP/1.1 200 OK",
+              b"Content-Length: 5",
+              b"Hello")])
+
+
+    def test_headerNames(self):
+        """
+        L{http.Request.write} sends header names in their canonical form,
+        whether or not they are among the names which are encoded in
+        advance.
+        """
+        req = http.Request(DummyChannel(), False)
+        trans = StringTransport()
+
+        req.transport = trans
+
+        req.setResponseCode(200)
+        req.clientproto = b"HTTP/1.0"
+        req.responseHeaders.setRawHeaders(b"content-type", [b"text/plain"])
+        req.responseHeaders.setRawHeaders(b"x-lemur-name", [b"Fluffy"])
+        req.responseHeaders.setRawHeaders(b"www-authenticate", [b"Basic"])
+        req.write(b'Hello')
+
+        self.assertResponseEquals(
+            trans.value(),
+            [(b"HTTP/1.0 200 OK",
+              b"Content-Type: text/plain",
+              b"X-Lemur-Name: Fluffy",
+              b"WWW-Authenticate: Basic",
+              b"Hello")])
+
+
     def test_firstWriteHTTP11Chunked(self):
         """
         For an HTTP 1.1 request, L{http.Request.write} sends an HTTP 1.1
@@ -1848,6 +2158,109 @@ class RequestTests(unittest.TestCase, ResponseTestMixin):
         self.assertEqual((None, existing), (req.producer, transport.producer))
 
 
+    def _fileChannel(self):
+        """
+        Make a L{DummyChannel} whose transport provides L{IFileTransport} and
+        records the files written to it.
+        """
+        @implementer(IFileTransport)
+        class FileTransport(DummyChannel.TCP):
+            def __init__(self):
+                DummyChannel.TCP.__init__(self)
+                self.files = []
+
+            def canWriteFile(self):
+                return True
+
+            def writeFile(self, fileObject, offset, count):
+                self.files.append((fileObject, offset, count))
+                return succeed(None)
+
+        channel = DummyChannel()
+        channel.transport = FileTransport()
+        return channel
+
+
+    def _file(self, size):
+        """
+        Return a file object open on a new file of C{size} bytes.
+        """
+        path = self.mktemp()
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        fileObject = open(path, "rb")
+        self.addCleanup(fileObject.close)
+        return fileObject
+
+
+    def test_writeFile(self):
+        """
+        L{http.Request._writeFile} writes the response headers, then has the
+        transport write the file, and counts the bytes written.
+        """
+        channel = self._fileChannel()
+        req = http.Request(channel, False)
+        req.setHeader(b"content-length", b"10")
+        fileObject = self._file(20)
+        written = []
+        req._writeFile(fileObject, 5, 10).addCallback(written.append)
+        self.assertEqual(written, [None])
+        self.assertEqual(channel.transport.files, [(fileObject, 5, 10)])
+        self.assertTrue(
+            channel.transport.written.getvalue().endswith(b"\r\n\r\n"))
+        self.assertEqual(req.sentLength, 10)
+
+
+    def test_writeFileShort(self):
+        """
+        L{http.Request._writeFile} counts only the bytes up to the end of the
+        file when fewer are left in it than were asked for.
+        """
+        channel = self._fileChannel()
+        req = http.Request(channel, False)
+        req.setHeader(b"content-length", b"10")
+        fileObject = self._file(8)
+        req._writeFile(fileObject, 5, 10)
+        self.assertEqual(channel.transport.files, [(fileObject, 5, 3)])
+        self.assertEqual(req.sentLength, 3)
+
+
+    def test_writeFileChunked(self):
+        """
+        L{http.Request._writeFile} returns C{None} if the response is chunked,
+        as the file can then not be written as it is.
+        """
+        channel = self._fileChannel()
+        req = http.Request(channel, False)
+        req.clientproto = b"HTTP/1.1"
+        self.assertIdentical(req._writeFile(b"file", 0, 10), None)
+        self.assertTrue(req.chunked)
+        self.assertEqual(channel.transport.files, [])
+
+
+    def test_writeFileHead(self):
+        """
+        L{http.Request._writeFile} writes only the response headers in
+        response to a I{HEAD} request.
+        """
+        channel = self._fileChannel()
+        req = http.Request(channel, False)
+        req.method = b"HEAD"
+        written = []
+        req._writeFile(b"file", 0, 10).addCallback(written.append)
+        self.assertEqual(written, [None])
+        self.assertEqual(channel.transport.files, [])
+
+
+    def test_writeFileUnsupported(self):
+        """
+        L{http.Request._writeFile} returns C{None} if the transport does not
+        provide L{IFileTransport}.
+        """
+        req = http.Request(DummyChannel(), False)
+        self.assertIdentical(req._writeFile(b"file", 0, 10), None)
+
+
 
 class MultilineHeadersTestCase(unittest.TestCase):
     """
@@ -0,0 +1,571 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.web._http2}, the HTTP/2 support of L{http.HTTPChannel}.
+"""
+
+from __future__ import division, absolute_import
+
+try:
+    from h2.config import H2Configuration
+    from h2.connection import H2Connection
+    from h2.events import (
+        DataReceived, ResponseReceived, StreamEnded, StreamReset)
+    from h2.settings import SettingCodes
+
+    from twisted.web import _http2
+except ImportError:
+    H2Connection = None
+
+from zope.interface import directlyProvides
+
+from twisted.internet.error import ConnectionDone, ConnectionLost
+from twisted.internet.interfaces import ISSLTransport
+from twisted.internet.task import Cooperator
+from twisted.python.compat import iterbytes
+from twisted.python.failure import Failure
+from twisted.test.proto_helpers import StringTransport
+from twisted.test.test_internet import DummyProducer
+from twisted.trial.unittest import TestCase
+from twisted.web import http, server
+from twisted.web.test.test_web import BodyCollector, StreamingResource
+
+
+
+class NegotiatingTransport(StringTransport):
+    """
+    A L{StringTransport} for a TLS connection on which ALPN agreed on some
+    application protocol.
+    """
+    def __init__(self, protocol):
+        StringTransport.__init__(self)
+        self.protocol = protocol
+
+
+    def getNegotiatedProtocol(self):
+        return self.protocol
+
+
+
+class HTTP2Tests(TestCase):
+    """
+    Tests for requests made over HTTP/2 to an L{http.HTTPChannel}, by a client
+    using the h2 library.
+    """
+    if H2Connection is None:
+        skip = "h2 is not installed."
+
+    def setUp(self):
+        self.processed = []
+        processed = self.processed
+        class Request(http.Request):
+            def process(self):
+                processed.append(self)
+
+        self.channel = http.HTTPChannel()
+        self.channel.requestFactory = Request
+        self.channel.cleartextHTTP2 = True
+        self.transport = StringTransport()
+        self.client = H2Connection(
+            config=H2Configuration(client_side=True, header_encoding=None))
+
+
+    def connect(self, transport=None):
+        """
+        Connect the channel, and send it the client's connection preface.
+        """
+        if transport is not None:
+            self.transport = transport
+        self.channel.makeConnection(self.transport)
+        self.client.initiate_connection()
+        self.send()
+
+
+    def send(self):
+        """
+        Deliver what the client has to send to the channel.
+        """
+        self.channel.dataReceived(self.client.data_to_send())
+
+
+    def receive(self):
+        """
+        Deliver what the channel has sent to the client.
+
+        @return: The events the client saw.
+        """
+        data = self.transport.value()
+        self.transport.clear()
+        return self.client.receive_data(data)
+
+
+    def request(self, method=b"GET", path=b"/", body=None, headers=()):
+        """
+        Make a request from the client.
+
+        @return: The ID of the stream of the request.
+        """
+        streamID = self.client.get_next_available_stream_id()
+        self.client.send_headers(
+            streamID,
+            [(b":method", method), (b":path", path),
+             (b":authority", b"example.com"), (b":scheme", b"https")] +
+            list(headers),
+            end_stream=body is None)
+        if body is not None:
+            self.client.send_data(streamID, body, end_stream=True)
+        self.send()
+        return streamID
+
+
+    def response(self, events, streamID):
+        """
+        Gather the response on a stream from the events the client saw.
+
+        @return: A 3-C{tuple} of the headers, the body and whether the stream
+            ended.
+        """
+        headers = None
+        body = []
+        ended = False
+        for event in events:
+            if getattr(event, "stream_id", None) != streamID:
+                continue
+            if isinstance(event, ResponseReceived):
+                headers = dict(event.headers)
+            elif isinstance(event, DataReceived):
+                body.append(event.data)
+                self.client.acknowledge_received_data(
+                    event.flow_controlled_length, streamID)
+            elif isinstance(event, StreamEnded):
+                ended = True
+        return headers, b"".join(body), ended
+
+
+    def test_priorKnowledge(self):
+        """
+        A client which starts the connection with the HTTP/2 connection
+        preface has its requests delivered to the channel's
+        C{requestFactory}, and gets their responses as HTTP/2 streams.
+        """
+        self.connect()
+        streamID = self.request(
+            path=b"/foo?bar=baz", headers=[(b"x-foo", b"quux")])
+        [request] = self.processed
+        self.assertEqual(request.method, b"GET")
+        self.assertEqual(request.path, b"/foo")
+        self.assertEqual(request.args, {b"bar": [b"baz"]})
+        self.assertEqual(request.clientproto, b"HTTP/2")
+        self.assertEqual(request.getHeader(b"host"), b"example.com")
+        self.assertEqual(request.getHeader(b"x-foo"), b"quux")
+
+        request.setHeader(b"content-type", b"text/plain")
+        request.write(b"hello, ")
+        request.write(b"world")
+        request.finish()
+        headers, body, ended = self.response(self.receive(), streamID)
+        self.assertEqual(headers[b":status"], b"200")
+        self.assertEqual(headers[b"content-type"], b"text/plain")
+        self.assertNotIn(b"transfer-encoding", headers)
+        self.assertEqual(body, b"hello, world")
+        self.assertTrue(ended)
+
+
+    def test_prefaceInPieces(self):
+        """
+        The connection preface is recognized if it arrives a byte at a time.
+        """
+        self.channel.makeConnection(self.transport)
+        self.client.initiate_connection()
+        for byte in iterbytes(self.client.data_to_send()):
+            self.channel.dataReceived(byte)
+        self.request()
+        self.assertEqual(len(self.processed), 1)
+
+
+    def test_priorKnowledgeDisabled(self):
+        """
+        Unless C{cleartextHTTP2} is set, a connection which starts with the
+        HTTP/2 connection preface is not handed over to HTTP/2.
+        """
+        self.channel.cleartextHTTP2 = False
+        self.connect()
+        self.assertIdentical(self.channel._h2, None)
+
+
+    def test_factory(self):
+        """
+        L{http.HTTPFactory} sets C{cleartextHTTP2} on the channels it builds,
+        and does not set it by default.
+        """
+        factory = http.HTTPFactory()
+        self.assertFalse(factory.buildProtocol(None).cleartextHTTP2)
+        factory.cleartextHTTP2 = True
+        self.assertTrue(factory.buildProtocol(None).cleartextHTTP2)
+
+
+    def test_negotiated(self):
+        """
+        A TLS connection on which ALPN agreed on C{h2} is handed over to
+        HTTP/2 as soon as anything is received.
+        """
+        self.connect(NegotiatingTransport(b"h2"))
+        self.assertNotIdentical(self.channel._h2, None)
+        self.request()
+        self.assertEqual(len(self.processed), 1)
+
+
+    def test_http11(self):
+        """
+        An HTTP/1.1 request on a connection which negotiated C{http/1.1} is
+        handled as before.
+        """
+        self.channel.makeConnection(NegotiatingTransport(b"http/1.1"))
+        self.channel.dataReceived(b"GET / HTTP/1.1\r\n\r\n")
+        self.assertIdentical(self.channel._h2, None)
+        [request] = self.processed
+        self.assertEqual(request.clientproto, b"HTTP/1.1")
+
+
+    def test_concurrentStreams(self):
+        """
+        Requests on several streams are processed at once, and each response
+        is sent as soon as it is written, whatever the order.
+        """
+        self.connect()
+        first = self.request(path=b"/first")
+        second = self.request(path=b"/second")
+        firstRequest, secondRequest = self.processed
+
+        secondRequest.write(b"second")
+        secondRequest.finish()
+        events = self.receive()
+        self.assertEqual(self.response(events, first), (None, b"", False))
+        headers, body, ended = self.response(events, second)
+        self.assertEqual((body, ended), (b"second", True))
+
+        firstRequest.write(b"first")
+        firstRequest.finish()
+        headers, body, ended = self.response(self.receive(), first)
+        self.assertEqual((body, ended), (b"first", True))
+
+
+    def test_requestBody(self):
+        """
+        The body of a request is made available as its C{content}.
+        """
+        self.connect()
+        self.request(
+            method=b"POST", body=b"a=b&c=d",
+            headers=[(b"content-type", b"application/x-www-form-urlencoded"),
+                     (b"content-length", b"7")])
+        [request] = self.processed
+        self.assertEqual(request.content.read(), b"a=b&c=d")
+        self.assertEqual(request.args, {b"a": [b"b"], b"c": [b"d"]})
+
+
+    def test_streamedBody(self):
+        """
+        The body of a request which is streamed to a resource is not
+        acknowledged while the resource has stopped it being read, so that
+        flow control stops the client sending more, until the resource wants
+        more.
+        """
+        resrc = StreamingResource()
+        site = server.Site(resrc, timeout=None)
+        site.streamRequestBodies = True
+        site.cleartextHTTP2 = True
+        self.channel = site.buildProtocol(None)
+        self.connect()
+        streamID = self.client.get_next_available_stream_id()
+        self.client.send_headers(
+            streamID,
+            [(b":method", b"POST"), (b":path", b"/"),
+             (b":authority", b"example.com"), (b":scheme", b"https")])
+        self.send()
+        [request] = resrc.requests
+        collector = BodyCollector()
+        request.deliverBody(collector)
+        collector.transport.pauseProducing()
+
+        # Enough of the body that h2 would let the client send more at once,
+        # in frames small enough for the default settings.
+        window = self.client.local_flow_control_window(streamID)
+        chunks = [b"x" * 16000] * 3
+        for chunk in chunks:
+            self.client.send_data(streamID, chunk)
+        self.send()
+        self.receive()
+        self.assertEqual(b"".join(collector.chunks), b"".join(chunks))
+        self.assertEqual(
+            self.client.local_flow_control_window(streamID), window - 48000)
+
+        collector.transport.resumeProducing()
+        self.receive()
+        self.assertEqual(
+            self.client.local_flow_control_window(streamID), window)
+
+        self.client.send_data(streamID, b"y", end_stream=True)
+        self.send()
+        self.assertEqual(b"".join(collector.chunks), b"".join(chunks) + b"y")
+        collector.reason.trap(http.RequestBodyDone)
+
+
+    def test_cookies(self):
+        """
+        Cookies sent in several I{cookie} headers, as HTTP/2 allows, are all
+        parsed.
+        """
+        self.connect()
+        self.request(headers=[(b"cookie", b"a=b"), (b"cookie", b"c=d")])
+        [request] = self.processed
+        self.assertEqual(request.getCookie(b"a"), b"b")
+        self.assertEqual(request.getCookie(b"c"), b"d")
+
+
+    def test_headRequest(self):
+        """
+        The response to a I{HEAD} request has no body.
+        """
+        self.connect()
+        streamID = self.request(method=b"HEAD")
+        [request] = self.processed
+        request.setHeader(b"content-length", b"5")
+        request.write(b"hello")
+        request.finish()
+        headers, body, ended = self.response(self.receive(), streamID)
+        self.assertEqual(headers[b"content-length"], b"5")
+        self.assertEqual((body, ended), (b"", True))
+
+
+    def test_flowControl(self):
+        """
+        A response is only sent as fast as the client's flow control window
+        allows, and the request's producer is paused while it waits.
+        """
+        self.channel.makeConnection(self.transport)
+        self.client.initiate_connection()
+        self.client.update_settings({SettingCodes.INITIAL_WINDOW_SIZE: 5})
+        self.send()
+        streamID = self.request()
+        [request] = self.processed
+        producer = DummyProducer()
+        request.registerProducer(producer, True)
+
+        request.write(b"0123456789")
+        headers, body, ended = self.response(self.receive(), streamID)
+        self.assertEqual(body, b"01234")
+        self.assertEqual(producer.events, ["pause"])
+
+        self.client.increment_flow_control_window(5, stream_id=streamID)
+        self.send()
+        headers, body, ended = self.response(self.receive(), streamID)
+        self.assertEqual(body, b"56789")
+        self.assertEqual(producer.events, ["pause", "resume"])
+
+        request.unregisterProducer()
+        request.finish()
+        headers, body, ended = self.response(self.receive(), streamID)
+        self.assertTrue(ended)
+
+
+    def test_pullProducer(self):
+        """
+        A response from a pull producer larger than the client's flow control
+        window is sent in full, the producer being asked for more only while
+        the window allows.
+        """
+        scheduled = []
+        cooperator = Cooperator(lambda: lambda: True, scheduled.append)
+        self.patch(_http2, "cooperate", cooperator.cooperate)
+        self.connect()
+        streamID = self.request()
+        [request] = self.processed
+
+        chunks = [b"x" * 10000] * 20
+        class Producer(object):
+            def resumeProducing(self):
+                if chunks:
+                    request.write(chunks.pop())
+                else:
+                    request.unregisterProducer()
+                    request.finish()
+
+            def stopProducing(self):
+                pass
+
+        request.registerProducer(Producer(), False)
+        body = []
+        for i in range(10):
+            # Run the producer until flow control stops it, then let the
+            # client acknowledge what it has been sent.
+            while scheduled:
+                scheduled.pop(0)()
+            headers, data, ended = self.response(self.receive(), streamID)
+            body.append(data)
+            self.send()
+            if ended:
+                break
+        self.assertTrue(ended)
+        self.assertEqual(b"".join(body), b"x" * 200000)
+
+
+    def test_transportPaused(self):
+        """
+        While the transport has paused the connection, no data is sent and
+        the producers of the responses are paused.
+        """
+        self.connect()
+        streamID = self.request()
+        [request] = self.processed
+        producer = DummyProducer()
+        request.registerProducer(producer, True)
+        self.channel._h2.pauseProducing()
+        self.assertEqual(producer.events, ["pause"])
+
+        request.write(b"hello")
+        headers, body, ended = self.response(self.receive(), streamID)
+        self.assertEqual(body, b"")
+
+        self.channel._h2.resumeProducing()
+        headers, body, ended = self.response(self.receive(), streamID)
+        self.assertEqual(body, b"hello")
+        self.assertEqual(producer.events, ["pause", "resume"])
+
+
+    def test_streamReset(self):
+        """
+        If the client resets a stream, its request is told the connection was
+        lost, and its producer is stopped.
+        """
+        self.connect()
+        streamID = self.request()
+        [request] = self.processed
+        stream = request.channel
+        producer = DummyProducer()
+        request.registerProducer(producer, True)
+        finished = request.notifyFinish()
+
+        self.client.reset_stream(streamID)
+        self.send()
+        self.assertEqual(producer.events, ["stop"])
+        self.assertIdentical(stream.producer, None)
+        return self.assertFailure(finished, ConnectionLost)
+
+
+    def test_loseConnection(self):
+        """
+        A request which closes its transport resets its own stream, rather
+        than closing the connection.
+        """
+        self.connect()
+        streamID = self.request()
+        [request] = self.processed
+        request.transport.loseConnection()
+        events = self.receive()
+        self.assertEqual(
+            [event.stream_id for event in events
+             if isinstance(event, StreamReset)],
+            [streamID])
+        self.assertFalse(self.transport.disconnecting)
+
+
+    def test_connectionLost(self):
+        """
+        When the connection is lost, the requests still waiting for their
+        responses are told.
+        """
+        self.connect()
+        self.request()
+        [request] = self.processed
+        finished = request.notifyFinish()
+        self.channel.connectionLost(Failure(ConnectionDone()))
+        return self.assertFailure(finished, ConnectionDone)
+
+
+    def test_protocolError(self):
+        """
+        If the client breaks the protocol, the connection is closed.
+        """
+        self.connect()
+        self.channel.dataReceived(b"\x00" * 100)
+        self.assertTrue(self.transport.disconnecting)
+
+
+    def test_upgrade(self):
+        """
+        An HTTP/1.1 request asking to upgrade to C{h2c} gets a 101 response,
+        and is answered as stream 1 of an HTTP/2 connection which the client
+        can go on making requests over.
+        """
+        self.channel.makeConnection(self.transport)
+        settings = self.client.initiate_upgrade_connection()
+        self.channel.dataReceived(
+            b"GET /upgraded HTTP/1.1\r\n"
+            b"Host: example.com\r\n"
+            b"Connection: Upgrade, HTTP2-Settings\r\n"
+            b"Upgrade: h2c\r\n"
+            b"HTTP2-Settings: " + settings + b"\r\n"
+            b"\r\n" + self.client.data_to_send())
+        switching = (b"HTTP/1.1 101 Switching Protocols\r\n"
+                     b"Connection: Upgrade\r\n"
+                     b"Upgrade: h2c\r\n"
+                     b"\r\n")
+        sent = self.transport.value()
+        self.assertEqual(sent[:len(switching)], switching)
+        self.transport.clear()
+        self.client.receive_data(sent[len(switching):])
+
+        [request] = self.processed
+        self.assertEqual(request.path, b"/upgraded")
+        self.assertEqual(request.clientproto, b"HTTP/2")
+        self.assertEqual(request.getHeader(b"host"), b"example.com")
+        self.assertEqual(request.requestHeaders.getRawHeaders(b"upgrade"),
+                         None)
+        self.assertEqual(self.channel.requests, [])
+
+        request.write(b"upgraded")
+        request.finish()
+        headers, body, ended = self.response(self.receive(), 1)
+        self.assertEqual((body, ended), (b"upgraded", True))
+
+        self.request(path=b"/next")
+        self.assertEqual(self.processed[1].path, b"/next")
+
+
+    def test_upgradeDisabled(self):
+        """
+        Unless C{cleartextHTTP2} is set, a request asking to upgrade to C{h2c}
+        is answered over HTTP/1.1.
+        """
+        self.channel.cleartextHTTP2 = False
+        self.channel.makeConnection(self.transport)
+        self.channel.dataReceived(
+            b"GET / HTTP/1.1\r\n"
+            b"Connection: Upgrade, HTTP2-Settings\r\n"
+            b"Upgrade: h2c\r\n"
+            b"HTTP2-Settings: AAMAAABkAAQAAP__\r\n"
+            b"\r\n")
+        self.assertIdentical(self.channel._h2, None)
+        [request] = self.processed
+        self.assertEqual(request.clientproto, b"HTTP/1.1")
+
+
+    def test_upgradeOverTLS(self):
+        """
+        A request asking to upgrade to C{h2c} over a TLS connection is answered
+        over HTTP/1.1, since C{h2c} is only for cleartext connections.
+        """
+        transport = StringTransport()
+        directlyProvides(transport, ISSLTransport)
+        self.channel.makeConnection(transport)
+        self.channel.dataReceived(
+            b"GET / HTTP/1.1\r\n"
+            b"Connection: Upgrade, HTTP2-Settings\r\n"
+            b"Upgrade: h2c\r\n"
+            b"HTTP2-Settings: AAMAAABkAAQAAP__\r\n"
+            b"\r\n")
+        self.assertIdentical(self.channel._h2, None)
+        [request] = self.processed
+        self.assertEqual(request.clientproto, b"HTTP/1.1")
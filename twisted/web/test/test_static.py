@@ -13,6 +13,7 @@ import StringIO
 from zope.interface.verify import verifyObject
 
 from twisted.internet import abstract, interfaces
+from twisted.internet.defer import Deferred
 from twisted.python.runtime import platform
 from twisted.python.filepath import FilePath
 from twisted.python import log
@@ -605,6 +606,27 @@ class StaticMakeProducerTests(TestCase):
 
 
 
+class FileWritingRequest(DummyRequest):
+    """
+    A L{DummyRequest} which can write files directly, like a
+    L{twisted.web.server.Request} whose transport supports
+    L{interfaces.IFileTransport}.
+
+    @ivar fileWrites: A C{list} of C{(fileObject, offset, count, Deferred)}
+        tuples, one for each call to C{_writeFile}.
+    """
+    def __init__(self, postpath):
+        DummyRequest.__init__(self, postpath)
+        self.fileWrites = []
+
+
+    def _writeFile(self, fileObject, offset, count):
+        d = Deferred()
+        self.fileWrites.append((fileObject, offset, count, d))
+        return d
+
+
+
 class StaticProducerTests(TestCase):
     """
     Tests for the abstract L{StaticProducer}.
@@ -702,6 +724,41 @@ class NoRangeStaticProducerTests(TestCase):
         self.assertEqual([None], callbackList)
 
 
+    def test_writeFile(self):
+        """
+        If the request can write the file directly, L{NoRangeStaticProducer}
+        has it write the whole file, and finishes the request once that is
+        done, without producing any data itself.
+        """
+        path = FilePath(self.mktemp())
+        path.setContent(b'abcdef')
+        fileObject = path.open()
+        request = FileWritingRequest([])
+        producer = static.NoRangeStaticProducer(request, fileObject)
+        producer.start()
+        self.assertEqual(
+            [(fileObject, 0, 6)], [w[:3] for w in request.fileWrites])
+        self.assertEqual((request.finished, request.written), (0, []))
+        request.fileWrites[0][3].callback(None)
+        self.assertEqual(request.finished, 1)
+        self.assertTrue(fileObject.closed)
+
+
+    def test_writeFileUnsupported(self):
+        """
+        If the request's C{_writeFile} returns C{None},
+        L{NoRangeStaticProducer} produces the content itself.
+        """
+        path = FilePath(self.mktemp())
+        path.setContent(b'abcdef')
+        request = DummyRequest([])
+        request._writeFile = lambda fileObject, offset, count: None
+        producer = static.NoRangeStaticProducer(request, path.open())
+        producer.start()
+        self.assertEqual('abcdef', ''.join(request.written))
+        self.assertEqual(request.finished, 1)
+
+
 
 class SingleRangeStaticProducerTests(TestCase):
     """
@@ -771,6 +828,37 @@ class SingleRangeStaticProducerTests(TestCase):
         self.assertEqual([None], callbackList)
 
 
+    def test_writeFile(self):
+        """
+        If the request can write the file directly,
+        L{SingleRangeStaticProducer} has it write the requested range, and
+        finishes the request once that is done.
+        """
+        fileObject = StringIO.StringIO('abcdef')
+        request = FileWritingRequest([])
+        producer = static.SingleRangeStaticProducer(request, fileObject, 1, 3)
+        producer.start()
+        self.assertEqual(
+            [(fileObject, 1, 3)], [w[:3] for w in request.fileWrites])
+        request.fileWrites[0][3].callback(None)
+        self.assertEqual(request.finished, 1)
+        self.assertEqual(request.written, [])
+
+
+    def test_writeFileFailed(self):
+        """
+        If the request fails to write the file, L{SingleRangeStaticProducer}
+        closes the file without finishing the request.
+        """
+        fileObject = StringIO.StringIO('abcdef')
+        request = FileWritingRequest([])
+        producer = static.SingleRangeStaticProducer(request, fileObject, 1, 3)
+        producer.start()
+        request.fileWrites[0][3].errback(RuntimeError("connection lost"))
+        self.assertEqual(request.finished, 0)
+        self.assertTrue(fileObject.closed)
+
+
 
 class MultipleRangeStaticProducerTests(TestCase):
     """
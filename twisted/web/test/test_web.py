@@ -17,8 +17,12 @@ from twisted.internet import reactor
 from twisted.internet.address import IPv4Address
 from twisted.web import server, resource
 from twisted.internet import task
+from twisted.internet.error import ConnectionLost
+from twisted.internet.protocol import Protocol
 from twisted.web import iweb, http, error
 from twisted.python import log
+from twisted.python.failure import Failure
+from twisted.test.proto_helpers import StringTransport
 
 from twisted.web.test.requesthelper import DummyChannel, DummyRequest
 
@@ -467,6 +471,57 @@ class RequestTests(unittest.TestCase):
         self.assertEqual(request.prePathURL(), b'http://example.com/foo%2Fbar')
 
 
+    def test_cachedDate(self):
+        """
+        L{Request.process} sets the C{Date} header of the response to the
+        value cached by the site.
+        """
+        d = DummyChannel()
+        d.site = server.Site(resource.Resource())
+        d.site._date = b"Sun, 06 Nov 1994 08:49:37 GMT"
+        request = server.Request(d, 1)
+        request.gotLength(0)
+        request.requestReceived(b'GET', b'/', b'HTTP/1.0')
+        self.assertEqual(request.responseHeaders.getRawHeaders(b'date'),
+                         [b"Sun, 06 Nov 1994 08:49:37 GMT"])
+
+
+    def test_uncachedDate(self):
+        """
+        If the site has not been started, so no C{Date} value is cached,
+        L{Request.process} sets the C{Date} header of the response to the
+        current time.
+        """
+        d = DummyChannel()
+        d.site = server.Site(resource.Resource())
+        request = server.Request(d, 1)
+        request.gotLength(0)
+        request.requestReceived(b'GET', b'/', b'HTTP/1.0')
+        [date] = request.responseHeaders.getRawHeaders(b'date')
+        self.assertEqual(http.stringToDatetime(date) // 10,
+                         http.stringToDatetime(http.datetimeToString()) // 10)
+
+
+    def test_dateCustomSite(self):
+        """
+        If the channel's site is not a L{server.Site} and caches no C{Date}
+        value, L{Request.process} sets the C{Date} header of the response to
+        the current time.
+        """
+        class CustomSite(object):
+            def getResourceFor(self, request):
+                return SimpleResource()
+
+        d = DummyChannel()
+        d.site = CustomSite()
+        request = server.Request(d, 1)
+        request.gotLength(0)
+        request.requestReceived(b'GET', b'/', b'HTTP/1.0')
+        [date] = request.responseHeaders.getRawHeaders(b'date')
+        self.assertEqual(http.stringToDatetime(date) // 10,
+                         http.stringToDatetime(http.datetimeToString()) // 10)
+
+
 
 class GzipEncoderTests(unittest.TestCase):
 
@@ -903,6 +958,330 @@ class TestLogEscaping(unittest.TestCase):
 
 
 
+class BodyCollector(Protocol):
+    """
+    A protocol which collects a request body delivered to it.
+
+    @ivar chunks: The parts of the body delivered so far.
+
+    @ivar reason: Why the body ended, once it has.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.reason = None
+
+
+    def dataReceived(self, data):
+        self.chunks.append(data)
+
+
+    def connectionLost(self, reason):
+        self.reason = reason
+
+
+
+@implementer(resource.IStreamingResource)
+class StreamingResource(resource.Resource):
+    """
+    A resource which takes request bodies as they arrive, and leaves the
+    requests for the tests to respond to.
+
+    @ivar requests: The requests rendered.
+    """
+    isLeaf = True
+
+    def __init__(self):
+        resource.Resource.__init__(self)
+        self.requests = []
+
+
+    def render_POST(self, request):
+        self.requests.append(request)
+        return server.NOT_DONE_YET
+
+
+
+class EchoResource(resource.Resource):
+    """
+    A resource which responds with the request body.
+    """
+    isLeaf = True
+
+    def render_POST(self, request):
+        return request.content.read()
+
+
+
+class StreamingRequestBodyTests(unittest.TestCase):
+    """
+    Tests for resources which provide L{resource.IStreamingResource}, served
+    by a L{server.Site} with C{streamRequestBodies} set.
+    """
+    head = (b"POST / HTTP/1.1\r\n"
+            b"Content-Length: 10\r\n"
+            b"\r\n")
+
+    def connect(self, resrc, stream=True):
+        """
+        Connect a channel of a site for a resource to a transport.
+
+        @return: The channel and the transport.
+        """
+        site = server.Site(resrc, timeout=None)
+        site.streamRequestBodies = stream
+        channel = site.buildProtocol(None)
+        transport = StringTransport()
+        channel.makeConnection(transport)
+        return channel, transport
+
+
+    def test_customSite(self):
+        """
+        A channel whose site is not a L{server.Site}, and so has no
+        C{streamRequestBodies} attribute, renders requests once their bodies
+        have been received.
+        """
+        resrc = EchoResource()
+        class CustomSite(object):
+            def getResourceFor(self, request):
+                return resrc
+
+        channel = http.HTTPChannel()
+        channel.requestFactory = server.Request
+        channel.site = CustomSite()
+        transport = StringTransport()
+        channel.makeConnection(transport)
+        channel.dataReceived(self.head + b"helloworld")
+        self.assertTrue(transport.value().startswith(b"HTTP/1.1 200 OK\r\n"))
+        self.assertTrue(transport.value().endswith(b"\r\n\r\nhelloworld"))
+
+
+    def test_renderedBeforeBody(self):
+        """
+        A streaming resource is rendered once the head of a request has been
+        received, with the content of the request empty, and the channel
+        stops reading until the body is asked for.
+        """
+        resrc = StreamingResource()
+        channel, transport = self.connect(resrc)
+        channel.dataReceived(self.head)
+        [request] = resrc.requests
+        self.assertEqual(request.content.read(), b"")
+        self.assertEqual(transport.producerState, "paused")
+
+
+    def test_deliverBody(self):
+        """
+        L{http.Request.deliverBody} delivers the body to a protocol as it
+        arrives, including any which arrived before it was called, and then
+        tells the protocol that all of it has been received.
+        """
+        resrc = StreamingResource()
+        channel, transport = self.connect(resrc)
+        channel.dataReceived(self.head + b"hello")
+        [request] = resrc.requests
+        collector = BodyCollector()
+        request.deliverBody(collector)
+        self.assertEqual(transport.producerState, "producing")
+        self.assertEqual(collector.chunks, [b"hello"])
+        self.assertIdentical(collector.reason, None)
+        channel.dataReceived(b"world")
+        self.assertEqual(collector.chunks, [b"hello", b"world"])
+        collector.reason.trap(http.RequestBodyDone)
+
+
+    def test_backpressure(self):
+        """
+        The protocol given to L{http.Request.deliverBody} can stop and start
+        the channel reading from the client.
+        """
+        resrc = StreamingResource()
+        channel, transport = self.connect(resrc)
+        channel.dataReceived(self.head)
+        collector = BodyCollector()
+        resrc.requests[0].deliverBody(collector)
+        collector.transport.pauseProducing()
+        self.assertEqual(transport.producerState, "paused")
+        collector.transport.resumeProducing()
+        self.assertEqual(transport.producerState, "producing")
+
+
+    def test_resumedOnceReceived(self):
+        """
+        Once all of the body has been received, the channel reads from the
+        client again even if the protocol given to
+        L{http.Request.deliverBody} had stopped it.
+        """
+        resrc = StreamingResource()
+        channel, transport = self.connect(resrc)
+        channel.dataReceived(self.head)
+        collector = BodyCollector()
+        collector.dataReceived = lambda data: (
+            collector.transport.pauseProducing())
+        resrc.requests[0].deliverBody(collector)
+        channel.dataReceived(b"helloworld")
+        collector.reason.trap(http.RequestBodyDone)
+        self.assertEqual(transport.producerState, "producing")
+
+
+    def test_respond(self):
+        """
+        The response to a streamed request is sent once it is finished, and
+        the next request on the connection is then served.
+        """
+        resrc = StreamingResource()
+        channel, transport = self.connect(resrc)
+        channel.dataReceived(self.head)
+        request = resrc.requests[0]
+        request.deliverBody(BodyCollector())
+        channel.dataReceived(b"helloworld" + self.head + b"helloworld")
+        request.setHeader(b"content-length", b"2")
+        request.write(b"ok")
+        request.finish()
+        self.assertTrue(transport.value().startswith(b"HTTP/1.1 200 OK\r\n"))
+        self.assertTrue(transport.value().endswith(b"\r\n\r\nok"))
+        self.assertEqual(len(resrc.requests), 2)
+
+
+    def test_finishedWhenBodyEnds(self):
+        """
+        The response can be finished by the protocol given to
+        L{http.Request.deliverBody} when it is told that all of the body has
+        been received, and the next request on the connection is then served.
+        """
+        resrc = StreamingResource()
+        channel, transport = self.connect(resrc)
+        channel.dataReceived(self.head)
+        request = resrc.requests[0]
+        collector = BodyCollector()
+        def connectionLost(reason):
+            request.setHeader(b"content-length", b"2")
+            request.write(b"ok")
+            request.finish()
+        collector.connectionLost = connectionLost
+        request.deliverBody(collector)
+        channel.dataReceived(b"helloworld" + self.head)
+        self.assertTrue(transport.value().startswith(b"HTTP/1.1 200 OK\r\n"))
+        self.assertTrue(transport.value().endswith(b"\r\n\r\nok"))
+        self.assertEqual(len(resrc.requests), 2)
+        self.assertEqual(channel.requests, [resrc.requests[1]])
+
+
+    def test_finishedBeforeBody(self):
+        """
+        If the response is finished before all of the body has been received,
+        and the body was not asked for, the rest of it is read and discarded
+        before the next request is served.
+        """
+        resrc = StreamingResource()
+        channel, transport = self.connect(resrc)
+        channel.dataReceived(self.head)
+        request = resrc.requests[0]
+        request.setResponseCode(http.REQUEST_ENTITY_TOO_LARGE)
+        request.setHeader(b"content-length", b"0")
+        request.finish()
+        self.assertEqual(channel.requests, [request])
+        channel.dataReceived(b"helloworld" + self.head)
+        self.assertTrue(
+            transport.value().startswith(b"HTTP/1.1 413 Request Entity"))
+        self.assertEqual(len(resrc.requests), 2)
+        self.assertEqual(channel.requests, [resrc.requests[1]])
+
+
+    def test_connectionLost(self):
+        """
+        If the connection is lost before all of the body has been received,
+        the protocol given to L{http.Request.deliverBody} is told why.
+        """
+        resrc = StreamingResource()
+        channel, transport = self.connect(resrc)
+        channel.dataReceived(self.head + b"hello")
+        collector = BodyCollector()
+        resrc.requests[0].deliverBody(collector)
+        channel.connectionLost(Failure(ConnectionLost()))
+        collector.reason.trap(ConnectionLost)
+
+
+    def test_otherResources(self):
+        """
+        A resource which does not provide L{resource.IStreamingResource} is
+        rendered once all of the body has been received, as usual.
+        """
+        channel, transport = self.connect(EchoResource())
+        channel.dataReceived(self.head + b"hello")
+        self.assertEqual(transport.value(), b"")
+        channel.dataReceived(b"world")
+        self.assertTrue(transport.value().endswith(b"\r\n\r\nhelloworld"))
+
+
+    def test_notStreamed(self):
+        """
+        If the site does not stream request bodies, a streaming resource is
+        rendered once all of the body has been received, and
+        L{http.Request.deliverBody} delivers all of it at once.
+        """
+        resrc = StreamingResource()
+        channel, transport = self.connect(resrc, stream=False)
+        channel.dataReceived(self.head + b"hello")
+        self.assertEqual(resrc.requests, [])
+        channel.dataReceived(b"world")
+        collector = BodyCollector()
+        resrc.requests[0].deliverBody(collector)
+        self.assertEqual(collector.chunks, [b"helloworld"])
+        collector.reason.trap(http.RequestBodyDone)
+
+
+    def test_deliverBodyTwice(self):
+        """
+        L{http.Request.deliverBody} raises L{RuntimeError} if the body has
+        already been delivered.
+        """
+        resrc = StreamingResource()
+        channel, transport = self.connect(resrc)
+        channel.dataReceived(self.head)
+        request = resrc.requests[0]
+        request.deliverBody(BodyCollector())
+        self.assertRaises(RuntimeError, request.deliverBody, BodyCollector())
+
+
+
+class HTTPFactoryDateTests(unittest.TestCase):
+    """
+    Tests for the C{Date} header value cached by L{http.HTTPFactory}.
+    """
+
+    def test_startFactory(self):
+        """
+        L{http.HTTPFactory.startFactory} caches the current time as a C{Date}
+        header value, and updates it every second.
+        """
+        clock = task.Clock()
+        self.patch(http, "reactor", clock)
+        dates = iter([b"Sun, 06 Nov 1994 08:49:37 GMT",
+                      b"Sun, 06 Nov 1994 08:49:38 GMT"])
+        self.patch(http, "datetimeToString", lambda: next(dates))
+        factory = http.HTTPFactory()
+        factory.startFactory()
+        self.addCleanup(factory.stopFactory)
+        self.assertEqual(factory._date, b"Sun, 06 Nov 1994 08:49:37 GMT")
+        clock.advance(1)
+        self.assertEqual(factory._date, b"Sun, 06 Nov 1994 08:49:38 GMT")
+
+
+    def test_stopFactory(self):
+        """
+        L{http.HTTPFactory.stopFactory} discards the cached C{Date} header
+        value, which would otherwise become stale.
+        """
+        self.patch(http, "reactor", task.Clock())
+        factory = http.HTTPFactory()
+        factory.startFactory()
+        factory.stopFactory()
+        self.assertIdentical(factory._date, None)
+
+
+
 class ServerAttributesTestCase(unittest.TestCase):
     """
     Tests that deprecated twisted.web.server attributes raise the appropriate